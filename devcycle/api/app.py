@@ -5,6 +5,7 @@ This module provides the core FastAPI application with middleware,
 CORS configuration, and basic endpoints.
 """
 
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
@@ -21,6 +22,12 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 from starlette.types import ASGIApp
 
+from ..core.cache import (
+    close_pool_registry,
+    get_async_cache,
+    get_local_cache,
+    get_pool_registry,
+)
 from ..core.config import get_config
 from ..core.logging import get_logger
 from .middleware.csrf_protection import CSRFProtectionMiddleware
@@ -133,6 +140,30 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return cast(Response, response)
 
 
+async def _backfill_auth_indexes(batches: int = 100) -> None:
+    """
+    Index sessions and blacklisted tokens stored before the indexes existed.
+
+    The backfills run off the event loop a few SCAN batches at a time, so
+    shutdown can stop them between chunks. Their progress is kept in Redis
+    and the next start resumes it.
+    """
+    from ..core.auth.session_monitor import get_session_monitor
+    from ..core.auth.token_blacklist import TokenBlacklist
+
+    logger = get_logger("api.app")
+    for backfill in (
+        get_session_monitor().backfill_indexes,
+        TokenBlacklist().backfill_index,
+    ):
+        try:
+            while not await asyncio.to_thread(backfill, batches):
+                pass
+        except Exception as e:
+            logger.error(f"Failed to backfill auth statistics indexes: {e}")
+            return
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
@@ -144,10 +175,39 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     config = get_config()
     logger.info(f"Loaded configuration for environment: {config.environment}")
 
+    # Redis connection pools shared by every subsystem in this worker
+    app.state.redis_pools = get_pool_registry()
+
+    # Keep the in-process L1 cache and the TTL policies coherent with other
+    # workers. Policy changes use the same channel, so the listener runs
+    # even when the L1 cache itself is disabled.
+    try:
+        await get_local_cache().start(get_async_cache().redis_client)
+    except Exception as e:
+        logger.error(f"Failed to start local cache invalidation listener: {e}")
+
+    # Make this worker's WebSocket connections visible to the other workers
+    from ..core.dependencies import close_redis_events
+    from .routes.websocket import manager as websocket_manager
+
+    try:
+        await websocket_manager.start_registry(get_async_cache().redis_client)
+    except Exception as e:
+        logger.error(f"Failed to start WebSocket registry: {e}")
+
+    # Session and blacklist stats count by SCAN until this has finished
+    auth_backfill = asyncio.create_task(_backfill_auth_indexes())
+
     yield
 
     # Shutdown
     logger.info("Shutting down DevCycle API server...")
+    auth_backfill.cancel()
+    await asyncio.gather(auth_backfill, return_exceptions=True)
+    await websocket_manager.stop_registry()
+    await close_redis_events()
+    await get_local_cache().stop()
+    await close_pool_registry()
 
 
 def create_app(environment: Optional[str] = None) -> FastAPI:
@@ -382,6 +442,13 @@ def _setup_routes(app: FastAPI) -> None:
         """Liveness check endpoint."""
         return {"status": "alive", "timestamp": datetime.now(timezone.utc).isoformat()}
 
+    @app.get("/api/v1/debug/redis-pools", tags=["debug"])
+    async def redis_pool_stats() -> Dict[str, Any]:
+        """Get connection counts of the shared Redis pools (debug mode only)."""
+        if not get_config().debug:
+            raise StarletteHTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return get_pool_registry().get_stats()
+
     # Include routers
     app.include_router(auth_router, prefix="/api/v1")
     app.include_router(acp.acp_router, prefix="/api/v1", tags=["acp"])
@@ -418,6 +485,13 @@ if __name__ == "__main__":
         "devcycle.api.app:app",
         host=config.api.host,
         port=config.api.port,
-        reload=config.api.reload and config.environment == "development",
+        # Several workers share WebSocket state through the registry
+        workers=config.api.workers,
+        reload=(
+            config.api.reload
+            and config.environment == "development"
+            and config.api.workers == 1
+        ),
         log_level="info",
+        ws_per_message_deflate=config.api.websocket_per_message_deflate,
     )
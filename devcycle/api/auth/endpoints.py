@@ -14,7 +14,7 @@ from fastapi_users import schemas
 from pydantic import BaseModel, ConfigDict, Field
 
 from ...core.auth.fastapi_users import auth_backend, current_active_user, fastapi_users
-from ...core.auth.session_monitor import SessionMonitor
+from ...core.auth.session_monitor import SessionMonitor, get_session_monitor
 from ...core.auth.tortoise_models import User
 from ...core.logging import get_logger
 
@@ -169,12 +169,14 @@ async def logout(
 @router.post("/logout-all", response_model=LogoutResponse)
 async def logout_all_sessions(
     current_user: User = Depends(current_active_user),
+    session_monitor: SessionMonitor = Depends(get_session_monitor),
 ) -> LogoutResponse:
     """
     Logout user from all active sessions.
 
     Args:
         current_user: Current authenticated user
+        session_monitor: Shared session monitor
 
     Returns:
         LogoutResponse with success status
@@ -183,7 +185,6 @@ async def logout_all_sessions(
         HTTPException: If logout all fails
     """
     try:
-        session_monitor = SessionMonitor()
         removed_count = session_monitor.remove_all_sessions(str(current_user.id))
 
         logger.info(
@@ -213,18 +214,19 @@ async def logout_all_sessions(
 @router.get("/sessions", response_model=dict)
 async def get_user_sessions(
     current_user: User = Depends(current_active_user),
+    session_monitor: SessionMonitor = Depends(get_session_monitor),
 ) -> dict:
     """
     Get current user's active sessions.
 
     Args:
         current_user: Current authenticated user
+        session_monitor: Shared session monitor
 
     Returns:
         Dictionary with active sessions information
     """
     try:
-        session_monitor = SessionMonitor()
         sessions = session_monitor.get_active_sessions(str(current_user.id))
 
         # Clean up sensitive information
@@ -2,38 +2,817 @@
 WebSocket routes for real-time ACP events.
 
 This module provides WebSocket endpoints for real-time event streaming
-from the ACP system to connected clients.
+from the ACP system to connected clients. Events reach clients through a
+fan-out hub: one upstream subscription per channel, each event encoded once,
+and a bounded send queue per connection drained by its own writer task.
+Every event frame carries an ID; a client reconnecting with the last ID it
+received is sent what it missed from the channel's recent history, or from
+the Redis Streams log, before live events.
 """
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, Optional, Set
+import re
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import Query, WebSocket, WebSocketDisconnect
 from fastapi.routing import APIRouter
 
+from ...core.acp.cache.instrumented_pool import RingStats
 from ...core.acp.events.redis_events import RedisACPEvents
+from ...core.config import get_config
 from ...core.dependencies import get_redis_events
+from ..websocket_registry import WebSocketRegistry
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+    MSGPACK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 websocket_router = APIRouter(prefix="/ws", tags=["websocket"])
 
 
+class SlowConsumerPolicy(str, Enum):
+    """What a client's send queue does when the client falls behind."""
+
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued frame
+    COALESCE = "coalesce"  # Replace a queued frame for the same source
+    DISCONNECT = "disconnect"  # Close the connection
+
+
+# Upstream event channel -> message type sent to clients
+EVENT_MESSAGE_TYPES: Dict[str, str] = {
+    "agent_events": "agent_event",
+    "workflow_events": "workflow_event",
+    "system_health": "system_health_event",
+    "performance_metrics": "performance_metrics_event",
+    "error_alerts": "error_alert_event",
+}
+
+# Event types where a newer event for the same source supersedes older ones
+COALESCIBLE_EVENT_TYPES = {
+    "workflow_progress",
+    "agent_status_changed",
+    "system_health_update",
+    "performance_metrics",
+}
+
+
+# Stream entry IDs, which are also the form of local event IDs
+EVENT_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+# Entries read per round trip when replaying from the stream log
+STREAM_REPLAY_PAGE = 500
+
+
+# Subprotocol -> encoding of event frames, in server preference order
+SUBPROTOCOL_ENCODINGS: Dict[str, str] = {
+    "devcycle.msgpack": "msgpack",
+    "devcycle.json": "json",
+}
+
+
+def negotiate_subprotocol(websocket: WebSocket) -> Tuple[Optional[str], str]:
+    """
+    Pick the subprotocol and event encoding for a connection.
+
+    Returns:
+        The first subprotocol offered by the client that the server supports
+        (None if there is none) and the encoding of event frames
+    """
+    for subprotocol in websocket.scope.get("subprotocols", []):
+        encoding = SUBPROTOCOL_ENCODINGS.get(subprotocol)
+        if encoding == "msgpack" and not MSGPACK_AVAILABLE:
+            continue
+        if encoding is not None:
+            return subprotocol, encoding
+    return None, "json"
+
+
+def encode_message(message: Dict[str, Any], encoding: str) -> Any:
+    """Encode an event message as JSON text or msgpack bytes."""
+    if encoding == "msgpack":
+        return msgpack.packb(message, use_bin_type=True, default=str)
+    return json.dumps(message)
+
+
+def coalesce_key(data: Dict[str, Any]) -> Optional[str]:
+    """Get the key under which queued frames of an event may be replaced."""
+    event_type = data.get("event_type")
+    if event_type not in COALESCIBLE_EVENT_TYPES:
+        return None
+    return f"{event_type}:{data.get('source')}"
+
+
+class EventFilter:
+    """
+    Subscription expression an event must match to be sent to a client.
+
+    Clauses are separated by ";" and must all match. A clause is
+    "field=value" or "field!=value", with alternatives separated by ",",
+    e.g. "event_type=workflow_progress,workflow_step_completed;step_id=build".
+    Fields are looked up on the event first, then in its data.
+    """
+
+    _CLAUSE = re.compile(r"^\s*(\w+)\s*(!=|=)\s*(.+?)\s*$")
+
+    def __init__(self, expression: str):
+        """
+        Parse a subscription expression.
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        self.expression = expression
+        self.clauses: List[Tuple[str, bool, Set[str]]] = []
+        for clause in expression.split(";"):
+            if not clause.strip():
+                continue
+            match = self._CLAUSE.match(clause)
+            if match is None:
+                raise ValueError(f"Invalid filter clause: {clause.strip()!r}")
+            field, operator, values = match.groups()
+            alternatives = {value.strip() for value in values.split(",")}
+            alternatives.discard("")
+            if not alternatives:
+                raise ValueError(f"Invalid filter clause: {clause.strip()!r}")
+            self.clauses.append((field, operator == "=", alternatives))
+        if not self.clauses:
+            raise ValueError("Empty filter expression")
+
+    @staticmethod
+    def _lookup(data: Dict[str, Any], field: str) -> Optional[str]:
+        """Get a field from the event or its data."""
+        value = data.get(field)
+        if value is None and isinstance(data.get("data"), dict):
+            value = data["data"].get(field)
+        return None if value is None else str(value)
+
+    def matches(self, data: Dict[str, Any]) -> bool:
+        """Check whether an event matches every clause."""
+        for field, include, alternatives in self.clauses:
+            if (self._lookup(data, field) in alternatives) is not include:
+                return False
+        return True
+
+
+class ChannelHistory:
+    """
+    Recent events of one channel, for resuming subscriptions.
+
+    Holds every event received since the channel's upstream handler was
+    added, up to max_size.
+    """
+
+    def __init__(self, max_size: int):
+        """Initialize an empty history."""
+        self.events: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=max_size)
+
+    def add(self, event_id: str, data: Dict[str, Any]) -> None:
+        """Record an event."""
+        self.events.append((event_id, data))
+
+    def since(self, event_id: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Get the events after an ID, or None if the ID is not retained."""
+        newer = []
+        for entry in reversed(self.events):
+            if entry[0] == event_id:
+                newer.reverse()
+                return newer
+            newer.append(entry)
+        return None
+
+
+def event_key(event_id: str, data: Dict[str, Any]) -> str:
+    """Identify an event whether it was delivered live or replayed."""
+    return data.get("event_id") or event_id
+
+
+class ClientSendQueue:
+    """
+    Bounded queue of encoded frames for one connection, with one writer.
+
+    With batching on, the writer waits up to batch_delay after the oldest
+    queued event, or until batch_max events are queued, and sends them as
+    one array frame. Other messages (replies, broadcasts) are sent on their
+    own, in order, as text frames.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        max_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        encoding: str = "json",
+        batch_max: int = 1,
+        batch_delay: float = 0.0,
+    ):
+        """
+        Initialize the send queue.
+
+        Args:
+            client_id: Client the queue belongs to
+            websocket: Connection the writer sends to
+            max_size: Event frames queued before the policy applies
+            policy: Slow consumer policy
+            encoding: Encoding of event frames, "json" or "msgpack"
+            batch_max: Events sent per frame at most; 1 disables batching
+            batch_delay: Seconds an event may wait for a batch to fill
+        """
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_size = max_size
+        self.policy = policy
+        self.encoding = encoding
+        self.batch_max = batch_max
+        self.batch_delay = batch_delay
+
+        # Entries are [frame, coalesce key, enqueue time, is event]
+        self.frames: Deque[List[Any]] = deque()
+        self._by_key: Dict[str, List[Any]] = {}
+        self._queued_other = 0  # Queued entries that are not events
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.overflowed = False
+
+        # Lag statistics
+        self.sent = 0  # Messages
+        self.frames_sent = 0  # WebSocket frames
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.lag_stats = RingStats()  # seconds from enqueue to send
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write())
+
+    def close(self) -> None:
+        """Stop the writer and discard queued frames."""
+        self.closed = True
+        self.frames.clear()
+        self._queued_other = 0
+        self._by_key.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+
+    def put(
+        self,
+        frame: Any,
+        key: Optional[str] = None,
+        control: bool = False,
+        event: bool = False,
+    ) -> bool:
+        """
+        Queue a frame without waiting.
+
+        Args:
+            frame: Encoded frame
+            key: Coalescing key, used with the coalesce policy
+            control: Replies such as pongs and confirmations, which are
+                never dropped or coalesced
+            event: Event encoded with this queue's encoding, which may be
+                batched
+
+        Returns:
+            False if the frame was not queued because the connection is
+            closed or is being closed as a slow consumer
+        """
+        if self.closed or self.overflowed:
+            return False
+
+        if (
+            key is not None
+            and not control
+            and self.policy is SlowConsumerPolicy.COALESCE
+        ):
+            entry = self._by_key.get(key)
+            if entry is not None:
+                entry[0] = frame  # Keeps its place and original enqueue time
+                self.coalesced += 1
+                return True
+
+        if not control and len(self.frames) >= self.max_size:
+            if self.policy is SlowConsumerPolicy.DISCONNECT:
+                self.overflowed = True
+                self.dropped += len(self.frames) + 1
+                self.frames.clear()
+                self._queued_other = 0
+                self._by_key.clear()
+                self._ready.set()
+                return False
+            self._drop_oldest()
+
+        entry = [frame, None if control else key, time.monotonic(), event]
+        self.frames.append(entry)
+        if not event:
+            self._queued_other += 1
+        if entry[1] is not None and self.policy is SlowConsumerPolicy.COALESCE:
+            self._by_key[entry[1]] = entry
+        self.max_depth = max(self.max_depth, len(self.frames))
+        self._ready.set()
+        return True
+
+    def _pop(self) -> List[Any]:
+        """Remove the oldest queued entry."""
+        entry = self.frames.popleft()
+        if not entry[3]:
+            self._queued_other -= 1
+        if entry[1] is not None and self._by_key.get(entry[1]) is entry:
+            del self._by_key[entry[1]]
+        return entry
+
+    def _drop_oldest(self) -> None:
+        """Discard the oldest queued frame to make room."""
+        self._pop()
+        self.dropped += 1
+
+    async def _write(self) -> None:
+        """Send queued frames in order until the queue is closed."""
+        try:
+            while True:
+                if self.overflowed:
+                    logger.warning(f"Closing slow WebSocket client {self.client_id}")
+                    await self.websocket.close(code=1013)  # Try again later
+                    return
+                if not self.frames:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                if self.batch_max > 1 and self.frames[0][3]:
+                    await self._fill_batch()
+                    if self.overflowed or not self.frames:
+                        continue
+                await self._send(self._take())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client {self.client_id}: {e}")
+            self.closed = True
+
+    async def _fill_batch(self) -> None:
+        """Wait until a batch is full, its oldest event is due or a reply waits."""
+        deadline = self.frames[0][2] + self.batch_delay
+        while (
+            len(self.frames) < self.batch_max
+            and not self._queued_other
+            and not self.overflowed
+        ):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def _take(self) -> List[List[Any]]:
+        """Remove the next frame, or the next batch of events."""
+        entries = [self._pop()]
+        if self.batch_max > 1 and entries[0][3]:
+            while self.frames and self.frames[0][3] and len(entries) < self.batch_max:
+                entries.append(self._pop())
+        return entries
+
+    async def _send(self, entries: List[List[Any]]) -> None:
+        """Send one frame, or a batch of events as one array frame."""
+        if self.batch_max > 1 and entries[0][3]:
+            frames = [entry[0] for entry in entries]
+            if self.encoding == "msgpack":
+                packer = msgpack.Packer()
+                payload = packer.pack_array_header(len(frames)) + b"".join(frames)
+            else:
+                payload = "[" + ",".join(frames) + "]"
+        else:
+            payload = entries[0][0]
+
+        if isinstance(payload, bytes):
+            await self.websocket.send_bytes(payload)
+        else:
+            await self.websocket.send_text(payload)
+
+        now = time.monotonic()
+        self.sent += len(entries)
+        self.frames_sent += 1
+        self.bytes_sent += len(payload)  # JSON frames are ASCII
+        for entry in entries:
+            self.lag_stats.add(now - entry[2])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and lag statistics."""
+        return {
+            "policy": self.policy.value,
+            "encoding": self.encoding,
+            "batch_max": self.batch_max,
+            "batch_delay_ms": self.batch_delay * 1000,
+            "queued": len(self.frames),
+            "max_queued": self.max_depth,
+            "sent": self.sent,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "lag_ms": self.lag_stats.to_dict(scale=1000),
+        }
+
+
+class EventFanoutHub:
+    """
+    Delivers events from one upstream subscription per channel to clients.
+
+    Each event is encoded once per encoding in use and the frame is put on
+    the send queue of every client subscribed to the channel whose filter it
+    matches. The upstream handler is added with the first client; it and the
+    channel's history are kept for history_linger seconds after the last
+    client leaves, so a client that reconnects can resume.
+
+    Events are identified by the stream entry ID the publisher stamped on
+    them, or else by a local ID of the same form.
+    """
+
+    def __init__(
+        self,
+        queues: Dict[str, ClientSendQueue],
+        history_size: int = 1000,
+        history_linger: float = 0.0,
+    ):
+        """
+        Initialize the hub.
+
+        Args:
+            queues: Send queues by client ID, owned by the connection manager
+            history_size: Events kept per channel for resuming (0 disables)
+            history_linger: Seconds a channel is kept after its last client
+        """
+        self.queues = queues
+        self.redis_events: Optional[RedisACPEvents] = None
+        self.history_size = history_size
+        self.history_linger = history_linger
+        # Channel -> client ID -> the client's filter, if any
+        self.channel_clients: Dict[str, Dict[str, Optional[EventFilter]]] = {}
+        self.history: Dict[str, ChannelHistory] = {}
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._message_types: Dict[str, str] = {}
+        self._lingering: Dict[str, asyncio.TimerHandle] = {}
+        # (client ID, channel) -> live events held while a replay is read
+        self._held: Dict[Tuple[str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+        self._epoch = int(time.time() * 1000)
+        self._sequence = 0
+
+        # Fan-out statistics
+        self.events_received = 0
+        self.frames_queued = 0
+        self.frames_rejected = 0
+        self.frames_filtered = 0
+        self.events_replayed = 0
+        self.resyncs = 0
+
+    def subscribe(
+        self,
+        client_id: str,
+        channel: str,
+        message_type: str,
+        event_filter: Optional[EventFilter] = None,
+        since: Optional[str] = None,
+    ) -> bool:
+        """
+        Subscribe a client to a channel (without the key prefix).
+
+        Subscribing again replaces the client's filter. With since, the
+        events received after that ID are queued first, followed by a
+        replay_complete message.
+
+        Returns:
+            False if since is not in the channel's history; the client's
+            live events are then held until finish_replay is called
+        """
+        lingering = self._lingering.pop(channel, None)
+        if lingering is not None:
+            lingering.cancel()
+        clients = self.channel_clients.get(channel)
+        if clients is None:
+            clients = self.channel_clients[channel] = {}
+            handler = self._make_handler(channel, message_type)
+            self._handlers[channel] = handler
+            self._message_types[channel] = message_type
+            if self.history_size > 0:
+                self.history[channel] = ChannelHistory(self.history_size)
+            if self.redis_events is not None:
+                self.redis_events.add_handler(channel, handler)
+        clients[client_id] = event_filter
+
+        if since is None:
+            return True
+        history = self.history.get(channel)
+        events = history.since(since) if history is not None else None
+        if events is None:
+            self._held[(client_id, channel)] = []
+            return False
+        self._replay(client_id, channel, since, events)
+        return True
+
+    def finish_replay(
+        self,
+        client_id: str,
+        channel: str,
+        since: str,
+        events: Optional[List[Tuple[str, Dict[str, Any]]]],
+    ) -> None:
+        """
+        Queue events replayed from the stream log, then the held live ones.
+
+        Args:
+            client_id: Client whose live events are held
+            channel: Channel being resumed
+            since: Last event ID the client received
+            events: (ID, event) pairs after since, or None if they are no
+                longer retained and the client must refetch its state
+        """
+        held = self._held.pop((client_id, channel), None)
+        if held is None:
+            return  # Unsubscribed in the meantime
+        self._replay(client_id, channel, since, events)
+        replayed = {event_key(event_id, data) for event_id, data in events or []}
+        self._queue_events(
+            client_id,
+            channel,
+            [entry for entry in held if event_key(*entry) not in replayed],
+        )
+
+    def _replay(
+        self,
+        client_id: str,
+        channel: str,
+        since: str,
+        events: Optional[List[Tuple[str, Dict[str, Any]]]],
+    ) -> None:
+        """Queue missed events and tell the client whether it is caught up."""
+        queue = self.queues.get(client_id)
+        if queue is None:
+            return
+        if events is None:
+            self.resyncs += 1
+            message = {"type": "resync_required", "channel": channel, "since": since}
+        else:
+            # Replayed events may exceed the queue bound once
+            replayed = self._queue_events(client_id, channel, events, replay=True)
+            self.events_replayed += replayed
+            message = {
+                "type": "replay_complete",
+                "channel": channel,
+                "replayed": replayed,
+                "last_id": events[-1][0] if events else since,
+            }
+        queue.put(json.dumps(message), control=True)
+
+    def _queue_events(
+        self,
+        client_id: str,
+        channel: str,
+        events: List[Tuple[str, Dict[str, Any]]],
+        replay: bool = False,
+    ) -> int:
+        """Encode and queue events for one client, applying its filter."""
+        queue = self.queues.get(client_id)
+        clients = self.channel_clients.get(channel, {})
+        if queue is None or client_id not in clients:
+            return 0
+        event_filter = clients[client_id]
+        message_type = self._message_types[channel]
+        queued = 0
+        for event_id, data in events:
+            if event_filter is not None and not event_filter.matches(data):
+                continue
+            frame = encode_message(
+                {"type": message_type, "id": event_id, "data": data}, queue.encoding
+            )
+            if queue.put(frame, coalesce_key(data), control=replay, event=True):
+                queued += 1
+        return queued
+
+    def unsubscribe(self, client_id: str, channel: str) -> None:
+        """Unsubscribe a client, closing the upstream subscription if unused."""
+        clients = self.channel_clients.get(channel)
+        if clients is None:
+            return
+        clients.pop(client_id, None)
+        self._held.pop((client_id, channel), None)
+        if clients or channel in self._lingering:
+            return
+        if self.history_linger > 0 and channel in self.history:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._lingering[channel] = loop.call_later(
+                    self.history_linger, self._release, channel
+                )
+                return
+        self._release(channel)
+
+    def _release(self, channel: str) -> None:
+        """Close a channel's upstream handler and drop its history."""
+        self._lingering.pop(channel, None)
+        if self.channel_clients.get(channel):
+            return
+        self.channel_clients.pop(channel, None)
+        self.history.pop(channel, None)
+        self._message_types.pop(channel, None)
+        handler = self._handlers.pop(channel, None)
+        if handler is not None and self.redis_events is not None:
+            self.redis_events.remove_handler(channel, handler)
+
+    def unsubscribe_all(self, client_id: str) -> None:
+        """Unsubscribe a client from every channel."""
+        for channel, clients in list(self.channel_clients.items()):
+            if client_id in clients:
+                self.unsubscribe(client_id, channel)
+
+    def _make_handler(
+        self, channel: str, message_type: str
+    ) -> Callable[[Dict[str, Any]], None]:
+        """Create the upstream handler of a channel."""
+
+        def handler(data: Dict[str, Any]) -> None:
+            self.dispatch(channel, message_type, data)
+
+        return handler
+
+    def _next_id(self) -> str:
+        """Get a local event ID for an event without a stream entry ID."""
+        self._sequence += 1
+        return f"{self._epoch}-{self._sequence}"
+
+    def dispatch(self, channel: str, message_type: str, data: Dict[str, Any]) -> None:
+        """Record an event and queue it, encoded once, for the channel's clients."""
+        clients = self.channel_clients.get(channel)
+        if clients is None:
+            return
+        event_id = data.get("stream_id") or self._next_id()
+        history = self.history.get(channel)
+        if history is not None:
+            history.add(event_id, data)
+        if not clients:
+            return  # Lingering for clients that may resume
+        self.events_received += 1
+        frames: Dict[str, Any] = {}  # Encoding -> frame
+        key = coalesce_key(data)
+        for client_id, event_filter in list(clients.items()):
+            held = self._held.get((client_id, channel))
+            if held is not None:
+                held.append((event_id, data))
+                continue
+            if event_filter is not None and not event_filter.matches(data):
+                self.frames_filtered += 1
+                continue
+            queue = self.queues.get(client_id)
+            if queue is None:
+                self.frames_rejected += 1
+                continue
+            frame = frames.get(queue.encoding)
+            if frame is None:
+                frame = frames[queue.encoding] = encode_message(
+                    {"type": message_type, "id": event_id, "data": data},
+                    queue.encoding,
+                )
+            if queue.put(frame, key, event=True):
+                self.frames_queued += 1
+            else:
+                self.frames_rejected += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fan-out statistics."""
+        return {
+            "channels": {
+                channel: len(clients)
+                for channel, clients in self.channel_clients.items()
+                if clients
+            },
+            "lingering_channels": len(self._lingering),
+            "history_events": sum(len(h.events) for h in self.history.values()),
+            "events_received": self.events_received,
+            "frames_queued": self.frames_queued,
+            "frames_rejected": self.frames_rejected,
+            "frames_filtered": self.frames_filtered,
+            "events_replayed": self.events_replayed,
+            "resyncs": self.resyncs,
+        }
+
+
 class ConnectionManager:
     """Manages WebSocket connections and event subscriptions."""
 
-    def __init__(self) -> None:
-        """Initialize the WebSocket manager."""
+    def __init__(
+        self,
+        send_queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[SlowConsumerPolicy] = None,
+        history_size: Optional[int] = None,
+        history_linger: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the WebSocket manager.
+
+        Args:
+            send_queue_size: Frames queued per client (defaults to
+                API_WEBSOCKET_SEND_QUEUE_SIZE)
+            slow_consumer_policy: Policy for clients that fall behind
+                (defaults to API_WEBSOCKET_SLOW_CONSUMER_POLICY)
+            history_size: Events kept per channel for resuming (defaults
+                to API_WEBSOCKET_HISTORY_SIZE)
+            history_linger: Seconds a channel's history outlives its last
+                client (defaults to API_WEBSOCKET_HISTORY_LINGER_SECONDS)
+        """
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_subscriptions: Dict[str, Set[str]] = {}
+        self.send_queues: Dict[str, ClientSendQueue] = {}
+        self.hub = EventFanoutHub(self.send_queues)
         self.redis_events: Optional[RedisACPEvents] = None
+        self.send_queue_size = send_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.history_size = history_size
+        self.history_linger = history_linger
+        # Presence and routing across workers, once started
+        self.registry: Optional[WebSocketRegistry] = None
 
-    async def connect(self, websocket: WebSocket, client_id: str) -> None:
-        """Accept a WebSocket connection."""
-        await websocket.accept()
+    def _load_config(self) -> None:
+        """Fill in the limits not passed to the constructor from the config."""
+        if None not in (
+            self.send_queue_size,
+            self.slow_consumer_policy,
+            self.history_size,
+            self.history_linger,
+        ):
+            return
+        api_config = get_config().api
+        if self.send_queue_size is None:
+            self.send_queue_size = api_config.websocket_send_queue_size
+        if self.slow_consumer_policy is None:
+            self.slow_consumer_policy = SlowConsumerPolicy(
+                api_config.websocket_slow_consumer_policy
+            )
+        if self.history_size is None:
+            self.history_size = api_config.websocket_history_size
+        if self.history_linger is None:
+            self.history_linger = api_config.websocket_history_linger_seconds
+        self.hub.history_size = self.history_size
+        self.hub.history_linger = self.history_linger
+
+    def _create_send_queue(
+        self, client_id: str, websocket: WebSocket, **options: Any
+    ) -> ClientSendQueue:
+        """Create a client's send queue with the configured limits."""
+        self._load_config()
+        return ClientSendQueue(
+            client_id,
+            websocket,
+            self.send_queue_size,
+            self.slow_consumer_policy,
+            **options,
+        )
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        subprotocol: Optional[str] = None,
+        **options: Any,
+    ) -> None:
+        """
+        Accept a WebSocket connection.
+
+        Args:
+            websocket: Connection to accept
+            client_id: Client identifier
+            subprotocol: Negotiated subprotocol to accept with
+            **options: Send queue options (encoding, batch_max, batch_delay)
+        """
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections[client_id] = websocket
         self.connection_subscriptions[client_id] = set()
+        queue = self._create_send_queue(client_id, websocket, **options)
+        previous = self.send_queues.get(client_id)
+        if previous is not None:
+            previous.close()
+        self.send_queues[client_id] = queue
+        queue.start()
+        if self.registry is not None:
+            self.registry.client_connected(client_id)
         logger.info(f"WebSocket client {client_id} connected")
 
     def disconnect(self, client_id: str) -> None:
@@ -42,21 +821,99 @@ class ConnectionManager:
             del self.active_connections[client_id]
         if client_id in self.connection_subscriptions:
             del self.connection_subscriptions[client_id]
+        queue = self.send_queues.pop(client_id, None)
+        if queue is not None:
+            queue.close()
+        self.hub.unsubscribe_all(client_id)
+        if self.registry is not None:
+            self.registry.client_disconnected(client_id)
         logger.info(f"WebSocket client {client_id} disconnected")
 
-    async def send_personal_message(self, message: str, client_id: str) -> None:
-        """Send a message to a specific client."""
+    async def start_registry(
+        self, redis_client: Any, interval: Optional[float] = None
+    ) -> None:
+        """
+        Publish this worker's connections and accept messages routed to it.
+
+        Args:
+            redis_client: Async Redis client with decoded responses
+            interval: Seconds between presence heartbeats (defaults to
+                API_WEBSOCKET_PRESENCE_INTERVAL_SECONDS)
+        """
+        if interval is None:
+            interval = get_config().api.websocket_presence_interval_seconds
+        registry = WebSocketRegistry(interval=interval)
+        for client_id in self.active_connections:
+            registry.client_connected(client_id)
+        self.registry = registry
+        await registry.start(redis_client, self._deliver_routed, self.get_presence)
+
+    async def stop_registry(self) -> None:
+        """Deregister this worker."""
+        if self.registry is not None:
+            await self.registry.stop()
+            self.registry = None
+
+    def get_presence(self) -> Dict[str, Any]:
+        """Get the counts this worker publishes to the registry."""
+        return {
+            "connections": len(self.active_connections),
+            "subscriptions": sum(
+                len(subscriptions)
+                for subscriptions in self.connection_subscriptions.values()
+            ),
+            "channels": self.hub.get_stats()["channels"],
+        }
+
+    async def _deliver_routed(self, client_id: Optional[str], message: str) -> None:
+        """Deliver a message another worker sent to this worker's clients."""
+        if client_id is None:
+            await self._broadcast_local(message)
+            return
+        # Never routed onwards, so a stale mapping cannot loop
+        queue = self.send_queues.get(client_id)
+        if queue is not None:
+            queue.put(message, control=True)
+
+    async def send_personal_message(self, message: str, client_id: str) -> bool:
+        """
+        Send a message to a specific client.
+
+        Clients connected to other workers are reached through the registry.
+
+        Returns:
+            True if the message was queued here or handed to the worker
+            holding the client
+        """
+        queue = self.send_queues.get(client_id)
+        if queue is not None:
+            return queue.put(message, control=True)
         if client_id in self.active_connections:
             try:
                 await self.active_connections[client_id].send_text(message)
+                return True
             except Exception as e:
                 logger.error(f"Error sending message to {client_id}: {e}")
                 self.disconnect(client_id)
+                return False
+        if self.registry is not None:
+            return await self.registry.send(client_id, message)
+        return False
 
     async def broadcast(self, message: str) -> None:
-        """Broadcast a message to all connected clients."""
+        """Broadcast a message to all connected clients, on every worker."""
+        await self._broadcast_local(message)
+        if self.registry is not None:
+            await self.registry.broadcast(message)
+
+    async def _broadcast_local(self, message: str) -> None:
+        """Broadcast a message to the clients connected to this worker."""
         disconnected_clients = []
         for client_id, connection in self.active_connections.items():
+            queue = self.send_queues.get(client_id)
+            if queue is not None:
+                queue.put(message)
+                continue
             try:
                 await connection.send_text(message)
             except Exception as e:
@@ -67,128 +924,120 @@ class ConnectionManager:
         for client_id in disconnected_clients:
             self.disconnect(client_id)
 
-    async def subscribe_to_events(self, client_id: str, event_types: Set[str]) -> None:
-        """Subscribe a client to specific event types."""
+    async def subscribe_to_events(
+        self,
+        client_id: str,
+        event_types: Set[str],
+        since: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Subscribe a client to specific event types.
+
+        Args:
+            client_id: Client identifier
+            event_types: Event channels to subscribe to
+            since: Last event ID received per event type, to resume from
+        """
         if client_id not in self.connection_subscriptions:
             self.connection_subscriptions[client_id] = set()
 
         self.connection_subscriptions[client_id].update(event_types)
 
-        # Set up Redis event subscriptions if not already done
-        if not self.redis_events:
-            self.redis_events = get_redis_events()
-            await self.redis_events.start()
+        await self._ensure_redis_events()
 
-        # Subscribe to relevant Redis channels
+        # The hub keeps one upstream handler per channel for all clients
         for event_type in event_types:
-            if event_type == "agent_events":
-
-                def agent_callback(data: Dict[str, Any]) -> None:
-                    # Schedule the async function to run
-                    import asyncio
-
-                    asyncio.create_task(self._handle_agent_event(data, client_id))
-
-                await self.redis_events.subscribe_to_agent_events(agent_callback)
-            elif event_type == "workflow_events":
-
-                def workflow_callback(data: Dict[str, Any]) -> None:
-                    # Schedule the async function to run
-                    import asyncio
-
-                    asyncio.create_task(self._handle_workflow_event(data, client_id))
-
-                await self.redis_events.subscribe_to_workflow_events(
-                    callback=workflow_callback
-                )
-            elif event_type == "system_health":
-
-                def system_health_callback(data: Dict[str, Any]) -> None:
-                    # Schedule the async function to run
-                    import asyncio
-
-                    asyncio.create_task(
-                        self._handle_system_health_event(data, client_id)
-                    )
-
-                await self.redis_events.subscribe_to_system_health(
-                    system_health_callback
-                )
-            elif event_type == "performance_metrics":
-
-                def performance_callback(data: Dict[str, Any]) -> None:
-                    # Schedule the async function to run
-                    import asyncio
-
-                    asyncio.create_task(
-                        self._handle_performance_metrics_event(data, client_id)
-                    )
-
-                await self.redis_events.subscribe_to_performance_metrics(
-                    performance_callback
+            message_type = EVENT_MESSAGE_TYPES.get(event_type)
+            if message_type is not None:
+                await self._subscribe(
+                    client_id,
+                    event_type,
+                    message_type,
+                    since=(since or {}).get(event_type),
                 )
-            elif event_type == "error_alerts":
-
-                def error_callback(data: Dict[str, Any]) -> None:
-                    # Schedule the async function to run
-                    import asyncio
 
-                    asyncio.create_task(self._handle_error_alert_event(data, client_id))
+    async def subscribe_to_workflow(
+        self,
+        client_id: str,
+        workflow_id: str,
+        event_filter: Optional[EventFilter] = None,
+        since: Optional[str] = None,
+    ) -> None:
+        """Subscribe a client to one workflow's events, optionally filtered."""
+        channel = f"workflow_events:{workflow_id}"
+        self.connection_subscriptions.setdefault(client_id, set()).add(channel)
+        await self._ensure_redis_events()
+        await self._subscribe(client_id, channel, "workflow_event", event_filter, since)
 
-                await self.redis_events.subscribe_to_error_alerts(error_callback)
+    async def _subscribe(
+        self,
+        client_id: str,
+        channel: str,
+        message_type: str,
+        event_filter: Optional[EventFilter] = None,
+        since: Optional[str] = None,
+    ) -> None:
+        """Subscribe a client to a channel, replaying what it missed since an ID."""
+        if self.hub.subscribe(client_id, channel, message_type, event_filter, since):
+            return
+        # Older than the in-memory history; live events wait for the log
+        events = await self._read_stream_history(channel, str(since))
+        self.hub.finish_replay(client_id, channel, str(since), events)
 
-    async def _handle_agent_event(self, data: Dict[str, Any], client_id: str) -> None:
-        """Handle agent events for a specific client."""
-        if (
-            client_id in self.connection_subscriptions
-            and "agent_events" in self.connection_subscriptions[client_id]
-        ):
-            message = json.dumps({"type": "agent_event", "data": data})
-            await self.send_personal_message(message, client_id)
+    async def _read_stream_history(
+        self, channel: str, since: str
+    ) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Read a channel's events after an ID from the Redis Streams log.
 
-    async def _handle_workflow_event(
-        self, data: Dict[str, Any], client_id: str
-    ) -> None:
-        """Handle workflow events for a specific client."""
-        if (
-            client_id in self.connection_subscriptions
-            and "workflow_events" in self.connection_subscriptions[client_id]
-        ):
-            message = json.dumps({"type": "workflow_event", "data": data})
-            await self.send_personal_message(message, client_id)
+        Returns:
+            (entry ID, event) pairs, or None if the log is disabled or no
+            longer holds the entry with that ID
+        """
+        streams = getattr(self.redis_events, "streams", None)
+        if streams is None or not EVENT_ID_PATTERN.match(since):
+            return None
+        family, _, entity = channel.partition(":")
+        stream = streams.stream_for_channel(family)
+        if stream is None:
+            return None
 
-    async def _handle_system_health_event(
-        self, data: Dict[str, Any], client_id: str
-    ) -> None:
-        """Handle system health events for a specific client."""
-        if (
-            client_id in self.connection_subscriptions
-            and "system_health" in self.connection_subscriptions[client_id]
-        ):
-            message = json.dumps({"type": "system_health_event", "data": data})
-            await self.send_personal_message(message, client_id)
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        page = await streams.read_since(
+            stream, since, count=STREAM_REPLAY_PAGE, inclusive=True
+        )
+        if not page or page[0].entry_id != since:
+            return None  # Trimmed, or not an ID from this log
+        while True:
+            for event in page:
+                if event.entry_id == since:
+                    continue
+                # Per-entity channels are logged to their family's stream
+                if entity and entity not in (
+                    event.data.get("source"),
+                    (event.data.get("data") or {}).get("workflow_id"),
+                ):
+                    continue
+                events.append((event.entry_id, event.data))
+            if len(page) < STREAM_REPLAY_PAGE:
+                return events
+            page = await streams.read_since(
+                stream, page[-1].entry_id, count=STREAM_REPLAY_PAGE
+            )
 
-    async def _handle_performance_metrics_event(
-        self, data: Dict[str, Any], client_id: str
-    ) -> None:
-        """Handle performance metrics events for a specific client."""
-        if (
-            client_id in self.connection_subscriptions
-            and "performance_metrics" in self.connection_subscriptions[client_id]
-        ):
-            message = json.dumps({"type": "performance_metrics_event", "data": data})
-            await self.send_personal_message(message, client_id)
+    async def _ensure_redis_events(self) -> None:
+        """Start the Redis events service on first use."""
+        if not self.redis_events:
+            self.redis_events = get_redis_events()
+            await self.redis_events.start()
+            self.hub.redis_events = self.redis_events
 
-    async def _handle_error_alert_event(
-        self, data: Dict[str, Any], client_id: str
-    ) -> None:
-        """Handle error alert events for a specific client."""
-        if (
-            client_id in self.connection_subscriptions
-            and "error_alerts" in self.connection_subscriptions[client_id]
-        ):
-            message = json.dumps({"type": "error_alert_event", "data": data})
-            await self.send_personal_message(message, client_id)
+    def get_client_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get send queue and lag statistics per client."""
+        return {
+            client_id: queue.get_stats()
+            for client_id, queue in self.send_queues.items()
+        }
 
 
 # Global connection manager
@@ -197,10 +1046,29 @@ manager = ConnectionManager()
 
 @websocket_router.websocket("/events")
 async def websocket_endpoint(
-    websocket: WebSocket, client_id: str = "anonymous"
+    websocket: WebSocket,
+    client_id: str = "anonymous",
+    batch_ms: int = Query(default=0, ge=0, le=1000),
+    batch_max: int = Query(default=100, ge=1, le=1000),
 ) -> None:
-    """Websocket endpoint for real-time ACP events."""
-    await manager.connect(websocket, client_id)
+    """
+    Websocket endpoint for real-time ACP events.
+
+    With batch_ms > 0, events are buffered for up to batch_ms milliseconds
+    or batch_max events and sent as one array frame. Clients offering the
+    devcycle.msgpack subprotocol receive events as binary msgpack frames.
+    A subscribe message may carry "since", mapping event types to the last
+    event ID received, to replay missed events first.
+    """
+    subprotocol, encoding = negotiate_subprotocol(websocket)
+    await manager.connect(
+        websocket,
+        client_id,
+        subprotocol=subprotocol,
+        encoding=encoding,
+        batch_max=batch_max if batch_ms > 0 else 1,
+        batch_delay=batch_ms / 1000,
+    )
 
     try:
         while True:
@@ -212,9 +1080,15 @@ async def websocket_endpoint(
                 message_type = message.get("type")
 
                 if message_type == "subscribe":
-                    # Client wants to subscribe to specific event types
+                    # Client wants to subscribe to specific event types,
+                    # optionally resuming each after the last ID it received
                     event_types = set(message.get("event_types", []))
-                    await manager.subscribe_to_events(client_id, event_types)
+                    since = message.get("since")
+                    await manager.subscribe_to_events(
+                        client_id,
+                        event_types,
+                        since=since if isinstance(since, dict) else None,
+                    )
 
                     # Send confirmation
                     await manager.send_personal_message(
@@ -260,19 +1134,42 @@ async def websocket_endpoint(
 
 @websocket_router.websocket("/workflow/{workflow_id}")
 async def workflow_websocket_endpoint(
-    websocket: WebSocket, workflow_id: str, client_id: str = "anonymous"
+    websocket: WebSocket,
+    workflow_id: str,
+    client_id: str = "anonymous",
+    expression: Optional[str] = Query(default=None, alias="filter"),
+    since: Optional[str] = None,
 ) -> None:
-    """Websocket endpoint for specific workflow events."""
+    """
+    Websocket endpoint for specific workflow events.
+
+    Only the workflow's own channel is subscribed. The optional filter query
+    parameter, or a {"type": "filter", "filter": ...} message, restricts
+    events by type, step ID or other fields (see EventFilter). With since,
+    the events after that ID are replayed first.
+    """
+    try:
+        event_filter = EventFilter(expression) if expression else None
+    except ValueError as e:
+        await websocket.accept()
+        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await websocket.close(code=1008)  # Policy violation
+        return
+
     await manager.connect(websocket, client_id)
 
     try:
         # Subscribe to workflow-specific events
-        await manager.subscribe_to_events(client_id, {"workflow_events"})
+        await manager.subscribe_to_workflow(client_id, workflow_id, event_filter, since)
 
         # Send initial confirmation
         await manager.send_personal_message(
             json.dumps(
-                {"type": "workflow_subscription_confirmed", "workflow_id": workflow_id}
+                {
+                    "type": "workflow_subscription_confirmed",
+                    "workflow_id": workflow_id,
+                    "filter": expression,
+                }
             ),
             client_id,
         )
@@ -289,6 +1186,24 @@ async def workflow_websocket_endpoint(
                     await manager.send_personal_message(
                         json.dumps({"type": "pong"}), client_id
                     )
+                elif message_type == "filter":
+                    # Replace the filter; null or empty removes it
+                    expression = message.get("filter") or None
+                    try:
+                        event_filter = EventFilter(expression) if expression else None
+                    except ValueError as e:
+                        await manager.send_personal_message(
+                            json.dumps({"type": "error", "message": str(e)}),
+                            client_id,
+                        )
+                        continue
+                    await manager.subscribe_to_workflow(
+                        client_id, workflow_id, event_filter
+                    )
+                    await manager.send_personal_message(
+                        json.dumps({"type": "filter_updated", "filter": expression}),
+                        client_id,
+                    )
                 else:
                     await manager.send_personal_message(
                         json.dumps(
@@ -315,12 +1230,28 @@ async def workflow_websocket_endpoint(
 
 @websocket_router.get("/status")
 async def websocket_status() -> Dict[str, Any]:
-    """Get WebSocket connection status."""
-    return {
+    """
+    Get WebSocket connection status.
+
+    With the registry running, active_connections covers every worker and
+    per-worker presence is listed under "workers". The other fields,
+    connected_clients included, describe the worker serving the request.
+    """
+    status: Dict[str, Any] = {
         "active_connections": len(manager.active_connections),
         "connected_clients": list(manager.active_connections.keys()),
         "subscription_counts": {
             client_id: len(subscriptions)
             for client_id, subscriptions in manager.connection_subscriptions.items()
         },
+        "send_queues": manager.get_client_stats(),
+        "fanout": manager.hub.get_stats(),
     }
+    if manager.registry is not None:
+        status["registry"] = manager.registry.get_stats()
+        cluster = await manager.registry.get_cluster_status()
+        if cluster:
+            status["active_connections"] = cluster["active_connections"]
+            status["workers"] = cluster["workers"]
+            status["channels"] = cluster["channels"]
+    return status
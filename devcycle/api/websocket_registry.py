@@ -0,0 +1,453 @@
+"""
+Cluster-wide registry of WebSocket connections.
+
+Each API worker (uvicorn process or pod) holds its own WebSocket
+connections. WebSocketRegistry makes them visible to the other workers
+through Redis:
+
+- A heartbeat writes the worker's presence (connection and subscription
+  counts) with a TTL, and records the worker in a sorted set scored by the
+  heartbeat time. Workers that stop heartbeating drop out after the TTL.
+- A hash maps client IDs to the worker holding them, and a set per worker
+  lists its clients. Connects and disconnects are written in batches by the
+  heartbeat task.
+- Every worker subscribes to its own channel. A message for a client on
+  another worker is published on that worker's channel by a script that
+  looks the worker up, so routing takes one round trip.
+- Each heartbeat looks for workers whose heartbeat expired and releases
+  the mappings of their clients, so dead workers are cleaned up without
+  reading the whole hash.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+from ..core.cache.lua_scripts import ScriptLibrary
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Publish a message on the channel of the worker holding a client.
+# KEYS: client hash
+# ARGV: client_id, worker channel prefix, worker channel suffix, message
+# Returns -1 for an unknown client, else the number of receivers
+ROUTE_TO_CLIENT = """
+local worker = redis.call("hget", KEYS[1], ARGV[1])
+if not worker then
+    return -1
+end
+local receivers = redis.call("publish", ARGV[2] .. worker .. ARGV[3], ARGV[4])
+if receivers == 0 then
+    redis.call("hdel", KEYS[1], ARGV[1])
+end
+return receivers
+"""
+
+# Remove clients of a worker from the hash, unless another worker has taken
+# them over.
+# KEYS: client hash
+# ARGV: worker_id, then client IDs
+RELEASE_CLIENTS = """
+local removed = 0
+for i = 2, #ARGV do
+    if redis.call("hget", KEYS[1], ARGV[i]) == ARGV[1] then
+        removed = removed + redis.call("hdel", KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+REGISTRY_SCRIPTS: Dict[str, str] = {
+    "route": ROUTE_TO_CLIENT,
+    "release": RELEASE_CLIENTS,
+}
+
+# Delivers a message from another worker: (client ID, or None for a
+# broadcast, message)
+MessageHandler = Callable[[Optional[str], str], Awaitable[None]]
+
+
+class WebSocketRegistry:
+    """Presence and message routing for WebSocket connections across workers."""
+
+    def __init__(
+        self,
+        key_prefix: str = "devcycle:ws:",
+        interval: float = 5.0,
+        worker_id: Optional[str] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            key_prefix: Prefix of the registry's keys and channels
+            interval: Seconds between heartbeats; a worker is considered
+                gone after three missed heartbeats
+            worker_id: Identifier of this worker (defaults to host, PID and
+                a random suffix)
+        """
+        self.key_prefix = key_prefix
+        self.interval = interval
+        self.ttl = interval * 3
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+
+        self._redis: Optional[redis.Redis] = None
+        self._scripts: Optional[ScriptLibrary] = None
+        self._pubsub: Optional[redis.client.PubSub] = None
+        self._on_message: Optional[MessageHandler] = None
+        self._presence: Callable[[], Dict[str, Any]] = dict
+        self._running = False
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Local clients, and changes not yet written to Redis
+        self.clients: Set[str] = set()
+        self._added: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._dirty = asyncio.Event()
+
+        # Routing statistics
+        self.messages_routed = 0
+        self.messages_unroutable = 0
+        self.messages_received = 0
+        self.heartbeats = 0
+        self.heartbeat_errors = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the registry is connected to Redis."""
+        return self._running
+
+    @property
+    def workers_key(self) -> str:
+        """Sorted set of workers scored by their last heartbeat."""
+        return f"{self.key_prefix}workers"
+
+    @property
+    def clients_key(self) -> str:
+        """Hash of client ID to the worker holding the connection."""
+        return f"{self.key_prefix}clients"
+
+    @property
+    def broadcast_channel(self) -> str:
+        """Channel of messages for every client on every worker."""
+        return f"{self.key_prefix}broadcast"
+
+    def _presence_key(self, worker_id: str) -> str:
+        """Get the key of a worker's presence."""
+        return f"{self.key_prefix}worker:{worker_id}"
+
+    def _worker_clients_key(self, worker_id: str) -> str:
+        """Get the key of the set of a worker's clients."""
+        return f"{self.key_prefix}worker:{worker_id}:clients"
+
+    def _worker_channel(self, worker_id: str) -> str:
+        """Get the channel of messages for a worker's clients."""
+        return f"{self.key_prefix}worker:{worker_id}:messages"
+
+    def client_connected(self, client_id: str) -> None:
+        """Record a client connected to this worker."""
+        self.clients.add(client_id)
+        self._removed.discard(client_id)
+        self._added.add(client_id)
+        self._dirty.set()
+
+    def client_disconnected(self, client_id: str) -> None:
+        """Record a client that left this worker."""
+        self.clients.discard(client_id)
+        self._added.discard(client_id)
+        self._removed.add(client_id)
+        self._dirty.set()
+
+    async def start(
+        self,
+        redis_client: redis.Redis,
+        on_message: MessageHandler,
+        presence: Callable[[], Dict[str, Any]],
+    ) -> None:
+        """
+        Register this worker and start routing messages to it.
+
+        Args:
+            redis_client: Async Redis client with decoded responses
+            on_message: Delivers messages sent to this worker's clients
+            presence: Returns the counts published with each heartbeat
+        """
+        if self._running:
+            return
+
+        self._redis = redis_client
+        self._scripts = ScriptLibrary(redis_client, REGISTRY_SCRIPTS)
+        self._on_message = on_message
+        self._presence = presence
+        self._pubsub = redis_client.pubsub()
+        await self._pubsub.subscribe(
+            self._worker_channel(self.worker_id), self.broadcast_channel
+        )
+        self._running = True
+        self._added.update(self.clients)
+        await self._sync()
+        for coro in (self._heartbeat(), self._listen()):
+            task = asyncio.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        logger.info(f"WebSocket registry started for worker {self.worker_id}")
+
+    async def stop(self) -> None:
+        """Deregister this worker and stop routing."""
+        if not self._running:
+            return
+
+        self._running = False
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            if self.clients or self._removed:
+                self._scripts.queue(
+                    pipe,
+                    "release",
+                    keys=[self.clients_key],
+                    args=[self.worker_id, *(self.clients | self._removed)],
+                )
+            pipe.zrem(self.workers_key, self.worker_id)
+            pipe.delete(
+                self._presence_key(self.worker_id),
+                self._worker_clients_key(self.worker_id),
+            )
+            await self._scripts.execute(pipe)
+        except Exception as e:
+            logger.error(f"Error deregistering WebSocket worker: {e}")
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.error(f"Error closing WebSocket registry subscription: {e}")
+            self._pubsub = None
+        logger.info(f"WebSocket registry stopped for worker {self.worker_id}")
+
+    async def _heartbeat(self) -> None:
+        """Write presence every interval, and client changes as they happen."""
+        while self._running:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self._sync()
+
+    async def _sync(self) -> None:
+        """
+        Write client changes and this worker's presence in one round trip.
+
+        Workers whose heartbeat expired are released afterwards.
+        """
+        self._dirty.clear()
+        added, self._added = self._added, set()
+        removed, self._removed = self._removed, set()
+        now = time.time()
+        presence = {
+            "worker_id": self.worker_id,
+            "updated_at": now,
+            **self._presence(),
+        }
+        worker_clients_key = self._worker_clients_key(self.worker_id)
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            if added:
+                pipe.hset(
+                    self.clients_key,
+                    mapping={client_id: self.worker_id for client_id in added},
+                )
+                pipe.sadd(worker_clients_key, *added)
+            if removed:
+                self._scripts.queue(
+                    pipe,
+                    "release",
+                    keys=[self.clients_key],
+                    args=[self.worker_id, *removed],
+                )
+                pipe.srem(worker_clients_key, *removed)
+            pipe.set(
+                self._presence_key(self.worker_id),
+                json.dumps(presence),
+                ex=max(1, int(self.ttl)),
+            )
+            pipe.zadd(self.workers_key, {self.worker_id: now})
+            pipe.zrangebyscore(self.workers_key, "-inf", now - self.ttl)
+            results = await self._scripts.execute(pipe)
+            self.heartbeats += 1
+        except Exception as e:
+            self.heartbeat_errors += 1
+            logger.error(f"Error writing WebSocket worker presence: {e}")
+            # Retry the changes with the next heartbeat
+            self._added |= added - self._removed
+            self._removed |= removed - self._added
+            return
+
+        if results[-1]:
+            await self._release_workers(results[-1])
+
+    async def _release_workers(self, worker_ids: List[str]) -> None:
+        """Release the client mappings of workers whose heartbeat expired."""
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for worker_id in worker_ids:
+                pipe.smembers(self._worker_clients_key(worker_id))
+            held = await pipe.execute()
+
+            pipe = self._redis.pipeline(transaction=False)
+            for worker_id, client_ids in zip(worker_ids, held):
+                # Clients taken over by another worker keep their mapping
+                if client_ids:
+                    self._scripts.queue(
+                        pipe,
+                        "release",
+                        keys=[self.clients_key],
+                        args=[worker_id, *client_ids],
+                    )
+                pipe.delete(self._worker_clients_key(worker_id))
+            pipe.zrem(self.workers_key, *worker_ids)
+            await self._scripts.execute(pipe)
+            logger.info(f"Released {len(worker_ids)} expired WebSocket workers")
+        except Exception as e:
+            logger.error(f"Error releasing expired WebSocket workers: {e}")
+
+    async def send(self, client_id: str, message: str) -> bool:
+        """
+        Route a message to a client connected to another worker.
+
+        Returns:
+            True if the worker holding the client received it
+        """
+        if not self._running or self._scripts is None:
+            return False
+        try:
+            payload = json.dumps({"client_id": client_id, "message": message})
+            receivers = await self._scripts.run(
+                "route",
+                [self.clients_key],
+                [
+                    client_id,
+                    f"{self.key_prefix}worker:",
+                    ":messages",
+                    payload,
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Error routing WebSocket message to {client_id}: {e}")
+            return False
+        if int(receivers) > 0:
+            self.messages_routed += 1
+            return True
+        self.messages_unroutable += 1
+        return False
+
+    async def broadcast(self, message: str) -> None:
+        """Send a message to the clients of every other worker."""
+        if not self._running:
+            return
+        try:
+            await self._redis.publish(
+                self.broadcast_channel,
+                json.dumps({"origin": self.worker_id, "message": message}),
+            )
+        except Exception as e:
+            logger.error(f"Error broadcasting WebSocket message: {e}")
+
+    async def _listen(self) -> None:
+        """Background task delivering messages routed to this worker."""
+        while self._running:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message and message["type"] == "message":
+                    await self._handle_message(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing routed WebSocket message: {e}")
+                await asyncio.sleep(1)
+
+    async def _handle_message(self, channel: Any, data: Any) -> None:
+        """Deliver one routed or broadcast message."""
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        payload = json.loads(data)
+        if channel == self.broadcast_channel:
+            if payload.get("origin") == self.worker_id:
+                return
+            client_id = None
+        else:
+            client_id = payload["client_id"]
+        self.messages_received += 1
+        if self._on_message is not None:
+            await self._on_message(client_id, payload["message"])
+
+    async def get_cluster_status(self) -> Dict[str, Any]:
+        """
+        Aggregate the presence of all live workers.
+
+        Totals are summed from the workers' presence records, so this reads
+        one key per worker rather than the client hash.
+
+        Returns:
+            Per-worker presence and totals; empty if Redis could not be read
+        """
+        if not self._running:
+            return {}
+        try:
+            live = await self._redis.zrangebyscore(
+                self.workers_key, time.time() - self.ttl, "+inf"
+            )
+            presences = (
+                await self._redis.mget([self._presence_key(w) for w in live])
+                if live
+                else []
+            )
+            workers = {
+                worker_id: json.loads(presence)
+                for worker_id, presence in zip(live, presences)
+                if presence
+            }
+
+            channels: Dict[str, int] = {}
+            for presence in workers.values():
+                for channel, count in presence.get("channels", {}).items():
+                    channels[channel] = channels.get(channel, 0) + count
+            return {
+                "workers": workers,
+                "active_connections": sum(
+                    p.get("connections", 0) for p in workers.values()
+                ),
+                "channels": channels,
+            }
+        except Exception as e:
+            logger.error(f"Error reading WebSocket cluster status: {e}")
+            return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics for this worker."""
+        return {
+            "worker_id": self.worker_id,
+            "running": self._running,
+            "clients": len(self.clients),
+            "messages_routed": self.messages_routed,
+            "messages_unroutable": self.messages_unroutable,
+            "messages_received": self.messages_received,
+            "heartbeats": self.heartbeats,
+            "heartbeat_errors": self.heartbeat_errors,
+        }
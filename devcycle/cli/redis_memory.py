@@ -0,0 +1,145 @@
+"""
+CLI tool for profiling Redis memory usage.
+
+Runs one streaming pass of the memory profiler over the configured Redis
+and prints memory per key family, per type and the largest keys. The scan
+pauses between batches, so it is safe to run against production.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Optional
+
+from devcycle.core.acp.cache.memory_profiler import MemoryProfile, MemoryProfiler
+from devcycle.core.cache.async_redis_cache import get_async_cache
+from devcycle.core.cache.pool_registry import close_pool_registry
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for humans."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} B" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def print_report(profile: MemoryProfile, families: int) -> None:
+    """Print a memory profile as a text report."""
+    total = profile.total_bytes or 1
+    scope = "" if profile.complete else " (partial scan)"
+    print(f"📊 {profile.keys_scanned} keys, {format_bytes(profile.total_bytes)}{scope}")
+
+    print(f"\nTop {families} key families:")
+    for family in profile.top_families(families):
+        share = family.bytes / total * 100
+        types = ", ".join(
+            f"{key_type} {format_bytes(size)}"
+            for key_type, size in sorted(
+                family.by_type.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+        print(
+            f"  {format_bytes(family.bytes):>10}  {share:5.1f}%  "
+            f"{family.keys:>8} keys  {family.family}  [{types}]"
+        )
+
+    print("\nBy type:")
+    for key_type, size in sorted(
+        profile.by_type.items(), key=lambda item: item[1], reverse=True
+    ):
+        print(f"  {format_bytes(size):>10}  {key_type}")
+
+    print("\nLargest keys:")
+    for big in profile.big_keys:
+        print(f"  {format_bytes(big.bytes):>10}  {big.key_type:<6}  {big.key}")
+
+
+async def run_profile(args: argparse.Namespace) -> MemoryProfile:
+    """Profile the configured Redis once."""
+    cache = get_async_cache()
+    try:
+        profiler = MemoryProfiler(
+            cache.redis_client,
+            top_n=args.top,
+            samples=args.samples,
+            scan_count=args.count,
+            batch_pause=args.pause_ms / 1000,
+        )
+        return await profiler.profile(match=args.match, max_keys=args.max_keys)
+    finally:
+        await cache.close()
+        await close_pool_registry()
+
+
+def profile_memory(args: argparse.Namespace) -> None:
+    """Profile Redis memory and print the report."""
+    profile = asyncio.run(run_profile(args))
+    if args.json:
+        print(json.dumps(profile.to_dict(), indent=2))
+    else:
+        print_report(profile, args.families)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Profile Redis memory usage by key family",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Profile the whole keyspace
+  python -m devcycle.cli.redis_memory
+
+  # Only ACP keys, with exact sizes for collections
+  python -m devcycle.cli.redis_memory --match 'acp:*' --samples 0
+
+  # Machine-readable report
+  python -m devcycle.cli.redis_memory --json
+        """,
+    )
+    parser.add_argument("--match", default="*", help="Key pattern to profile")
+    parser.add_argument(
+        "--top", type=int, default=20, help="Number of largest keys to report"
+    )
+    parser.add_argument(
+        "--families", type=int, default=20, help="Number of key families to report"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=5,
+        help="MEMORY USAGE SAMPLES per key (0 measures every element)",
+    )
+    parser.add_argument("--count", type=int, default=500, help="SCAN COUNT hint")
+    parser.add_argument(
+        "--pause-ms",
+        type=float,
+        default=10.0,
+        help="Pause between SCAN batches in milliseconds",
+    )
+    parser.add_argument(
+        "--max-keys", type=int, default=None, help="Stop after this many keys"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the memory profiler CLI."""
+    args = build_parser().parse_args(argv)
+
+    try:
+        profile_memory(args)
+    except KeyboardInterrupt:
+        print("\n❌ Operation cancelled by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
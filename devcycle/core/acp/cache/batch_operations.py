@@ -6,7 +6,8 @@ network round trips and improve overall performance.
 """
 
 import asyncio
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
@@ -52,6 +53,28 @@ class BatchResult:
     throughput_ops_per_second: float
 
 
+@dataclass
+class CoalescerStats:
+    """Counters for the auto-flushing pipeline coalescer."""
+
+    flushes: int = 0
+    flushed_operations: int = 0
+    size_triggered_flushes: int = 0
+    timer_triggered_flushes: int = 0
+    max_queue_depth: int = 0
+    # Flush sizes bucketed by the next power of two
+    flush_size_histogram: Dict[int, int] = field(default_factory=dict)
+
+    def record_flush(self, size: int) -> None:
+        """Record a flush of the given number of operations."""
+        self.flushes += 1
+        self.flushed_operations += size
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        self.flush_size_histogram[bucket] = self.flush_size_histogram.get(bucket, 0) + 1
+
+
 class RedisBatchProcessor:
     """High-performance Redis batch operations processor."""
 
@@ -60,20 +83,31 @@ class RedisBatchProcessor:
         acp_cache: ACPCache,
         batch_size: int = 100,
         max_concurrent_batches: int = 10,
+        flush_interval_us: int = 500,
     ):
         """
         Initialize batch processor.
 
         Args:
             acp_cache: ACP cache instance
-            batch_size: Maximum operations per batch
+            batch_size: Maximum operations per batch (and per coalesced flush)
             max_concurrent_batches: Maximum concurrent batch operations
+            flush_interval_us: Microseconds a submitted operation may wait
+                for others before the coalescer flushes
         """
         self.acp_cache = acp_cache
         self.batch_size = batch_size
         self.max_concurrent_batches = max_concurrent_batches
         self.semaphore = asyncio.Semaphore(max_concurrent_batches)
 
+        # Pipeline coalescer: operations submitted individually are queued
+        # and flushed together through one pipeline
+        self.flush_interval_us = flush_interval_us
+        self._pending: List[Tuple[BatchOperation, "asyncio.Future[Any]"]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: "set[asyncio.Task[None]]" = set()
+        self.coalescer_stats = CoalescerStats()
+
         # Performance tracking
         self.total_batches_processed = 0
         self.total_operations_processed = 0
@@ -97,26 +131,15 @@ class RedisBatchProcessor:
         # Split operations into batches
         batches = self._split_into_batches(operations)
 
-        # Execute batches concurrently
+        # Execute batches concurrently, each through one pipeline; failed
+        # operations carry their own error and never fail the whole batch
         batch_results = await asyncio.gather(
-            *[self._execute_single_batch(batch) for batch in batches],
-            return_exceptions=True,
+            *[self._execute_single_batch(batch) for batch in batches]
         )
 
-        # Combine results
-        all_operations: List[BatchOperation] = []
-        successful_ops = 0
-        failed_ops = 0
-
-        for result in batch_results:
-            if isinstance(result, Exception):
-                logger.error(f"Batch execution failed: {result}")
-                failed_ops += len(operations)  # Assume all failed
-            else:
-                if isinstance(result, list):
-                    all_operations.extend(result)
-                    successful_ops += len([op for op in result if op.error is None])
-                    failed_ops += len([op for op in result if op.error is not None])
+        all_operations = [op for batch in batch_results for op in batch]
+        failed_ops = sum(1 for op in all_operations if op.error is not None)
+        successful_ops = len(all_operations) - failed_ops
 
         end_time = datetime.now(timezone.utc)
         execution_time_ms = (end_time - start_time).total_seconds() * 1000
@@ -136,180 +159,162 @@ class RedisBatchProcessor:
             throughput_ops_per_second=throughput,
         )
 
-    def _split_into_batches(
-        self, operations: List[BatchOperation]
-    ) -> List[List[BatchOperation]]:
-        """Split operations into batches of appropriate size."""
-        batches = []
-        for i in range(0, len(operations), self.batch_size):
-            batches.append(operations[i : i + self.batch_size])
-        return batches
+    async def submit(self, operation: BatchOperation) -> Any:
+        """
+        Queue a single operation on the coalescer and wait for its reply.
 
-    async def _execute_single_batch(
-        self, operations: List[BatchOperation]
-    ) -> List[BatchOperation]:
-        """Execute a single batch of operations."""
-        async with self.semaphore:
-            # Group operations by type for efficiency
-            grouped_ops = self._group_operations_by_type(operations)
+        Operations from concurrent callers are flushed together through one
+        pipeline once batch_size operations are queued or flush_interval_us
+        has passed, whichever comes first.
 
-            # Execute each group
-            for op_type, ops in grouped_ops.items():
-                await self._execute_operation_group(op_type, ops)
+        Args:
+            operation: Operation to execute
 
-            return operations
+        Returns:
+            The Redis reply for this operation
 
-    def _group_operations_by_type(
-        self, operations: List[BatchOperation]
-    ) -> Dict[BatchOperationType, List[BatchOperation]]:
-        """Group operations by type for efficient execution."""
-        grouped: Dict[BatchOperationType, List[BatchOperation]] = {}
-        for op in operations:
-            if op.operation_type not in grouped:
-                grouped[op.operation_type] = []
-            grouped[op.operation_type].append(op)
-        return grouped
-
-    async def _execute_operation_group(
-        self, op_type: BatchOperationType, operations: List[BatchOperation]
+        Raises:
+            Exception: The error Redis returned for this operation
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Any]" = loop.create_future()
+        self._pending.append((operation, future))
+        depth = len(self._pending)
+        if depth > self.coalescer_stats.max_queue_depth:
+            self.coalescer_stats.max_queue_depth = depth
+
+        if depth >= self.batch_size:
+            self.coalescer_stats.size_triggered_flushes += 1
+            self._start_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(
+                self.flush_interval_us / 1_000_000, self._on_flush_timer
+            )
+        return await future
+
+    def _on_flush_timer(self) -> None:
+        """Flush operations that waited the full flush interval."""
+        self._flush_timer = None
+        if self._pending:
+            self.coalescer_stats.timer_triggered_flushes += 1
+            self._start_flush()
+
+    def _start_flush(self) -> None:
+        """Hand the queued operations to a background flush."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        pending, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush_pending(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """Flush queued operations now and wait for in-flight flushes."""
+        if self._pending:
+            self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def _flush_pending(
+        self, pending: List[Tuple[BatchOperation, "asyncio.Future[Any]"]]
     ) -> None:
-        """Execute a group of operations of the same type."""
-        if op_type == BatchOperationType.GET:
-            await self._execute_get_operations(operations)
-        elif op_type == BatchOperationType.SET:
-            await self._execute_set_operations(operations)
-        elif op_type == BatchOperationType.DELETE:
-            await self._execute_delete_operations(operations)
-        elif op_type == BatchOperationType.EXISTS:
-            await self._execute_exists_operations(operations)
-        elif op_type == BatchOperationType.EXPIRE:
-            await self._execute_expire_operations(operations)
-        elif op_type == BatchOperationType.TTL:
-            await self._execute_ttl_operations(operations)
-
-    async def _execute_get_operations(self, operations: List[BatchOperation]) -> None:
-        """Execute GET operations in batch."""
-        keys = [op.key for op in operations]
-
-        try:
-            # Use Redis MGET for multiple keys
-            values = self.acp_cache.redis.redis_client.mget(keys)
+        """Execute queued operations and resolve each caller's future."""
+        operations = [operation for operation, _ in pending]
+        start_time = datetime.now(timezone.utc)
+        async with self.semaphore:
+            replies = await self._execute_pipeline(operations)
+        execution_time_ms = (
+            datetime.now(timezone.utc) - start_time
+        ).total_seconds() * 1000
+        self.coalescer_stats.record_flush(len(operations))
+        self._update_performance_stats(len(operations), execution_time_ms)
 
-            for i, op in enumerate(operations):
-                op.result = values[i] if i < len(values) else None
-                if op.result is None:
-                    op.error = "Key not found"
+        for (operation, future), reply in zip(pending, replies):
+            if future.done():
+                continue  # Caller was cancelled
+            if isinstance(reply, Exception):
+                future.set_exception(reply)
+            else:
+                future.set_result(reply)
 
-        except Exception as e:
-            for op in operations:
-                op.error = str(e)
+    async def _execute_pipeline(self, operations: List[BatchOperation]) -> List[Any]:
+        """
+        Execute operations in one pipeline, storing each exact reply.
 
-    async def _execute_set_operations(self, operations: List[BatchOperation]) -> None:
-        """Execute SET operations in batch."""
+        Returns:
+            One reply per operation; failed operations get their exception
+        """
         try:
-            # Use Redis pipeline for multiple SET operations
-            pipe = self.acp_cache.redis.redis_client.pipeline()
-
+            pipe = self.acp_cache.redis.redis_client.pipeline(transaction=False)
             for op in operations:
-                # Serialize value for Redis
-                if isinstance(op.value, str):
-                    serialized_value = op.value
-                else:
-                    import json
-
-                    serialized_value = json.dumps(op.value)
-
-                if op.ttl:
-                    pipe.setex(op.key, int(op.ttl), serialized_value)
-                else:
-                    pipe.set(op.key, serialized_value)
-
-            results = pipe.execute()
-
-            for i, op in enumerate(operations):
-                op.result = results[i] if i < len(results) else None
-                if not op.result:
-                    op.error = "Set operation failed"
-
+                self._queue_operation(pipe, op)
+            replies = list(await pipe.execute(raise_on_error=False))
         except Exception as e:
-            for op in operations:
-                op.error = str(e)
+            replies = [e] * len(operations)
 
-    async def _execute_delete_operations(
-        self, operations: List[BatchOperation]
-    ) -> None:
-        """Execute DELETE operations in batch."""
-        keys = [op.key for op in operations]
-
-        try:
-            # Use Redis DEL for multiple keys
-            deleted_count = self.acp_cache.redis.delete(*keys)
-
-            for i, op in enumerate(operations):
-                op.result = deleted_count > i
-                if not op.result:
-                    op.error = "Delete operation failed"
-
-        except Exception as e:
-            for op in operations:
-                op.error = str(e)
+        for op, reply in zip(operations, replies):
+            if isinstance(reply, Exception):
+                op.error = str(reply)
+            else:
+                op.result = reply
+        return replies
+
+    def _queue_operation(self, pipe: Any, op: BatchOperation) -> None:
+        """Queue the command for a single operation on a pipeline."""
+        if op.operation_type == BatchOperationType.GET:
+            pipe.get(op.key)
+        elif op.operation_type == BatchOperationType.SET:
+            value = self._serialize_value(op.value)
+            if op.ttl:
+                pipe.set(op.key, value, ex=int(op.ttl))
+            else:
+                pipe.set(op.key, value)
+        elif op.operation_type == BatchOperationType.DELETE:
+            pipe.delete(op.key)
+        elif op.operation_type == BatchOperationType.EXISTS:
+            pipe.exists(op.key)
+        elif op.operation_type == BatchOperationType.EXPIRE:
+            pipe.expire(op.key, int(op.ttl) if op.ttl else 0)
+        elif op.operation_type == BatchOperationType.TTL:
+            pipe.ttl(op.key)
+
+    def _serialize_value(self, value: Any) -> Any:
+        """Serialize a value for Redis."""
+        return value if isinstance(value, str) else json.dumps(value)
+
+    def get_coalescer_statistics(self) -> Dict[str, Any]:
+        """Get coalescer queue depth and flush-size statistics."""
+        stats = self.coalescer_stats
+        return {
+            "queue_depth": len(self._pending),
+            "max_queue_depth": stats.max_queue_depth,
+            "flushes": stats.flushes,
+            "flushed_operations": stats.flushed_operations,
+            "size_triggered_flushes": stats.size_triggered_flushes,
+            "timer_triggered_flushes": stats.timer_triggered_flushes,
+            "average_flush_size": (
+                stats.flushed_operations / stats.flushes if stats.flushes else 0.0
+            ),
+            "flush_size_histogram": dict(sorted(stats.flush_size_histogram.items())),
+        }
 
-    async def _execute_exists_operations(
+    def _split_into_batches(
         self, operations: List[BatchOperation]
-    ) -> None:
-        """Execute EXISTS operations in batch."""
-        keys = [op.key for op in operations]
-
-        try:
-            # Use Redis EXISTS for multiple keys
-            exists_count = self.acp_cache.redis.exists(*keys)
-
-            for i, op in enumerate(operations):
-                op.result = exists_count > i
-
-        except Exception as e:
-            for op in operations:
-                op.error = str(e)
+    ) -> List[List[BatchOperation]]:
+        """Split operations into batches of appropriate size."""
+        batches = []
+        for i in range(0, len(operations), self.batch_size):
+            batches.append(operations[i : i + self.batch_size])
+        return batches
 
-    async def _execute_expire_operations(
+    async def _execute_single_batch(
         self, operations: List[BatchOperation]
-    ) -> None:
-        """Execute EXPIRE operations in batch."""
-        try:
-            # Use Redis pipeline for multiple EXPIRE operations
-            pipe = self.acp_cache.redis.redis_client.pipeline()
-
-            for op in operations:
-                pipe.expire(op.key, int(op.ttl) if op.ttl else 0)
-
-            results = pipe.execute()
-
-            for i, op in enumerate(operations):
-                op.result = results[i] if i < len(results) else False
-                if not op.result:
-                    op.error = "Expire operation failed"
-
-        except Exception as e:
-            for op in operations:
-                op.error = str(e)
-
-    async def _execute_ttl_operations(self, operations: List[BatchOperation]) -> None:
-        """Execute TTL operations in batch."""
-        try:
-            # Use Redis pipeline for multiple TTL operations
-            pipe = self.acp_cache.redis.redis_client.pipeline()
-
-            for op in operations:
-                pipe.ttl(op.key)
-
-            results = pipe.execute()
-
-            for i, op in enumerate(operations):
-                op.result = results[i] if i < len(results) else -1
-
-        except Exception as e:
-            for op in operations:
-                op.error = str(e)
+    ) -> List[BatchOperation]:
+        """Execute a single batch of operations through one pipeline."""
+        async with self.semaphore:
+            await self._execute_pipeline(operations)
+        return operations
 
     def _update_performance_stats(
         self, operation_count: int, execution_time_ms: float
@@ -351,6 +356,7 @@ class RedisBatchProcessor:
             "average_throughput_ops_per_second": self.average_throughput_ops_per_second,
             "batch_size": self.batch_size,
             "max_concurrent_batches": self.max_concurrent_batches,
+            "coalescer": self.get_coalescer_statistics(),
         }
 
     def set_batch_size(self, batch_size: int) -> None:
@@ -6,13 +6,19 @@ cache warming, and adaptive caching strategies.
 """
 
 import asyncio
+import statistics
+import sys
 from collections import defaultdict, deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from ...cache.acp_cache import ACPCache
 from ...logging import get_logger
+from .sketches import CountMinSketch, HeavyHitters, HyperLogLog, key_family
+
+if TYPE_CHECKING:
+    from .cache_warmer import CacheWarmer
 
 logger = get_logger(__name__)
 
@@ -28,6 +34,7 @@ class CacheAccessPattern:
     avg_ttl: float
     hit_ratio: float
     access_frequency: float  # accesses per hour
+    distinct_keys: int = 0
 
 
 @dataclass
@@ -42,36 +49,143 @@ class CacheOptimizationRecommendation:
     priority: int  # 1-5, 5 being highest
 
 
-class CacheOptimizer:
-    """Advanced cache optimization service."""
+@dataclass
+class AccessPrediction:
+    """Predicted next access of a key, derived from its access history."""
+
+    key: str
+    next_access: datetime
+    period_seconds: float
+    confidence: float  # 0-1, how regular the gaps between accesses are
+
 
-    def __init__(self, acp_cache: ACPCache, analysis_window_hours: int = 24):
+class CacheOptimizer:
+    """
+    Advanced cache optimization service.
+
+    Accesses are tracked in fixed memory: a time-decayed count-min sketch
+    estimates per-key frequency, the heaviest keys are kept in a top-K list
+    (only these keep an access history, for prediction), and HyperLogLogs
+    count distinct keys. Patterns and recommendations are aggregated per key
+    family, where variable segments of a key are normalized to "*".
+    """
+
+    # Families beyond max_families are aggregated here
+    OVERFLOW_FAMILY = "*"
+
+    # Estimated size of a family's pattern and counters, excluding its HLL
+    FAMILY_OVERHEAD_BYTES = 512
+
+    # Estimated size of a heavy hitter entry, excluding its access history
+    TRACKED_KEY_OVERHEAD_BYTES = 256
+
+    def __init__(
+        self,
+        acp_cache: ACPCache,
+        analysis_window_hours: int = 24,
+        memory_limit_bytes: int = 4 * 1024 * 1024,
+        top_k: int = 256,
+        max_families: int = 256,
+        history_size: int = 32,
+        sketch_depth: int = 4,
+    ):
         """
         Initialize cache optimizer.
 
         Args:
             acp_cache: ACP cache instance to optimize
-            analysis_window_hours: Hours of data to analyze for patterns
+            analysis_window_hours: Half-life in hours of access counts, so
+                frequencies weigh the last window most
+            memory_limit_bytes: Ceiling on tracking memory; the count-min
+                sketch gets whatever the fixed-size structures leave
+            top_k: Number of heavy hitter keys to track individually
+            max_families: Number of key families to aggregate separately
+            history_size: Access times kept per heavy hitter key
+            sketch_depth: Rows of the count-min sketch
         """
         self.acp_cache = acp_cache
         self.analysis_window_hours = analysis_window_hours
+        self.memory_limit_bytes = memory_limit_bytes
+        self.top_k = top_k
+        self.max_families = max_families
+        self.history_size = history_size
+        self.sketch_depth = sketch_depth
+
+        sketch_bytes = memory_limit_bytes - self._reserved_memory_bytes()
+        self.sketch_width = sketch_bytes // (sketch_depth * 8)
+        if self.sketch_width < 64:
+            raise ValueError(
+                f"memory_limit_bytes={memory_limit_bytes} leaves no room for "
+                f"the count-min sketch; raise it or lower top_k/max_families"
+            )
 
         # Access pattern tracking
         self.access_patterns: Dict[str, CacheAccessPattern] = {}
         self.key_access_times: Dict[str, deque] = defaultdict(
-            lambda: deque(maxlen=1000)
+            lambda: deque(maxlen=self.history_size)
         )
-        self.key_ttl_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
+        self._init_sketches()
 
         # Optimization state
         self.optimization_enabled = True
         self.last_optimization = datetime.now(timezone.utc)
         self.optimization_interval = timedelta(hours=1)
 
+        # Warmer used to act on preload recommendations
+        self.warmer: Optional["CacheWarmer"] = None
+
         # Background task
         self._optimization_task: Optional[asyncio.Task] = None
         self._running = False
 
+    def _reserved_memory_bytes(self) -> int:
+        """Get the memory ceiling of everything except the count-min sketch."""
+        family_bytes = self.FAMILY_OVERHEAD_BYTES + HyperLogLog(10).memory_bytes()
+        tracked_key_bytes = self.TRACKED_KEY_OVERHEAD_BYTES + self.history_size * (
+            sys.getsizeof(datetime.now(timezone.utc)) + 8
+        )
+        return (
+            HyperLogLog(14).memory_bytes()
+            + (self.max_families + 1) * family_bytes
+            + self.top_k * tracked_key_bytes
+        )
+
+    def _init_sketches(self) -> None:
+        """Create empty frequency, heavy hitter and cardinality sketches."""
+        self.frequency_sketch = CountMinSketch(
+            self.sketch_width,
+            self.sketch_depth,
+            half_life_seconds=self.analysis_window_hours * 3600,
+        )
+        self.heavy_hitters = HeavyHitters(self.top_k)
+        self.key_cardinality = HyperLogLog(14)
+        self._family_cardinality: Dict[str, HyperLogLog] = {}
+        # Forward-weighted family counts on the frequency sketch's landmark
+        self._family_counts: Dict[str, float] = {}
+
+    def memory_usage_bytes(self) -> int:
+        """Estimate the memory currently used for access tracking."""
+        family_bytes = self.FAMILY_OVERHEAD_BYTES * len(self.access_patterns) + sum(
+            hll.memory_bytes() for hll in self._family_cardinality.values()
+        )
+        tracked_key_bytes = self.TRACKED_KEY_OVERHEAD_BYTES * len(self.heavy_hitters)
+        history_bytes = sum(
+            len(times) * (sys.getsizeof(times[0]) + 8)
+            for times in self.key_access_times.values()
+            if times
+        )
+        return (
+            self.frequency_sketch.memory_bytes()
+            + self.key_cardinality.memory_bytes()
+            + family_bytes
+            + tracked_key_bytes
+            + history_bytes
+        )
+
+    def attach_warmer(self, warmer: "CacheWarmer") -> None:
+        """Use a cache warmer's loaders for preload recommendations."""
+        self.warmer = warmer
+
     async def start(self) -> None:
         """Start the cache optimization system."""
         if self._running:
@@ -112,6 +226,9 @@ class CacheOptimizer:
         """Run a complete optimization cycle."""
         logger.info("Starting cache optimization cycle")
 
+        # Measure the policy changes made by earlier cycles
+        await self.acp_cache.measure_ttl_policy_impact()
+
         # Analyze access patterns
         await self._analyze_access_patterns()
 
@@ -130,22 +247,60 @@ class CacheOptimizer:
             f"Applied {applied_count} recommendations"
         )
 
-    async def record_access(self, key: str, ttl: Optional[float] = None) -> None:
-        """Record a cache access for pattern analysis."""
-        now = datetime.now(timezone.utc)
-        self.key_access_times[key].append(now)
+    def _family_of(self, key: str) -> str:
+        """Get the tracked family of a key, or the overflow family."""
+        family = key_family(key)
+        if (
+            family not in self.access_patterns
+            and len(self.access_patterns) >= self.max_families
+        ):
+            return self.OVERFLOW_FAMILY
+        return family
 
-        if ttl is not None:
-            self.key_ttl_history[key].append(ttl)
+    async def record_access(self, key: str, ttl: Optional[float] = None) -> None:
+        """
+        Record a cache access for pattern analysis.
 
-        # Update access pattern
-        if key in self.access_patterns:
-            pattern = self.access_patterns[key]
+        Args:
+            key: Cache key as passed to AsyncRedisCache (without its prefix)
+            ttl: TTL the key was written with, if known
+        """
+        now = datetime.now(timezone.utc)
+        timestamp = now.timestamp()
+
+        factor = self.frequency_sketch.maybe_renormalize(timestamp)
+        if factor != 1.0:
+            self.heavy_hitters.scale(factor)
+            for family in self._family_counts:
+                self._family_counts[family] *= factor
+
+        estimate = self.frequency_sketch.add(key, timestamp)
+        tracked, evicted = self.heavy_hitters.update(key, estimate)
+        if evicted is not None:
+            self.key_access_times.pop(evicted, None)
+        if tracked:
+            self.key_access_times[key].append(now)
+        self.key_cardinality.add(key)
+
+        # Update family pattern
+        family = self._family_of(key)
+        self._family_counts[family] = self._family_counts.get(
+            family, 0.0
+        ) + self.frequency_sketch.weight(timestamp)
+        if family not in self._family_cardinality:
+            self._family_cardinality[family] = HyperLogLog(10)
+        self._family_cardinality[family].add(key)
+
+        if family in self.access_patterns:
+            pattern = self.access_patterns[family]
             pattern.access_count += 1
             pattern.last_access = now
+            if ttl is not None:
+                # Running mean over accesses that reported a TTL
+                pattern.avg_ttl += (ttl - pattern.avg_ttl) / pattern.access_count
         else:
-            self.access_patterns[key] = CacheAccessPattern(
-                key=key,
+            self.access_patterns[family] = CacheAccessPattern(
+                key=family,
                 access_count=1,
                 last_access=now,
                 first_access=now,
@@ -154,27 +309,37 @@ class CacheOptimizer:
                 access_frequency=0.0,
             )
 
+    def last_access_time(self, key: str) -> Optional[datetime]:
+        """Get the last recorded access of a heavy hitter key."""
+        times = self.key_access_times.get(key)
+        return times[-1] if times else None
+
+    def get_heavy_hitters(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the most frequently accessed keys with decayed access counts."""
+        now = datetime.now(timezone.utc).timestamp()
+        return [
+            {
+                "key": key,
+                "family": key_family(key),
+                "decayed_count": self.frequency_sketch.decay(count, now),
+            }
+            for key, count in self.heavy_hitters.top(limit)
+        ]
+
     async def _analyze_access_patterns(self) -> None:
         """Analyze cache access patterns to identify optimization opportunities."""
-        now = datetime.now(timezone.utc)
-        cutoff_time = now - timedelta(hours=self.analysis_window_hours)
-
-        for key, pattern in self.access_patterns.items():
-            # Calculate access frequency
-            recent_accesses = [
-                access_time
-                for access_time in self.key_access_times[key]
-                if access_time >= cutoff_time
-            ]
+        now = datetime.now(timezone.utc).timestamp()
+        # A steady rate r accumulates a decayed count of r / decay rate
+        mean_lifetime_hours = 1 / (self.frequency_sketch.rate * 3600)
 
-            hours_analyzed = self.analysis_window_hours
-            pattern.access_frequency = len(recent_accesses) / hours_analyzed
+        for family, pattern in self.access_patterns.items():
+            decayed = self.frequency_sketch.decay(
+                self._family_counts.get(family, 0.0), now
+            )
+            pattern.access_frequency = decayed / mean_lifetime_hours
 
-            # Calculate average TTL
-            if self.key_ttl_history[key]:
-                pattern.avg_ttl = sum(self.key_ttl_history[key]) / len(
-                    self.key_ttl_history[key]
-                )
+            cardinality = self._family_cardinality.get(family)
+            pattern.distinct_keys = cardinality.count() if cardinality else 0
 
             # Calculate hit ratio (simplified - would need cache hit/miss tracking)
             # For now, assume high frequency = high hit ratio
@@ -233,59 +398,131 @@ class CacheOptimizer:
 
         return recommendations
 
+    def _hot_keys(self, family: str) -> List[str]:
+        """Get the heavy hitter keys of a family (the key itself if literal)."""
+        if "*" not in family:
+            return [family]
+        return [key for key, _ in self.heavy_hitters.top() if key_family(key) == family]
+
     async def _apply_recommendations(
         self, recommendations: List[CacheOptimizationRecommendation]
     ) -> None:
-        """Apply optimization recommendations."""
+        """Apply optimization recommendations per key family."""
         for rec in recommendations:
-            if rec.priority >= 4:  # Apply high-priority recommendations
-                try:
-                    if rec.recommendation_type == "ttl_adjustment":
-                        await self._adjust_key_ttl(
-                            rec.key_pattern, rec.recommended_value
-                        )
-                    elif rec.recommendation_type == "preload":
-                        await self._preload_key(rec.key_pattern)
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to apply recommendation for {rec.key_pattern}: {e}"
-                    )
+            # The overflow family mixes unrelated keys and matches everything
+            if rec.priority < 4 or rec.key_pattern == self.OVERFLOW_FAMILY:
+                continue
+            try:
+                if rec.recommendation_type == "ttl_adjustment":
+                    await self._apply_ttl_policy(rec)
+                elif rec.recommendation_type == "preload":
+                    keys = self._hot_keys(rec.key_pattern)
+                    if keys:
+                        await self._preload_keys(keys)
+            except Exception as e:
+                logger.error(
+                    f"Failed to apply recommendation for {rec.key_pattern}: {e}"
+                )
 
-    async def _adjust_key_ttl(self, key: str, new_ttl: float) -> None:
-        """Adjust TTL for a specific key."""
-        try:
-            # Get current value
-            current_value = self.acp_cache.redis.get(key)
-            if current_value:
-                # Set with new TTL
-                self.acp_cache.redis.set(key, current_value, ttl=int(new_ttl))
-                logger.info(f"Adjusted TTL for {key} to {new_ttl}s")
-        except Exception as e:
-            logger.error(f"Failed to adjust TTL for {key}: {e}")
+    async def _apply_ttl_policy(self, rec: CacheOptimizationRecommendation) -> None:
+        """Turn a family TTL recommendation into a cache TTL policy."""
+        # Policies match full Redis keys, whose prefix depends on the owner
+        pattern = self.acp_cache.redis_key(rec.key_pattern)
+        await self.acp_cache.apply_ttl_policy(
+            pattern,
+            rec.recommended_value,
+            reason=(
+                f"optimizer: avg TTL {rec.current_value:.0f}s, "
+                f"expected improvement {rec.expected_improvement:.0%}"
+            ),
+        )
 
-    async def _preload_key(self, key: str) -> None:
-        """Preload a key (implementation depends on data source)."""
-        # This would typically involve loading data from the original source
-        # For now, just log the recommendation
-        logger.info(f"Preload recommendation for {key}")
+    async def _preload_keys(self, keys: List[str]) -> None:
+        """Preload keys through the attached warmer's data loaders."""
+        if self.warmer is None:
+            logger.info(f"Preload recommendation for {keys} (no warmer attached)")
+            return
+        await self.warmer.warm_on_demand(keys)
 
     async def warm_cache(self, key_patterns: List[str]) -> None:
         """Warm the cache with frequently accessed data."""
         logger.info(f"Starting cache warming for {len(key_patterns)} patterns")
 
-        for pattern in key_patterns:
-            try:
-                # This would typically involve loading data from the original source
-                # For now, just log the warming attempt
-                logger.info(f"Cache warming for pattern: {pattern}")
-            except Exception as e:
-                logger.error(f"Failed to warm cache for pattern {pattern}: {e}")
+        if self.warmer is None:
+            logger.info("No warmer attached; skipping cache warming")
+            return
+        try:
+            await self.warmer.warm_on_demand(key_patterns)
+        except Exception as e:
+            logger.error(f"Failed to warm cache for {len(key_patterns)} patterns: {e}")
+
+    def predict_next_accesses(
+        self,
+        horizon: timedelta,
+        now: Optional[datetime] = None,
+        min_accesses: int = 3,
+    ) -> List[AccessPrediction]:
+        """
+        Predict which keys will be accessed within a time horizon.
+
+        A key's period is the median gap between its recorded accesses and
+        its confidence falls with the spread of those gaps. Keys that have
+        not been accessed for more than two periods are treated as no longer
+        periodic.
+
+        Args:
+            horizon: How far ahead to predict
+            now: Current time (defaults to now)
+            min_accesses: Accesses needed before a key is predicted
+
+        Returns:
+            Predictions ordered by predicted access time
+        """
+        now = now or datetime.now(timezone.utc)
+        predictions = []
+
+        for key, access_times in self.key_access_times.items():
+            if len(access_times) < min_accesses:
+                continue
+            times = list(access_times)
+            gaps = [
+                (later - earlier).total_seconds()
+                for earlier, later in zip(times, times[1:])
+            ]
+            period = statistics.median(gaps)
+            if period <= 0:
+                continue
+
+            # Periods elapsed since the last access, rounded up to the next one
+            elapsed = (now - times[-1]).total_seconds()
+            periods_ahead = max(1, int(elapsed // period) + 1)
+            if periods_ahead > 2:
+                continue
+            next_access = times[-1] + timedelta(seconds=period * periods_ahead)
+            if next_access - now > horizon:
+                continue
+
+            spread = statistics.pstdev(gaps) / statistics.fmean(gaps)
+            predictions.append(
+                AccessPrediction(
+                    key=key,
+                    next_access=next_access,
+                    period_seconds=period,
+                    confidence=max(0.0, 1.0 - spread),
+                )
+            )
+
+        predictions.sort(key=lambda prediction: prediction.next_access)
+        return predictions
 
     async def get_cache_statistics(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics."""
         stats: Dict[str, Any] = {
-            "total_keys_tracked": len(self.access_patterns),
+            "total_keys_tracked": self.key_cardinality.count(),
+            "families_tracked": len(self.access_patterns),
+            "memory_bytes": self.memory_usage_bytes(),
+            "memory_limit_bytes": self.memory_limit_bytes,
+            "heavy_hitters": self.get_heavy_hitters(10),
             "optimization_enabled": self.optimization_enabled,
             "last_optimization": self.last_optimization.isoformat(),
             "access_patterns": {},
@@ -298,6 +535,7 @@ class CacheOptimizer:
                 "access_frequency": pattern.access_frequency,
                 "avg_ttl": pattern.avg_ttl,
                 "hit_ratio": pattern.hit_ratio,
+                "distinct_keys": pattern.distinct_keys,
                 "last_access": pattern.last_access.isoformat(),
             }
 
@@ -337,8 +575,6 @@ class CacheOptimizer:
     async def reset_statistics(self) -> None:
         """Reset all optimization statistics."""
         self.access_patterns.clear()
-        for key_times in self.key_access_times.values():
-            key_times.clear()
-        for key_ttl in self.key_ttl_history.values():
-            key_ttl.clear()
+        self.key_access_times.clear()
+        self._init_sketches()
         logger.info("Cache optimization statistics reset")
@@ -6,14 +6,14 @@ frequently accessed data and improve cache hit ratios.
 """
 
 import asyncio
-import json
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from ...cache.acp_cache import ACPCache
 from ...logging import get_logger
+from .cache_optimizer import AccessPrediction, CacheOptimizer
 
 logger = get_logger(__name__)
 
@@ -39,6 +39,8 @@ class WarmingRule:
     enabled: bool = True
     last_warmed: Optional[datetime] = None
     warm_count: int = 0
+    # Seconds the loader may take before the rule is failed (None: no limit)
+    deadline: Optional[float] = None
 
 
 @dataclass
@@ -52,20 +54,75 @@ class WarmingStatistics:
     failed_warms: int
     last_warming_cycle: Optional[datetime]
     average_warm_time_ms: float
+    timed_out_warms: int = 0
+
+
+@dataclass
+class PredictiveBudget:
+    """Limits on the Redis work one predictive warming cycle may spend."""
+
+    max_ops_per_cycle: int = 200  # TTL checks plus writes
+    max_bytes_per_cycle: int = 1024 * 1024  # Encoded bytes written
+    min_confidence: float = 0.5  # Skip keys with irregular access gaps
+
+
+@dataclass
+class PredictiveWarmingStatistics:
+    """Outcome of predictive preloads, to check the strategy pays off."""
+
+    cycles: int = 0
+    predictions: int = 0
+    preloads: int = 0
+    misses_avoided: int = 0  # Preloaded keys read before their window closed
+    wasted_preloads: int = 0  # Preloaded keys not read in time
+    ops_used: int = 0
+    bytes_written: int = 0
+    skipped_for_budget: int = 0
+    # Preloaded key -> (preloaded at, end of its predicted access window)
+    pending: Dict[str, Tuple[datetime, datetime]] = field(default_factory=dict)
 
 
 class CacheWarmer:
     """Intelligent cache warming service."""
 
-    def __init__(self, acp_cache: ACPCache):
+    def __init__(
+        self,
+        acp_cache: ACPCache,
+        max_concurrent_loaders: int = 10,
+        default_deadline: Optional[float] = None,
+        optimizer: Optional[CacheOptimizer] = None,
+        predictive_interval: float = 30.0,
+        predictive_lead_time: float = 60.0,
+        predictive_budget: Optional[PredictiveBudget] = None,
+    ):
         """
         Initialize cache warmer.
 
         Args:
             acp_cache: ACP cache instance to warm
+            max_concurrent_loaders: Maximum data loaders running at once
+            default_deadline: Seconds a loader may take when its rule sets
+                no deadline (None: no limit)
+            optimizer: Access pattern source for the PREDICTIVE strategy
+            predictive_interval: Seconds between predictive warming cycles
+            predictive_lead_time: Seconds ahead of a predicted access to
+                preload the key (should be at least predictive_interval)
+            predictive_budget: Redis ops and memory limits per cycle
         """
         self.acp_cache = acp_cache
         self.redis = acp_cache.redis  # Access Redis client directly
+        self.max_concurrent_loaders = max_concurrent_loaders
+        self.default_deadline = default_deadline
+
+        # Predictive warming
+        self.optimizer = optimizer
+        if optimizer is not None:
+            optimizer.attach_warmer(self)
+        self.predictive_interval = predictive_interval
+        self.predictive_lead_time = predictive_lead_time
+        self.predictive_budget = predictive_budget or PredictiveBudget()
+        self.predictive_statistics = PredictiveWarmingStatistics()
+        self._predictive_task: Optional[asyncio.Task] = None
         self.warming_rules: Dict[str, WarmingRule] = {}
         self.warming_strategies: Set[WarmingStrategy] = {WarmingStrategy.ON_STARTUP}
 
@@ -101,6 +158,15 @@ class CacheWarmer:
         if WarmingStrategy.SCHEDULED in self.warming_strategies:
             self._warming_task = asyncio.create_task(self._scheduled_warming_loop())
 
+        # Start predictive warming if enabled and access history is available
+        if WarmingStrategy.PREDICTIVE in self.warming_strategies:
+            if self.optimizer is None:
+                logger.warning("Predictive warming needs a CacheOptimizer; skipped")
+            else:
+                self._predictive_task = asyncio.create_task(
+                    self._predictive_warming_loop()
+                )
+
         logger.info("Cache warmer started")
 
     async def stop(self) -> None:
@@ -109,12 +175,13 @@ class CacheWarmer:
             return
 
         self._running = False
-        if self._warming_task:
-            self._warming_task.cancel()
-            try:
-                await self._warming_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._warming_task, self._predictive_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         logger.info("Cache warmer stopped")
 
     async def _warm_on_startup(self) -> None:
@@ -134,6 +201,124 @@ class CacheWarmer:
                 logger.error(f"Error in scheduled warming loop: {e}")
                 await asyncio.sleep(300)  # Wait 5 minutes on error
 
+    async def _predictive_warming_loop(self) -> None:
+        """Background predictive warming loop."""
+        while self._running:
+            try:
+                await asyncio.sleep(self.predictive_interval)
+                if self.warming_enabled:
+                    await self._run_predictive_cycle()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in predictive warming loop: {e}")
+
+    async def _run_predictive_cycle(self, now: Optional[datetime] = None) -> int:
+        """
+        Preload keys predicted to be read before the next cycle.
+
+        A key is preloaded when its next access is predicted within the lead
+        time and it is missing from Redis or will expire before that access.
+        Keys are taken in order of rule priority and prediction confidence
+        until the cycle's ops or bytes budget is spent.
+
+        Returns:
+            Number of keys preloaded
+        """
+        if self.optimizer is None:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        stats = self.predictive_statistics
+        budget = self.predictive_budget
+        stats.cycles += 1
+        self._settle_predictions(now)
+
+        predictions = self.optimizer.predict_next_accesses(
+            timedelta(seconds=self.predictive_lead_time), now=now
+        )
+        stats.predictions += len(predictions)
+
+        candidates: List[Tuple[AccessPrediction, WarmingRule]] = []
+        for prediction in predictions:
+            rule = self._rule_for_key(prediction.key)
+            if (
+                rule is not None
+                and prediction.confidence >= budget.min_confidence
+                and prediction.key not in stats.pending
+            ):
+                candidates.append((prediction, rule))
+        candidates.sort(key=lambda c: (c[1].priority, c[0].confidence), reverse=True)
+
+        # Each candidate costs a TTL check and possibly a write
+        affordable = budget.max_ops_per_cycle // 2
+        stats.skipped_for_budget += max(0, len(candidates) - affordable)
+        candidates = candidates[:affordable]
+        if not candidates:
+            return 0
+
+        ttls = await self.redis.get_ttls([p.key for p, _ in candidates])
+        stats.ops_used += len(candidates)
+        due = [
+            (prediction, rule)
+            for (prediction, rule), ttl in zip(candidates, ttls)
+            if ttl == -2
+            or (ttl >= 0 and now + timedelta(seconds=ttl) < prediction.next_access)
+        ]
+
+        loaded, _ = await self._load_jobs([(rule, p.key) for p, rule in due])
+        windows = {
+            p.key: p.next_access + timedelta(seconds=p.period_seconds / 2)
+            for p, _ in due
+        }
+
+        # Spend the memory budget in priority order
+        within_budget: List[Tuple[WarmingRule, str, Any]] = []
+        total_bytes = 0
+        for rule, key, data in sorted(
+            loaded, key=lambda e: e[0].priority, reverse=True
+        ):
+            size = len(self.redis.encode_value(key, data))
+            if total_bytes + size > budget.max_bytes_per_cycle:
+                stats.skipped_for_budget += 1
+                continue
+            total_bytes += size
+            within_budget.append((rule, key, data))
+
+        failures = await self._write_warmed(within_budget)
+        stats.ops_used += len(within_budget)
+        stats.bytes_written += total_bytes
+        preloaded = len(within_budget) - failures
+        stats.preloads += preloaded
+        for _, key, _ in within_budget:
+            stats.pending[key] = (now, windows[key])
+
+        if preloaded:
+            logger.info(f"Predictive warming preloaded {preloaded} keys")
+        return preloaded
+
+    def _settle_predictions(self, now: datetime) -> None:
+        """Score earlier preloads as avoided misses or wasted work."""
+        if self.optimizer is None:
+            return
+        stats = self.predictive_statistics
+        for key, (preloaded_at, window_end) in list(stats.pending.items()):
+            last_access = self.optimizer.last_access_time(key)
+            if last_access is not None and last_access >= preloaded_at:
+                stats.misses_avoided += 1
+                del stats.pending[key]
+            elif now > window_end:
+                stats.wasted_preloads += 1
+                del stats.pending[key]
+
+    def _rule_for_key(self, key: str) -> Optional[WarmingRule]:
+        """Get the highest-priority enabled rule able to load a key."""
+        matching = [
+            rule
+            for rule in self.warming_rules.values()
+            if rule.enabled and self._pattern_matches(key, rule.key_pattern)
+        ]
+        return max(matching, key=lambda rule: rule.priority, default=None)
+
     async def _execute_warming_cycle(self) -> None:
         """Execute a complete warming cycle."""
         if not self.warming_enabled:
@@ -142,20 +327,10 @@ class CacheWarmer:
         logger.info("Starting cache warming cycle")
         start_time = datetime.now(timezone.utc)
 
-        # Get enabled rules sorted by priority
         enabled_rules = [rule for rule in self.warming_rules.values() if rule.enabled]
-        enabled_rules.sort(key=lambda x: x.priority, reverse=True)
-
-        successful_warms = 0
-        failed_warms = 0
-
-        for rule in enabled_rules:
-            try:
-                await self._warm_rule(rule)
-                successful_warms += 1
-            except Exception as e:
-                logger.error(f"Failed to warm rule {rule.name}: {e}")
-                failed_warms += 1
+        successful_warms, failed_warms = await self._run_warming_jobs(
+            [(rule, rule.key_pattern) for rule in enabled_rules]
+        )
 
         # Update statistics
         end_time = datetime.now(timezone.utc)
@@ -176,36 +351,93 @@ class CacheWarmer:
             f"{failed_warms} failed"
         )
 
-    async def _warm_rule(
-        self, rule: WarmingRule, key_pattern: Optional[str] = None
-    ) -> None:
-        """Warm a specific rule."""
-        start_time = datetime.now(timezone.utc)
+    async def _run_warming_jobs(
+        self, jobs: List[Tuple[WarmingRule, str]]
+    ) -> Tuple[int, int]:
+        """
+        Load (rule, key) jobs concurrently and write the results in bulk.
 
-        try:
-            # Use provided key_pattern or fall back to rule's key_pattern
-            pattern = key_pattern or rule.key_pattern
+        Jobs are drained from a priority queue by up to max_concurrent_loaders
+        workers, so higher-priority rules start (and usually finish) first.
+        Loaded values are written through a single pipelined bulk write.
 
-            # Load data using the rule's data loader
-            data = await rule.data_loader(pattern)
+        Returns:
+            Tuple of (successful, failed) job counts
+        """
+        loaded, failed = await self._load_jobs(jobs)
+        write_failures = await self._write_warmed(loaded)
+        return len(jobs) - failed - write_failures, failed + write_failures
 
-            if data is not None:
-                # Store in cache with specified TTL
-                self.redis.set(
-                    pattern, json.dumps(data), ttl=int(rule.ttl) if rule.ttl else None
-                )
+    async def _load_jobs(
+        self, jobs: List[Tuple[WarmingRule, str]]
+    ) -> Tuple[List[Tuple[WarmingRule, str, Any]], int]:
+        """
+        Run the loaders of (rule, key) jobs concurrently, by priority.
 
-                # Update rule statistics
-                rule.last_warmed = start_time
-                rule.warm_count += 1
+        Returns:
+            Tuple of ((rule, key, data) for each loaded value, failed count)
+        """
+        queue: "asyncio.PriorityQueue[Tuple[int, int, WarmingRule, str]]" = (
+            asyncio.PriorityQueue()
+        )
+        for seq, (rule, key) in enumerate(jobs):
+            queue.put_nowait((-rule.priority, seq, rule, key))
 
-                logger.debug(f"Warmed cache for rule {rule.name}: {pattern}")
-            else:
-                logger.warning(f"No data returned for warming rule {rule.name}")
+        loaded: List[Tuple[WarmingRule, str, Any]] = []
+        failed = 0
+
+        async def worker() -> None:
+            nonlocal failed
+            while not queue.empty():
+                _, _, rule, key = queue.get_nowait()
+                try:
+                    data = await self._load_rule(rule, key)
+                except Exception as e:
+                    logger.error(f"Failed to warm rule {rule.name}: {e}")
+                    failed += 1
+                    continue
+                if data is None:
+                    logger.warning(f"No data returned for warming rule {rule.name}")
+                else:
+                    loaded.append((rule, key, data))
+
+        workers = min(self.max_concurrent_loaders, len(jobs))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return loaded, failed
+
+    async def _load_rule(self, rule: WarmingRule, key: str) -> Any:
+        """Run a rule's data loader, failing it once its deadline passes."""
+        deadline = rule.deadline if rule.deadline is not None else self.default_deadline
+        try:
+            return await asyncio.wait_for(rule.data_loader(key), timeout=deadline)
+        except asyncio.TimeoutError:
+            self.warming_statistics.timed_out_warms += 1
+            raise TimeoutError(f"loader exceeded {deadline}s deadline") from None
+
+    async def _write_warmed(self, loaded: List[Tuple[WarmingRule, str, Any]]) -> int:
+        """Write loaded values in one pipelined bulk write; return failures."""
+        if not loaded:
+            return 0
+
+        # Through ACPCache so TTL policies apply and L1 copies are invalidated
+        results = await self.acp_cache.set_many(
+            [
+                (key, data, int(rule.ttl) if rule.ttl else None)
+                for rule, key, data in loaded
+            ]
+        )
 
-        except Exception as e:
-            logger.error(f"Error warming rule {rule.name}: {e}")
-            raise
+        warmed_at = datetime.now(timezone.utc)
+        failures = 0
+        for (rule, key, _), ok in zip(loaded, results):
+            if ok:
+                rule.last_warmed = warmed_at
+                rule.warm_count += 1
+                logger.debug(f"Warmed cache for rule {rule.name}: {key}")
+            else:
+                logger.error(f"Failed to write warmed value for rule {rule.name}")
+                failures += 1
+        return failures
 
     def add_warming_rule(self, rule: WarmingRule) -> None:
         """Add a cache warming rule."""
@@ -253,19 +485,13 @@ class CacheWarmer:
             f"Starting on-demand cache warming for {len(key_patterns)} patterns"
         )
 
-        for pattern in key_patterns:
-            # Find matching rules
-            matching_rules = [
-                rule
-                for rule in self.warming_rules.values()
-                if rule.enabled and self._pattern_matches(pattern, rule.key_pattern)
-            ]
-
-            for rule in matching_rules:
-                try:
-                    await self._warm_rule(rule, pattern)
-                except Exception as e:
-                    logger.error(f"Failed to warm rule {rule.name} on demand: {e}")
+        jobs = [
+            (rule, pattern)
+            for pattern in key_patterns
+            for rule in self.warming_rules.values()
+            if rule.enabled and self._pattern_matches(pattern, rule.key_pattern)
+        ]
+        await self._run_warming_jobs(jobs)
 
     def _pattern_matches(self, key: str, pattern: str) -> bool:
         """Check if a key matches a pattern."""
@@ -311,6 +537,9 @@ class CacheWarmer:
                 else None
             ),
             "average_warm_time_ms": self.warming_statistics.average_warm_time_ms,
+            "timed_out_warms": self.warming_statistics.timed_out_warms,
+            "max_concurrent_loaders": self.max_concurrent_loaders,
+            "predictive": self.get_predictive_statistics(),
             "rules": {
                 name: {
                     "key_pattern": rule.key_pattern,
@@ -325,6 +554,26 @@ class CacheWarmer:
             },
         }
 
+    def get_predictive_statistics(self) -> Dict[str, Any]:
+        """Get predictive warming statistics."""
+        stats = self.predictive_statistics
+        settled = stats.misses_avoided + stats.wasted_preloads
+        return {
+            "cycles": stats.cycles,
+            "predictions": stats.predictions,
+            "preloads": stats.preloads,
+            "misses_avoided": stats.misses_avoided,
+            "wasted_preloads": stats.wasted_preloads,
+            "pending_preloads": len(stats.pending),
+            "precision": stats.misses_avoided / settled if settled else 0.0,
+            "ops_used": stats.ops_used,
+            "ops_per_miss_avoided": (
+                stats.ops_used / stats.misses_avoided if stats.misses_avoided else None
+            ),
+            "bytes_written": stats.bytes_written,
+            "skipped_for_budget": stats.skipped_for_budget,
+        }
+
     async def reset_statistics(self) -> None:
         """Reset warming statistics."""
         self.warming_statistics = WarmingStatistics(
@@ -336,6 +585,7 @@ class CacheWarmer:
             last_warming_cycle=None,
             average_warm_time_ms=0.0,
         )
+        self.predictive_statistics = PredictiveWarmingStatistics()
 
         for rule in self.warming_rules.values():
             rule.last_warmed = None
@@ -6,15 +6,17 @@ for Redis connections to improve performance and resource utilization.
 """
 
 import asyncio
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
-from redis.asyncio.connection import ConnectionPool
 
 from ...logging import get_logger
+from .instrumented_pool import InstrumentedConnectionPool, PoolSnapshot
 
 logger = get_logger(__name__)
 
@@ -71,7 +73,7 @@ class ConnectionPoolOptimizer:
             initial_config: Initial pool configuration
         """
         self.redis_url = redis_url
-        self.pool: Optional[ConnectionPool] = None
+        self.pool: Optional[InstrumentedConnectionPool] = None
         self.redis_client: Optional[redis.Redis] = None
 
         # Default configuration
@@ -95,10 +97,13 @@ class ConnectionPoolOptimizer:
 
         # Metrics tracking
         self.metrics_history: List[PoolMetrics] = []
-        self.connection_events: List[Tuple[datetime, str, float]] = (
-            []
-        )  # (timestamp, event_type, duration)
         self.max_history_size = 1000
+        # (timestamp, event_type, duration) recorded by callers
+        self.connection_events: Deque[Tuple[datetime, str, float]] = deque(
+            maxlen=self.max_history_size
+        )
+        # Pool counters at the previous collection, for rates
+        self._last_snapshot: Optional[Tuple[float, PoolSnapshot]] = None
 
         # Background task
         self._optimization_task: Optional[asyncio.Task] = None
@@ -152,9 +157,11 @@ class ConnectionPoolOptimizer:
 
     async def _create_pool(self) -> None:
         """Create Redis connection pool."""
-        self.pool = ConnectionPool.from_url(
+        self.pool = InstrumentedConnectionPool.from_url(
             self.redis_url,
             max_connections=self.config.max_connections,
+            max_idle_connections=self.config.max_idle_connections,
+            timeout=self.config.connection_timeout,
             retry_on_timeout=self.config.retry_on_timeout,
             socket_timeout=self.config.socket_timeout,
             socket_keepalive=self.config.socket_keepalive,
@@ -163,6 +170,7 @@ class ConnectionPoolOptimizer:
         )
 
         self.redis_client = redis.Redis(connection_pool=self.pool)
+        self._last_snapshot = None
 
     async def _monitoring_loop(self) -> None:
         """Background monitoring loop."""
@@ -191,74 +199,40 @@ class ConnectionPoolOptimizer:
             return
 
         try:
-            # Get pool statistics
-            total_connections = self.pool.connection_kwargs.get("max_connections", 0)
-            # Use public API to get connection counts
-            active_connections = (
-                getattr(self.pool, "_in_use_connections", set()).__len__()
-                if hasattr(self.pool, "_in_use_connections")
-                else 0
-            )
-            idle_connections = (
-                getattr(self.pool, "_available_connections", set()).__len__()
-                if hasattr(self.pool, "_available_connections")
-                else 0
+            snapshot = self.pool.snapshot()
+            now = time.monotonic()
+            previous = self._last_snapshot or (now, snapshot)
+            self._last_snapshot = (now, snapshot)
+            elapsed_minutes = max(now - previous[0], 1e-9) / 60
+            created = snapshot.created - previous[1].created
+            closed = snapshot.closed - previous[1].closed
+            checkouts = snapshot.checkouts - previous[1].checkouts
+
+            # Utilization from the in-use count sampled at each checkout,
+            # falling back to the current count when the pool is quiet
+            in_use_stats = self.pool.in_use_stats
+            in_use = (
+                in_use_stats.recent_mean() if in_use_stats.count else snapshot.in_use
             )
-
-            # Calculate utilization
             utilization = (
-                active_connections / total_connections if total_connections > 0 else 0
+                in_use / snapshot.max_connections if snapshot.max_connections else 0
             )
 
-            # Calculate average connection lifetime
-            now = datetime.now(timezone.utc)
-            lifetimes = []
-            for event_time, event_type, duration in self.connection_events:
-                if event_type == "connection_created":
-                    # Find corresponding destruction event
-                    for destroy_time, destroy_type, _ in self.connection_events:
-                        if (
-                            destroy_type == "connection_destroyed"
-                            and destroy_time > event_time
-                        ):
-                            lifetime = (destroy_time - event_time).total_seconds()
-                            lifetimes.append(lifetime)
-                            break
-
-            avg_lifetime = sum(lifetimes) / len(lifetimes) if lifetimes else 0
-
-            # Calculate rates
-            recent_events = [
-                event
-                for event in self.connection_events
-                if now - event[0] < timedelta(minutes=5)
-            ]
-
-            creation_events = [e for e in recent_events if e[1] == "connection_created"]
-            destruction_events = [
-                e for e in recent_events if e[1] == "connection_destroyed"
-            ]
-
-            creation_rate = len(creation_events) / 5  # per minute
-            destruction_rate = len(destruction_events) / 5  # per minute
-
-            # Calculate pool hit ratio (simplified)
-            pool_hit_ratio = 1.0 - (len(creation_events) / max(1, active_connections))
-
-            # Calculate average wait time
-            wait_times = [e[2] for e in recent_events if e[1] == "connection_wait"]
-            avg_wait_time = sum(wait_times) / len(wait_times) if wait_times else 0
+            # Checkouts served by an existing connection
+            pool_hit_ratio = (
+                max(0.0, 1.0 - created / checkouts) if checkouts > 0 else 1.0
+            )
 
             metrics = PoolMetrics(
-                total_connections=total_connections,
-                active_connections=active_connections,
-                idle_connections=idle_connections,
+                total_connections=snapshot.total,
+                active_connections=snapshot.in_use,
+                idle_connections=snapshot.idle,
                 connection_utilization=utilization,
-                average_connection_lifetime=avg_lifetime,
-                connection_creation_rate=creation_rate,
-                connection_destruction_rate=destruction_rate,
+                average_connection_lifetime=self.pool.lifetime_stats.mean,
+                connection_creation_rate=created / elapsed_minutes,
+                connection_destruction_rate=closed / elapsed_minutes,
                 pool_hit_ratio=pool_hit_ratio,
-                average_wait_time_ms=avg_wait_time * 1000,
+                average_wait_time_ms=self.pool.wait_stats.recent_mean() * 1000,
             )
 
             self.metrics_history.append(metrics)
@@ -272,6 +246,8 @@ class ConnectionPoolOptimizer:
         """Run a complete optimization cycle."""
         if not self.metrics_history:
             return
+        if self.optimization_strategy == PoolOptimizationStrategy.STATIC:
+            return
 
         logger.info("Starting connection pool optimization cycle")
 
@@ -395,29 +371,25 @@ class ConnectionPoolOptimizer:
                 logger.error(f"Failed to apply optimization {rec['type']}: {e}")
 
     async def _update_pool_size(self, new_max_connections: int) -> None:
-        """Update pool size by recreating the pool."""
+        """Resize the running pool."""
         if new_max_connections == self.config.max_connections:
             return
 
-        old_pool = self.pool
         self.config.max_connections = new_max_connections
-
-        # Create new pool
-        await self._create_pool()
-
-        # Close old pool
-        if old_pool:
-            await old_pool.disconnect()
+        if self.pool:
+            await self.pool.resize(new_max_connections)
 
     async def _update_idle_connections(self, new_max_idle: int) -> None:
         """Update maximum idle connections."""
         self.config.max_idle_connections = new_max_idle
-        # Note: This would require pool recreation in a real implementation
+        if self.pool:
+            await self.pool.set_max_idle_connections(new_max_idle)
 
     async def _update_connection_timeout(self, new_timeout: float) -> None:
-        """Update connection timeout."""
+        """Update how long callers wait for a free connection."""
         self.config.connection_timeout = new_timeout
-        # Note: This would require pool recreation in a real implementation
+        if self.pool:
+            self.pool.timeout = new_timeout
 
     def record_connection_event(self, event_type: str, duration: float = 0.0) -> None:
         """Record a connection event for metrics."""
@@ -425,11 +397,11 @@ class ConnectionPoolOptimizer:
             (datetime.now(timezone.utc), event_type, duration)
         )
 
-        # Keep only recent events
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
-        self.connection_events = [
-            event for event in self.connection_events if event[0] > cutoff
-        ]
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get live pool counters and wait-time statistics."""
+        if not self.pool:
+            return {}
+        return self.pool.get_stats()
 
     def get_pool_metrics(self) -> Optional[PoolMetrics]:
         """Get current pool metrics."""
@@ -0,0 +1,306 @@
+"""
+Instrumented, resizable Redis connection pool.
+
+InstrumentedConnectionPool is a blocking redis.asyncio pool that records
+checkout wait time, hold time, in-use count and connection lifetimes in
+fixed-size ring buffers with running statistics, so collecting metrics
+never scans event lists. Its size can be changed while it is in use:
+growing wakes waiting callers, shrinking closes idle connections at once
+and busy ones as they are released.
+"""
+
+import asyncio
+import math
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from redis.asyncio.connection import AbstractConnection, BlockingConnectionPool
+from redis.exceptions import ConnectionError
+
+from ...logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RingStats:
+    """Recent samples in a ring buffer plus running all-time statistics."""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Number of recent samples kept for percentiles
+        """
+        self.capacity = capacity
+        self._samples = array("d", bytes(8 * capacity))
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Welford's running mean and sum of squared deviations
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Record a sample."""
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+    @property
+    def mean(self) -> float:
+        """Mean of all samples."""
+        return self._mean
+
+    @property
+    def stddev(self) -> float:
+        """Population standard deviation of all samples."""
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    def recent(self) -> List[float]:
+        """Get the samples still in the ring, oldest first."""
+        if self.count < self.capacity:
+            return list(self._samples[: self.count])
+        return list(self._samples[self._next :]) + list(self._samples[: self._next])
+
+    def recent_mean(self) -> float:
+        """Mean of the samples still in the ring."""
+        recent = self.recent()
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """Get the value at a 0-100 rank among the samples still in the ring."""
+        recent = sorted(self.recent())
+        if not recent:
+            return 0.0
+        index = min(len(recent) - 1, int(len(recent) * percentile / 100))
+        return recent[index]
+
+    def to_dict(self, scale: float = 1.0) -> Dict[str, float]:
+        """Summarize the statistics, multiplying values by scale."""
+        return {
+            "count": self.count,
+            "mean": self.mean * scale,
+            "recent_mean": self.recent_mean() * scale,
+            "p95": self.percentile(95) * scale,
+            "max": self.max * scale,
+        }
+
+
+@dataclass
+class PoolSnapshot:
+    """Point-in-time pool counters."""
+
+    max_connections: int
+    max_idle_connections: int
+    in_use: int
+    idle: int
+    created: int
+    closed: int
+    checkouts: int
+    checkout_timeouts: int
+
+    @property
+    def total(self) -> int:
+        """Open connections, busy or idle."""
+        return self.in_use + self.idle
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Blocking connection pool with checkout instrumentation and live resizing."""
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        timeout: Optional[float] = 20,
+        max_idle_connections: Optional[int] = None,
+        stats_window: int = 1024,
+        **connection_kwargs: Any,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            max_connections: Maximum open connections
+            timeout: Seconds to wait for a free connection (None waits forever)
+            max_idle_connections: Idle connections kept on release; extra
+                ones are closed (defaults to max_connections)
+            stats_window: Samples kept per ring buffer
+            connection_kwargs: Passed to each connection
+        """
+        super().__init__(
+            max_connections=max_connections, timeout=timeout, **connection_kwargs
+        )
+        self.max_idle_connections = (
+            max_idle_connections
+            if max_idle_connections is not None
+            else max_connections
+        )
+
+        self.wait_stats = RingStats(stats_window)  # seconds to check out
+        self.hold_stats = RingStats(stats_window)  # seconds checked out
+        self.in_use_stats = RingStats(stats_window)  # in-use count at checkout
+        self.lifetime_stats = RingStats(stats_window)  # seconds open when closed
+        # (monotonic time, event type, duration) of creations and closes
+        self.events: Deque[Tuple[float, str, float]] = deque(maxlen=stats_window)
+
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self._created_at: Dict[AbstractConnection, float] = {}
+        self._checked_out_at: Dict[AbstractConnection, float] = {}
+
+    def make_connection(self) -> AbstractConnection:
+        """Create a connection and record its creation."""
+        connection = super().make_connection()
+        now = time.monotonic()
+        self._created_at[connection] = now
+        self.created += 1
+        self.events.append((now, "connection_created", 0.0))
+        return connection
+
+    async def get_connection(self, *args: Any, **kwargs: Any) -> AbstractConnection:
+        """Check out a connection, recording how long the caller waited."""
+        started = time.monotonic()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except ConnectionError as e:
+            # Only a wait for a free connection times out; connect errors
+            # raised while opening the connection are not checkout timeouts
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                self.checkout_timeouts += 1
+            self.wait_stats.add(time.monotonic() - started)
+            raise
+        now = time.monotonic()
+        self.wait_stats.add(now - started)
+        self.in_use_stats.add(len(self._in_use_connections))
+        self.checkouts += 1
+        self._checked_out_at[connection] = now
+        return connection
+
+    async def release(self, connection: AbstractConnection) -> None:
+        """Return a connection, closing it if the pool has shrunk."""
+        checked_out = self._checked_out_at.pop(connection, None)
+        if checked_out is not None:
+            self.hold_stats.add(time.monotonic() - checked_out)
+
+        async with self._condition:
+            open_connections = len(self._in_use_connections) + len(
+                self._available_connections
+            )
+            close = (
+                open_connections > self.max_connections
+                or len(self._available_connections) >= self.max_idle_connections
+            )
+            if close:
+                self._in_use_connections.discard(connection)
+                self._condition.notify()
+        if not close:
+            await super().release(connection)
+            return
+        await self._close(connection)
+
+    async def _close(self, connection: AbstractConnection) -> None:
+        """Close a connection that has left the pool."""
+        now = time.monotonic()
+        created_at = self._created_at.pop(connection, now)
+        self.lifetime_stats.add(now - created_at)
+        self.closed += 1
+        self.events.append((now, "connection_destroyed", now - created_at))
+        try:
+            await connection.disconnect()
+        except Exception as e:
+            logger.error(f"Error closing pooled connection: {e}")
+
+    async def resize(self, max_connections: int) -> int:
+        """
+        Change the maximum number of connections while the pool is in use.
+
+        Growing wakes callers waiting for a connection. Shrinking closes idle
+        connections now; busy connections are closed as they are released.
+
+        Returns:
+            Number of idle connections closed
+        """
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        async with self._condition:
+            self.max_connections = max_connections
+            excess = (
+                len(self._in_use_connections)
+                + len(self._available_connections)
+                - max_connections
+            )
+            drained = self._take_idle(excess)
+            self._condition.notify_all()
+        for connection in drained:
+            await self._close(connection)
+        logger.info(
+            f"Connection pool resized to {max_connections} "
+            f"({len(drained)} idle connections closed)"
+        )
+        return len(drained)
+
+    async def set_max_idle_connections(self, max_idle_connections: int) -> int:
+        """
+        Change how many idle connections are kept, closing any excess.
+
+        Returns:
+            Number of idle connections closed
+        """
+        async with self._condition:
+            self.max_idle_connections = max_idle_connections
+            drained = self._take_idle(
+                len(self._available_connections) - max_idle_connections
+            )
+        for connection in drained:
+            await self._close(connection)
+        return len(drained)
+
+    def _take_idle(self, count: int) -> List[AbstractConnection]:
+        """Remove up to count idle connections, oldest first."""
+        count = max(0, min(count, len(self._available_connections)))
+        drained = self._available_connections[:count]
+        del self._available_connections[:count]
+        return drained
+
+    def snapshot(self) -> PoolSnapshot:
+        """Get the pool's current counters."""
+        return PoolSnapshot(
+            max_connections=self.max_connections,
+            max_idle_connections=self.max_idle_connections,
+            in_use=len(self._in_use_connections),
+            idle=len(self._available_connections),
+            created=self.created,
+            closed=self.closed,
+            checkouts=self.checkouts,
+            checkout_timeouts=self.checkout_timeouts,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters and wait, hold, in-use and lifetime statistics."""
+        snapshot = self.snapshot()
+        return {
+            "max_connections": snapshot.max_connections,
+            "max_idle_connections": snapshot.max_idle_connections,
+            "in_use": snapshot.in_use,
+            "idle": snapshot.idle,
+            "created": snapshot.created,
+            "closed": snapshot.closed,
+            "checkouts": snapshot.checkouts,
+            "checkout_timeouts": snapshot.checkout_timeouts,
+            "wait_ms": self.wait_stats.to_dict(scale=1000),
+            "hold_ms": self.hold_stats.to_dict(scale=1000),
+            "in_use_at_checkout": self.in_use_stats.to_dict(),
+            "lifetime_seconds": self.lifetime_stats.to_dict(),
+        }
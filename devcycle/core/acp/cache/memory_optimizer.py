@@ -9,14 +9,18 @@ import asyncio
 import base64
 import gzip
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
 
+from ...cache.async_redis_cache import get_async_cache
+from ...cache.compression import compress_bytes, decompress_bytes, resolve_algorithm
+from ...config import get_config
 from ...logging import get_logger
+from .memory_profiler import MemoryProfiler
 
 
 def safe_serialize(value: Any) -> bytes:
@@ -56,6 +60,9 @@ def safe_deserialize(data: bytes) -> Any:
 
 logger = get_logger(__name__)
 
+# Raw gzip streams written by compress_value before values carried a marker
+GZIP_MAGIC = b"\x1f\x8b"
+
 
 class CompressionAlgorithm(Enum):
     """Compression algorithms."""
@@ -91,6 +98,7 @@ class MemoryMetrics:
     evicted_keys: int
     memory_usage_by_type: Dict[str, int]
     largest_keys: List[Tuple[str, int]]
+    memory_usage_by_family: Dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -108,16 +116,26 @@ class MemoryOptimizationRecommendation:
 class MemoryOptimizer:
     """Intelligent Redis memory optimizer."""
 
-    def __init__(self, redis_client: redis.Redis, memory_threshold: float = 0.8):
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        memory_threshold: float = 0.8,
+        profiler: Optional[MemoryProfiler] = None,
+    ):
         """
         Initialize memory optimizer.
 
         Args:
             redis_client: Redis client instance
             memory_threshold: Memory usage threshold for optimization (0.0-1.0)
+            profiler: Keyspace profiler supplying per-type, per-family and
+                largest-key figures
         """
         self.redis_client = redis_client
         self.memory_threshold = memory_threshold
+        self.profiler = (
+            profiler if profiler is not None else MemoryProfiler(redis_client)
+        )
 
         # Optimization settings
         self.compression_enabled = True
@@ -144,6 +162,7 @@ class MemoryOptimizer:
         self._running = True
 
         # Start background tasks
+        await self.profiler.start()
         self._monitoring_task = asyncio.create_task(self._monitoring_loop())
         self._optimization_task = asyncio.create_task(self._optimization_loop())
 
@@ -171,6 +190,7 @@ class MemoryOptimizer:
             except asyncio.CancelledError:
                 pass
 
+        await self.profiler.stop()
         logger.info("Memory optimizer stopped")
 
     async def _monitoring_loop(self) -> None:
@@ -202,11 +222,8 @@ class MemoryOptimizer:
             db_info = await self.redis_client.info("keyspace")
             total_keys = sum(int(db.get("keys", 0)) for db in db_info.values())
 
-            # Get largest keys (sample)
-            largest_keys = await self._get_largest_keys(limit=10)
-
-            # Calculate memory usage by type
-            memory_by_type = await self._analyze_memory_by_type()
+            # Keyspace figures come from the profiler's latest full scan
+            profile = self.profiler.latest_profile
 
             metrics = MemoryMetrics(
                 used_memory=info.get("used_memory", 0),
@@ -218,8 +235,16 @@ class MemoryOptimizer:
                 total_keys=total_keys,
                 expired_keys=info.get("expired_keys", 0),
                 evicted_keys=info.get("evicted_keys", 0),
-                memory_usage_by_type=memory_by_type,
-                largest_keys=largest_keys,
+                memory_usage_by_type=dict(profile.by_type) if profile else {},
+                largest_keys=self._get_largest_keys(limit=10),
+                memory_usage_by_family=(
+                    {
+                        family.family: family.bytes
+                        for family in profile.families.values()
+                    }
+                    if profile
+                    else {}
+                ),
             )
 
             self.memory_history.append(metrics)
@@ -229,53 +254,12 @@ class MemoryOptimizer:
         except Exception as e:
             logger.error(f"Error collecting memory metrics: {e}")
 
-    async def _get_largest_keys(self, limit: int = 10) -> List[Tuple[str, int]]:
-        """Get the largest keys by memory usage."""
-        try:
-            # Use MEMORY USAGE command to get key sizes
-            keys = await self.redis_client.keys("*")
-            key_sizes = []
-
-            for key in keys[:100]:  # Sample first 100 keys
-                try:
-                    size = await self.redis_client.memory_usage(key)
-                    key_sizes.append((key, size))
-                except Exception as e:
-                    logger.warning(f"Failed to get memory usage for key {key}: {e}")
-                    # Skip this key but continue processing others
-
-            # Sort by size and return top keys
-            key_sizes.sort(key=lambda x: x[1], reverse=True)
-            return key_sizes[:limit]
-
-        except Exception as e:
-            logger.error(f"Error getting largest keys: {e}")
+    def _get_largest_keys(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Get the largest keys found by the latest memory profile."""
+        profile = self.profiler.latest_profile
+        if profile is None:
             return []
-
-    async def _analyze_memory_by_type(self) -> Dict[str, int]:
-        """Analyze memory usage by data type."""
-        try:
-            # Get all keys and their types
-            keys = await self.redis_client.keys("*")
-            type_counts: Dict[str, int] = {}
-            type_memory: Dict[str, int] = {}
-
-            for key in keys[:1000]:  # Sample first 1000 keys
-                try:
-                    key_type = await self.redis_client.type(key)
-                    memory_usage = await self.redis_client.memory_usage(key)
-
-                    type_counts[key_type] = type_counts.get(key_type, 0) + 1
-                    type_memory[key_type] = type_memory.get(key_type, 0) + memory_usage
-                except Exception as e:
-                    logger.warning(f"Failed to analyze memory for key {key}: {e}")
-                    # Skip this key but continue processing others
-
-            return type_memory
-
-        except Exception as e:
-            logger.error(f"Error analyzing memory by type: {e}")
-            return {}
+        return [(big.key, big.bytes) for big in profile.big_keys[:limit]]
 
     async def _run_optimization_cycle(self) -> None:
         """Run a complete memory optimization cycle."""
@@ -407,11 +391,21 @@ class MemoryOptimizer:
             logger.error(f"Failed to run memory defragmentation: {e}")
 
     async def _enable_compression_for_large_keys(self) -> None:
-        """Enable compression for large keys."""
+        """Enable write-path compression on the cache for large values."""
         try:
-            # This would implement compression for large keys
-            # For now, just log the action
-            logger.info("Compression enabled for large keys")
+            if get_config().redis.cache_legacy_json_writes:
+                # Older readers cannot decompress values during a rollout
+                logger.info("Compression not enabled while legacy writes are on")
+                return
+
+            compressor = get_async_cache().compressor
+            compressor.enabled = True
+            compressor.threshold = self.compression_threshold
+            compressor.algorithm = resolve_algorithm(self.compression_algorithm.value)
+            logger.info(
+                f"Compression enabled for values over {self.compression_threshold} "
+                f"bytes using {compressor.algorithm}"
+            )
         except Exception as e:
             logger.error(f"Failed to enable compression: {e}")
 
@@ -434,21 +428,25 @@ class MemoryOptimizer:
         if len(serialized) < self.compression_threshold:
             return serialized
 
-        if self.compression_algorithm == CompressionAlgorithm.GZIP:
-            return gzip.compress(serialized)
-        else:
+        if self.compression_algorithm == CompressionAlgorithm.NONE:
             return serialized
 
+        return compress_bytes(
+            serialized, resolve_algorithm(self.compression_algorithm.value)
+        )
+
     async def decompress_value(self, compressed_data: bytes) -> Any:
         """Decompress a value."""
         if not self.compression_enabled:
             return safe_deserialize(compressed_data)
 
         try:
-            if self.compression_algorithm == CompressionAlgorithm.GZIP:
+            # The marker identifies the algorithm, so values compressed before
+            # an algorithm change still decompress
+            if compressed_data[:2] == GZIP_MAGIC:
                 decompressed = gzip.decompress(compressed_data)
             else:
-                decompressed = compressed_data
+                decompressed = decompress_bytes(compressed_data)
 
             return safe_deserialize(decompressed)
         except Exception:
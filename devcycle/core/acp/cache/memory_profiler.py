@@ -0,0 +1,284 @@
+"""
+Streaming Redis memory profiler.
+
+The profiler walks the whole keyspace with SCAN, fetching TYPE and
+MEMORY USAGE ... SAMPLES for each batch in one pipelined round trip and
+pausing between batches, so a full profile never blocks the server.
+Memory is attributed to key families (keys with their variable segments
+normalized to "*") and Redis types. The largest keys are kept in a top-N
+heap and measured exactly (SAMPLES 0) once the scan finishes. Per-family
+totals of each profile are kept as a time series.
+"""
+
+import asyncio
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ...cache.scan import DEFAULT_SCAN_COUNT, ScanState, ascan_batches
+from ...logging import get_logger
+from .sketches import key_family
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FamilyMemory:
+    """Memory attributed to one key family."""
+
+    family: str
+    keys: int = 0
+    bytes: int = 0
+    by_type: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class BigKey:
+    """A key among the largest in the keyspace."""
+
+    key: str
+    bytes: int
+    key_type: str
+
+
+@dataclass
+class MemoryProfile:
+    """Result of one pass over the keyspace."""
+
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    keys_scanned: int = 0
+    total_bytes: int = 0
+    complete: bool = False
+    families: Dict[str, FamilyMemory] = field(default_factory=dict)
+    by_type: Dict[str, int] = field(default_factory=dict)
+    big_keys: List[BigKey] = field(default_factory=list)
+
+    def top_families(self, limit: Optional[int] = None) -> List[FamilyMemory]:
+        """Get families ordered by memory, largest first."""
+        ranked = sorted(self.families.values(), key=lambda f: f.bytes, reverse=True)
+        return ranked if limit is None else ranked[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-friendly report of the profile."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "complete": self.complete,
+            "keys_scanned": self.keys_scanned,
+            "total_bytes": self.total_bytes,
+            "by_type": dict(self.by_type),
+            "families": [
+                {
+                    "family": family.family,
+                    "keys": family.keys,
+                    "bytes": family.bytes,
+                    "by_type": dict(family.by_type),
+                }
+                for family in self.top_families()
+            ],
+            "big_keys": [
+                {"key": big.key, "bytes": big.bytes, "type": big.key_type}
+                for big in self.big_keys
+            ],
+        }
+
+
+class MemoryProfiler:
+    """Background keyspace profiler attributing memory to key families."""
+
+    # Families beyond max_families are aggregated here
+    OVERFLOW_FAMILY = "*"
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        top_n: int = 20,
+        samples: int = 5,
+        scan_count: int = DEFAULT_SCAN_COUNT,
+        batch_pause: float = 0.01,
+        max_families: int = 1000,
+        interval: float = 900.0,
+        history_size: int = 96,
+    ):
+        """
+        Initialize memory profiler.
+
+        Args:
+            redis_client: Async Redis client
+            top_n: Number of largest keys to report
+            samples: MEMORY USAGE SAMPLES for aggregate sizes (0 measures
+                every element of a collection)
+            scan_count: SCAN COUNT hint per batch
+            batch_pause: Seconds to pause between batches
+            max_families: Families tracked separately per profile
+            interval: Seconds between background profiles
+            history_size: Profiles kept in the per-family time series
+        """
+        self.redis_client = redis_client
+        self.top_n = top_n
+        self.samples = samples
+        self.scan_count = scan_count
+        self.batch_pause = batch_pause
+        self.max_families = max_families
+        self.interval = interval
+
+        self.latest_profile: Optional[MemoryProfile] = None
+        self.family_history: Deque[Tuple[datetime, Dict[str, int]]] = deque(
+            maxlen=history_size
+        )
+
+        # Background task
+        self._profiling_task: Optional[asyncio.Task] = None
+        self._running = False
+
+    async def start(self) -> None:
+        """Start profiling in the background."""
+        if self._running:
+            return
+
+        self._running = True
+        self._profiling_task = asyncio.create_task(self._profiling_loop())
+        logger.info("Memory profiler started")
+
+    async def stop(self) -> None:
+        """Stop background profiling."""
+        if not self._running:
+            return
+
+        self._running = False
+        if self._profiling_task:
+            self._profiling_task.cancel()
+            try:
+                await self._profiling_task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Memory profiler stopped")
+
+    async def _profiling_loop(self) -> None:
+        """Background profiling loop."""
+        while self._running:
+            try:
+                await self.profile()
+                await asyncio.sleep(self.interval)
+            except Exception as e:
+                logger.error(f"Error in memory profiling loop: {e}")
+                await asyncio.sleep(60)
+
+    def _family_for(self, profile: MemoryProfile, key: str) -> FamilyMemory:
+        """Get the family entry of a key, creating it if there is room."""
+        name = key_family(key)
+        if name not in profile.families and len(profile.families) >= self.max_families:
+            name = self.OVERFLOW_FAMILY
+        if name not in profile.families:
+            profile.families[name] = FamilyMemory(name)
+        return profile.families[name]
+
+    async def profile(
+        self, match: str = "*", max_keys: Optional[int] = None
+    ) -> MemoryProfile:
+        """
+        Profile the keyspace once.
+
+        Args:
+            match: Only profile keys matching this pattern
+            max_keys: Stop after roughly this many keys (the profile is then
+                marked incomplete)
+
+        Returns:
+            The profile, also stored as latest_profile
+        """
+        profile = MemoryProfile(started_at=datetime.now(timezone.utc))
+        # Candidates for the top N, as a min-heap of (bytes, key, type). Twice
+        # as many are kept since sampled sizes can misorder close neighbours.
+        candidates: List[Tuple[int, str, str]] = []
+        state = ScanState()
+
+        async for keys in ascan_batches(
+            self.redis_client, match, self.scan_count, state
+        ):
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.type(key)
+                pipe.memory_usage(key, samples=self.samples)
+            results = await pipe.execute()
+
+            for key, key_type, usage in zip(keys, results[0::2], results[1::2]):
+                if usage is None:
+                    continue  # Key expired between SCAN and lookup
+                size = int(usage)
+                key_type = str(key_type)
+                profile.keys_scanned += 1
+                profile.total_bytes += size
+                profile.by_type[key_type] = profile.by_type.get(key_type, 0) + size
+
+                family = self._family_for(profile, key)
+                family.keys += 1
+                family.bytes += size
+                family.by_type[key_type] = family.by_type.get(key_type, 0) + size
+
+                entry = (size, str(key), key_type)
+                if len(candidates) < self.top_n * 2:
+                    heapq.heappush(candidates, entry)
+                elif size > candidates[0][0]:
+                    heapq.heapreplace(candidates, entry)
+
+            if max_keys is not None and profile.keys_scanned >= max_keys:
+                break
+            if self.batch_pause:
+                await asyncio.sleep(self.batch_pause)
+
+        profile.big_keys = await self._measure_exactly(candidates)
+        profile.complete = state.finished
+        profile.finished_at = datetime.now(timezone.utc)
+
+        self.latest_profile = profile
+        self.family_history.append(
+            (
+                profile.finished_at,
+                {name: family.bytes for name, family in profile.families.items()},
+            )
+        )
+        logger.info(
+            f"Memory profile: {profile.keys_scanned} keys, "
+            f"{profile.total_bytes} bytes in {len(profile.families)} families"
+        )
+        return profile
+
+    async def _measure_exactly(
+        self, candidates: List[Tuple[int, str, str]]
+    ) -> List[BigKey]:
+        """Re-measure top-N candidates with SAMPLES 0 and rank them."""
+        if not candidates:
+            return []
+        candidates = sorted(candidates, reverse=True)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for _, key, _ in candidates:
+            pipe.memory_usage(key, samples=0)
+        results = await pipe.execute()
+
+        measured = [
+            BigKey(key, int(usage), key_type)
+            for (_, key, key_type), usage in zip(candidates, results)
+            if usage is not None
+        ]
+        measured.sort(key=lambda big: big.bytes, reverse=True)
+        return measured[: self.top_n]
+
+    def get_family_history(self, family: str) -> List[Tuple[datetime, int]]:
+        """Get a family's memory in each recorded profile, oldest first."""
+        return [(at, families.get(family, 0)) for at, families in self.family_history]
+
+    def get_family_trends(self) -> Dict[str, int]:
+        """Get each family's change in bytes between the last two profiles."""
+        if len(self.family_history) < 2:
+            return {}
+        (_, previous), (_, current) = self.family_history[-2], self.family_history[-1]
+        return {
+            family: current.get(family, 0) - previous.get(family, 0)
+            for family in set(previous) | set(current)
+        }
@@ -0,0 +1,232 @@
+"""
+Fixed-memory probabilistic structures for cache access tracking.
+
+CacheOptimizer sees every cache access, across millions of distinct keys, so
+it cannot keep exact per-key state. These structures bound its memory
+independently of the key count:
+
+- CountMinSketch: approximate, exponentially time-decayed access counts
+- HeavyHitters: the top-K keys by those counts
+- HyperLogLog: approximate number of distinct keys
+"""
+
+import hashlib
+import math
+import re
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Segments with digits (IDs, UUIDs, timestamps) vary per key within a family
+_VARIABLE_SEGMENT = re.compile(r"\d")
+
+_MASK64 = (1 << 64) - 1
+
+
+def hash_key(key: str) -> Tuple[int, int]:
+    """Hash a key to two independent 64-bit values."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def key_family(key: str) -> str:
+    """
+    Normalize a cache key to its family pattern.
+
+    Colon-separated segments containing digits are replaced with "*", so
+    "workflows:steps:wf-12:step-3" becomes "workflows:steps:*:*".
+    """
+    return ":".join(
+        "*" if _VARIABLE_SEGMENT.search(segment) else segment
+        for segment in key.split(":")
+    )
+
+
+class CountMinSketch:
+    """
+    Count-min sketch with exponential time decay.
+
+    Uses forward decay: an update at time t adds exp(rate * (t - landmark)),
+    so stored counters stay comparable across time and only need decaying
+    when read. Counters are rescaled when the weights grow large.
+    """
+
+    # Rescale once weights reach exp(RENORMALIZE_EXPONENT)
+    RENORMALIZE_EXPONENT = 50.0
+
+    def __init__(self, width: int, depth: int = 4, half_life_seconds: float = 3600.0):
+        """
+        Initialize sketch.
+
+        Args:
+            width: Counters per row; error is about total_count * e / width
+            depth: Rows; failure probability is about exp(-depth)
+            half_life_seconds: Time for an access's weight to halve
+        """
+        self.width = width
+        self.depth = depth
+        self.rate = math.log(2) / half_life_seconds
+        self.landmark: Optional[float] = None
+        self.rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        """Get the counter index of a key in each row."""
+        h1, h2 = hash_key(key)
+        return [((h1 + i * h2) & _MASK64) % self.width for i in range(self.depth)]
+
+    def maybe_renormalize(self, now: float) -> float:
+        """
+        Rescale counters if update weights at `now` would grow too large.
+
+        Returns:
+            Factor applied to all counters (1.0 if none); values derived
+            from raw counters must be scaled by it too
+        """
+        if self.landmark is None:
+            self.landmark = now
+            return 1.0
+        exponent = self.rate * (now - self.landmark)
+        if exponent < self.RENORMALIZE_EXPONENT:
+            return 1.0
+        factor = math.exp(-exponent)
+        for row in self.rows:
+            for i in range(self.width):
+                row[i] *= factor
+        self.landmark = now
+        return factor
+
+    def weight(self, now: float) -> float:
+        """Get the forward-decay weight of an update at `now`."""
+        if self.landmark is None:
+            return 1.0
+        return math.exp(self.rate * (now - self.landmark))
+
+    def add(self, key: str, now: float) -> float:
+        """
+        Record one access to a key.
+
+        Returns:
+            The key's new raw (forward-weighted) estimate
+        """
+        self.maybe_renormalize(now)
+        weight = self.weight(now)
+        estimate = math.inf
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += weight
+            estimate = min(estimate, row[index])
+        return estimate
+
+    def raw_estimate(self, key: str) -> float:
+        """Get a key's forward-weighted count, comparable across time."""
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def decay(self, raw: float, now: float) -> float:
+        """Convert a raw estimate to a decayed access count at `now`."""
+        if self.landmark is None:
+            return 0.0
+        return raw * math.exp(-self.rate * (now - self.landmark))
+
+    def estimate(self, key: str, now: float) -> float:
+        """Get a key's decayed access count at `now`."""
+        return self.decay(self.raw_estimate(key), now)
+
+    def memory_bytes(self) -> int:
+        """Get the memory used by the counters."""
+        return self.width * self.depth * 8
+
+
+class HeavyHitters:
+    """Top-K keys by (raw) count-min estimate."""
+
+    def __init__(self, capacity: int):
+        """
+        Initialize heavy hitters list.
+
+        Args:
+            capacity: Number of keys to keep
+        """
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+        self._min_key: Optional[str] = None
+
+    def update(self, key: str, count: float) -> Tuple[bool, Optional[str]]:
+        """
+        Offer a key with its current count.
+
+        Returns:
+            Tuple of (whether the key is now tracked, key evicted to make room)
+        """
+        if key in self.counts or len(self.counts) < self.capacity:
+            self.counts[key] = count
+            if key == self._min_key:
+                self._min_key = None
+            return True, None
+
+        if self._min_key is None:
+            self._min_key = min(self.counts, key=self.counts.__getitem__)
+        if count <= self.counts[self._min_key]:
+            return False, None
+
+        evicted = self._min_key
+        del self.counts[evicted]
+        self.counts[key] = count
+        self._min_key = None
+        return True, evicted
+
+    def scale(self, factor: float) -> None:
+        """Rescale counts after the sketch renormalizes."""
+        for key in self.counts:
+            self.counts[key] *= factor
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Get tracked keys ordered by count, highest first."""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a key is tracked."""
+        return key in self.counts
+
+    def __len__(self) -> int:
+        """Get the number of tracked keys."""
+        return len(self.counts)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count estimator."""
+
+    def __init__(self, precision: int = 12):
+        """
+        Initialize estimator.
+
+        Args:
+            precision: log2 of the register count; standard error is about
+                1.04 / sqrt(2 ** precision)
+        """
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self.alpha = 0.7213 / (1 + 1.079 / self.size)
+
+    def add(self, key: str) -> None:
+        """Record a key."""
+        h1, _ = hash_key(key)
+        index = h1 >> (64 - self.precision)
+        remainder = (h1 << self.precision) & _MASK64
+        rank = 1 if remainder == 0 else 65 - remainder.bit_length()
+        rank = min(rank, 64 - self.precision + 1)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Estimate the number of distinct keys recorded."""
+        total = sum(2.0**-register for register in self.registers)
+        estimate = self.alpha * self.size * self.size / total
+        if estimate <= 2.5 * self.size:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def memory_bytes(self) -> int:
+        """Get the memory used by the registers."""
+        return self.size
@@ -4,7 +4,7 @@ ACP configuration classes for DevCycle.
 Based on the ACP specification and SDK requirements.
 """
 
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -60,6 +60,20 @@ class ACPConfig(BaseSettings):
         default=3600, description="Redis TTL for agent state in seconds"
     )
 
+    # Event Configuration
+    event_streams_enabled: bool = Field(
+        default=False,
+        description="Also log published events to Redis Streams for replay",
+    )
+    event_stream_maxlen: int = Field(
+        default=10000, description="Approximate number of events kept per stream"
+    )
+    event_coalesce_windows_ms: Dict[str, int] = Field(
+        default_factory=lambda: {"workflow_progress": 100},
+        description="Per event type, publish only the latest event per key "
+        "within this many milliseconds",
+    )
+
     # Advanced Configuration
     enable_metrics: bool = Field(
         default=True, description="Enable ACP metrics collection"
@@ -6,6 +6,15 @@ including agent status changes, workflow progress, and system health updates.
 """
 
 from .event_types import ACPEvent, ACPEventType
+from .publisher import EventPublisher
 from .redis_events import RedisACPEvents
+from .stream_events import RedisStreamEvents, StreamEvent
 
-__all__ = ["RedisACPEvents", "ACPEventType", "ACPEvent"]
+__all__ = [
+    "EventPublisher",
+    "RedisACPEvents",
+    "RedisStreamEvents",
+    "StreamEvent",
+    "ACPEventType",
+    "ACPEvent",
+]
@@ -0,0 +1,193 @@
+"""
+Batched, coalesced publishing of ACP events.
+
+An event published to several channels (e.g. workflow_events:<id> and
+workflow_events) is serialized once and sent in a single pipelined round
+trip. High-frequency event types can be coalesced per key: the first event
+for a key is published at once and opens a window, later events in the
+window replace each other, and only the latest is published when the
+window closes. With a stream log, logged events are appended and published
+by one script, which stamps the published copy with its stream entry ID.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from ...logging import get_logger
+from .event_types import ACPEvent, ACPEventType
+from .stream_events import RedisStreamEvents
+
+logger = get_logger(__name__)
+
+# Coalescing window in seconds per event type
+DEFAULT_COALESCE_WINDOWS: Dict[str, float] = {
+    ACPEventType.WORKFLOW_PROGRESS.value: 0.1,
+}
+
+
+class EventPublisher:
+    """Publishes ACP events in pipelined round trips, coalescing bursts."""
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        streams: Optional[RedisStreamEvents] = None,
+        coalesce_windows: Optional[Dict[str, float]] = None,
+        max_pending: int = 10000,
+    ):
+        """
+        Initialize event publisher.
+
+        Args:
+            redis_client: Async Redis client
+            streams: Durable event log written in the same round trip
+            coalesce_windows: Window in seconds per event type; events of
+                these types are coalesced per key
+            max_pending: Coalesced events held at most; new keys beyond
+                this are dropped until windows close
+        """
+        self.redis = redis_client
+        self.streams = streams
+        self.coalesce_windows = (
+            DEFAULT_COALESCE_WINDOWS if coalesce_windows is None else coalesce_windows
+        )
+        self.max_pending = max_pending
+
+        # (event type, key) -> latest messages waiting for the window to close
+        self._pending: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        # (event type, key) -> task closing the open window
+        self._windows: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._window_tasks: Set[asyncio.Task] = set()
+
+        # Publishing statistics
+        self.events_published = 0
+        self.events_coalesced = 0
+        self.events_dropped = 0
+        self.messages_published = 0
+        self.round_trips = 0
+
+    @staticmethod
+    def serialize(event: ACPEvent) -> str:
+        """Serialize an event for publishing."""
+        return json.dumps(event.model_dump(), default=str)
+
+    async def publish(
+        self, channels: List[str], event: ACPEvent, coalesce_key: Optional[str] = None
+    ) -> None:
+        """
+        Publish an event to one or more full channel names.
+
+        Args:
+            channels: Full channel names
+            event: Event to publish
+            coalesce_key: Key events of a coalesced type are grouped by
+                (e.g. the workflow ID); without it the event is sent at once
+        """
+        payload = self.serialize(event)
+        messages = [(channel, payload) for channel in channels]
+
+        window = self.coalesce_windows.get(event.event_type)
+        if window is None or coalesce_key is None:
+            await self.publish_messages(messages)
+            return
+
+        key = (str(event.event_type), coalesce_key)
+        if key in self._windows:
+            if key in self._pending:
+                self.events_coalesced += 1
+            elif len(self._pending) >= self.max_pending:
+                self.events_dropped += 1
+                return
+            self._pending[key] = messages
+            return
+
+        task = asyncio.create_task(self._run_window(key, window))
+        self._windows[key] = task
+        self._window_tasks.add(task)
+        task.add_done_callback(self._window_tasks.discard)
+        await self.publish_messages(messages)
+
+    async def _run_window(self, key: Tuple[str, str], window: float) -> None:
+        """Publish the latest coalesced event each window until none arrive."""
+        try:
+            while True:
+                await asyncio.sleep(window)
+                messages = self._pending.pop(key, None)
+                if messages is None:
+                    return
+                await self.publish_messages(messages)
+        finally:
+            self._windows.pop(key, None)
+
+    async def publish_messages(self, messages: List[Tuple[str, str]]) -> None:
+        """Publish the (full channel, payload) pairs of one event."""
+        await self._send([messages])
+
+    async def _send(self, batch: List[List[Tuple[str, str]]]) -> None:
+        """Send the messages of several events in one round trip."""
+        messages = [message for event in batch for message in event]
+        if not messages:
+            return
+        try:
+            if len(messages) == 1 and self.streams is None:
+                channel, payload = messages[0]
+                await self.redis.publish(channel, payload)
+            else:
+                pipe = self.redis.pipeline(transaction=False)
+                for event in batch:
+                    if self._add_logged_event(pipe, event):
+                        continue
+                    for channel, payload in event:
+                        pipe.publish(channel, payload)
+                        if self.streams is not None:
+                            self.streams.add_to_pipeline(pipe, channel, payload)
+                if self.streams is not None:
+                    await self.streams.scripts.execute(pipe)
+                else:
+                    await pipe.execute()
+            self.round_trips += 1
+            self.events_published += len(batch)
+            self.messages_published += len(messages)
+        except Exception as e:
+            self.events_dropped += len(batch)
+            channels = ", ".join(sorted({channel for channel, _ in messages}))
+            logger.error(f"Error publishing events to {channels}: {e}")
+
+    def _add_logged_event(self, pipe: Any, event: List[Tuple[str, str]]) -> bool:
+        """Queue an event to be logged and published stamped with its entry ID."""
+        if self.streams is None or not event:
+            return False
+        payload = event[0][1]
+        if any(other != payload for _, other in event):
+            return False
+        channels = [channel for channel, _ in event]
+        return self.streams.add_publish_to_pipeline(pipe, channels, payload)
+
+    async def flush(self) -> None:
+        """Publish all coalesced events now, in one round trip."""
+        batch = list(self._pending.values())
+        self._pending.clear()
+        await self._send(batch)
+
+    async def close(self) -> None:
+        """Close open windows and publish what they hold."""
+        for task in list(self._window_tasks):
+            task.cancel()
+        await asyncio.gather(*self._window_tasks, return_exceptions=True)
+        self._windows.clear()  # Tasks cancelled before they ran left entries
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get publishing statistics."""
+        return {
+            "events_published": self.events_published,
+            "events_coalesced": self.events_coalesced,
+            "events_dropped": self.events_dropped,
+            "messages_published": self.messages_published,
+            "round_trips": self.round_trips,
+            "pending": len(self._pending),
+            "open_windows": len(self._windows),
+        }
@@ -2,18 +2,31 @@
 Redis Pub/Sub implementation for ACP real-time events.
 
 This module provides Redis-based event publishing and subscription
-for real-time ACP system updates.
+for real-time ACP system updates. Each service subscribes to the event
+family channels (agent_events, workflow_events, ...) and to per-entity
+channels such as workflow_events:<id> only while it has handlers for them,
+so a worker does not receive every workflow's events. A reader task
+dispatches messages through a channel-to-handlers table and runs handlers
+as separate tasks, at most max_concurrent_callbacks at a time, so a slow
+handler cannot stall delivery to the others. Publishing goes through an
+EventPublisher, which serializes each event once, sends multi-channel
+publishes in one round trip and coalesces bursts of high-frequency events
+such as workflow progress.
 """
 
 import asyncio
+import inspect
 import json
+import time
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-import redis
+import redis.asyncio as redis
 
-from ...cache.redis_cache import RedisCache
+from ...cache.async_redis_cache import AsyncRedisCache
 from ...logging import get_logger
+from ..cache.instrumented_pool import RingStats
+from ..metrics.loop_lag import EventLoopLagMonitor
 from .event_types import (
     ACPEvent,
     ACPEventType,
@@ -21,25 +34,71 @@ from .event_types import (
     SystemHealthEvent,
     WorkflowProgressEvent,
 )
+from .publisher import EventPublisher
+from .stream_events import RedisStreamEvents
 
 logger = get_logger(__name__)
 
+# Channels every service subscribes to; any other channel (per-entity ones
+# such as workflow_events:<id>) is subscribed while it has handlers
+EVENT_FAMILIES = (
+    "agent_status",
+    "agent_events",
+    "workflow_events",
+    "system_health",
+    "performance_metrics",
+    "error_alerts",
+)
+
 
 class RedisACPEvents:
     """Redis Pub/Sub service for ACP real-time events."""
 
-    def __init__(self, redis_cache: RedisCache):
+    def __init__(
+        self,
+        redis_cache: AsyncRedisCache,
+        max_concurrent_callbacks: int = 64,
+        streams: Optional[RedisStreamEvents] = None,
+        coalesce_windows: Optional[Dict[str, float]] = None,
+    ):
         """
         Initialize Redis ACP events service.
 
         Args:
-            redis_cache: Redis cache instance for Pub/Sub operations
+            redis_cache: Async Redis cache instance for Pub/Sub operations
+            max_concurrent_callbacks: Handlers allowed to run at once; the
+                reader waits for a free slot beyond this
+            streams: Durable event log; when set, published events are also
+                appended to Redis Streams
+            coalesce_windows: Coalescing window in seconds per event type
+                (defaults to 100 ms for workflow progress)
         """
-        self.redis = redis_cache.redis_client  # Get the underlying redis-py client
+        self.redis = redis_cache.redis_client  # Underlying redis.asyncio client
         self.key_prefix = "acp:events:"
+        self.streams = streams
+        self.publisher = EventPublisher(self.redis, streams, coalesce_windows)
+        # Full channel name -> handlers
         self.subscribers: Dict[str, Set[Callable]] = {}
         self.pubsub: Optional[redis.client.PubSub] = None
         self._running = False
+        self._reader_task: Optional[asyncio.Task] = None
+        self._family_channels = {self._get_channel(f) for f in EVENT_FAMILIES}
+        # On-demand channels currently subscribed, kept in line with the
+        # handler table by _sync_subscription
+        self._subscribed: Set[str] = set()
+        self._subscription_lock = asyncio.Lock()
+        self._subscription_tasks: Set[asyncio.Task] = set()
+
+        self.max_concurrent_callbacks = max_concurrent_callbacks
+        self._callback_slots = asyncio.Semaphore(max_concurrent_callbacks)
+        self._callback_tasks: Set[asyncio.Task] = set()
+
+        # Delivery statistics
+        self.messages_received = 0
+        self.messages_unhandled = 0
+        self.callback_errors = 0
+        self.slot_wait_stats = RingStats()  # seconds waiting for a free slot
+        self.loop_lag = EventLoopLagMonitor()
 
     def _get_channel(self, channel: str) -> str:
         """Get the full Redis channel name with prefix."""
@@ -51,54 +110,173 @@ class RedisACPEvents:
             return
 
         self.pubsub = self.redis.pubsub()
+        await self.pubsub.subscribe(*sorted(self._family_channels))
         self._running = True
+        for channel in list(self.subscribers):
+            await self._sync_subscription(channel)
 
         # Start background task for processing events
-        asyncio.create_task(self._process_events())
+        self._reader_task = asyncio.create_task(self._process_events())
+        self.loop_lag.start()
         logger.info("Redis ACP Events service started")
 
     async def stop(self) -> None:
-        """Stop the Redis events service."""
+        """Stop the Redis events service and publish coalesced events."""
         if not self._running:
+            # Publish-only services still hold coalesced events
+            await self.publisher.close()
             return
 
         self._running = False
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+        for task in list(self._callback_tasks | self._subscription_tasks):
+            task.cancel()
+        await asyncio.gather(
+            *self._callback_tasks, *self._subscription_tasks, return_exceptions=True
+        )
+        self._subscribed.clear()
+        await self.loop_lag.stop()
+        await self.publisher.close()
+
         if self.pubsub is not None:
-            self.pubsub.close()
+            await self.pubsub.aclose()
         logger.info("Redis ACP Events service stopped")
 
     async def _process_events(self) -> None:
-        """Background task to process incoming events."""
+        """Background task reading messages from the subscribed channels."""
         while self._running:
             try:
                 if self.pubsub is None:
-                    await asyncio.sleep(0.1)
-                    continue
-                message = self.pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1.0
+                    return
+                # Waits on the socket without polling until a message arrives
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=None
                 )
                 if message and message["type"] == "message":
                     await self._handle_event(message)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error processing event: {e}")
                 await asyncio.sleep(1)
 
     async def _handle_event(self, message: Dict[str, Any]) -> None:
-        """Handle incoming event message."""
+        """Dispatch an incoming message to the channel's handlers."""
         try:
-            channel = message["channel"].decode("utf-8")
-            data = json.loads(message["data"].decode("utf-8"))
-
-            # Notify subscribers
-            if channel in self.subscribers:
-                for callback in self.subscribers[channel]:
-                    try:
-                        await callback(data)
-                    except Exception as e:
-                        logger.error(f"Error in event callback: {e}")
+            self.messages_received += 1
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode("utf-8")
+
+            handlers = self.subscribers.get(channel)
+            if not handlers:
+                self.messages_unhandled += 1
+                return
+
+            data = message["data"]
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            data = json.loads(data)
+
+            # Snapshot, since handlers may subscribe or unsubscribe meanwhile
+            for callback in list(handlers):
+                waited = time.monotonic()
+                await self._callback_slots.acquire()
+                self.slot_wait_stats.add(time.monotonic() - waited)
+                task = asyncio.create_task(self._run_callback(callback, data))
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._callback_tasks.discard)
         except Exception as e:
             logger.error(f"Error handling event: {e}")
 
+    async def _run_callback(self, callback: Callable, data: Dict[str, Any]) -> None:
+        """Run one handler, sync or async, in its callback slot."""
+        try:
+            result = callback(data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.callback_errors += 1
+            logger.error(f"Error in event callback: {e}")
+        finally:
+            self._callback_slots.release()
+
+    def _add_handler(self, channel: str, callback: Optional[Callable]) -> None:
+        """Register a handler for a full channel name."""
+        if callback is None:
+            return
+        handlers = self.subscribers.setdefault(channel, set())
+        first = not handlers
+        handlers.add(callback)
+        if first:
+            self._schedule_subscription(channel)
+
+    def add_handler(self, channel: str, callback: Callable) -> None:
+        """Register a handler for a channel (without the key prefix)."""
+        self._add_handler(self._get_channel(channel), callback)
+
+    def remove_handler(self, channel: str, callback: Callable) -> None:
+        """Unregister a handler for a channel (without the key prefix)."""
+        full_channel = self._get_channel(channel)
+        handlers = self.subscribers.get(full_channel)
+        if handlers is None:
+            return
+        handlers.discard(callback)
+        if not handlers:
+            del self.subscribers[full_channel]
+            self._schedule_subscription(full_channel)
+
+    def _schedule_subscription(self, channel: str) -> None:
+        """Subscribe or unsubscribe an on-demand channel in the background."""
+        if not self._running or channel in self._family_channels:
+            return  # start() subscribes the channels that have handlers
+        task = asyncio.create_task(self._sync_subscription(channel))
+        self._subscription_tasks.add(task)
+        task.add_done_callback(self._subscription_tasks.discard)
+
+    async def _sync_subscription(self, channel: str) -> None:
+        """Subscribe an on-demand channel iff it has handlers."""
+        if channel in self._family_channels:
+            return
+        async with self._subscription_lock:
+            if self.pubsub is None:
+                return
+            wanted = channel in self.subscribers
+            if wanted == (channel in self._subscribed):
+                return
+            try:
+                if wanted:
+                    await self.pubsub.subscribe(channel)
+                    self._subscribed.add(channel)
+                else:
+                    await self.pubsub.unsubscribe(channel)
+                    self._subscribed.discard(channel)
+            except Exception as e:
+                logger.error(f"Error updating subscription to {channel}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery and event loop lag statistics."""
+        return {
+            "messages_received": self.messages_received,
+            "messages_unhandled": self.messages_unhandled,
+            "callback_errors": self.callback_errors,
+            "callbacks_in_flight": len(self._callback_tasks),
+            "max_concurrent_callbacks": self.max_concurrent_callbacks,
+            "channels": len(self.subscribers),
+            "subscribed_channels": len(self._family_channels) + len(self._subscribed),
+            "handlers": sum(len(h) for h in self.subscribers.values()),
+            "slot_wait_ms": self.slot_wait_stats.to_dict(scale=1000),
+            "loop_lag_ms": self.loop_lag.get_stats(),
+            "publisher": self.publisher.get_stats(),
+        }
+
     # Agent Events
     async def publish_agent_status_change(
         self, agent_id: str, old_status: str, new_status: str
@@ -162,7 +340,7 @@ class RedisACPEvents:
             source=workflow_id,
             data={"workflow_id": workflow_id, "workflow_info": workflow_info},
         )
-        await self._publish_event("workflow_events", event)
+        await self._publish_workflow_event(workflow_id, event)
         logger.debug(f"Published workflow started: {workflow_id}")
 
     async def publish_workflow_progress(
@@ -170,18 +348,21 @@ class RedisACPEvents:
     ) -> None:
         """Publish workflow progress event."""
         event = WorkflowProgressEvent(workflow_id, step_id, progress)
-        await self._publish_event(f"workflow_events:{workflow_id}", event)
-        await self._publish_event(
-            "workflow_events", event
-        )  # Also publish to general channel
+        # Only the latest progress per workflow is sent each coalescing window
+        await self._publish_workflow_event(workflow_id, event, coalesce=True)
         logger.debug(
             f"Published workflow progress: {workflow_id} step {step_id} - {progress}%"
         )
 
-    async def publish_workflow_step_completed(
+    def workflow_step_completed_messages(
         self, workflow_id: str, step_id: str, result: Dict[str, Any]
-    ) -> None:
-        """Publish workflow step completion event."""
+    ) -> List[Tuple[str, str]]:
+        """
+        Build the step completion event as (channel, payload) pairs.
+
+        Lets callers publish the event from a server-side script together
+        with the state change it describes.
+        """
         timestamp = datetime.now(timezone.utc).timestamp()
         event = ACPEvent(
             event_type=ACPEventType.WORKFLOW_STEP_COMPLETED,
@@ -189,8 +370,19 @@ class RedisACPEvents:
             source=workflow_id,
             data={"workflow_id": workflow_id, "step_id": step_id, "result": result},
         )
-        await self._publish_event(f"workflow_events:{workflow_id}", event)
-        await self._publish_event("workflow_events", event)
+        payload = self._serialize_event(event)
+        return [
+            (self._get_channel(f"workflow_events:{workflow_id}"), payload),
+            (self._get_channel("workflow_events"), payload),
+        ]
+
+    async def publish_workflow_step_completed(
+        self, workflow_id: str, step_id: str, result: Dict[str, Any]
+    ) -> None:
+        """Publish workflow step completion event."""
+        await self._publish_messages(
+            self.workflow_step_completed_messages(workflow_id, step_id, result)
+        )
         logger.debug(f"Published workflow step completed: {workflow_id} step {step_id}")
 
     async def publish_workflow_step_failed(
@@ -204,8 +396,7 @@ class RedisACPEvents:
             source=workflow_id,
             data={"workflow_id": workflow_id, "step_id": step_id, "error": error},
         )
-        await self._publish_event(f"workflow_events:{workflow_id}", event)
-        await self._publish_event("workflow_events", event)
+        await self._publish_workflow_event(workflow_id, event)
         logger.debug(
             f"Published workflow step failed: {workflow_id} step {step_id} - {error}"
         )
@@ -221,8 +412,7 @@ class RedisACPEvents:
             source=workflow_id,
             data={"workflow_id": workflow_id, "result": result},
         )
-        await self._publish_event(f"workflow_events:{workflow_id}", event)
-        await self._publish_event("workflow_events", event)
+        await self._publish_workflow_event(workflow_id, event)
         logger.debug(f"Published workflow completed: {workflow_id}")
 
     async def publish_workflow_failed(self, workflow_id: str, error: str) -> None:
@@ -234,8 +424,7 @@ class RedisACPEvents:
             source=workflow_id,
             data={"workflow_id": workflow_id, "error": error},
         )
-        await self._publish_event(f"workflow_events:{workflow_id}", event)
-        await self._publish_event("workflow_events", event)
+        await self._publish_workflow_event(workflow_id, event)
         logger.warning(f"Published workflow failed: {workflow_id} - {error}")
 
     # System Events
@@ -278,12 +467,7 @@ class RedisACPEvents:
     ) -> None:
         """Subscribe to agent events."""
         channel = self._get_channel("agent_events")
-        if self.pubsub is not None:
-            self.pubsub.subscribe(channel)
-        if callback is not None:
-            if channel not in self.subscribers:
-                self.subscribers[channel] = set()
-            self.subscribers[channel].add(callback)
+        self._add_handler(channel, callback)
         logger.debug("Subscribed to agent events")
 
     async def subscribe_to_workflow_events(
@@ -297,12 +481,7 @@ class RedisACPEvents:
         else:
             channel = self._get_channel("workflow_events")
 
-        if self.pubsub is not None:
-            self.pubsub.subscribe(channel)
-        if callback is not None:
-            if channel not in self.subscribers:
-                self.subscribers[channel] = set()
-            self.subscribers[channel].add(callback)
+        self._add_handler(channel, callback)
         logger.debug(f"Subscribed to workflow events: {workflow_id or 'all'}")
 
     async def subscribe_to_system_health(
@@ -310,12 +489,7 @@ class RedisACPEvents:
     ) -> None:
         """Subscribe to system health events."""
         channel = self._get_channel("system_health")
-        if self.pubsub is not None:
-            self.pubsub.subscribe(channel)
-        if callback is not None:
-            if channel not in self.subscribers:
-                self.subscribers[channel] = set()
-            self.subscribers[channel].add(callback)
+        self._add_handler(channel, callback)
         logger.debug("Subscribed to system health events")
 
     async def subscribe_to_performance_metrics(
@@ -323,12 +497,7 @@ class RedisACPEvents:
     ) -> None:
         """Subscribe to performance metrics events."""
         channel = self._get_channel("performance_metrics")
-        if self.pubsub is not None:
-            self.pubsub.subscribe(channel)
-        if callback is not None:
-            if channel not in self.subscribers:
-                self.subscribers[channel] = set()
-            self.subscribers[channel].add(callback)
+        self._add_handler(channel, callback)
         logger.debug("Subscribed to performance metrics events")
 
     async def subscribe_to_error_alerts(
@@ -336,39 +505,66 @@ class RedisACPEvents:
     ) -> None:
         """Subscribe to error alert events."""
         channel = self._get_channel("error_alerts")
-        if self.pubsub is not None:
-            self.pubsub.subscribe(channel)
-        if callback is not None:
-            if channel not in self.subscribers:
-                self.subscribers[channel] = set()
-            self.subscribers[channel].add(callback)
+        self._add_handler(channel, callback)
         logger.debug("Subscribed to error alert events")
 
     # Internal Methods
+    def _serialize_event(self, event: ACPEvent) -> str:
+        """Serialize an event for publishing."""
+        return self.publisher.serialize(event)
+
     async def _publish_event(self, channel: str, event: ACPEvent) -> None:
         """Publish an event to a Redis channel."""
-        try:
-            full_channel = self._get_channel(channel)
-            event_data = event.model_dump()
-            self.redis.publish(full_channel, json.dumps(event_data, default=str))
-        except Exception as e:
-            logger.error(f"Error publishing event to {channel}: {e}")
+        await self.publisher.publish([self._get_channel(channel)], event)
+
+    async def _publish_workflow_event(
+        self, workflow_id: str, event: ACPEvent, coalesce: bool = False
+    ) -> None:
+        """Publish a workflow event to its own and the general channel."""
+        channels = [
+            self._get_channel(f"workflow_events:{workflow_id}"),
+            self._get_channel("workflow_events"),
+        ]
+        await self.publisher.publish(
+            channels, event, coalesce_key=workflow_id if coalesce else None
+        )
+
+    async def _publish_messages(self, messages: List[Tuple[str, str]]) -> None:
+        """Publish (full channel, payload) pairs of one event."""
+        await self.publisher.publish_messages(messages)
+
+    def event_log_for(
+        self, messages: List[Tuple[str, str]]
+    ) -> Optional[Tuple[str, str, int]]:
+        """
+        Get where messages published from a script should be logged.
+
+        Only JSON object payloads are logged, since the script stamps them
+        with their entry ID.
+
+        Returns:
+            Tuple of (stream key, logged channel, maxlen) for the script to
+            append the event with, or None without a stream log
+        """
+        if self.streams is None:
+            return None
+        target = self.streams.log_target(channel for channel, _ in messages)
+        if target is None:
+            return None
+        stream_key, logged_channel = target
+        if not dict(messages)[logged_channel].startswith("{"):
+            return None
+        return stream_key, logged_channel, self.streams.maxlen
 
     async def get_active_channels(self) -> List[str]:
-        """Get list of active Redis channels."""
-        try:
-            channels = self.redis.pubsub_channels(self._get_channel("*"))
-            return [str(channel) for channel in channels]
-        except Exception as e:
-            logger.error(f"Error getting active channels: {e}")
-            return []
+        """
+        Get the channels this service has handlers for.
+
+        Redis cannot report these: PUBSUB CHANNELS and NUMSUB count the
+        connections subscribed to a channel, not the handlers behind them.
+        """
+        return sorted(self.subscribers)
 
     async def get_subscriber_count(self, channel: str) -> int:
-        """Get number of subscribers for a channel."""
-        try:
-            full_channel = self._get_channel(channel)
-            count = self.redis.pubsub_numsub(full_channel)
-            return count[0][1] if count and len(count) > 0 else 0
-        except Exception as e:
-            logger.error(f"Error getting subscriber count for {channel}: {e}")
-            return 0
+        """Get the number of local handlers for a channel (without the prefix)."""
+        return len(self.subscribers.get(self._get_channel(channel), ()))
@@ -0,0 +1,377 @@
+"""
+Durable ACP event log on Redis Streams.
+
+Pub/Sub delivery is fire-and-forget: an event published while nobody is
+subscribed is gone. RedisStreamEvents appends the same events to one stream
+per event family (agent_events, workflow_events, ...) with approximate
+MAXLEN trimming, so they can be replayed from a last-seen entry ID after a
+reconnect or deploy, and consumed by consumer groups in which several API
+nodes share the work. Entries stay pending until acknowledged, and entries
+left pending by a dead consumer are claimed by the live ones.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from ...cache.lua_scripts import ScriptLibrary
+from ...logging import get_logger
+
+logger = get_logger(__name__)
+
+# Log an event and publish it stamped with its entry ID, so subscribers can
+# resume from the last event they received.
+# KEYS: stream
+# ARGV: maxlen, logged channel, payload (a JSON object), then channels to
+#       publish to
+LOG_AND_PUBLISH = """
+local id = redis.call("xadd", KEYS[1], "MAXLEN", "~", ARGV[1], "*",
+    "channel", ARGV[2], "event", ARGV[3])
+local body = string.sub(ARGV[3], 2)
+if string.sub(body, 1, 1) ~= "}" then
+    body = ", " .. body
+end
+local stamped = '{"stream_id": "' .. id .. '"' .. body
+for i = 4, #ARGV do
+    redis.call("publish", ARGV[i], stamped)
+end
+return id
+"""
+
+STREAM_SCRIPTS: Dict[str, str] = {"log_and_publish": LOG_AND_PUBLISH}
+
+
+@dataclass
+class StreamEvent:
+    """An event read from a stream."""
+
+    entry_id: str
+    channel: str
+    data: Dict[str, Any]
+
+
+class RedisStreamEvents:
+    """Redis Streams transport for ACP events."""
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        key_prefix: str = "acp:stream:",
+        channel_prefix: str = "acp:events:",
+        maxlen: int = 10000,
+    ):
+        """
+        Initialize stream transport.
+
+        Args:
+            redis_client: Async Redis client with decoded responses
+            key_prefix: Prefix of stream keys
+            channel_prefix: Prefix of the Pub/Sub channels mirrored here
+            maxlen: Approximate number of entries kept per stream
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.channel_prefix = channel_prefix
+        self.maxlen = maxlen
+        # Run with scripts.execute on pipelines holding add_publish_to_pipeline
+        self.scripts = ScriptLibrary(redis_client, STREAM_SCRIPTS)
+
+    def _get_stream(self, stream: str) -> str:
+        """Get the full Redis key of a stream."""
+        return f"{self.key_prefix}{stream}"
+
+    def stream_for_channel(self, channel: str) -> Optional[str]:
+        """
+        Get the stream an event channel is logged to.
+
+        Per-entity channels such as workflow_events:<id> are not logged,
+        since every event on them is also published to the family channel.
+        """
+        if channel.startswith(self.channel_prefix):
+            channel = channel[len(self.channel_prefix) :]
+        if ":" in channel:
+            return None
+        return channel
+
+    def log_target(self, channels: Iterable[str]) -> Optional[Tuple[str, str]]:
+        """
+        Get where an event published to several channels is logged.
+
+        Returns:
+            Tuple of (stream key, logged channel), or None if no channel is
+            logged
+        """
+        for channel in channels:
+            stream = self.stream_for_channel(channel)
+            if stream is not None:
+                return self._get_stream(stream), channel
+        return None
+
+    def add_to_pipeline(self, pipe: Any, channel: str, payload: str) -> bool:
+        """
+        Queue the XADD for an event on a pipeline.
+
+        Returns:
+            True if the channel is logged and an XADD was queued
+        """
+        stream = self.stream_for_channel(channel)
+        if stream is None:
+            return False
+        pipe.xadd(
+            self._get_stream(stream),
+            {"channel": channel, "event": payload},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        return True
+
+    def add_publish_to_pipeline(
+        self, pipe: Any, channels: List[str], payload: str
+    ) -> bool:
+        """
+        Queue logging and publishing an event on a pipeline.
+
+        The event is published with a "stream_id" field holding its entry
+        ID, which read_since accepts to replay what followed it. The script
+        is called by SHA, so run the pipeline with scripts.execute.
+
+        Returns:
+            True if one of the channels is logged and the event was queued;
+            otherwise nothing is queued
+        """
+        if not payload.startswith("{"):
+            return False
+        target = self.log_target(channels)
+        if target is None:
+            return False
+        stream_key, logged_channel = target
+        self.scripts.queue(
+            pipe,
+            "log_and_publish",
+            keys=[stream_key],
+            args=[self.maxlen, logged_channel, payload, *channels],
+        )
+        return True
+
+    async def append_many(self, messages: Iterable[Tuple[str, str]]) -> int:
+        """
+        Log (channel, payload) pairs in one round trip.
+
+        Returns:
+            Number of entries added
+        """
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            queued = sum(
+                self.add_to_pipeline(pipe, channel, payload)
+                for channel, payload in messages
+            )
+            if queued:
+                await pipe.execute()
+            return queued
+        except Exception as e:
+            logger.error(f"Error appending events to streams: {e}")
+            return 0
+
+    @staticmethod
+    def _parse_entries(entries: Optional[List[Any]]) -> List[StreamEvent]:
+        """Convert raw stream entries to events, skipping deleted ones."""
+        events = []
+        for entry_id, fields in entries or []:
+            if not fields:
+                continue  # Trimmed or deleted while pending
+            try:
+                data = json.loads(fields.get("event", "{}"))
+            except (TypeError, ValueError):
+                data = {}
+            events.append(StreamEvent(entry_id, fields.get("channel", ""), data))
+        return events
+
+    async def read_since(
+        self,
+        stream: str,
+        last_id: Optional[str] = None,
+        count: int = 100,
+        inclusive: bool = False,
+    ) -> List[StreamEvent]:
+        """
+        Replay events logged after an entry ID.
+
+        Args:
+            stream: Stream name, e.g. "workflow_events"
+            last_id: Last entry ID already seen (None reads from the start)
+            count: Maximum events returned
+            inclusive: Also return the entry with last_id, which shows it
+                has not been trimmed yet
+
+        Returns:
+            Events in log order
+        """
+        try:
+            if not last_id:
+                start = "-"
+            else:
+                start = last_id if inclusive else f"({last_id}"
+            entries = await self.redis.xrange(
+                self._get_stream(stream), min=start, count=count
+            )
+            return self._parse_entries(entries)
+        except Exception as e:
+            logger.error(f"Error reading stream {stream}: {e}")
+            return []
+
+    async def ensure_group(self, stream: str, group: str, start_id: str = "$") -> bool:
+        """
+        Create a consumer group, and the stream if needed.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            start_id: First entry delivered to a new group ("$" for new
+                entries only, "0" for the whole log)
+
+        Returns:
+            True if the group exists
+        """
+        try:
+            await self.redis.xgroup_create(
+                self._get_stream(stream), group, id=start_id, mkstream=True
+            )
+            return True
+        except ResponseError as e:
+            if "BUSYGROUP" in str(e):
+                return True
+            logger.error(f"Error creating consumer group {group} on {stream}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error creating consumer group {group} on {stream}: {e}")
+            return False
+
+    async def read_group(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int = 100,
+        block_ms: Optional[int] = 5000,
+    ) -> List[StreamEvent]:
+        """Read events not yet delivered to any consumer of the group."""
+        try:
+            response = await self.redis.xreadgroup(
+                group,
+                consumer,
+                {self._get_stream(stream): ">"},
+                count=count,
+                block=block_ms,
+            )
+            if not response:
+                return []
+            return self._parse_entries(response[0][1])
+        except Exception as e:
+            logger.error(f"Error reading stream {stream} for group {group}: {e}")
+            return []
+
+    async def ack(self, stream: str, group: str, entry_ids: List[str]) -> int:
+        """Acknowledge processed events."""
+        if not entry_ids:
+            return 0
+        try:
+            return int(
+                await self.redis.xack(self._get_stream(stream), group, *entry_ids)
+            )
+        except Exception as e:
+            logger.error(f"Error acknowledging events on {stream}: {e}")
+            return 0
+
+    async def claim_stale(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        min_idle_ms: int = 60000,
+        count: int = 100,
+    ) -> List[StreamEvent]:
+        """Take over events left pending by other consumers for too long."""
+        try:
+            response = await self.redis.xautoclaim(
+                self._get_stream(stream),
+                group,
+                consumer,
+                min_idle_time=min_idle_ms,
+                start_id="0-0",
+                count=count,
+            )
+            return self._parse_entries(response[1])
+        except Exception as e:
+            logger.error(f"Error claiming pending events on {stream}: {e}")
+            return []
+
+    async def consume(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        handler: Callable[[StreamEvent], Awaitable[None]],
+        count: int = 100,
+        block_ms: int = 5000,
+        min_idle_ms: int = 60000,
+    ) -> None:
+        """
+        Process a stream as one consumer of a group until cancelled.
+
+        Each round first claims events other consumers left pending, then
+        reads new ones. Events are acknowledged once the handler returns;
+        if it raises, the event stays pending and is retried after
+        min_idle_ms.
+        """
+        await self.ensure_group(stream, group)
+        while True:
+            try:
+                events = await self.claim_stale(
+                    stream, group, consumer, min_idle_ms, count
+                )
+                events += await self.read_group(
+                    stream, group, consumer, count, block_ms
+                )
+                processed = []
+                for event in events:
+                    try:
+                        await handler(event)
+                        processed.append(event.entry_id)
+                    except Exception as e:
+                        logger.error(
+                            f"Error handling stream event {event.entry_id}: {e}"
+                        )
+                await self.ack(stream, group, processed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error consuming stream {stream}: {e}")
+                await asyncio.sleep(1)
+
+    async def get_stream_info(self, stream: str) -> Dict[str, Any]:
+        """Get length, last entry ID and consumer groups of a stream."""
+        try:
+            key = self._get_stream(stream)
+            info = await self.redis.xinfo_stream(key)
+            groups = await self.redis.xinfo_groups(key)
+            return {
+                "length": info.get("length", 0),
+                "last_entry_id": info.get("last-generated-id"),
+                "groups": [
+                    {
+                        "name": group.get("name"),
+                        "consumers": group.get("consumers", 0),
+                        "pending": group.get("pending", 0),
+                        "last_delivered_id": group.get("last-delivered-id"),
+                    }
+                    for group in groups
+                ],
+            }
+        except Exception as e:
+            logger.error(f"Error getting stream info for {stream}: {e}")
+            return {}
@@ -6,7 +6,13 @@ for Redis operations, ACP services, and system health monitoring.
 """
 
 from .acp_metrics import ACPMetricsCollector
+from .loop_lag import EventLoopLagMonitor
 from .performance_monitor import PerformanceMonitor
 from .redis_metrics import RedisMetricsCollector
 
-__all__ = ["RedisMetricsCollector", "ACPMetricsCollector", "PerformanceMonitor"]
+__all__ = [
+    "RedisMetricsCollector",
+    "ACPMetricsCollector",
+    "PerformanceMonitor",
+    "EventLoopLagMonitor",
+]
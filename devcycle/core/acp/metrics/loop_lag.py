@@ -0,0 +1,66 @@
+"""
+Event loop lag measurement.
+
+EventLoopLagMonitor repeatedly sleeps for a fixed interval and records how
+much later than requested it woke up. Anything that blocks the loop (sync
+I/O, long CPU work in a coroutine, a flood of ready callbacks) shows up as
+lag for every task sharing it.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from ...logging import get_logger
+from ..cache.instrumented_pool import RingStats
+
+logger = get_logger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Background probe measuring event loop scheduling lag."""
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        """
+        Initialize lag monitor.
+
+        Args:
+            interval: Seconds between probes
+            window: Probes kept for recent statistics
+        """
+        self.interval = interval
+        self.stats = RingStats(window)  # seconds of lag per probe
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the probe is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start probing on the running loop."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _probe_loop(self) -> None:
+        """Sleep for the interval and record the overshoot."""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.stats.add(max(0.0, time.monotonic() - started - self.interval))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get lag statistics in milliseconds."""
+        return self.stats.to_dict(scale=1000)
@@ -95,9 +95,9 @@ class ACPAgentRegistry:
             # Update capabilities index
             await self._update_capabilities_index(agent_info)
 
-            # Cache agent status in Redis if cache is available
+            # Cache status, metadata and capability mappings atomically
             if self.acp_cache:
-                await self.acp_cache.cache_agent_status(
+                await self.acp_cache.register_agent(
                     agent_info.agent_id,
                     {
                         "status": "online",
@@ -105,11 +105,6 @@ class ACPAgentRegistry:
                         "current_runs": 0,
                         "max_runs": agent_info.max_concurrent_runs,
                     },
-                )
-
-                # Cache agent metadata
-                await self.acp_cache.cache_agent_metadata(
-                    agent_info.agent_id,
                     {
                         "agent_id": agent_info.agent_id,
                         "agent_name": agent_info.agent_name,
@@ -121,6 +116,7 @@ class ACPAgentRegistry:
                         "max_concurrent_runs": agent_info.max_concurrent_runs,
                         "hf_model_name": agent_info.hf_model_name,
                     },
+                    agent_info.capabilities,
                 )
 
                 # Publish agent registered event
@@ -135,17 +131,6 @@ class ACPAgentRegistry:
                         },
                     )
 
-                # Update capability mappings in Redis
-                for capability in agent_info.capabilities:
-                    current_agents = await self.acp_cache.discover_agents_by_capability(
-                        capability
-                    )
-                    if agent_info.agent_id not in current_agents:
-                        current_agents.append(agent_info.agent_id)
-                    await self.acp_cache.cache_capability_mapping(
-                        capability, current_agents
-                    )
-
             logger.info(f"Agent {agent_info.agent_id} registered successfully")
             return True
 
@@ -161,12 +146,18 @@ class ACPAgentRegistry:
                 return False
 
             # Remove from all indexes
-            agent_info = self.agents[agent_id]
-            for capability in agent_info.capabilities:
+            agent_info = self.agent_infos.get(agent_id)
+            capabilities = agent_info.capabilities if agent_info else []
+            for capability in capabilities:
                 self.capabilities_index[capability].discard(agent_id)
 
+            # Remove from Redis capability sets via the agent's reverse index
+            if self.acp_cache:
+                await self.acp_cache.remove_agent_capabilities(agent_id, capabilities)
+
             # Remove from registries
             del self.agents[agent_id]
+            self.agent_infos.pop(agent_id, None)
             del self.agent_health[agent_id]
             del self.agent_last_seen[agent_id]
 
@@ -186,8 +177,13 @@ class ACPAgentRegistry:
         try:
             # Try Redis cache first if available
             if self.acp_cache:
-                cached_agent_ids = await self.acp_cache.discover_agents_by_capability(
-                    capability
+                # An expired mapping is rebuilt from the local index once,
+                # however many requests miss it at the same time
+                async def load_capability() -> List[str]:
+                    return sorted(self.capabilities_index.get(capability, set()))
+
+                cached_agent_ids = await self.acp_cache.get_capability_agents(
+                    capability, load_capability
                 )
                 if cached_agent_ids:
                     # Return cached results, filtering for healthy agents
@@ -224,6 +220,39 @@ class ACPAgentRegistry:
             )
             return []
 
+    async def discover_agents_with_capabilities(
+        self, capabilities: List[str], match_all: bool = True
+    ) -> List[ACPAgentInfo]:
+        """Discover healthy agents with all (or any) of several capabilities."""
+        try:
+            agent_ids: Set[str] = set()
+            if self.acp_cache:
+                agent_ids = set(
+                    await self.acp_cache.discover_agents_by_capabilities(
+                        capabilities, match_all=match_all
+                    )
+                )
+
+            # Fallback to local capabilities index
+            if not agent_ids and capabilities:
+                local = [
+                    self.capabilities_index.get(capability, set())
+                    for capability in capabilities
+                ]
+                agent_ids = set.intersection(*local) if match_all else set.union(*local)
+
+            return [
+                self.agent_infos[agent_id]
+                for agent_id in agent_ids
+                if agent_id in self.agents and self.agent_health.get(agent_id, False)
+            ]
+
+        except Exception as e:
+            logger.error(
+                f"Failed to discover agents with capabilities {capabilities}: {e}"
+            )
+            return []
+
     def get_agent_instance(self, agent_id: str) -> Optional[Any]:
         """Get agent instance by ID."""
         return self.agents.get(agent_id)
@@ -247,8 +276,10 @@ class ACPAgentRegistry:
 
         return agents
 
-    async def update_agent_status(self, agent_id: str, status: ACPAgentStatus) -> bool:
-        """Update agent status."""
+    async def update_agent_status(
+        self, agent_id: str, status: ACPAgentStatus, delta_runs: int = 0
+    ) -> bool:
+        """Update agent status, adjusting its cached run count by delta_runs."""
         try:
             if agent_id not in self.agents:
                 logger.warning(f"Agent {agent_id} not found for status update")
@@ -258,20 +289,10 @@ class ACPAgentRegistry:
             self.agents[agent_id].last_heartbeat = datetime.now(timezone.utc)
             self.agent_last_seen[agent_id] = datetime.now(timezone.utc)
 
-            # Update Redis cache if available
+            # Update Redis cache if available; only the changed fields are written
             if self.acp_cache:
-                await self.acp_cache.cache_agent_status(
-                    agent_id,
-                    {
-                        "status": status.value,
-                        "last_seen": datetime.now(timezone.utc).isoformat(),
-                        "current_runs": getattr(
-                            self.agents[agent_id], "current_runs", 0
-                        ),
-                        "max_runs": getattr(
-                            self.agents[agent_id], "max_concurrent_runs", 1
-                        ),
-                    },
+                await self.acp_cache.set_agent_status(
+                    agent_id, status.value, delta_runs=delta_runs
                 )
 
                 # Update heartbeat
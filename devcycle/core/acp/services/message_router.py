@@ -258,9 +258,9 @@ class ACPMessageRouter:
     async def _route_to_agent(self, message: ACPMessage, agent: Any) -> ACPResponse:
         """Route message to a specific agent."""
         try:
-            # Update agent status to busy
+            # Update agent status to busy; each flip also adjusts the run count
             await self.agent_registry.update_agent_status(
-                agent.agent_id, ACPAgentStatus.BUSY
+                agent.agent_id, ACPAgentStatus.BUSY, delta_runs=1
             )
 
             # Send message to agent
@@ -268,7 +268,7 @@ class ACPMessageRouter:
 
             # Update agent status back to online
             await self.agent_registry.update_agent_status(
-                agent.agent_id, ACPAgentStatus.ONLINE
+                agent.agent_id, ACPAgentStatus.ONLINE, delta_runs=-1
             )
 
             return response
@@ -276,7 +276,7 @@ class ACPMessageRouter:
         except Exception as e:
             # Update agent status to error
             await self.agent_registry.update_agent_status(
-                agent.agent_id, ACPAgentStatus.ERROR
+                agent.agent_id, ACPAgentStatus.ERROR, delta_runs=-1
             )
             raise e
 
@@ -516,9 +516,21 @@ class ACPWorkflowEngine:
                 step.status = "completed"
                 step.completed_at = datetime.now(timezone.utc)
 
-                # Cache step result in Redis if available
+                # Store the result, advance progress and publish and log the
+                # completion event atomically in Redis if available
+                new_state = None
                 if self.acp_cache:
-                    await self.acp_cache.update_workflow_step(
+                    events = (
+                        self.events.workflow_step_completed_messages(
+                            workflow.workflow_id, step.step_id, step.output_data
+                        )
+                        if self.events
+                        else []
+                    )
+                    event_log = (
+                        self.events.event_log_for(events) if self.events else None
+                    )
+                    new_state = await self.acp_cache.complete_workflow_step(
                         workflow.workflow_id,
                         step.step_id,
                         {
@@ -531,10 +543,12 @@ class ACPWorkflowEngine:
                             "agent_id": step.agent_id,
                             "completed_at": step.completed_at.isoformat(),
                         },
+                        events=events,
+                        event_log=event_log,
                     )
 
-                # Publish step completed event
-                if self.events:
+                # Publish step completed event if the script did not
+                if self.events and new_state is None:
                     await self.events.publish_workflow_step_completed(
                         workflow.workflow_id, step.step_id, step.output_data
                     )
@@ -663,10 +677,6 @@ class ACPWorkflowEngine:
     ) -> None:
         """Update workflow progress in Redis cache if available."""
         if self.acp_cache:
-            # Get current state
-            current_state = await self.acp_cache.get_workflow_state(workflow_id)
-            if current_state:
-                current_state.update(
-                    {"current_step": current_step, "progress": progress}
-                )
-                await self.acp_cache.cache_workflow_state(workflow_id, current_state)
+            await self.acp_cache.advance_workflow_progress(
+                workflow_id, current_step, progress
+            )
@@ -10,7 +10,8 @@ from typing import List, Optional
 
 import redis
 
-from ..config import get_config
+from ..cache.pool_registry import get_pool_registry
+from ..cache.scan import ScanState, count_matching, scan_with_followup
 from ..logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,20 +22,16 @@ class SessionMonitor:
 
     def __init__(self) -> None:
         """Initialize session monitor with Redis connection."""
-        config = get_config()
         self.redis_client = redis.Redis(
-            host=config.redis.host,
-            port=config.redis.port,
-            password=config.redis.password,
-            db=config.redis.db,
-            decode_responses=True,
-            socket_timeout=config.redis.socket_timeout,
-            socket_connect_timeout=config.redis.socket_connect_timeout,
-            retry_on_timeout=config.redis.retry_on_timeout,
-            max_connections=config.redis.max_connections,
+            connection_pool=get_pool_registry().get_pool(decode_responses=True)
         )
         self.session_prefix = "user_sessions:"
         self.session_info_prefix = "session_info:"
+        # Sorted sets scored by expiry, used for counting without scanning
+        self.session_index_key = "session_index"
+        self.user_index_key = "session_users_index"
+        # Progress of indexing sessions tracked before the indexes existed
+        self.backfill_key = "session_index_backfill"
         logger.info("Session monitor initialized with Redis connection")
 
     def track_session(
@@ -83,6 +80,15 @@ class SessionMonitor:
                     self.redis_client.hset(session_info_key, key, value)
                 self.redis_client.expire(session_info_key, ttl)
 
+                # Index session and user for statistics
+                expiry_score = expires_at.timestamp()
+                self.redis_client.zadd(
+                    self.session_index_key, {session_id: expiry_score}
+                )
+                self.redis_client.zadd(
+                    self.user_index_key, {user_id: expiry_score}, gt=True
+                )
+
                 logger.info(
                     "Session tracked successfully",
                     user_id=user_id,
@@ -171,6 +177,11 @@ class SessionMonitor:
             # Remove session info
             removed_info = self.redis_client.delete(session_info_key)
 
+            # Keep the statistics indexes in step
+            self.redis_client.zrem(self.session_index_key, session_id)
+            if not self.redis_client.scard(user_key):
+                self.redis_client.zrem(self.user_index_key, user_id)
+
             success = bool(removed_from_set or removed_info)
 
             if success:
@@ -221,6 +232,11 @@ class SessionMonitor:
             # Remove user's session set
             self.redis_client.delete(user_key)
 
+            # Keep the statistics indexes in step
+            if session_ids:
+                self.redis_client.zrem(self.session_index_key, *session_ids)
+            self.redis_client.zrem(self.user_index_key, user_id)
+
             logger.info(
                 "All sessions removed for user",
                 user_id=user_id,
@@ -244,36 +260,39 @@ class SessionMonitor:
             Number of expired sessions cleaned up
         """
         try:
-            # Get all session info keys
+            # Walk session info hashes incrementally, fetching each batch
+            # in one pipelined round trip
             pattern = f"{self.session_info_prefix}*"
-            session_info_keys = self.redis_client.keys(pattern)
 
             expired_count = 0
             current_time = datetime.now(timezone.utc)
 
-            for session_info_key in session_info_keys:
-                session_info = self.redis_client.hgetall(session_info_key)
+            for batch in scan_with_followup(
+                self.redis_client, pattern, lambda pipe, key: pipe.hgetall(key)
+            ):
+                pipe = self.redis_client.pipeline(transaction=False)
+                for session_info_key, session_info in batch:
+                    if not session_info or "expires_at" not in session_info:
+                        continue
 
-                if session_info and "expires_at" in session_info:
+                    session_id = session_info_key.replace(self.session_info_prefix, "")
                     try:
                         expires_at = datetime.fromisoformat(session_info["expires_at"])
-                        if current_time > expires_at:
-                            # Session expired, clean it up
-                            session_id = session_info_key.replace(
-                                self.session_info_prefix, ""
-                            )
-                            user_id = session_info.get("user_id")
-
-                            if user_id:
-                                user_key = f"{self.session_prefix}{user_id}"
-                                self.redis_client.srem(user_key, session_id)
-
-                            self.redis_client.delete(session_info_key)
-                            expired_count += 1
+                        if current_time <= expires_at:
+                            continue
+                        # Session expired, clean it up
+                        user_id = session_info.get("user_id")
+                        if user_id:
+                            user_key = f"{self.session_prefix}{user_id}"
+                            pipe.srem(user_key, session_id)
                     except (ValueError, TypeError):
                         # Invalid date format, remove the session
-                        self.redis_client.delete(session_info_key)
-                        expired_count += 1
+                        pass
+
+                    pipe.delete(session_info_key)
+                    pipe.zrem(self.session_index_key, session_id)
+                    expired_count += 1
+                pipe.execute()
 
             if expired_count > 0:
                 logger.info(
@@ -289,26 +308,95 @@ class SessionMonitor:
             )
             return 0
 
+    def backfill_indexes(self, max_batches: Optional[int] = None) -> bool:
+        """
+        Index sessions tracked before the statistics indexes existed.
+
+        Session info hashes are walked with SCAN and every live session is
+        added to both indexes. The cursor is saved after each batch, so an
+        interrupted backfill resumes where it stopped. Once it has finished,
+        later calls return at once.
+
+        Args:
+            max_batches: Stop after this many SCAN calls (call again to resume)
+
+        Returns:
+            True once every session has been indexed
+
+        Raises:
+            redis.RedisError: Redis could not be read or written; progress
+                up to the last finished batch is kept
+        """
+        progress = self.redis_client.hgetall(self.backfill_key)
+        if progress.get("done"):
+            return True
+
+        cursor = int(progress.get("cursor", 0))
+        state = ScanState(cursor=cursor, started=cursor != 0)
+        now = datetime.now(timezone.utc).timestamp()
+        for batch in scan_with_followup(
+            self.redis_client,
+            f"{self.session_info_prefix}*",
+            lambda pipe, key: pipe.hmget(key, "user_id", "expires_at"),
+            state=state,
+            max_batches=max_batches,
+        ):
+            pipe = self.redis_client.pipeline(transaction=False)
+            for session_info_key, (user_id, expires_at) in batch:
+                try:
+                    score = datetime.fromisoformat(expires_at).timestamp()
+                except (ValueError, TypeError):
+                    continue  # Removed by cleanup_expired_sessions
+                if score <= now:
+                    continue
+                session_id = session_info_key[len(self.session_info_prefix) :]
+                pipe.zadd(self.session_index_key, {session_id: score})
+                if user_id:
+                    pipe.zadd(self.user_index_key, {user_id: score}, gt=True)
+            pipe.hset(self.backfill_key, "cursor", state.cursor)
+            pipe.execute()
+
+        if not state.finished:
+            # The last SCAN calls may have matched nothing
+            self.redis_client.hset(self.backfill_key, "cursor", state.cursor)
+            return False
+        self.redis_client.hset(self.backfill_key, mapping={"cursor": 0, "done": 1})
+        logger.info("Session index backfill complete", keys_scanned=state.keys_seen)
+        return True
+
     def get_session_stats(self) -> dict:
         """
         Get session monitoring statistics.
 
+        Until backfill_indexes has finished, the indexes may miss sessions
+        tracked before they existed, so sessions and users are counted with
+        SCAN instead.
+
         Returns:
             Dictionary with session statistics
         """
         try:
-            # Count total active sessions
-            user_pattern = f"{self.session_prefix}*"
-            user_keys = self.redis_client.keys(user_pattern)
-
-            total_sessions = 0
-            for user_key in user_keys:
-                session_count = self.redis_client.scard(user_key)
-                total_sessions += session_count
+            # Count from the expiry-scored indexes after trimming expired entries
+            now = datetime.now(timezone.utc).timestamp()
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zremrangebyscore(self.session_index_key, "-inf", now)
+            pipe.zremrangebyscore(self.user_index_key, "-inf", now)
+            pipe.zcard(self.session_index_key)
+            pipe.zcard(self.user_index_key)
+            pipe.hget(self.backfill_key, "done")
+            _, _, total_sessions, total_users, backfilled = pipe.execute()
+
+            if not backfilled:
+                total_sessions = count_matching(
+                    self.redis_client, f"{self.session_info_prefix}*"
+                )
+                total_users = count_matching(
+                    self.redis_client, f"{self.session_prefix}*"
+                )
 
             stats = {
-                "total_active_sessions": total_sessions,
-                "total_users_with_sessions": len(user_keys),
+                "total_active_sessions": int(total_sessions),
+                "total_users_with_sessions": int(total_users),
                 "redis_connected": True,
             }
 
@@ -346,3 +434,20 @@ class SessionMonitor:
                 error=str(e),
             )
             return False
+
+
+# Global session monitor instance
+_session_monitor_instance: Optional[SessionMonitor] = None
+
+
+def get_session_monitor() -> SessionMonitor:
+    """
+    Get the global session monitor instance.
+
+    Returns:
+        SessionMonitor instance
+    """
+    global _session_monitor_instance
+    if _session_monitor_instance is None:
+        _session_monitor_instance = SessionMonitor()
+    return _session_monitor_instance
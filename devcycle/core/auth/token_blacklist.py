@@ -7,10 +7,12 @@ immediately upon logout, preventing token reuse and improving security.
 
 import hashlib
 from datetime import datetime, timezone
+from typing import Optional
 
 import redis
 
-from ..config import get_config
+from ..cache.pool_registry import get_pool_registry
+from ..cache.scan import ScanState, count_matching, scan_with_followup
 from ..logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,19 +23,14 @@ class TokenBlacklist:
 
     def __init__(self) -> None:
         """Initialize token blacklist with Redis connection."""
-        config = get_config()
         self.redis_client = redis.Redis(
-            host=config.redis.host,
-            port=config.redis.port,
-            password=config.redis.password,
-            db=config.redis.db,
-            decode_responses=True,
-            socket_timeout=config.redis.socket_timeout,
-            socket_connect_timeout=config.redis.socket_connect_timeout,
-            retry_on_timeout=config.redis.retry_on_timeout,
-            max_connections=config.redis.max_connections,
+            connection_pool=get_pool_registry().get_pool(decode_responses=True)
         )
         self.blacklist_prefix = "jwt_blacklist:"
+        # Sorted set of token hashes scored by expiry, used for counting
+        self.blacklist_index_key = "jwt_blacklist_index"
+        # Progress of indexing tokens blacklisted before the index existed
+        self.backfill_key = "jwt_blacklist_index_backfill"
         logger.info("Token blacklist initialized with Redis connection")
 
     def blacklist_token(self, token: str, expires_at: datetime) -> bool:
@@ -58,6 +55,9 @@ class TokenBlacklist:
                     ttl,
                     str(expires_at.timestamp()),
                 )
+                self.redis_client.zadd(
+                    self.blacklist_index_key, {token_hash: expires_at.timestamp()}
+                )
                 logger.info(
                     "Token blacklisted successfully",
                     token_hash=token_hash[:8] + "...",
@@ -132,14 +132,15 @@ class TokenBlacklist:
             Number of expired entries cleaned up
         """
         try:
-            # Redis automatically expires keys, but we can clean up manually
-            pattern = f"{self.blacklist_prefix}*"
-            keys = self.redis_client.keys(pattern)
-            expired_count = 0
-
-            for key in keys:
-                if not self.redis_client.exists(key):
-                    expired_count += 1
+            # Redis expires the blacklist keys themselves; trim their index entries
+            expired_count = int(
+                self.redis_client.zremrangebyscore(
+                    self.blacklist_index_key,
+                    "-inf",
+                    datetime.now(timezone.utc).timestamp(),
+                )
+                or 0
+            )
 
             if expired_count > 0:
                 logger.info(
@@ -155,19 +156,78 @@ class TokenBlacklist:
             )
             return 0
 
+    def backfill_index(self, max_batches: Optional[int] = None) -> bool:
+        """
+        Index tokens blacklisted before the index existed.
+
+        Blacklist keys are walked with SCAN and each one is indexed by the
+        expiry stored as its value. The cursor is saved after each batch, so
+        an interrupted backfill resumes where it stopped. Once it has
+        finished, later calls return at once.
+
+        Args:
+            max_batches: Stop after this many SCAN calls (call again to resume)
+
+        Returns:
+            True once every blacklisted token has been indexed
+
+        Raises:
+            redis.RedisError: Redis could not be read or written; progress
+                up to the last finished batch is kept
+        """
+        progress = self.redis_client.hgetall(self.backfill_key)
+        if progress.get("done"):
+            return True
+
+        cursor = int(progress.get("cursor", 0))
+        state = ScanState(cursor=cursor, started=cursor != 0)
+        for batch in scan_with_followup(
+            self.redis_client,
+            f"{self.blacklist_prefix}*",
+            lambda pipe, key: pipe.get(key),
+            state=state,
+            max_batches=max_batches,
+        ):
+            scores = {}
+            for key, expires_at in batch:
+                try:
+                    scores[key[len(self.blacklist_prefix) :]] = float(expires_at)
+                except (ValueError, TypeError):
+                    continue  # Expired since the scan
+            pipe = self.redis_client.pipeline(transaction=False)
+            if scores:
+                pipe.zadd(self.blacklist_index_key, scores)
+            pipe.hset(self.backfill_key, "cursor", state.cursor)
+            pipe.execute()
+
+        if not state.finished:
+            # The last SCAN calls may have matched nothing
+            self.redis_client.hset(self.backfill_key, "cursor", state.cursor)
+            return False
+        self.redis_client.hset(self.backfill_key, mapping={"cursor": 0, "done": 1})
+        logger.info("Blacklist index backfill complete", keys_scanned=state.keys_seen)
+        return True
+
     def get_blacklist_stats(self) -> dict:
         """
         Get blacklist statistics.
 
+        Until backfill_index has finished, the index may miss tokens
+        blacklisted before it existed, so tokens are counted with SCAN
+        instead.
+
         Returns:
             Dictionary with blacklist statistics
         """
         try:
-            pattern = f"{self.blacklist_prefix}*"
-            keys = self.redis_client.keys(pattern)
+            self.cleanup_expired()
+            if self.redis_client.hget(self.backfill_key, "done"):
+                total = self.redis_client.zcard(self.blacklist_index_key)
+            else:
+                total = count_matching(self.redis_client, f"{self.blacklist_prefix}*")
 
             stats = {
-                "total_blacklisted_tokens": len(keys),
+                "total_blacklisted_tokens": int(total or 0),
                 "redis_connected": True,
             }
 
@@ -1,6 +1,24 @@
 """Redis caching services for DevCycle."""
 
 from .acp_cache import ACPCache
+from .async_redis_cache import AsyncRedisCache, get_async_cache
+from .local_cache import LocalCache, LocalCacheFamily, get_local_cache
+from .pool_registry import RedisPoolRegistry, close_pool_registry, get_pool_registry
 from .redis_cache import RedisCache, get_cache
+from .ttl_policy import TTLPolicyTable, get_ttl_policy_table
 
-__all__ = ["RedisCache", "get_cache", "ACPCache"]
+__all__ = [
+    "RedisCache",
+    "get_cache",
+    "AsyncRedisCache",
+    "get_async_cache",
+    "LocalCache",
+    "LocalCacheFamily",
+    "get_local_cache",
+    "RedisPoolRegistry",
+    "get_pool_registry",
+    "close_pool_registry",
+    "ACPCache",
+    "TTLPolicyTable",
+    "get_ttl_policy_table",
+]
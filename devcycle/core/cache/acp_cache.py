@@ -1,31 +1,138 @@
 """
 ACP-specific Redis caching service for DevCycle.
 
-This module extends the base RedisCache to provide ACP-specific caching functionality
-for agent state, workflow state, and performance optimization.
+This module builds on AsyncRedisCache to provide ACP-specific caching
+functionality for agent state, workflow state, and performance optimization.
 """
 
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from ..logging import get_logger
-from .redis_cache import RedisCache
+from .async_redis_cache import AsyncRedisCache
+from .local_cache import LocalCache, publish_ttl_policy_change
+from .lua_scripts import ScriptLibrary, pairs_to_dict
+from .scan import ascan_batches, ascan_with_followup
+from .single_flight import (
+    RELEASE_LOCK_SCRIPT,
+    ComputeStats,
+    is_envelope,
+    make_envelope,
+    should_refresh_early,
+)
+from .ttl_policy import TTLPolicyChange, TTLPolicyTable
 
 logger = get_logger(__name__)
 
+# Statuses tracked in the agent status distribution index
+AGENT_STATUSES = ("online", "offline", "busy", "error", "maintenance")
+
+# Agent status hash fields that are stored as integers
+AGENT_STATUS_INT_FIELDS = ("current_runs", "max_runs")
+
+# In-flight get_or_compute loads by full Redis key. Process-wide, since
+# ACPCache instances are created per request and must share their loads.
+_inflight_loads: Dict[str, "asyncio.Task[Any]"] = {}
+
+
+def _encode_status_fields(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert agent status values to types a Redis hash can store."""
+    encoded: Dict[str, Any] = {}
+    for field, value in status.items():
+        if isinstance(value, (str, bytes, int, float)) and not isinstance(value, bool):
+            encoded[field] = value
+        else:
+            encoded[field] = json.dumps(value)
+    return encoded
+
+
+def _decode_status_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Convert an agent status hash back to typed values."""
+    status: Dict[str, Any] = dict(fields)
+    for field in AGENT_STATUS_INT_FIELDS:
+        if field in status:
+            try:
+                status[field] = int(status[field])
+            except (TypeError, ValueError):
+                pass
+    return status
+
+
+def _encode_json_fields(state: Dict[str, Any]) -> Dict[str, str]:
+    """JSON-encode each value of a workflow state for a Redis hash."""
+    return {field: json.dumps(value, default=str) for field, value in state.items()}
+
+
+def _decode_json_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Decode a workflow state hash written by _encode_json_fields."""
+    state: Dict[str, Any] = {}
+    for field, value in fields.items():
+        try:
+            state[field] = json.loads(value)
+        except (TypeError, ValueError):
+            state[field] = value
+    return state
+
+
+def _finish_inflight(key: str, task: "asyncio.Task[Any]") -> None:
+    """Forget a finished load and mark its exception as retrieved."""
+    if _inflight_loads.get(key) is task:
+        del _inflight_loads[key]
+    if not task.cancelled():
+        task.exception()
+
 
 class ACPCache:
     """ACP-specific Redis caching service for performance optimization."""
 
-    def __init__(self, redis_cache: RedisCache):
+    # Key families stored under the ACP prefix, and without any prefix
+    ACP_KEY_FAMILIES = (
+        "agents:status:",
+        "agents:status_index:",
+        "agents:capabilities:",
+        "workflows:active:",
+        "workflows:active_index",
+        "workflows:completed:",
+        "locks:",
+    )
+    RAW_KEY_FAMILIES = ("capabilities:",)
+
+    def __init__(
+        self,
+        redis_cache: AsyncRedisCache,
+        local_cache: Optional[LocalCache] = None,
+        ttl_policies: Optional[TTLPolicyTable] = None,
+    ):
         """
         Initialize ACP cache service.
 
         Args:
-            redis_cache: Base Redis cache instance
+            redis_cache: Base async Redis cache instance
+            local_cache: Optional in-process L1 cache placed in front of Redis
+            ttl_policies: Per key family TTL overrides applied on write; the
+                application injects the process-wide table
         """
         self.redis = redis_cache
+        self.local_cache = local_cache
         self.key_prefix = "acp:"
+        self.ttl_policies = (
+            ttl_policies if ttl_policies is not None else TTLPolicyTable()
+        )
 
         # Cache TTL Configuration
         self.AGENT_STATUS_TTL = 300  # 5 minutes
@@ -34,24 +141,402 @@ class ACPCache:
         self.CAPABILITY_MAPPING_TTL = 600  # 10 minutes
         self.SYSTEM_METRICS_TTL = 60  # 1 minute
 
+        # get_or_compute lock configuration
+        self.COMPUTE_LOCK_TTL = 10.0  # seconds a loader may hold the lock
+        self.COMPUTE_LOCK_WAIT = 5.0  # seconds to wait for another loader
+        self.COMPUTE_LOCK_POLL_INTERVAL = 0.05
+        # Seconds a rebuilt capability mapping is also kept as a
+        # get_or_compute result, for callers that waited on the rebuild
+        self.CAPABILITY_REBUILD_TTL = 5
+
+        self.compute_stats = ComputeStats()
+        self._scripts: Optional[ScriptLibrary] = None
+
     def _get_key(self, key: str) -> str:
         """Get the full Redis key with ACP prefix."""
         return f"{self.key_prefix}{key}"
 
+    def _cache_key(self, key: str) -> str:
+        """Get the full Redis key of a key written through AsyncRedisCache."""
+        return f"{self.redis.key_prefix}{key}"
+
+    def redis_key(self, key: str) -> str:
+        """
+        Get the full Redis key of a key (or key pattern) by its owner.
+
+        ACP state lives under the ACP prefix, capability sets are raw keys and
+        everything else is written through AsyncRedisCache.
+        """
+        if key.startswith(self.RAW_KEY_FAMILIES):
+            return key
+        if key.startswith(self.ACP_KEY_FAMILIES):
+            return self._get_key(key)
+        return self._cache_key(key)
+
+    @property
+    def ttl_policy_changes(self) -> List[TTLPolicyChange]:
+        """Policy changes applied through this process, oldest first."""
+        return self.ttl_policies.changes
+
+    def _ttl(self, redis_key: str, default: int) -> int:
+        """Get the TTL to write a full Redis key with, honouring policies."""
+        return self.ttl_policies.ttl_for(redis_key, default)
+
+    @property
+    def scripts(self) -> ScriptLibrary:
+        """Lua scripts for atomic state transitions, created on first use."""
+        if self._scripts is None:
+            self._scripts = ScriptLibrary(self.redis.redis_client)
+        return self._scripts
+
+    async def _read_through(
+        self, key: str, fetch: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Optional[Any]:
+        """Read a key from L1, falling back to Redis and populating L1."""
+        if fetch is None:
+
+            def fetch() -> Awaitable[Any]:
+                return self.redis.get(key)
+
+        if self.local_cache is None:
+            return await fetch()
+
+        found, value = self.local_cache.get(key)
+        if found:
+            return value
+
+        value = await fetch()
+        if self.local_cache.is_cached_family(key):
+            self.local_cache.record_l2(value is not None)
+            if value is not None:
+                self.local_cache.set(key, value)
+        return value
+
+    async def _write_through(self, key: str, value: Any, ttl: int) -> bool:
+        """Write a key to Redis and invalidate it in every worker's L1."""
+        return await self._store(key, value, self._ttl(self._cache_key(key), ttl))
+
+    async def _store(self, key: str, value: Any, ttl: int) -> bool:
+        """Write a key with an already resolved TTL and invalidate it in L1."""
+        result = await self.redis.set(key, value, ttl=ttl)
+        await self._invalidate_local(keys=[key])
+        return result
+
+    async def set_many(self, items: List[Tuple[str, Any, Optional[int]]]) -> List[bool]:
+        """
+        Write several keys in one round trip, honouring TTL policies.
+
+        Args:
+            items: (key, value, ttl) tuples; a ttl of None means no expiration
+                unless a TTL policy covers the key
+
+        Returns:
+            Success flag for each item, in order
+        """
+        if not items:
+            return []
+        resolved = []
+        for key, value, ttl in items:
+            # With no default a policy TTL applies, otherwise the key persists
+            ttl = self._ttl(self._cache_key(key), ttl or 0) or None
+            resolved.append((key, value, ttl))
+        results = await self.redis.set_many(resolved)
+        await self._invalidate_local(keys=[key for key, _, _ in items])
+        return results
+
+    async def _invalidate_local(
+        self, keys: Iterable[str] = (), prefixes: Iterable[str] = ()
+    ) -> None:
+        """Invalidate L1 entries locally and on other workers."""
+        if self.local_cache is not None:
+            await self.local_cache.publish_invalidation(keys, prefixes)
+
+    # Get-or-Compute
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        beta: float = 1.0,
+    ) -> Optional[Any]:
+        """
+        Get a cached value, computing it once when it is missing or stale.
+
+        Concurrent callers in this process share a single in-flight load,
+        whichever ACPCache instance they go through. Callers in other
+        processes wait on a short Redis lock and read the value written by the
+        lock holder. Hot entries are recomputed shortly before they expire
+        (XFetch) while readers keep getting the current value, so an expiry
+        does not send every reader to the loader at once.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function computing the value
+            ttl: Time to live in seconds
+            beta: Early refresh eagerness (0 disables early refresh)
+
+        Returns:
+            Cached or computed value (None results are not cached)
+
+        Raises:
+            Exception: Whatever the loader raises
+        """
+        cached = await self._read_through(key)
+        stale: Optional[Dict[str, Any]] = None
+        if cached is not None:
+            if not is_envelope(cached):
+                self.compute_stats.hits += 1
+                return cached
+            if not should_refresh_early(cached["delta"], cached["expires_at"], beta):
+                self.compute_stats.hits += 1
+                return cached["value"]
+            stale = cached
+
+        inflight_key = self._cache_key(key)
+        task = _inflight_loads.get(inflight_key)
+        if task is not None:
+            if stale is not None:
+                self.compute_stats.stale_served += 1
+                return stale["value"]
+            self.compute_stats.coalesced += 1
+        else:
+            # The load runs as its own task so a cancelled caller does not
+            # cancel it for everyone else waiting on it
+            task = asyncio.create_task(self._compute_with_lock(key, loader, ttl, stale))
+            _inflight_loads[inflight_key] = task
+            task.add_done_callback(lambda done: _finish_inflight(inflight_key, done))
+
+        return await asyncio.shield(task)
+
+    async def _compute_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale: Optional[Dict[str, Any]],
+    ) -> Optional[Any]:
+        """Compute a value under the cross-process lock, or wait for its holder."""
+        lock_key = self._get_key(f"locks:{key}")
+        token = uuid.uuid4().hex
+
+        if await self._acquire_compute_lock(lock_key, token):
+            if stale is not None:
+                self.compute_stats.early_refreshes += 1
+            return await self._load_locked(key, loader, ttl, lock_key, token)
+
+        if stale is not None:
+            # Another worker is already refreshing; the current value is valid
+            self.compute_stats.stale_served += 1
+            return stale["value"]
+
+        self.compute_stats.lock_waits += 1
+        deadline = time.monotonic() + self.COMPUTE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.COMPUTE_LOCK_POLL_INTERVAL)
+            cached = await self.redis.get(key)
+            if cached is not None:
+                return cached["value"] if is_envelope(cached) else cached
+            # The holder finished without storing a value or died; take over
+            if await self._acquire_compute_lock(lock_key, token):
+                return await self._load_locked(key, loader, ttl, lock_key, token)
+
+        self.compute_stats.lock_timeouts += 1
+        logger.warning(f"Timed out waiting for compute lock on {key}, loading")
+        return await self._load_and_store(key, loader, ttl)
+
+    async def _load_locked(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        lock_key: str,
+        token: str,
+    ) -> Optional[Any]:
+        """Run the loader while holding the compute lock."""
+        try:
+            return await self._load_and_store(key, loader, ttl)
+        finally:
+            await self._release_compute_lock(lock_key, token)
+
+    async def _load_and_store(
+        self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int
+    ) -> Optional[Any]:
+        """Run the loader and cache its result with its compute time."""
+        start_time = time.perf_counter()
+        value = await loader()
+        delta = time.perf_counter() - start_time
+        self.compute_stats.loads += 1
+
+        if value is not None:
+            # The envelope's expiry must match the key's, policies included
+            ttl = self._ttl(self._cache_key(key), ttl)
+            await self._store(key, make_envelope(value, delta, ttl), ttl)
+        return value
+
+    async def _acquire_compute_lock(self, lock_key: str, token: str) -> bool:
+        """Try to take the compute lock for a key."""
+        try:
+            acquired = await self.redis.redis_client.set(
+                lock_key, token, nx=True, px=int(self.COMPUTE_LOCK_TTL * 1000)
+            )
+            return bool(acquired)
+        except Exception as e:
+            # Without Redis there is nothing to coordinate on; load locally
+            logger.error(f"Error acquiring compute lock {lock_key}: {e}")
+            return True
+
+    async def _release_compute_lock(self, lock_key: str, token: str) -> None:
+        """Release the compute lock if this worker still holds it."""
+        try:
+            await self.redis.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.error(f"Error releasing compute lock {lock_key}: {e}")
+
+    def get_compute_stats(self) -> Dict[str, Any]:
+        """
+        Get get-or-compute statistics.
+
+        Returns:
+            Dictionary with hit, load, coalescing and lock counters
+        """
+        stats: Dict[str, Any] = asdict(self.compute_stats)
+        stats["inflight"] = len(_inflight_loads)
+        return stats
+
     # Agent State Management
+    #
+    # Agent status is a Redis hash (status, last_seen, current_runs, max_runs)
+    # so single fields can be updated without rewriting the record. Every
+    # write also moves the agent between per-status sorted sets scored by
+    # expiry, which keep the status distribution countable without a scan.
+    # Writes run as the write_agent_status script, which also replaces status
+    # values stored as JSON strings by older releases.
+    def _agent_status_key(self, agent_id: str) -> str:
+        """Get the Redis key of an agent status hash."""
+        return self._get_key(f"agents:status:{agent_id}")
+
+    def _status_index_key(self, status: str) -> str:
+        """Get the Redis key of the distribution index for a status."""
+        return self._get_key(f"agents:status_index:{status}")
+
+    def _status_write(
+        self, agent_id: str, fields: Dict[str, Any], delta_runs: int = 0
+    ) -> Tuple[List[str], List[Any]]:
+        """Get the keys and arguments of a write_agent_status script call."""
+        key = self._agent_status_key(agent_id)
+        ttl = self._ttl(key, self.AGENT_STATUS_TTL)
+        status = fields.get("status")
+        target = AGENT_STATUSES.index(status) + 1 if status in AGENT_STATUSES else 0
+        # Without a new status the agent's current index entry is extended
+        args: List[Any] = [
+            agent_id,
+            ttl,
+            time.time() + ttl,
+            delta_runs,
+            int(status is not None),
+            target,
+        ]
+        for field, value in fields.items():
+            args.extend((field, value))
+        keys = [key, *(self._status_index_key(s) for s in AGENT_STATUSES)]
+        return keys, args
+
+    def _queue_status_write(
+        self, pipe: Any, agent_id: str, fields: Dict[str, Any]
+    ) -> None:
+        """Queue a field update, TTL refresh and index update on a pipeline."""
+        keys, args = self._status_write(agent_id, fields)
+        self.scripts.queue(pipe, "write_agent_status", keys=keys, args=args)
+
+    async def _write_agent_status(
+        self, agent_id: str, fields: Dict[str, Any], delta_runs: int = 0
+    ) -> bool:
+        """Write agent status fields and adjust the run count in one round trip."""
+        try:
+            keys, args = self._status_write(
+                agent_id, _encode_status_fields(fields), delta_runs
+            )
+            await self.scripts.run("write_agent_status", keys=keys, args=args)
+            await self._invalidate_local(keys=[f"agents:status:{agent_id}"])
+            return True
+        except Exception as e:
+            logger.error(f"Error writing agent status for {agent_id}: {e}")
+            return False
+
     async def cache_agent_status(self, agent_id: str, status: Dict[str, Any]) -> bool:
         """
         Cache agent status for fast discovery.
 
         Args:
             agent_id: Agent identifier
-            status: Agent status data
+            status: Agent status fields (status, last_seen, current_runs, ...)
 
         Returns:
             True if successful, False otherwise
         """
-        key = f"agents:status:{agent_id}"
-        return self.redis.set(key, status, ttl=self.AGENT_STATUS_TTL)
+        return await self._write_agent_status(agent_id, status)
+
+    async def set_agent_status(
+        self,
+        agent_id: str,
+        status: str,
+        last_seen: Optional[str] = None,
+        delta_runs: int = 0,
+    ) -> bool:
+        """
+        Update only the status and last_seen fields of an agent.
+
+        Args:
+            agent_id: Agent identifier
+            status: New status value
+            last_seen: ISO timestamp (defaults to now)
+            delta_runs: Amount added to current_runs in the same round trip
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._write_agent_status(
+            agent_id,
+            {
+                "status": status,
+                "last_seen": last_seen or datetime.now(timezone.utc).isoformat(),
+            },
+            delta_runs,
+        )
+
+    async def increment_agent_runs(
+        self, agent_id: str, delta: int = 1
+    ) -> Optional[int]:
+        """
+        Atomically adjust an agent's current run count.
+
+        Args:
+            agent_id: Agent identifier
+            delta: Amount to add (negative to decrement)
+
+        Returns:
+            New run count, or None if the agent has no cached status or on
+            error
+        """
+        try:
+            keys, args = self._status_write(agent_id, {}, delta)
+            runs = await self.scripts.run("write_agent_status", keys=keys, args=args)
+            await self._invalidate_local(keys=[f"agents:status:{agent_id}"])
+            return None if runs is None else int(runs)
+        except Exception as e:
+            logger.error(f"Error updating run count for {agent_id}: {e}")
+            return None
+
+    async def _fetch_agent_status(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Read an agent status hash from Redis."""
+        try:
+            fields = await self.redis.redis_client.hgetall(
+                self._agent_status_key(agent_id)
+            )
+        except Exception as e:
+            logger.error(f"Error getting agent status for {agent_id}: {e}")
+            return None
+        return _decode_status_fields(fields) if fields else None
 
     async def get_agent_status(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -64,7 +549,9 @@ class ACPCache:
             Agent status data or None if not found
         """
         key = f"agents:status:{agent_id}"
-        return self.redis.get(key)
+        return await self._read_through(
+            key, fetch=lambda: self._fetch_agent_status(agent_id)
+        )
 
     async def update_agent_heartbeat(self, agent_id: str) -> bool:
         """
@@ -78,7 +565,8 @@ class ACPCache:
         """
         key = f"agents:heartbeat:{agent_id}"
         timestamp = datetime.now(timezone.utc).isoformat()
-        return self.redis.set(key, timestamp, ttl=self.AGENT_STATUS_TTL)
+        ttl = self._ttl(self._cache_key(key), self.AGENT_STATUS_TTL)
+        return await self.redis.set(key, timestamp, ttl=ttl)
 
     async def get_agent_heartbeat(self, agent_id: str) -> Optional[str]:
         """
@@ -91,9 +579,80 @@ class ACPCache:
             Heartbeat timestamp or None if not found
         """
         key = f"agents:heartbeat:{agent_id}"
-        return self.redis.get(key)
+        return await self.redis.get(key)
 
     # Capability Discovery
+    # Agents join capability sets with SADD when they register (see
+    # register_agent) and leave them with SREM. The reverse index
+    # (agent -> capabilities) lets an agent be removed from every set it
+    # belongs to without scanning.
+    def _capability_key(self, capability: str) -> str:
+        """Get the Redis key of a capability set."""
+        return f"capabilities:{capability}"
+
+    def _agent_capabilities_key(self, agent_id: str) -> str:
+        """Get the Redis key of an agent's reverse capability index."""
+        return self._get_key(f"agents:capabilities:{agent_id}")
+
+    async def remove_agent_capabilities(
+        self, agent_id: str, capabilities: Iterable[str] = ()
+    ) -> bool:
+        """
+        Remove an agent from every capability set it belongs to.
+
+        Args:
+            agent_id: Agent identifier
+            capabilities: Capabilities known to the caller, removed in
+                addition to those in the reverse index
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            reverse_key = self._agent_capabilities_key(agent_id)
+            indexed = await self.redis.redis_client.smembers(reverse_key)
+            keys = [
+                self._capability_key(cap)
+                for cap in set(indexed or ()) | set(capabilities)
+            ]
+
+            pipe = self.redis.redis_client.pipeline()
+            for key in keys:
+                pipe.srem(key, agent_id)
+            pipe.delete(reverse_key)
+            await pipe.execute()
+            await self._invalidate_local(keys=keys)
+            return True
+        except Exception as e:
+            logger.error(f"Error removing capabilities for agent {agent_id}: {e}")
+            return False
+
+    async def discover_agents_by_capabilities(
+        self, capabilities: Iterable[str], match_all: bool = True
+    ) -> List[str]:
+        """
+        Find agents by several capabilities with a server-side set operation.
+
+        Args:
+            capabilities: Capability names
+            match_all: Require every capability (SINTER) instead of any (SUNION)
+
+        Returns:
+            List of matching agent IDs
+        """
+        keys = [self._capability_key(cap) for cap in dict.fromkeys(capabilities)]
+        if not keys:
+            return []
+        try:
+            client = self.redis.redis_client
+            agent_ids = await (
+                client.sinter(keys) if match_all else client.sunion(keys)
+            )
+            return list(agent_ids) if agent_ids else []
+        except Exception as e:
+            logger.error(f"Error discovering agents for capabilities {keys}: {e}")
+            return []
+
     async def cache_capability_mapping(
         self, capability: str, agent_ids: List[str]
     ) -> bool:
@@ -114,8 +673,9 @@ class ACPCache:
             pipe.delete(key)  # Clear existing mapping
             if agent_ids:
                 pipe.sadd(key, *agent_ids)
-            pipe.expire(key, self.CAPABILITY_MAPPING_TTL)
-            results = pipe.execute()
+            pipe.expire(key, self._ttl(key, self.CAPABILITY_MAPPING_TTL))
+            results = await pipe.execute()
+            await self._invalidate_local(keys=[key])
             return bool(results[-1])  # Check if expire was successful
         except Exception as e:
             logger.error(f"Error caching capability mapping for {capability}: {e}")
@@ -133,12 +693,58 @@ class ACPCache:
         """
         try:
             key = f"capabilities:{capability}"
-            agent_ids = self.redis.redis_client.smembers(key)
-            return list(agent_ids) if agent_ids else []
+            if self.local_cache is not None:
+                found, cached = self.local_cache.get(key)
+                if found:
+                    return list(cached)
+
+            agent_ids = await self.redis.redis_client.smembers(key)
+            result = list(agent_ids) if agent_ids else []
+
+            if self.local_cache is not None:
+                self.local_cache.record_l2(bool(result))
+                if result:
+                    self.local_cache.set(key, result)
+            return result
         except Exception as e:
             logger.error(f"Error discovering agents for capability {capability}: {e}")
             return []
 
+    async def get_capability_agents(
+        self, capability: str, loader: Callable[[], Awaitable[Iterable[str]]]
+    ) -> List[str]:
+        """
+        Get the agents of a capability, rebuilding an expired mapping once.
+
+        When the capability set is missing, the loader is run through
+        get_or_compute, so concurrent callers in every worker share one
+        rebuild, and the set is rewritten from its result.
+
+        Args:
+            capability: Capability name
+            loader: Coroutine function listing the capability's agents from
+                the source of truth
+
+        Returns:
+            List of agent IDs with the capability
+        """
+        agent_ids = await self.discover_agents_by_capability(capability)
+        if agent_ids:
+            return agent_ids
+
+        async def rebuild() -> List[str]:
+            rebuilt = list(await loader())
+            await self.cache_capability_mapping(capability, rebuilt)
+            return rebuilt
+
+        result = await self.get_or_compute(
+            f"rebuilds:capabilities:{capability}",
+            rebuild,
+            self.CAPABILITY_REBUILD_TTL,
+            beta=0,
+        )
+        return list(result or [])
+
     async def invalidate_capability_cache(self, capability: str) -> bool:
         """
         Invalidate capability cache.
@@ -150,9 +756,17 @@ class ACPCache:
             True if successful, False otherwise
         """
         key = f"capabilities:{capability}"
-        return self.redis.delete(key)
+        result = await self.redis.delete(key)
+        await self._invalidate_local(keys=[key])
+        return result
 
     # Workflow State Management
+    # Workflow state is a Redis hash of JSON-encoded fields so transitions
+    # (progress, step completion) can update single fields server-side.
+    def _workflow_state_key(self, workflow_id: str) -> str:
+        """Get the Redis key of a workflow state hash."""
+        return self._get_key(f"workflows:active:{workflow_id}")
+
     async def cache_workflow_state(
         self, workflow_id: str, state: Dict[str, Any]
     ) -> bool:
@@ -166,8 +780,24 @@ class ACPCache:
         Returns:
             True if successful, False otherwise
         """
-        key = f"workflows:active:{workflow_id}"
-        return self.redis.set(key, state, ttl=self.WORKFLOW_STATE_TTL)
+        try:
+            key = self._workflow_state_key(workflow_id)
+            ttl = self._ttl(key, self.WORKFLOW_STATE_TTL)
+            expires_at = time.time() + ttl
+            pipe = self.redis.redis_client.pipeline()
+            pipe.delete(key)
+            if state:
+                pipe.hset(key, mapping=_encode_json_fields(state))
+            pipe.expire(key, ttl)
+            # Active index is scored by expiry so metrics never scan keys
+            pipe.zadd(
+                self._get_key("workflows:active_index"), {workflow_id: expires_at}
+            )
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error caching workflow state for {workflow_id}: {e}")
+            return False
 
     async def get_workflow_state(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -179,8 +809,110 @@ class ACPCache:
         Returns:
             Workflow state data or None if not found
         """
-        key = f"workflows:active:{workflow_id}"
-        return self.redis.get(key)
+        try:
+            fields = await self.redis.redis_client.hgetall(
+                self._workflow_state_key(workflow_id)
+            )
+        except Exception as e:
+            logger.error(f"Error getting workflow state for {workflow_id}: {e}")
+            return None
+        return _decode_json_fields(fields) if fields else None
+
+    async def advance_workflow_progress(
+        self, workflow_id: str, current_step: Optional[str], progress: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically set the current step and progress of a cached workflow.
+
+        Args:
+            workflow_id: Workflow identifier
+            current_step: Step now being executed
+            progress: Progress percentage
+
+        Returns:
+            New workflow state, empty if the workflow is not cached, or None
+            on error
+        """
+        try:
+            key = self._workflow_state_key(workflow_id)
+            ttl = self._ttl(key, self.WORKFLOW_STATE_TTL)
+            flat = await self.scripts.run(
+                "advance_progress",
+                keys=[key, self._get_key("workflows:active_index")],
+                args=[
+                    workflow_id,
+                    json.dumps(current_step),
+                    json.dumps(progress),
+                    ttl,
+                    time.time() + ttl,
+                ],
+            )
+            return _decode_json_fields(pairs_to_dict(flat or []))
+        except Exception as e:
+            logger.error(f"Error advancing workflow {workflow_id}: {e}")
+            return None
+
+    async def complete_workflow_step(
+        self,
+        workflow_id: str,
+        step_id: str,
+        result: Dict[str, Any],
+        events: Sequence[Tuple[str, str]] = (),
+        event_log: Optional[Tuple[str, str, int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically record a completed step and update workflow progress.
+
+        The step result is stored, the step is counted once towards
+        completed_steps, progress is recomputed from total_steps and the
+        given events are published (and logged), all in one round trip.
+
+        Args:
+            workflow_id: Workflow identifier
+            step_id: Step identifier
+            result: Step result data
+            events: (channel, payload) pairs to publish on completion
+            event_log: (stream key, logged channel, maxlen) to also append
+                the event on the logged channel to an event stream; its
+                copies are then published with a "stream_id" field
+
+        Returns:
+            New workflow state, empty if the workflow is not cached, or None
+            on error
+        """
+        try:
+            step_key = f"workflows:steps:{workflow_id}:{step_id}"
+            # The state, step result and completed set share one TTL
+            ttl = self._ttl(self._cache_key(step_key), self.WORKFLOW_STATE_TTL)
+            args: List[Any] = [
+                workflow_id,
+                step_id,
+                self.redis.encode_value(step_key, result),
+                ttl,
+                time.time() + ttl,
+            ]
+            keys = [
+                self._workflow_state_key(workflow_id),
+                self._cache_key(step_key),
+                self._get_key(f"workflows:completed:{workflow_id}"),
+                self._get_key("workflows:active_index"),
+            ]
+            if event_log is not None:
+                stream_key, logged_channel, maxlen = event_log
+                keys.append(stream_key)
+                args.extend((maxlen, logged_channel))
+            else:
+                args.extend((0, ""))
+            for channel, payload in events:
+                args.extend((channel, payload))
+
+            flat = await self.scripts.run("complete_step", keys=keys, args=args)
+            return _decode_json_fields(pairs_to_dict(flat or []))
+        except Exception as e:
+            logger.error(
+                f"Error completing step {step_id} of workflow {workflow_id}: {e}"
+            )
+            return None
 
     async def update_workflow_step(
         self, workflow_id: str, step_id: str, result: Dict[str, Any]
@@ -197,7 +929,8 @@ class ACPCache:
             True if successful, False otherwise
         """
         key = f"workflows:steps:{workflow_id}:{step_id}"
-        return self.redis.set(key, result, ttl=self.WORKFLOW_STATE_TTL)
+        ttl = self._ttl(self._cache_key(key), self.WORKFLOW_STATE_TTL)
+        return await self.redis.set(key, result, ttl=ttl)
 
     async def get_workflow_step(
         self, workflow_id: str, step_id: str
@@ -213,7 +946,7 @@ class ACPCache:
             Step result data or None if not found
         """
         key = f"workflows:steps:{workflow_id}:{step_id}"
-        return self.redis.get(key)
+        return await self.redis.get(key)
 
     # Performance Caching
     async def cache_agent_metadata(
@@ -230,7 +963,7 @@ class ACPCache:
             True if successful, False otherwise
         """
         key = f"cache:agents:{agent_id}"
-        return self.redis.set(key, metadata, ttl=self.AGENT_METADATA_TTL)
+        return await self._write_through(key, metadata, self.AGENT_METADATA_TTL)
 
     async def get_agent_metadata(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -243,7 +976,7 @@ class ACPCache:
             Agent metadata or None if not found
         """
         key = f"cache:agents:{agent_id}"
-        return self.redis.get(key)
+        return await self._read_through(key)
 
     async def cache_workflow_template(
         self, template_id: str, template: Dict[str, Any]
@@ -259,7 +992,7 @@ class ACPCache:
             True if successful, False otherwise
         """
         key = f"cache:templates:{template_id}"
-        return self.redis.set(key, template, ttl=self.AGENT_METADATA_TTL)
+        return await self._write_through(key, template, self.AGENT_METADATA_TTL)
 
     async def get_workflow_template(self, template_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -272,7 +1005,90 @@ class ACPCache:
             Template definition or None if not found
         """
         key = f"cache:templates:{template_id}"
-        return self.redis.get(key)
+        return await self._read_through(key)
+
+    # Agent Registration
+    async def register_agent(
+        self,
+        agent_id: str,
+        status: Dict[str, Any],
+        metadata: Dict[str, Any],
+        capabilities: Iterable[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically cache a newly registered agent.
+
+        Replaces the agent status hash, moves the agent to its status index,
+        stores its metadata and adds it to each capability set in one round
+        trip.
+
+        Args:
+            agent_id: Agent identifier
+            status: Agent status fields (status, last_seen, current_runs, ...)
+            metadata: Agent metadata
+            capabilities: Capabilities the agent provides
+
+        Returns:
+            New agent status, or None on error
+        """
+        try:
+            metadata_key = f"cache:agents:{agent_id}"
+            capabilities = list(dict.fromkeys(capabilities))
+            previous = await self.redis.redis_client.smembers(
+                self._agent_capabilities_key(agent_id)
+            )
+            stale = [cap for cap in previous or () if cap not in capabilities]
+            capability_keys = [self._capability_key(cap) for cap in capabilities]
+            stale_keys = [self._capability_key(cap) for cap in stale]
+            state = status.get("status")
+            target = AGENT_STATUSES.index(state) + 1 if state in AGENT_STATUSES else 0
+
+            status_ttl = self._ttl(
+                self._agent_status_key(agent_id), self.AGENT_STATUS_TTL
+            )
+            # One TTL for all capability sets keeps them expiring together
+            capability_ttl = self._ttl(
+                self._capability_key("*"), self.CAPABILITY_MAPPING_TTL
+            )
+            args: List[Any] = [
+                agent_id,
+                status_ttl,
+                time.time() + status_ttl,
+                self.redis.encode_value(metadata_key, metadata),
+                self._ttl(self._cache_key(metadata_key), self.AGENT_METADATA_TTL),
+                capability_ttl,
+                len(AGENT_STATUSES),
+                target,
+                len(capabilities),
+                *capabilities,
+            ]
+            for field, value in _encode_status_fields(status).items():
+                args.extend((field, value))
+
+            flat = await self.scripts.run(
+                "register_agent",
+                keys=[
+                    self._agent_status_key(agent_id),
+                    self._cache_key(metadata_key),
+                    self._agent_capabilities_key(agent_id),
+                    *(self._status_index_key(s) for s in AGENT_STATUSES),
+                    *capability_keys,
+                    *stale_keys,
+                ],
+                args=args,
+            )
+            await self._invalidate_local(
+                keys=[
+                    f"agents:status:{agent_id}",
+                    metadata_key,
+                    *capability_keys,
+                    *stale_keys,
+                ]
+            )
+            return _decode_status_fields(pairs_to_dict(flat or []))
+        except Exception as e:
+            logger.error(f"Error registering agent {agent_id} in cache: {e}")
+            return None
 
     # Batch Operations
     async def batch_update_agent_status(
@@ -294,12 +1110,20 @@ class ACPCache:
                 agent_id = update.get("agent_id")
                 status = update.get("status", {})
                 if agent_id:
-                    key = f"agents:status:{agent_id}"
-                    pipe.hset(key, mapping=status)
-                    pipe.expire(key, self.AGENT_STATUS_TTL)
-
-            results = pipe.execute()
-            return all(results)
+                    self._queue_status_write(
+                        pipe, agent_id, _encode_status_fields(status)
+                    )
+
+            # Raises if any command fails
+            await self.scripts.execute(pipe)
+            await self._invalidate_local(
+                keys=[
+                    f"agents:status:{update['agent_id']}"
+                    for update in agent_updates
+                    if update.get("agent_id")
+                ]
+            )
+            return True
         except Exception as e:
             logger.error(f"Error in batch update agent status: {e}")
             return False
@@ -324,14 +1148,144 @@ class ACPCache:
                 pipe.delete(key)  # Clear existing
                 if agent_ids:
                     pipe.sadd(key, *agent_ids)
-                pipe.expire(key, self.CAPABILITY_MAPPING_TTL)
+                pipe.expire(key, self._ttl(key, self.CAPABILITY_MAPPING_TTL))
 
-            results = pipe.execute()
+            results = await pipe.execute()
+            await self._invalidate_local(
+                keys=[
+                    f"capabilities:{capability}" for capability in capability_mappings
+                ]
+            )
             return all(results)
         except Exception as e:
             logger.error(f"Error in batch cache capabilities: {e}")
             return False
 
+    # TTL Policies
+    # Policies take effect for new writes through _ttl, in every worker once
+    # they reload the persisted table. Existing keys get the new TTL with
+    # pipelined EXPIRE/PEXPIRE, so values are never rewritten.
+    async def apply_ttl_policy(
+        self, pattern: str, ttl: float, reason: str = ""
+    ) -> Optional[TTLPolicyChange]:
+        """
+        Set the TTL of a key family and adjust its existing keys.
+
+        Args:
+            pattern: Glob-style pattern over full Redis keys
+            ttl: New TTL in seconds (fractional TTLs use PEXPIRE)
+            reason: Why the policy changed, kept in the change history
+
+        Returns:
+            The recorded change, or None on error
+        """
+        try:
+            hits, misses = await self._keyspace_counters()
+            previous = self.ttl_policies.set(pattern, ttl, reason)
+            await self.ttl_policies.save(self.redis.redis_client, pattern)
+            await publish_ttl_policy_change(self.redis.redis_client)
+            adjusted, memory = await self._expire_matching(pattern, ttl)
+            total = hits + misses
+            change = TTLPolicyChange(
+                pattern=pattern,
+                previous_ttl=previous,
+                ttl=ttl,
+                reason=reason,
+                applied_at=datetime.now(timezone.utc),
+                keys_adjusted=adjusted,
+                hit_ratio_before=hits / total if total > 0 else 0.0,
+                memory_bytes_before=memory,
+                keyspace_hits=hits,
+                keyspace_misses=misses,
+            )
+            self.ttl_policy_changes.append(change)
+            logger.info(f"TTL policy {pattern} set to {ttl}s ({adjusted} keys)")
+            return change
+        except Exception as e:
+            logger.error(f"Error applying TTL policy for {pattern}: {e}")
+            return None
+
+    async def _expire_matching(self, pattern: str, ttl: float) -> Tuple[int, int]:
+        """
+        Set the TTL of every key matching a pattern.
+
+        Returns:
+            Tuple of (keys adjusted, their memory usage in bytes)
+        """
+        client = self.redis.redis_client
+        adjusted = 0
+        memory = 0
+        async for keys in ascan_batches(client, pattern):
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.memory_usage(key)
+                if float(ttl).is_integer():
+                    pipe.expire(key, int(ttl))
+                else:
+                    pipe.pexpire(key, int(ttl * 1000))
+            results = await pipe.execute()
+            memory += sum(int(usage or 0) for usage in results[0::2])
+            adjusted += sum(1 for applied in results[1::2] if applied)
+        return adjusted, memory
+
+    async def _family_memory(self, pattern: str) -> int:
+        """Get the memory used by keys matching a pattern."""
+        memory = 0
+        async for batch in ascan_with_followup(
+            self.redis.redis_client, pattern, lambda pipe, key: pipe.memory_usage(key)
+        ):
+            memory += sum(int(usage or 0) for _, usage in batch)
+        return memory
+
+    async def _keyspace_counters(self) -> Tuple[int, int]:
+        """Get Redis keyspace hit and miss counters."""
+        info = await self.redis.redis_client.info("stats")
+        return int(info.get("keyspace_hits", 0)), int(info.get("keyspace_misses", 0))
+
+    async def measure_ttl_policy_impact(
+        self, min_age_seconds: float = 0.0
+    ) -> List[TTLPolicyChange]:
+        """
+        Measure the impact of policy changes not measured yet.
+
+        The hit ratio after a change covers the keyspace hits and misses
+        since it; memory is the family's current usage.
+
+        Args:
+            min_age_seconds: Only measure changes at least this old
+
+        Returns:
+            Changes measured by this call
+        """
+        now = datetime.now(timezone.utc)
+        pending = [
+            change
+            for change in self.ttl_policy_changes
+            if change.measured_at is None
+            and (now - change.applied_at).total_seconds() >= min_age_seconds
+        ]
+        if not pending:
+            return []
+
+        try:
+            hits, misses = await self._keyspace_counters()
+            for change in pending:
+                delta_hits = hits - change.keyspace_hits
+                delta_total = delta_hits + misses - change.keyspace_misses
+                change.hit_ratio_after = (
+                    delta_hits / delta_total if delta_total > 0 else None
+                )
+                change.memory_bytes_after = await self._family_memory(change.pattern)
+                change.measured_at = now
+            return pending
+        except Exception as e:
+            logger.error(f"Error measuring TTL policy impact: {e}")
+            return []
+
+    def get_ttl_policy_history(self) -> List[Dict[str, Any]]:
+        """Get every recorded TTL policy change, oldest first."""
+        return [change.to_dict() for change in self.ttl_policy_changes]
+
     # Cache Statistics
     async def get_cache_hit_ratio(self) -> float:
         """
@@ -341,7 +1295,7 @@ class ACPCache:
             Cache hit ratio (0.0 to 1.0)
         """
         try:
-            info = self.redis.redis_client.info("stats")
+            info = await self.redis.redis_client.info("stats")
             hits = info.get("keyspace_hits", 0)
             misses = info.get("keyspace_misses", 0)
             total = hits + misses
@@ -350,6 +1304,17 @@ class ACPCache:
             logger.error(f"Error calculating cache hit ratio: {e}")
             return 0.0
 
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """
+        Get per-tier (L1 in-process / L2 Redis) hit statistics.
+
+        Returns:
+            Dictionary with tier statistics, empty if L1 is disabled
+        """
+        if self.local_cache is None:
+            return {}
+        return self.local_cache.get_stats()
+
     async def get_agent_status_distribution(self) -> Dict[str, int]:
         """
         Get distribution of agent statuses.
@@ -358,19 +1323,22 @@ class ACPCache:
             Dictionary with status counts
         """
         try:
-            pattern = self._get_key("agents:status:*")
-            keys = self.redis.redis_client.keys(pattern)
-
-            status_counts = {"online": 0, "offline": 0, "busy": 0}
-            for key in keys:
-                status_data = self.redis.redis_client.hget(key, "status")
-                if status_data:
-                    status_counts[status_data] += 1
+            # Expired agents are trimmed from each index instead of scanning keys
+            now = time.time()
+            pipe = self.redis.redis_client.pipeline()
+            for status in AGENT_STATUSES:
+                index_key = self._status_index_key(status)
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.zcard(index_key)
+            results = await pipe.execute()
 
-            return status_counts
+            return {
+                status: int(count)
+                for status, count in zip(AGENT_STATUSES, results[1::2])
+            }
         except Exception as e:
             logger.error(f"Error getting agent status distribution: {e}")
-            return {"online": 0, "offline": 0, "busy": 0}
+            return {status: 0 for status in AGENT_STATUSES}
 
     async def get_workflow_metrics(self) -> Dict[str, Any]:
         """
@@ -380,21 +1348,26 @@ class ACPCache:
             Dictionary with workflow metrics
         """
         try:
-            active_workflows = self.redis.redis_client.keys(
-                self._get_key("workflows:active:*")
-            )
+            # Expired entries are trimmed from the index instead of scanning keys
+            index_key = self._get_key("workflows:active_index")
+            pipe = self.redis.redis_client.pipeline()
+            pipe.zremrangebyscore(index_key, "-inf", time.time())
+            pipe.zcard(index_key)
+            _, active_workflows = await pipe.execute()
 
             return {
-                "active_workflows": len(active_workflows),
+                "active_workflows": int(active_workflows),
                 "cache_hit_ratio": await self.get_cache_hit_ratio(),
                 "agent_status_distribution": await self.get_agent_status_distribution(),
+                "tier_stats": self.get_tier_stats(),
+                "compute_stats": self.get_compute_stats(),
             }
         except Exception as e:
             logger.error(f"Error getting workflow metrics: {e}")
             return {
                 "active_workflows": 0,
                 "cache_hit_ratio": 0.0,
-                "agent_status_distribution": {"online": 0, "offline": 0, "busy": 0},
+                "agent_status_distribution": {status: 0 for status in AGENT_STATUSES},
             }
 
     # Cache Management
@@ -414,16 +1387,14 @@ class ACPCache:
                 f"agents:heartbeat:{agent_id}",
                 f"cache:agents:{agent_id}",
             ]
+            await self._invalidate_local(keys=patterns)
 
-            keys_to_delete = []
-            for pattern in patterns:
-                full_pattern = self._get_key(pattern)
-                keys = self.redis.redis_client.keys(full_pattern)
-                keys_to_delete.extend(keys)
-
-            if keys_to_delete:
-                result = self.redis.redis_client.delete(*keys_to_delete)
-                return bool(result)
+            # These are exact keys, so they can be deleted without a lookup
+            pipe = self.redis.redis_client.pipeline()
+            pipe.delete(*[self._get_key(pattern) for pattern in patterns])
+            for status in AGENT_STATUSES:
+                pipe.zrem(self._status_index_key(status), agent_id)
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Error clearing agent cache for {agent_id}: {e}")
@@ -440,20 +1411,21 @@ class ACPCache:
             True if successful, False otherwise
         """
         try:
-            patterns = [
-                f"workflows:active:{workflow_id}",
-                f"workflows:steps:{workflow_id}:*",
+            keys_to_delete = [
+                self._workflow_state_key(workflow_id),
+                self._get_key(f"workflows:completed:{workflow_id}"),
             ]
-
-            keys_to_delete = []
-            for pattern in patterns:
-                full_pattern = self._get_key(pattern)
-                keys = self.redis.redis_client.keys(full_pattern)
+            # Step results are stored through the base cache and its prefix
+            async for keys in ascan_batches(
+                self.redis.redis_client,
+                f"{self.redis.key_prefix}workflows:steps:{workflow_id}:*",
+            ):
                 keys_to_delete.extend(keys)
 
-            if keys_to_delete:
-                result = self.redis.redis_client.delete(*keys_to_delete)
-                return bool(result)
+            pipe = self.redis.redis_client.pipeline()
+            pipe.delete(*keys_to_delete)
+            pipe.zrem(self._get_key("workflows:active_index"), workflow_id)
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Error clearing workflow cache for {workflow_id}: {e}")
@@ -466,5 +1438,8 @@ class ACPCache:
         Returns:
             Number of keys deleted
         """
+        await self._invalidate_local(prefixes=[""])
         pattern = self._get_key("*")
-        return self.redis.clear_pattern(pattern.replace(self.redis.key_prefix, ""))
+        return await self.redis.clear_pattern(
+            pattern.replace(self.redis.key_prefix, "")
+        )
@@ -0,0 +1,413 @@
+"""
+Async Redis-based caching service for DevCycle.
+
+This module provides an asyncio-native counterpart to RedisCache built on
+redis.asyncio, so cache round trips from async services do not block the
+event loop. The synchronous RedisCache remains available for CLI and secret
+tooling.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ..config import get_config
+from ..logging import get_logger
+from .codecs import CodecRegistry
+from .compression import (
+    DICTIONARIES_KEY,
+    MissingDictionaryError,
+    ValueCompressor,
+    decompress_bytes,
+)
+from .pool_registry import get_pool_registry
+from .scan import acount_matching, adelete_matching, ascan_batches
+
+logger = get_logger(__name__)
+
+
+class AsyncRedisCache:
+    """Async Redis-based caching service."""
+
+    def __init__(
+        self,
+        key_prefix: str = "devcycle:cache:",
+        codecs: Optional[CodecRegistry] = None,
+        compressor: Optional[ValueCompressor] = None,
+    ) -> None:
+        """
+        Initialize async Redis cache service.
+
+        Args:
+            key_prefix: Prefix for all cache keys
+            codecs: Value codecs per key family (defaults to DEFAULT_CODEC_FAMILIES)
+            compressor: Value compression (defaults to the Redis config settings)
+        """
+        config = get_config()
+        pools = get_pool_registry()
+        self.redis_client = redis.Redis(
+            connection_pool=pools.get_async_pool(decode_responses=True)
+        )
+        # Cached values are codec-encoded bytes, so they are read and written
+        # through a client that does not decode replies
+        self.binary_client = redis.Redis(
+            connection_pool=pools.get_async_pool(decode_responses=False)
+        )
+        self.codecs = codecs or CodecRegistry(
+            legacy_json_writes=config.redis.cache_legacy_json_writes
+        )
+        # Readers that predate compression cannot decompress, so legacy
+        # writes also disable it
+        self.compressor = compressor or ValueCompressor(
+            enabled=config.redis.cache_compression_enabled
+            and not config.redis.cache_legacy_json_writes,
+            algorithm=config.redis.cache_compression_algorithm,
+            threshold=config.redis.cache_compression_threshold,
+        )
+        self.key_prefix = key_prefix
+        logger.info("Async Redis cache service initialized")
+
+    def _get_key(self, key: str) -> str:
+        """Get the full Redis key with prefix."""
+        return f"{self.key_prefix}{key}"
+
+    async def _decompress(self, key: str, value: bytes) -> bytes:
+        """Decompress a stored value, loading its zstd dictionary if needed."""
+        try:
+            return self.compressor.decompress(key, value)
+        except MissingDictionaryError:
+            # Trained by another worker since we last loaded dictionaries
+            await self.load_compression_dictionaries()
+            return self.compressor.decompress(key, value)
+
+    async def load_compression_dictionaries(self) -> int:
+        """
+        Load the zstd dictionaries trained by any worker from Redis.
+
+        Returns:
+            Number of dictionaries loaded
+        """
+        try:
+            stored = await self.binary_client.hgetall(self._get_key(DICTIONARIES_KEY))
+            return self.compressor.load_dictionaries(stored)
+        except Exception as e:
+            logger.error(f"Error loading compression dictionaries: {e}")
+            return 0
+
+    async def train_compression_dictionary(
+        self, family: str, sample_size: int = 500
+    ) -> bool:
+        """
+        Train a zstd dictionary for a key family from sampled cached values.
+
+        The dictionary is stored in Redis so other workers can read values
+        compressed with it and start writing with it on their next load.
+
+        Args:
+            family: Key family prefix, e.g. "workflows:steps:"
+            sample_size: Maximum number of values to sample
+
+        Returns:
+            True if a dictionary was trained and stored, False otherwise
+        """
+        samples: List[bytes] = []
+        try:
+            async for keys in ascan_batches(
+                self.binary_client, self._get_key(f"{family}*")
+            ):
+                for value in await self.binary_client.mget(keys):
+                    if value is None:
+                        continue
+                    try:
+                        samples.append(
+                            decompress_bytes(value, self.compressor.dictionaries)
+                        )
+                    except Exception:
+                        continue
+                if len(samples) >= sample_size:
+                    break
+
+            dict_bytes = self.compressor.train_dictionary(family, samples[:sample_size])
+            if dict_bytes is None:
+                return False
+
+            await self.binary_client.hset(
+                self._get_key(DICTIONARIES_KEY),
+                mapping=self.compressor.dictionary_fields(family, dict_bytes),
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error training compression dictionary for {family}: {e}")
+            return False
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value from the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found
+        """
+        try:
+            full_key = self._get_key(key)
+            value = await self.binary_client.get(full_key)
+
+            if value is None:
+                return None
+
+            return self.codecs.decode(await self._decompress(key, value))
+
+        except Exception as e:
+            logger.error(f"Error getting cache value for key {key}: {e}")
+            return None
+
+    def encode_value(self, key: str, value: Any) -> bytes:
+        """
+        Encode a value exactly as set() stores it.
+
+        Args:
+            key: Cache key (without prefix), used to pick codec and compression
+            value: Value to encode
+
+        Returns:
+            Stored representation of the value
+        """
+        return self.compressor.compress(key, self.codecs.encode(key, value))
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        Set a value in the cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (None for no expiration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            full_key = self._get_key(key)
+            serialized_value = self.encode_value(key, value)
+
+            redis_result: bool | None
+            if ttl is not None:
+                redis_result = await self.binary_client.setex(
+                    full_key, ttl, serialized_value
+                )
+            else:
+                redis_result = await self.binary_client.set(full_key, serialized_value)
+
+            return redis_result is not None and bool(redis_result)
+
+        except Exception as e:
+            logger.error(f"Error setting cache value for key {key}: {e}")
+            return False
+
+    async def set_many(self, items: List[Tuple[str, Any, Optional[int]]]) -> List[bool]:
+        """
+        Set several values in one pipelined round trip.
+
+        Args:
+            items: (key, value, ttl) tuples; a ttl of None means no expiration
+
+        Returns:
+            Success flag for each item, in order
+        """
+        if not items:
+            return []
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            for key, value, ttl in items:
+                pipe.set(self._get_key(key), self.encode_value(key, value), ex=ttl)
+            results = await pipe.execute(raise_on_error=False)
+            return [result is True for result in results]
+
+        except Exception as e:
+            logger.error(f"Error setting {len(items)} cache values: {e}")
+            return [False] * len(items)
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete a value from the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            full_key = self._get_key(key)
+            result = await self.redis_client.delete(full_key)
+            return bool(result)
+
+        except Exception as e:
+            logger.error(f"Error deleting cache value for key {key}: {e}")
+            return False
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check if a key exists in the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key exists, False otherwise
+        """
+        try:
+            full_key = self._get_key(key)
+            return bool(await self.redis_client.exists(full_key))
+
+        except Exception as e:
+            logger.error(f"Error checking cache existence for key {key}: {e}")
+            return False
+
+    async def get_ttl(self, key: str) -> int:
+        """
+        Get the time to live for a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            TTL in seconds, -1 if no expiration, -2 if key doesn't exist
+        """
+        try:
+            full_key = self._get_key(key)
+            result = await self.redis_client.ttl(full_key)
+            return int(result) if result is not None else -2
+
+        except Exception as e:
+            logger.error(f"Error getting TTL for key {key}: {e}")
+            return -2
+
+    async def get_ttls(self, keys: List[str]) -> List[int]:
+        """
+        Get the time to live of several keys in one pipelined round trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            TTL per key in seconds, -1 if no expiration, -2 if missing
+        """
+        if not keys:
+            return []
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.ttl(self._get_key(key))
+            return [int(result) for result in await pipe.execute()]
+
+        except Exception as e:
+            logger.error(f"Error getting TTL for {len(keys)} keys: {e}")
+            return [-2] * len(keys)
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """
+        Clear all keys matching a pattern.
+
+        Args:
+            pattern: Pattern to match (without prefix)
+
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            full_pattern = self._get_key(pattern)
+            return await adelete_matching(self.redis_client, full_pattern)
+
+        except Exception as e:
+            logger.error(f"Error clearing cache pattern {pattern}: {e}")
+            return 0
+
+    async def clear_all(self) -> int:
+        """
+        Clear all cache keys with the current prefix.
+
+        Returns:
+            Number of keys deleted
+        """
+        return int(await self.clear_pattern("*"))
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        try:
+            info = await self.redis_client.info()
+            total_keys = await acount_matching(self.redis_client, self._get_key("*"))
+
+            return {
+                "total_keys": total_keys,
+                "redis_connected": True,
+                "redis_version": info.get("redis_version", "unknown"),
+                "used_memory": info.get("used_memory_human", "unknown"),
+                "connected_clients": info.get("connected_clients", 0),
+                "compression": self.compressor.get_stats(),
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting cache stats: {e}")
+            return {
+                "total_keys": 0,
+                "redis_connected": False,
+                "error": str(e),
+            }
+
+    async def health_check(self) -> bool:
+        """
+        Check if Redis connection is healthy.
+
+        Returns:
+            True if Redis is accessible, False otherwise
+        """
+        try:
+            await self.redis_client.ping()
+            return True
+        except Exception as e:
+            logger.error(f"Redis health check failed: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Close the clients; the shared pools stay open until close_pool_registry()."""
+        try:
+            await self.redis_client.aclose()
+            await self.binary_client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing async Redis cache: {e}")
+
+
+# Global async cache instance
+_async_cache_instance: Optional[AsyncRedisCache] = None
+
+
+def get_async_cache(key_prefix: str = "devcycle:cache:") -> AsyncRedisCache:
+    """
+    Get the global async cache instance.
+
+    Args:
+        key_prefix: Prefix for cache keys
+
+    Returns:
+        AsyncRedisCache instance
+    """
+    global _async_cache_instance
+    import os
+
+    # In test environments, always create a new instance to use the current config
+    if os.getenv("ENVIRONMENT") == "testing":
+        _async_cache_instance = AsyncRedisCache(key_prefix)
+    elif _async_cache_instance is None:
+        # Singleton behavior, key_prefix is ignored once created
+        _async_cache_instance = AsyncRedisCache(key_prefix)
+
+    return _async_cache_instance
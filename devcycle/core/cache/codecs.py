@@ -0,0 +1,222 @@
+"""
+Value serialization codecs for the Redis caches.
+
+Every encoded value starts with a one-byte header naming the codec that wrote
+it, so values written with different codecs (and legacy header-less JSON or
+plain strings) can coexist in Redis while a rollout is in progress. The codec
+used for writes is chosen per key family by key prefix; reads always follow
+the header.
+
+orjson and msgpack are project dependencies. Should one be missing anyway
+(e.g. a trimmed image), families configured for it fall back to the stdlib
+JSON codec.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+
+class CacheCodec(ABC):
+    """Base class for cache value codecs."""
+
+    name: str = ""
+    header: bytes = b""
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to bytes (without header)."""
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Deserialize bytes (without header) to a value."""
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value and prefix it with the codec header."""
+        return self.header + self.dumps(value)
+
+
+class JSONCodec(CacheCodec):
+    """Stdlib JSON codec; output stays human-readable after the header."""
+
+    name = "json"
+    header = b"\x01"
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to JSON bytes."""
+        return json.dumps(value).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize JSON bytes."""
+        return json.loads(data)
+
+
+class OrjsonCodec(CacheCodec):
+    """orjson codec; wire-compatible with JSON but several times faster."""
+
+    name = "orjson"
+    header = b"\x02"
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to JSON bytes with orjson."""
+        # Match json.dumps, which coerces non-string dict keys
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize JSON bytes with orjson."""
+        return orjson.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack codec; compact binary encoding for large structured values."""
+
+    name = "msgpack"
+    header = b"\x03"
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to msgpack bytes."""
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize msgpack bytes."""
+        return msgpack.unpackb(data, raw=False)
+
+
+JSON_CODEC = JSONCodec()
+
+AVAILABLE_CODECS: Dict[str, CacheCodec] = {"json": JSON_CODEC}
+if ORJSON_AVAILABLE:
+    AVAILABLE_CODECS["orjson"] = OrjsonCodec()
+if MSGPACK_AVAILABLE:
+    AVAILABLE_CODECS["msgpack"] = MsgpackCodec()
+
+CODECS_BY_HEADER: Dict[bytes, CacheCodec] = {
+    codec.header: codec for codec in AVAILABLE_CODECS.values()
+}
+# orjson output is plain JSON, so the stdlib codec can read it if needed
+CODECS_BY_HEADER.setdefault(OrjsonCodec.header, JSON_CODEC)
+
+# Codec used for writes per key family (key prefix without the cache prefix).
+# Keys that match no family use the default codec.
+DEFAULT_CODEC_FAMILIES: Dict[str, str] = {
+    "workflows:steps:": "msgpack",
+    "workflows:active:": "orjson",
+}
+
+
+def get_codec(name: str) -> CacheCodec:
+    """
+    Look up a codec by name, falling back to JSON if it is unavailable.
+
+    Args:
+        name: Codec name ("json", "orjson" or "msgpack")
+
+    Returns:
+        Codec instance
+    """
+    codec = AVAILABLE_CODECS.get(name)
+    if codec is None:
+        logger.warning(f"Cache codec {name} is not available, falling back to json")
+        return JSON_CODEC
+    return codec
+
+
+class CodecRegistry:
+    """Selects a codec per key family and decodes values by header."""
+
+    def __init__(
+        self,
+        families: Optional[Dict[str, str]] = None,
+        default: str = "json",
+        legacy_json_writes: bool = False,
+    ):
+        """
+        Initialize codec registry.
+
+        Args:
+            families: Mapping of key prefix to codec name
+            default: Codec name for keys that match no family
+            legacy_json_writes: Write JSON-family values without a header so
+                readers that predate codecs can still parse them
+        """
+        family_names = DEFAULT_CODEC_FAMILIES if families is None else families
+        self.families: Dict[str, CacheCodec] = {
+            prefix: get_codec(name) for prefix, name in family_names.items()
+        }
+        # Longest prefix first so nested families win over broader ones
+        self._prefixes = sorted(self.families, key=len, reverse=True)
+        self.default = get_codec(default)
+        self.legacy_json_writes = legacy_json_writes
+
+    def codec_for(self, key: str) -> CacheCodec:
+        """Return the write codec for a key."""
+        for prefix in self._prefixes:
+            if key.startswith(prefix):
+                return self.families[prefix]
+        return self.default
+
+    def encode(self, key: str, value: Any) -> bytes:
+        """
+        Encode a value for a key.
+
+        Args:
+            key: Cache key (without the cache prefix)
+            value: Value to encode
+
+        Returns:
+            Header-prefixed bytes
+        """
+        codec = self.codec_for(key)
+        if self.legacy_json_writes and codec is JSON_CODEC:
+            # Pre-codec format: strings stored raw, everything else as JSON
+            if isinstance(value, str):
+                return value.encode("utf-8")
+            return codec.dumps(value)
+        return codec.encode(value)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode a value written by any codec or by the pre-codec format.
+
+        Args:
+            data: Raw value read from Redis
+
+        Returns:
+            Decoded value
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        header = data[:1]
+        codec = CODECS_BY_HEADER.get(header)
+        if codec is not None:
+            return codec.loads(data[1:])
+        if header == MsgpackCodec.header:
+            raise ValueError("Value is msgpack-encoded but msgpack is not installed")
+
+        # Legacy value without a header: JSON, or a plain string
+        text = data.decode("utf-8")
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return text
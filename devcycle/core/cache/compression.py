@@ -0,0 +1,437 @@
+"""
+Transparent value compression for the Redis caches.
+
+Encoded values at or above a size threshold are compressed before they are
+written. A compressed value starts with a one-byte marker naming the
+algorithm. The markers overlap neither the codec headers nor the first byte
+of legacy text values, so reads detect compression on their own and values
+written before compression was enabled stay readable.
+
+zstd can optionally use a dictionary trained per key family from sampled
+values, which lets small JSON blobs shrink as well. Each zstd frame records
+the ID of its dictionary. A reader that does not have that dictionary yet
+raises MissingDictionaryError so the cache can load it from Redis.
+
+zstandard and lz4 are project dependencies. Should one be missing anyway,
+families configured for it use gzip, which is always available.
+"""
+
+import gzip
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+
+    LZ4_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    lz4 = None
+    LZ4_AVAILABLE = False
+
+
+GZIP_MARKER = b"\x10"
+LZ4_MARKER = b"\x11"
+ZSTD_MARKER = b"\x12"
+
+ALGORITHM_MARKERS: Dict[str, bytes] = {
+    "gzip": GZIP_MARKER,
+    "lz4": LZ4_MARKER,
+    "zstd": ZSTD_MARKER,
+}
+
+AVAILABLE_ALGORITHMS = {"gzip"}
+if LZ4_AVAILABLE:
+    AVAILABLE_ALGORITHMS.add("lz4")
+if ZSTD_AVAILABLE:
+    AVAILABLE_ALGORITHMS.add("zstd")
+
+# Algorithm used per key family (key prefix without the cache prefix).
+# Keys that match no family use the default algorithm.
+DEFAULT_COMPRESSION_FAMILIES: Dict[str, str] = {
+    "workflows:steps:": "zstd",
+    "workflows:active:": "lz4",
+    "cache:templates:": "zstd",
+}
+
+# Family name used in statistics for keys outside every family
+OTHER_FAMILY = "other"
+
+# Hash (under the cache prefix) holding trained zstd dictionaries. Field
+# "id:<dict_id>" keeps every dictionary readable; "family:<prefix>" names the
+# dictionary a family currently writes with.
+DICTIONARIES_KEY = "compression:dictionaries"
+
+
+class MissingDictionaryError(Exception):
+    """Raised when a zstd frame needs a dictionary that is not loaded."""
+
+    def __init__(self, dict_id: int):
+        """
+        Initialize error.
+
+        Args:
+            dict_id: zstd dictionary ID recorded in the frame
+        """
+        super().__init__(f"zstd dictionary {dict_id} is not loaded")
+        self.dict_id = dict_id
+
+
+def resolve_algorithm(name: str) -> str:
+    """
+    Return an available algorithm, falling back to gzip.
+
+    Args:
+        name: Algorithm name ("gzip", "lz4" or "zstd")
+
+    Returns:
+        Name of an installed algorithm
+    """
+    if name in AVAILABLE_ALGORITHMS:
+        return name
+    logger.warning(f"Compression algorithm {name} is not available, using gzip")
+    return "gzip"
+
+
+def is_compressed(data: bytes) -> bool:
+    """Check whether a stored value carries a compression marker."""
+    return data[:1] in ALGORITHM_MARKERS.values()
+
+
+def compress_bytes(
+    data: bytes,
+    algorithm: str = "gzip",
+    level: Optional[int] = None,
+    dictionary: Optional[Any] = None,
+) -> bytes:
+    """
+    Compress bytes and prefix them with the algorithm marker.
+
+    Args:
+        data: Bytes to compress
+        algorithm: Algorithm name (must be available)
+        level: Compression level (algorithm default if None)
+        dictionary: zstd dictionary to compress with
+
+    Returns:
+        Marker-prefixed compressed bytes
+    """
+    if algorithm == "zstd":
+        compressor = zstandard.ZstdCompressor(
+            level=level if level is not None else 3, dict_data=dictionary
+        )
+        return ZSTD_MARKER + compressor.compress(data)
+    if algorithm == "lz4":
+        return LZ4_MARKER + lz4.frame.compress(
+            data, compression_level=level if level is not None else 0
+        )
+    return GZIP_MARKER + gzip.compress(
+        data, compresslevel=level if level is not None else 6
+    )
+
+
+def decompress_bytes(
+    data: bytes, dictionaries: Optional[Dict[int, Any]] = None
+) -> bytes:
+    """
+    Decompress a value if it carries a compression marker.
+
+    Args:
+        data: Stored bytes
+        dictionaries: Loaded zstd dictionaries by dictionary ID
+
+    Returns:
+        Decompressed bytes, or the input unchanged if it is not compressed
+
+    Raises:
+        MissingDictionaryError: If a zstd frame needs an unknown dictionary
+        ValueError: If the algorithm is not installed
+    """
+    marker, payload = data[:1], data[1:]
+    if marker == ZSTD_MARKER:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Value is zstd-compressed but zstandard is not installed")
+        dict_id = zstandard.get_frame_parameters(payload).dict_id
+        dictionary = None
+        if dict_id:
+            dictionary = (dictionaries or {}).get(dict_id)
+            if dictionary is None:
+                raise MissingDictionaryError(dict_id)
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(payload)
+    if marker == LZ4_MARKER:
+        if not LZ4_AVAILABLE:
+            raise ValueError("Value is lz4-compressed but lz4 is not installed")
+        return lz4.frame.decompress(payload)
+    if marker == GZIP_MARKER:
+        return gzip.decompress(payload)
+    return data
+
+
+@dataclass
+class CompressionStats:
+    """Space saved and CPU spent by compression for one key family."""
+
+    writes: int = 0
+    compressed_writes: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    compress_seconds: float = 0.0
+    decompressed_reads: int = 0
+    decompress_seconds: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes not written to Redis thanks to compression."""
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def compression_ratio(self) -> float:
+        """Stored size relative to encoded size (lower is better)."""
+        return self.bytes_out / self.bytes_in if self.bytes_in > 0 else 1.0
+
+
+class ValueCompressor:
+    """Size-threshold compression with per-family algorithms and dictionaries."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        algorithm: str = "zstd",
+        threshold: int = 1024,
+        families: Optional[Dict[str, str]] = None,
+        dictionary_threshold: int = 64,
+    ):
+        """
+        Initialize value compressor.
+
+        Args:
+            enabled: Compress values on write (reads always decompress)
+            algorithm: Algorithm for keys that match no family
+            threshold: Minimum encoded size in bytes to compress
+            families: Mapping of key prefix to algorithm name
+            dictionary_threshold: Minimum size for families with a trained
+                zstd dictionary
+        """
+        self.enabled = enabled
+        self.algorithm = resolve_algorithm(algorithm)
+        self.threshold = threshold
+        self.dictionary_threshold = dictionary_threshold
+
+        family_algorithms = (
+            DEFAULT_COMPRESSION_FAMILIES if families is None else families
+        )
+        self.families: Dict[str, str] = {
+            prefix: resolve_algorithm(name)
+            for prefix, name in family_algorithms.items()
+        }
+        # Longest prefix first so nested families win over broader ones
+        self._prefixes = sorted(self.families, key=len, reverse=True)
+
+        # Dictionaries used for writes per family, and for reads by ID
+        self.family_dictionaries: Dict[str, Any] = {}
+        self.dictionaries: Dict[int, Any] = {}
+
+        self.stats: Dict[str, CompressionStats] = {}
+
+    def family_for(self, key: str) -> str:
+        """Return the family prefix for a key, or OTHER_FAMILY."""
+        for prefix in self._prefixes:
+            if key.startswith(prefix):
+                return prefix
+        return OTHER_FAMILY
+
+    def _stats_for(self, family: str) -> CompressionStats:
+        """Return the statistics bucket for a family."""
+        stats = self.stats.get(family)
+        if stats is None:
+            stats = self.stats[family] = CompressionStats()
+        return stats
+
+    def compress(self, key: str, data: bytes) -> bytes:
+        """
+        Compress an encoded value if it is large enough to benefit.
+
+        Args:
+            key: Cache key (without the cache prefix)
+            data: Codec-encoded value
+
+        Returns:
+            Compressed bytes, or the input unchanged
+        """
+        if not self.enabled:
+            return data
+
+        family = self.family_for(key)
+        stats = self._stats_for(family)
+        stats.writes += 1
+
+        dictionary = self.family_dictionaries.get(family)
+        threshold = self.dictionary_threshold if dictionary else self.threshold
+        if len(data) < threshold:
+            return data
+
+        algorithm = self.families.get(family, self.algorithm)
+        if dictionary is not None:
+            algorithm = "zstd"
+
+        start_time = time.perf_counter()
+        compressed = compress_bytes(data, algorithm, dictionary=dictionary)
+        stats.compress_seconds += time.perf_counter() - start_time
+
+        # Incompressible values are stored as-is
+        if len(compressed) >= len(data):
+            return data
+
+        stats.compressed_writes += 1
+        stats.bytes_in += len(data)
+        stats.bytes_out += len(compressed)
+        return compressed
+
+    def decompress(self, key: str, data: bytes) -> bytes:
+        """
+        Decompress a stored value if it carries a compression marker.
+
+        Args:
+            key: Cache key (without the cache prefix)
+            data: Stored bytes
+
+        Returns:
+            Codec-encoded value
+
+        Raises:
+            MissingDictionaryError: If the value needs a dictionary that is
+                not loaded yet
+        """
+        if not is_compressed(data):
+            return data
+
+        start_time = time.perf_counter()
+        decompressed = decompress_bytes(data, self.dictionaries)
+        stats = self._stats_for(self.family_for(key))
+        stats.decompress_seconds += time.perf_counter() - start_time
+        stats.decompressed_reads += 1
+        return decompressed
+
+    def train_dictionary(
+        self, family: str, samples: List[bytes], dict_size: int = 16384
+    ) -> Optional[bytes]:
+        """
+        Train a zstd dictionary for a family from sampled encoded values.
+
+        Args:
+            family: Family key prefix
+            samples: Codec-encoded (uncompressed) values from the family
+            dict_size: Target dictionary size in bytes
+
+        Returns:
+            Serialized dictionary, or None if training was not possible
+        """
+        if not ZSTD_AVAILABLE:
+            logger.warning("zstandard is not installed, skipping dictionary training")
+            return None
+
+        try:
+            dictionary = zstandard.train_dictionary(dict_size, samples)
+        except Exception as e:
+            logger.error(f"Error training compression dictionary for {family}: {e}")
+            return None
+
+        self.load_dictionary(family, dictionary.as_bytes())
+        logger.info(
+            f"Trained compression dictionary {dictionary.dict_id()} for {family} "
+            f"from {len(samples)} samples"
+        )
+        return dictionary.as_bytes()
+
+    def load_dictionary(self, family: Optional[str], dict_bytes: bytes) -> int:
+        """
+        Register a serialized zstd dictionary.
+
+        Args:
+            family: Family that should write with it, or None for read-only
+            dict_bytes: Serialized dictionary
+
+        Returns:
+            Dictionary ID
+        """
+        dictionary = zstandard.ZstdCompressionDict(dict_bytes)
+        dict_id = dictionary.dict_id()
+        self.dictionaries[dict_id] = dictionary
+        if family is not None:
+            self.family_dictionaries[family] = dictionary
+        return int(dict_id)
+
+    def dictionary_fields(self, family: str, dict_bytes: bytes) -> Dict[str, bytes]:
+        """Return the DICTIONARIES_KEY hash fields for a trained dictionary."""
+        dict_id = zstandard.ZstdCompressionDict(dict_bytes).dict_id()
+        return {f"id:{dict_id}": dict_bytes, f"family:{family}": dict_bytes}
+
+    def load_dictionaries(self, stored: Dict[Any, bytes]) -> int:
+        """
+        Register dictionaries read from the DICTIONARIES_KEY hash.
+
+        Args:
+            stored: Hash fields and serialized dictionaries
+
+        Returns:
+            Number of dictionaries loaded
+        """
+        if not ZSTD_AVAILABLE:
+            return 0
+
+        loaded = 0
+        for field, dict_bytes in stored.items():
+            name = field.decode("utf-8") if isinstance(field, bytes) else field
+            kind, _, family = name.partition(":")
+            self.load_dictionary(family if kind == "family" else None, dict_bytes)
+            loaded += 1
+        return loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get compression statistics per family.
+
+        Returns:
+            Dictionary with bytes saved and CPU time per family and in total
+        """
+        families: Dict[str, Dict[str, Any]] = {}
+        for family, stats in self.stats.items():
+            families[family] = {
+                "writes": stats.writes,
+                "compressed_writes": stats.compressed_writes,
+                "bytes_in": stats.bytes_in,
+                "bytes_out": stats.bytes_out,
+                "bytes_saved": stats.bytes_saved,
+                "compression_ratio": stats.compression_ratio,
+                "compress_ms": stats.compress_seconds * 1000,
+                "decompressed_reads": stats.decompressed_reads,
+                "decompress_ms": stats.decompress_seconds * 1000,
+                "algorithm": (
+                    "zstd+dict"
+                    if family in self.family_dictionaries
+                    else self.families.get(family, self.algorithm)
+                ),
+            }
+
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "bytes_saved": sum(s.bytes_saved for s in self.stats.values()),
+            "cpu_ms": sum(
+                (s.compress_seconds + s.decompress_seconds) * 1000
+                for s in self.stats.values()
+            ),
+            "families": families,
+        }
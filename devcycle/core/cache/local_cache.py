@@ -0,0 +1,420 @@
+"""
+In-process L1 cache for DevCycle.
+
+This module provides a bounded LRU/TTL cache that sits in front of Redis for
+rarely changing, frequently read data such as agent metadata and capability
+sets. Entries are grouped into key families (matched by key prefix), each
+with its own size bound and TTL. Coherence across API workers is maintained
+by broadcasting invalidation messages on a Redis Pub/Sub channel. The same
+channel announces TTL policy changes, after which each worker reloads the
+persisted policies.
+"""
+
+import asyncio
+import copy
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ..logging import get_logger
+from .ttl_policy import TTLPolicyTable, get_ttl_policy_table
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class LocalCacheFamily:
+    """Sizing and expiry for a family of keys sharing a prefix."""
+
+    max_entries: int
+    ttl: float  # seconds
+
+
+@dataclass
+class TierStats:
+    """Hit/miss counters for a single cache tier."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Hit ratio for this tier (0.0 to 1.0)."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+# Key families cached in L1 by default. Keys are the ACPCache keys (without the
+# Redis prefix); anything that does not match a family bypasses L1.
+DEFAULT_LOCAL_CACHE_FAMILIES: Dict[str, LocalCacheFamily] = {
+    "agents:status:": LocalCacheFamily(max_entries=1024, ttl=5),
+    "cache:agents:": LocalCacheFamily(max_entries=1024, ttl=60),
+    "capabilities:": LocalCacheFamily(max_entries=256, ttl=30),
+    "cache:templates:": LocalCacheFamily(max_entries=256, ttl=300),
+}
+
+INVALIDATION_CHANNEL = "devcycle:cache:invalidate"
+
+
+class LocalCache:
+    """Bounded in-process cache kept coherent through Redis Pub/Sub."""
+
+    def __init__(
+        self,
+        families: Optional[Dict[str, LocalCacheFamily]] = None,
+        invalidation_channel: str = INVALIDATION_CHANNEL,
+        ttl_policies: Optional[TTLPolicyTable] = None,
+    ):
+        """
+        Initialize local cache.
+
+        Args:
+            families: Mapping of key prefix to family sizing
+            invalidation_channel: Redis channel used for cross-worker invalidation
+            ttl_policies: Policy table to reload when a change is announced
+        """
+        self.families = dict(
+            families if families is not None else DEFAULT_LOCAL_CACHE_FAMILIES
+        )
+        # Longest prefix first so nested families win over broader ones
+        self._prefixes = sorted(self.families, key=len, reverse=True)
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {
+            prefix: OrderedDict() for prefix in self.families
+        }
+        self.invalidation_channel = invalidation_channel
+        self.instance_id = uuid.uuid4().hex
+        self.ttl_policies = ttl_policies
+
+        self.l1_stats = TierStats()
+        self.l2_stats = TierStats()
+        self.evictions = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+
+        self._redis: Optional[redis.Redis] = None
+        self._pubsub: Optional[redis.client.PubSub] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._reload_tasks: "set[asyncio.Task[None]]" = set()
+        self._running = False
+
+    def _family_for(self, key: str) -> Optional[str]:
+        """Return the family prefix for a key, or None if it is not cached."""
+        for prefix in self._prefixes:
+            if key.startswith(prefix):
+                return prefix
+        return None
+
+    def is_cached_family(self, key: str) -> bool:
+        """Check whether a key belongs to an L1 family."""
+        return self._family_for(key) is not None
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key in L1.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        family = self._family_for(key)
+        if family is None:
+            return False, None
+
+        entries = self._entries[family]
+        entry = entries.get(key)
+        if entry is None:
+            self.l1_stats.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del entries[key]
+            self.l1_stats.misses += 1
+            return False, None
+
+        entries.move_to_end(key)
+        self.l1_stats.hits += 1
+        # Hand out copies so callers cannot mutate the cached value in place
+        if isinstance(value, (dict, list, set)):
+            return True, copy.deepcopy(value)
+        return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in L1 if the key belongs to a cached family.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        family = self._family_for(key)
+        if family is None:
+            return
+
+        config = self.families[family]
+        entries = self._entries[family]
+        if isinstance(value, (dict, list, set)):
+            value = copy.deepcopy(value)
+        entries[key] = (time.monotonic() + config.ttl, value)
+        entries.move_to_end(key)
+
+        while len(entries) > config.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_l2(self, hit: bool) -> None:
+        """Record the outcome of a Redis lookup that followed an L1 miss."""
+        if hit:
+            self.l2_stats.hits += 1
+        else:
+            self.l2_stats.misses += 1
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Drop a key from L1.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if an entry was removed
+        """
+        family = self._family_for(key)
+        if family is None:
+            return False
+        return self._entries[family].pop(key, None) is not None
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """
+        Drop all L1 entries whose key starts with a prefix.
+
+        Args:
+            prefix: Key prefix ("" clears everything)
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for entries in self._entries.values():
+            for key in [k for k in entries if k.startswith(prefix)]:
+                del entries[key]
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop all L1 entries."""
+        for entries in self._entries.values():
+            entries.clear()
+
+    def _apply_invalidation(
+        self, keys: Iterable[str], prefixes: Iterable[str] = ()
+    ) -> None:
+        """Apply an invalidation to the local entries."""
+        for key in keys:
+            self.invalidate(key)
+        for prefix in prefixes:
+            self.invalidate_prefix(prefix)
+
+    async def publish_invalidation(
+        self, keys: Iterable[str] = (), prefixes: Iterable[str] = ()
+    ) -> None:
+        """
+        Invalidate keys locally and on every other worker.
+
+        Args:
+            keys: Exact keys to invalidate
+            prefixes: Key prefixes to invalidate
+        """
+        key_list = [key for key in keys if self.is_cached_family(key)]
+        prefix_list = list(prefixes)
+        if not key_list and not prefix_list:
+            return
+
+        self._apply_invalidation(key_list, prefix_list)
+
+        if self._redis is None:
+            return
+
+        try:
+            message = json.dumps(
+                {
+                    "origin": self.instance_id,
+                    "keys": key_list,
+                    "prefixes": prefix_list,
+                }
+            )
+            await self._redis.publish(self.invalidation_channel, message)
+            self.invalidations_sent += 1
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation: {e}")
+
+    async def start(self, redis_client: redis.Redis) -> None:
+        """
+        Start listening for invalidation messages from other workers.
+
+        Args:
+            redis_client: Async Redis client used for Pub/Sub
+        """
+        if self._running:
+            return
+
+        self._redis = redis_client
+        self._pubsub = redis_client.pubsub()
+        await self._pubsub.subscribe(self.invalidation_channel)
+        self._running = True
+        self._listener_task = asyncio.create_task(self._listen())
+        # Subscribed first, so no policy change announced from now on is missed
+        await self._reload_ttl_policies()
+        logger.info("Local cache invalidation listener started")
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if not self._running:
+            return
+
+        self._running = False
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.error(f"Error closing invalidation subscription: {e}")
+            self._pubsub = None
+
+        # Without a listener we can no longer trust entries to stay coherent
+        self.clear()
+        logger.info("Local cache invalidation listener stopped")
+
+    async def _listen(self) -> None:
+        """Background task applying invalidations published by other workers."""
+        while self._running:
+            try:
+                if self._pubsub is None:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message and message["type"] == "message":
+                    self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing cache invalidation: {e}")
+                # Drop everything rather than risk serving stale entries
+                self.clear()
+                await asyncio.sleep(1)
+
+    async def _reload_ttl_policies(self) -> None:
+        """Replace the policy table with the persisted policies."""
+        if self.ttl_policies is None or self._redis is None:
+            return
+        try:
+            count = await self.ttl_policies.load(self._redis)
+            logger.info(f"Loaded {count} TTL policies")
+        except Exception as e:
+            logger.error(f"Error loading TTL policies: {e}")
+
+    def _handle_invalidation(self, data: Any) -> None:
+        """Apply a single invalidation message."""
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        payload = json.loads(data)
+        if payload.get("ttl_policies"):
+            task = asyncio.create_task(self._reload_ttl_policies())
+            self._reload_tasks.add(task)
+            task.add_done_callback(self._reload_tasks.discard)
+            return
+        if payload.get("origin") == self.instance_id:
+            return
+        self.invalidations_received += 1
+        self._apply_invalidation(payload.get("keys", []), payload.get("prefixes", []))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-tier hit statistics.
+
+        Returns:
+            Dictionary with L1/L2 hit ratios and entry counts
+        """
+        families: Dict[str, Dict[str, Any]] = {}
+        for prefix, config in self.families.items():
+            families[prefix] = {
+                "entries": len(self._entries[prefix]),
+                "max_entries": config.max_entries,
+                "ttl": config.ttl,
+            }
+
+        lookups = self.l1_stats.hits + self.l1_stats.misses
+        return {
+            "l1": {
+                "hits": self.l1_stats.hits,
+                "misses": self.l1_stats.misses,
+                "hit_ratio": self.l1_stats.hit_ratio,
+            },
+            "l2": {
+                "hits": self.l2_stats.hits,
+                "misses": self.l2_stats.misses,
+                "hit_ratio": self.l2_stats.hit_ratio,
+            },
+            "overall_hit_ratio": (
+                (self.l1_stats.hits + self.l2_stats.hits) / lookups
+                if lookups > 0
+                else 0.0
+            ),
+            "redis_round_trips_saved": self.l1_stats.hits,
+            "evictions": self.evictions,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "listening": self._running,
+            "families": families,
+        }
+
+
+# Global local cache instance
+_local_cache_instance: Optional[LocalCache] = None
+
+
+def get_local_cache() -> LocalCache:
+    """
+    Get the global local cache instance.
+
+    Returns:
+        LocalCache instance
+    """
+    global _local_cache_instance
+
+    if _local_cache_instance is None:
+        _local_cache_instance = LocalCache(ttl_policies=get_ttl_policy_table())
+
+    return _local_cache_instance
+
+
+async def publish_ttl_policy_change(
+    redis_client: redis.Redis, channel: str = INVALIDATION_CHANNEL
+) -> None:
+    """
+    Tell every worker's local cache to reload the persisted TTL policies.
+
+    Args:
+        redis_client: Async Redis client to publish with
+        channel: Invalidation channel the local caches listen on
+    """
+    try:
+        await redis_client.publish(channel, json.dumps({"ttl_policies": True}))
+    except Exception as e:
+        logger.error(f"Error announcing TTL policy change: {e}")
@@ -0,0 +1,297 @@
+"""
+Server-side Lua scripts for atomic ACP state transitions.
+
+Each script performs a complete state transition (several keys, TTL refresh,
+index maintenance and optional event publication) in a single round trip and
+returns the new state. Scripts are invoked with EVALSHA, on their own or
+queued on a pipeline; when Redis reports NOSCRIPT (after a restart, failover
+or SCRIPT FLUSH) the script is loaded again and the call retried.
+
+Hash values of workflow state are JSON-encoded by the caller, so numeric
+fields such as completed_steps can be updated with HINCRBY in place.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Set progress and current step on an existing workflow state hash.
+# KEYS: state hash, active workflow index
+# ARGV: workflow_id, current_step (JSON), progress (JSON), ttl, index score
+ADVANCE_PROGRESS = """
+if redis.call("exists", KEYS[1]) == 0 then
+    return false
+end
+redis.call("hset", KEYS[1], "current_step", ARGV[2], "progress", ARGV[3])
+redis.call("expire", KEYS[1], ARGV[4])
+redis.call("zadd", KEYS[2], ARGV[5], ARGV[1])
+return redis.call("hgetall", KEYS[1])
+"""
+
+# Store a step result, count the step as completed once, recompute progress
+# and publish completion events. The event on the logged channel is also
+# appended to the event stream, so the log and the state change agree, and
+# its copies are published stamped with the entry ID as by LOG_AND_PUBLISH.
+# KEYS: state hash, step result key, completed step set, active workflow index,
+#       then the event stream if an event is logged
+# ARGV: workflow_id, step_id, step value, ttl, index score, stream maxlen,
+#       logged channel ("" for none), then channel/payload pairs to publish
+COMPLETE_STEP = """
+local ttl = tonumber(ARGV[4])
+redis.call("set", KEYS[2], ARGV[3], "EX", ttl)
+local first_completion = redis.call("sadd", KEYS[3], ARGV[2])
+redis.call("expire", KEYS[3], ttl)
+
+if redis.call("exists", KEYS[1]) == 1 then
+    local completed = tonumber(redis.call("hget", KEYS[1], "completed_steps") or "0")
+    if first_completion == 1 then
+        completed = redis.call("hincrby", KEYS[1], "completed_steps", 1)
+    end
+    local total = tonumber(redis.call("hget", KEYS[1], "total_steps") or "0")
+    if total and total > 0 then
+        local progress = math.floor(completed * 100 / total)
+        redis.call("hset", KEYS[1], "progress", string.format("%d", progress))
+    end
+    redis.call("expire", KEYS[1], ttl)
+    redis.call("zadd", KEYS[4], ARGV[5], ARGV[1])
+end
+
+local logged, stamped
+for i = 8, #ARGV, 2 do
+    if KEYS[5] and ARGV[i] == ARGV[7] then
+        logged = ARGV[i + 1]
+        local id = redis.call("xadd", KEYS[5], "MAXLEN", "~", ARGV[6], "*",
+            "channel", ARGV[i], "event", logged)
+        local body = string.sub(logged, 2)
+        if string.sub(body, 1, 1) ~= "}" then
+            body = ", " .. body
+        end
+        stamped = '{"stream_id": "' .. id .. '"' .. body
+        break
+    end
+end
+for i = 8, #ARGV, 2 do
+    if stamped and ARGV[i + 1] == logged then
+        redis.call("publish", ARGV[i], stamped)
+    else
+        redis.call("publish", ARGV[i], ARGV[i + 1])
+    end
+end
+return redis.call("hgetall", KEYS[1])
+"""
+
+# Write agent status fields, adjust the run count and refresh the TTL, then
+# move the agent between status indexes. A value of another type left in the
+# key by older releases (a JSON string) is replaced. Without status fields
+# nothing is written for an agent that has no status hash.
+# KEYS: status hash, status indexes
+# ARGV: agent_id, ttl, index score, run count delta, 1 if the status is set,
+#       position of the status among the indexes (0 if untracked), then
+#       field/value pairs
+# Returns current_runs, false if it is unset or nothing was written
+WRITE_AGENT_STATUS = """
+local kind = redis.call("type", KEYS[1])["ok"]
+if kind ~= "hash" and kind ~= "none" then
+    redis.call("del", KEYS[1])
+    kind = "none"
+end
+if kind == "none" and #ARGV < 7 then
+    return false
+end
+
+if #ARGV >= 7 then
+    redis.call("hset", KEYS[1], unpack(ARGV, 7))
+end
+local delta = tonumber(ARGV[4])
+if delta ~= 0 then
+    redis.call("hincrby", KEYS[1], "current_runs", delta)
+end
+redis.call("expire", KEYS[1], ARGV[2])
+
+local target = tonumber(ARGV[6])
+for i = 2, #KEYS do
+    if ARGV[5] == "0" then
+        redis.call("zadd", KEYS[i], "XX", ARGV[3], ARGV[1])
+    elseif i - 1 == target then
+        redis.call("zadd", KEYS[i], ARGV[3], ARGV[1])
+    else
+        redis.call("zrem", KEYS[i], ARGV[1])
+    end
+end
+return redis.call("hget", KEYS[1], "current_runs")
+"""
+
+# Register an agent: replace its status hash, move it to its status index,
+# store its metadata and add it to each capability set. The reverse index
+# of the agent's capabilities is rewritten, and the agent is removed from
+# capability sets it no longer provides.
+# KEYS: status hash, metadata key, reverse capability index,
+#       status indexes (ARGV[7] of them), capability sets (ARGV[9] of them),
+#       stale capability sets
+# ARGV: agent_id, status ttl, index score, metadata value, metadata ttl,
+#       capability ttl, number of status indexes, position of the agent's
+#       status among them (0 if untracked), number of capability sets,
+#       then capability names, then status field/value pairs
+REGISTER_AGENT = """
+local index_count = tonumber(ARGV[7])
+local target = tonumber(ARGV[8])
+local capability_count = tonumber(ARGV[9])
+local first_field = 10 + capability_count
+
+redis.call("del", KEYS[1])
+local fields = {}
+for i = first_field, #ARGV do
+    fields[#fields + 1] = ARGV[i]
+end
+if #fields > 0 then
+    redis.call("hset", KEYS[1], unpack(fields))
+end
+redis.call("expire", KEYS[1], ARGV[2])
+
+for i = 1, index_count do
+    if i == target then
+        redis.call("zadd", KEYS[3 + i], ARGV[3], ARGV[1])
+    else
+        redis.call("zrem", KEYS[3 + i], ARGV[1])
+    end
+end
+
+redis.call("set", KEYS[2], ARGV[4], "EX", ARGV[5])
+
+local first_set = 4 + index_count
+for i = first_set, first_set + capability_count - 1 do
+    redis.call("sadd", KEYS[i], ARGV[1])
+    redis.call("expire", KEYS[i], ARGV[6])
+end
+for i = first_set + capability_count, #KEYS do
+    redis.call("srem", KEYS[i], ARGV[1])
+end
+
+redis.call("del", KEYS[3])
+if capability_count > 0 then
+    redis.call("sadd", KEYS[3], unpack(ARGV, 10, first_field - 1))
+    redis.call("expire", KEYS[3], ARGV[5])
+end
+return redis.call("hgetall", KEYS[1])
+"""
+
+
+@dataclass
+class LuaScript:
+    """A Lua script and its SHA1 digest."""
+
+    name: str
+    source: str
+    sha: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Compute the digest Redis uses to identify the script."""
+        self.sha = hashlib.sha1(self.source.encode("utf-8")).hexdigest()
+
+
+ACP_SCRIPTS: Dict[str, str] = {
+    "advance_progress": ADVANCE_PROGRESS,
+    "complete_step": COMPLETE_STEP,
+    "register_agent": REGISTER_AGENT,
+    "write_agent_status": WRITE_AGENT_STATUS,
+}
+
+
+class ScriptLibrary:
+    """Registered Lua scripts invoked by SHA with reload on NOSCRIPT."""
+
+    def __init__(self, client: redis.Redis, scripts: Dict[str, str] = ACP_SCRIPTS):
+        """
+        Initialize script library.
+
+        Args:
+            client: Async Redis client
+            scripts: Mapping of script name to Lua source
+        """
+        self.client = client
+        self.scripts = {
+            name: LuaScript(name, source) for name, source in scripts.items()
+        }
+        self.reloads = 0
+
+    async def load_all(self) -> None:
+        """Load every script into the Redis script cache."""
+        for script in self.scripts.values():
+            await self.client.script_load(script.source)
+
+    async def run(self, name: str, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        """
+        Run a script by name.
+
+        Args:
+            name: Script name
+            keys: Keys the script touches
+            args: Script arguments
+
+        Returns:
+            Script result
+        """
+        script = self.scripts[name]
+        try:
+            return await self.client.evalsha(script.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            # Script cache was flushed (restart, failover); load and retry once
+            self.reloads += 1
+            logger.info(f"Reloading Lua script {name}")
+            await self.client.script_load(script.source)
+            return await self.client.evalsha(script.sha, len(keys), *keys, *args)
+
+    def queue(
+        self, pipe: Any, name: str, keys: Sequence[str], args: Sequence[Any]
+    ) -> None:
+        """
+        Queue a script call by SHA on a pipeline.
+
+        Run the pipeline with execute, which reloads the script if needed.
+        """
+        script = self.scripts[name]
+        pipe.evalsha(script.sha, len(keys), *keys, *args)
+
+    async def execute(self, pipe: Any) -> List[Any]:
+        """
+        Execute a pipeline holding queued script calls.
+
+        Calls that failed with NOSCRIPT are retried once the scripts are
+        loaded again, after the rest of the pipeline has run.
+
+        Returns:
+            One reply per queued command
+
+        Raises:
+            ResponseError: The first error of any other command
+        """
+        commands: List[Tuple[Any, Any]] = list(pipe.command_stack)
+        replies = list(await pipe.execute(raise_on_error=False))
+        missing = [
+            i for i, reply in enumerate(replies) if isinstance(reply, NoScriptError)
+        ]
+        if missing:
+            # Script cache was flushed (restart, failover); load and retry once
+            self.reloads += 1
+            logger.info("Reloading Lua scripts for a pipeline")
+            await self.load_all()
+            for i in missing:
+                args, options = commands[i]
+                replies[i] = await self.client.execute_command(*args, **options)
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+
+def pairs_to_dict(flat: List[Any]) -> Dict[str, Any]:
+    """Convert a flat HGETALL reply from a script into a dictionary."""
+    return {flat[i]: flat[i + 1] for i in range(0, len(flat), 2)}
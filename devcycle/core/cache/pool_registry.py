@@ -0,0 +1,192 @@
+"""
+Process-wide Redis connection pool registry for DevCycle.
+
+Every subsystem that talks to Redis (caches, token blacklist, session
+monitor, events) gets its connections from here, so an API worker holds one
+pool per (URL, db, decode mode) instead of one per service object. Pools are
+blocking and sized from RedisConfig.max_connections: when every connection
+is busy, callers wait up to the socket timeout rather than failing at once.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+import redis
+import redis.asyncio as aioredis
+
+from ..config import get_config
+from ..config.settings import RedisConfig
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+# (url, db, decode_responses)
+PoolKey = Tuple[str, int, bool]
+
+
+@dataclass
+class PoolUsage:
+    """Connection counts of one pool."""
+
+    max_connections: int
+    in_use: int
+    idle: int
+
+
+def _pool_usage(
+    pool: Union[redis.ConnectionPool, aioredis.ConnectionPool],
+) -> PoolUsage:
+    """Count busy and idle connections of a redis-py pool."""
+    if isinstance(pool, redis.BlockingConnectionPool):
+        # The sync queue holds idle connections and None for unopened slots
+        idle = sum(1 for connection in list(pool.pool.queue) if connection)
+        in_use = len(pool._connections) - idle
+    else:
+        idle = len(pool._available_connections)
+        in_use = len(pool._in_use_connections)
+    return PoolUsage(max_connections=pool.max_connections, in_use=in_use, idle=idle)
+
+
+class RedisPoolRegistry:
+    """Shared sync and async Redis connection pools."""
+
+    def __init__(self, config: Optional[RedisConfig] = None) -> None:
+        """
+        Initialize pool registry.
+
+        Args:
+            config: Redis settings (defaults to the current application config)
+        """
+        self._config = config
+        self._pools: Dict[PoolKey, redis.BlockingConnectionPool] = {}
+        self._async_pools: Dict[PoolKey, aioredis.BlockingConnectionPool] = {}
+
+    @property
+    def config(self) -> RedisConfig:
+        """Redis settings used for new pools."""
+        return self._config or get_config().redis
+
+    def _key(self, db: Optional[int], decode_responses: bool) -> PoolKey:
+        """Get the registry key for a pool."""
+        config = self.config
+        return (
+            f"redis://{config.host}:{config.port}",
+            config.db if db is None else db,
+            decode_responses,
+        )
+
+    def _pool_kwargs(self, db: int, decode_responses: bool) -> Dict[str, Any]:
+        """Get the pool settings shared by both pool flavours."""
+        config = self.config
+        return {
+            "max_connections": config.max_connections,
+            "timeout": config.socket_timeout,
+            "host": config.host,
+            "port": config.port,
+            "password": config.password,
+            "db": db,
+            "decode_responses": decode_responses,
+            "socket_timeout": config.socket_timeout,
+            "socket_connect_timeout": config.socket_connect_timeout,
+            "retry_on_timeout": config.retry_on_timeout,
+            "health_check_interval": config.health_check_interval,
+        }
+
+    def get_pool(
+        self, decode_responses: bool = True, db: Optional[int] = None
+    ) -> redis.BlockingConnectionPool:
+        """Get the shared sync pool, creating it on first use."""
+        key = self._key(db, decode_responses)
+        if key not in self._pools:
+            self._pools[key] = redis.BlockingConnectionPool(
+                **self._pool_kwargs(key[1], decode_responses)
+            )
+            logger.info(f"Created Redis connection pool {key}")
+        return self._pools[key]
+
+    def get_async_pool(
+        self, decode_responses: bool = True, db: Optional[int] = None
+    ) -> aioredis.BlockingConnectionPool:
+        """Get the shared async pool, creating it on first use."""
+        key = self._key(db, decode_responses)
+        if key not in self._async_pools:
+            self._async_pools[key] = aioredis.BlockingConnectionPool(
+                **self._pool_kwargs(key[1], decode_responses)
+            )
+            logger.info(f"Created async Redis connection pool {key}")
+        return self._async_pools[key]
+
+    def get_client(
+        self, decode_responses: bool = True, db: Optional[int] = None
+    ) -> redis.Redis:
+        """Get a sync client on the shared pool."""
+        return redis.Redis(connection_pool=self.get_pool(decode_responses, db))
+
+    def get_async_client(
+        self, decode_responses: bool = True, db: Optional[int] = None
+    ) -> aioredis.Redis:
+        """Get an async client on the shared pool."""
+        return aioredis.Redis(connection_pool=self.get_async_pool(decode_responses, db))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection counts of every pool."""
+        pools = []
+        for kind, registry in (("sync", self._pools), ("async", self._async_pools)):
+            for (url, db, decode_responses), pool in registry.items():
+                usage = _pool_usage(pool)
+                pools.append(
+                    {
+                        "kind": kind,
+                        "url": url,
+                        "db": db,
+                        "decode_responses": decode_responses,
+                        "max_connections": usage.max_connections,
+                        "in_use": usage.in_use,
+                        "idle": usage.idle,
+                    }
+                )
+        return {
+            "pools": pools,
+            "total_in_use": sum(pool["in_use"] for pool in pools),
+            "total_idle": sum(pool["idle"] for pool in pools),
+        }
+
+    async def aclose(self) -> None:
+        """Disconnect and forget every pool."""
+        for key, pool in list(self._pools.items()):
+            try:
+                pool.disconnect()
+            except Exception as e:
+                logger.error(f"Error closing Redis connection pool {key}: {e}")
+        for key, async_pool in list(self._async_pools.items()):
+            try:
+                await async_pool.disconnect()
+            except Exception as e:
+                logger.error(f"Error closing async Redis connection pool {key}: {e}")
+        self._pools.clear()
+        self._async_pools.clear()
+
+
+# Global pool registry instance
+_pool_registry_instance: Optional[RedisPoolRegistry] = None
+
+
+def get_pool_registry() -> RedisPoolRegistry:
+    """
+    Get the process-wide pool registry.
+
+    Returns:
+        RedisPoolRegistry instance
+    """
+    global _pool_registry_instance
+    if _pool_registry_instance is None:
+        _pool_registry_instance = RedisPoolRegistry()
+    return _pool_registry_instance
+
+
+async def close_pool_registry() -> None:
+    """Close every shared pool; the next get_pool_registry() starts afresh."""
+    global _pool_registry_instance
+    if _pool_registry_instance is not None:
+        await _pool_registry_instance.aclose()
+        _pool_registry_instance = None
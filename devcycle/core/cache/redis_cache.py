@@ -5,13 +5,21 @@ This module provides a Redis-backed caching service that can be used throughout
 the application for improved performance and distributed caching capabilities.
 """
 
-import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import redis
 
 from ..config import get_config
 from ..logging import get_logger
+from .codecs import CodecRegistry
+from .compression import (
+    DICTIONARIES_KEY,
+    MissingDictionaryError,
+    ValueCompressor,
+    decompress_bytes,
+)
+from .pool_registry import get_pool_registry
+from .scan import count_matching, delete_matching, scan_batches
 
 logger = get_logger(__name__)
 
@@ -19,23 +27,40 @@ logger = get_logger(__name__)
 class RedisCache:
     """Redis-based caching service."""
 
-    def __init__(self, key_prefix: str = "devcycle:cache:") -> None:
+    def __init__(
+        self,
+        key_prefix: str = "devcycle:cache:",
+        codecs: Optional[CodecRegistry] = None,
+        compressor: Optional[ValueCompressor] = None,
+    ) -> None:
         """
         Initialize Redis cache service.
 
         Args:
             key_prefix: Prefix for all cache keys
+            codecs: Value codecs per key family (defaults to DEFAULT_CODEC_FAMILIES)
+            compressor: Value compression (defaults to the Redis config settings)
         """
         config = get_config()
+        pools = get_pool_registry()
         self.redis_client = redis.Redis(
-            host=config.redis.host,
-            port=config.redis.port,
-            password=config.redis.password,
-            db=config.redis.db,
-            decode_responses=True,
-            socket_timeout=config.redis.socket_timeout,
-            socket_connect_timeout=config.redis.socket_connect_timeout,
-            max_connections=config.redis.max_connections,
+            connection_pool=pools.get_pool(decode_responses=True)
+        )
+        # Cached values are codec-encoded bytes, so they are read and written
+        # through a client that does not decode replies
+        self.binary_client = redis.Redis(
+            connection_pool=pools.get_pool(decode_responses=False)
+        )
+        self.codecs = codecs or CodecRegistry(
+            legacy_json_writes=config.redis.cache_legacy_json_writes
+        )
+        # Readers that predate compression cannot decompress, so legacy
+        # writes also disable it
+        self.compressor = compressor or ValueCompressor(
+            enabled=config.redis.cache_compression_enabled
+            and not config.redis.cache_legacy_json_writes,
+            algorithm=config.redis.cache_compression_algorithm,
+            threshold=config.redis.cache_compression_threshold,
         )
         self.key_prefix = key_prefix
         logger.info("Redis cache service initialized")
@@ -44,6 +69,72 @@ class RedisCache:
         """Get the full Redis key with prefix."""
         return f"{self.key_prefix}{key}"
 
+    def _decompress(self, key: str, value: bytes) -> bytes:
+        """Decompress a stored value, loading its zstd dictionary if needed."""
+        try:
+            return self.compressor.decompress(key, value)
+        except MissingDictionaryError:
+            # Trained by another worker since we last loaded dictionaries
+            self.load_compression_dictionaries()
+            return self.compressor.decompress(key, value)
+
+    def load_compression_dictionaries(self) -> int:
+        """
+        Load the zstd dictionaries trained by any worker from Redis.
+
+        Returns:
+            Number of dictionaries loaded
+        """
+        try:
+            stored = self.binary_client.hgetall(self._get_key(DICTIONARIES_KEY))
+            return self.compressor.load_dictionaries(stored)
+        except Exception as e:
+            logger.error(f"Error loading compression dictionaries: {e}")
+            return 0
+
+    def train_compression_dictionary(self, family: str, sample_size: int = 500) -> bool:
+        """
+        Train a zstd dictionary for a key family from sampled cached values.
+
+        The dictionary is stored in Redis so other workers can read values
+        compressed with it and start writing with it on their next load.
+
+        Args:
+            family: Key family prefix, e.g. "workflows:steps:"
+            sample_size: Maximum number of values to sample
+
+        Returns:
+            True if a dictionary was trained and stored, False otherwise
+        """
+        samples: List[bytes] = []
+        try:
+            for keys in scan_batches(self.binary_client, self._get_key(f"{family}*")):
+                for value in self.binary_client.mget(keys):
+                    if value is None:
+                        continue
+                    try:
+                        samples.append(
+                            decompress_bytes(value, self.compressor.dictionaries)
+                        )
+                    except Exception:
+                        continue
+                if len(samples) >= sample_size:
+                    break
+
+            dict_bytes = self.compressor.train_dictionary(family, samples[:sample_size])
+            if dict_bytes is None:
+                return False
+
+            self.binary_client.hset(
+                self._get_key(DICTIONARIES_KEY),
+                mapping=self.compressor.dictionary_fields(family, dict_bytes),
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error training compression dictionary for {family}: {e}")
+            return False
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get a value from the cache.
@@ -56,21 +147,30 @@ class RedisCache:
         """
         try:
             full_key = self._get_key(key)
-            value = self.redis_client.get(full_key)
+            value = self.binary_client.get(full_key)
 
             if value is None:
                 return None
 
-            # Try to deserialize JSON, fallback to string
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self.codecs.decode(self._decompress(key, value))
 
         except Exception as e:
             logger.error(f"Error getting cache value for key {key}: {e}")
             return None
 
+    def encode_value(self, key: str, value: Any) -> bytes:
+        """
+        Encode a value exactly as set() stores it.
+
+        Args:
+            key: Cache key (without prefix), used to pick codec and compression
+            value: Value to encode
+
+        Returns:
+            Stored representation of the value
+        """
+        return self.compressor.compress(key, self.codecs.encode(key, value))
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
         Set a value in the cache.
@@ -85,18 +185,13 @@ class RedisCache:
         """
         try:
             full_key = self._get_key(key)
-
-            # Serialize value to JSON if it's not a string
-            if isinstance(value, str):
-                serialized_value = value
-            else:
-                serialized_value = json.dumps(value)
+            serialized_value = self.encode_value(key, value)
 
             redis_result: bool | None
             if ttl is not None:
-                redis_result = self.redis_client.setex(full_key, ttl, serialized_value)
+                redis_result = self.binary_client.setex(full_key, ttl, serialized_value)
             else:
-                redis_result = self.redis_client.set(full_key, serialized_value)
+                redis_result = self.binary_client.set(full_key, serialized_value)
 
             return redis_result is not None and bool(redis_result)
 
@@ -172,13 +267,7 @@ class RedisCache:
         """
         try:
             full_pattern = self._get_key(pattern)
-            keys = self.redis_client.keys(full_pattern)
-
-            if not keys:
-                return 0
-
-            result = self.redis_client.delete(*keys)
-            return int(result) if result is not None else 0
+            return delete_matching(self.redis_client, full_pattern)
 
         except Exception as e:
             logger.error(f"Error clearing cache pattern {pattern}: {e}")
@@ -202,14 +291,15 @@ class RedisCache:
         """
         try:
             info = self.redis_client.info()
-            keys = self.redis_client.keys(self._get_key("*"))
+            total_keys = count_matching(self.redis_client, self._get_key("*"))
 
             return {
-                "total_keys": len(keys),
+                "total_keys": total_keys,
                 "redis_connected": True,
                 "redis_version": info.get("redis_version", "unknown"),
                 "used_memory": info.get("used_memory_human", "unknown"),
                 "connected_clients": info.get("connected_clients", 0),
+                "compression": self.compressor.get_stats(),
             }
 
         except Exception as e:
@@ -0,0 +1,256 @@
+"""
+Incremental key iteration helpers for DevCycle.
+
+KEYS walks the whole keyspace in a single command and blocks every other
+client while it runs. These helpers use SCAN instead, yielding keys in small
+batches so the server can interleave other work. Each helper has an async
+variant for redis.asyncio clients and a sync variant for redis-py clients.
+
+Callers that need to inspect the matched keys can run a follow-up command per
+key; the follow-ups for a batch are sent in a single pipeline round trip.
+"""
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+# Hint passed to SCAN COUNT; Redis may return more or fewer keys per call
+DEFAULT_SCAN_COUNT = 500
+
+# Follow-up callbacks queue one command per key on the batch pipeline
+FollowUp = Callable[[Any, str], Any]
+
+
+@dataclass
+class ScanState:
+    """Cursor position of an in-progress scan, used to resume iteration."""
+
+    cursor: int = 0
+    started: bool = False
+    keys_seen: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the scan has wrapped around to cursor 0."""
+        return self.started and self.cursor == 0
+
+
+async def ascan_batches(
+    client: aioredis.Redis,
+    match: str,
+    count: int = DEFAULT_SCAN_COUNT,
+    state: Optional[ScanState] = None,
+    max_batches: Optional[int] = None,
+    key_type: Optional[str] = None,
+) -> AsyncIterator[List[str]]:
+    """
+    Iterate keys matching a pattern in SCAN-sized batches.
+
+    Args:
+        client: Async Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+        state: Scan state to resume from; updated in place as batches are read
+        max_batches: Stop after this many SCAN calls (resume later with state)
+        key_type: Only return keys of this Redis type
+
+    Yields:
+        Non-empty lists of keys
+    """
+    state = state if state is not None else ScanState()
+    calls = 0
+    while not state.finished:
+        cursor, keys = await client.scan(
+            cursor=state.cursor, match=match, count=count, _type=key_type
+        )
+        state.cursor = int(cursor)
+        state.started = True
+        calls += 1
+        if keys:
+            state.keys_seen += len(keys)
+            yield list(keys)
+        if max_batches is not None and calls >= max_batches:
+            return
+
+
+async def ascan_with_followup(
+    client: aioredis.Redis,
+    match: str,
+    followup: FollowUp,
+    count: int = DEFAULT_SCAN_COUNT,
+    state: Optional[ScanState] = None,
+    max_batches: Optional[int] = None,
+) -> AsyncIterator[List[Tuple[str, Any]]]:
+    """
+    Iterate matching keys and run a pipelined follow-up command per batch.
+
+    Args:
+        client: Async Redis client
+        match: Glob-style key pattern
+        followup: Callable queuing a command for a key, e.g.
+            ``lambda pipe, key: pipe.hget(key, "status")``
+        count: SCAN COUNT hint per round trip
+        state: Scan state to resume from
+        max_batches: Stop after this many SCAN calls
+
+    Yields:
+        Lists of (key, follow-up result) pairs
+    """
+    async for keys in ascan_batches(client, match, count, state, max_batches):
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            followup(pipe, key)
+        results = await pipe.execute()
+        yield list(zip(keys, results))
+
+
+async def acount_matching(
+    client: aioredis.Redis, match: str, count: int = DEFAULT_SCAN_COUNT
+) -> int:
+    """
+    Count keys matching a pattern without blocking the server.
+
+    Args:
+        client: Async Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+
+    Returns:
+        Number of matching keys (approximate: SCAN can repeat a key while
+        the keyspace is being rehashed)
+    """
+    state = ScanState()
+    async for _ in ascan_batches(client, match, count, state):
+        pass
+    return state.keys_seen
+
+
+async def adelete_matching(
+    client: aioredis.Redis, match: str, count: int = DEFAULT_SCAN_COUNT
+) -> int:
+    """
+    Delete keys matching a pattern, one pipelined batch at a time.
+
+    Args:
+        client: Async Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+
+    Returns:
+        Number of keys deleted
+    """
+    deleted = 0
+    async for keys in ascan_batches(client, match, count):
+        deleted += int(await client.delete(*keys) or 0)
+    return deleted
+
+
+def scan_batches(
+    client: redis.Redis,
+    match: str,
+    count: int = DEFAULT_SCAN_COUNT,
+    state: Optional[ScanState] = None,
+    max_batches: Optional[int] = None,
+    key_type: Optional[str] = None,
+) -> Iterator[List[str]]:
+    """
+    Iterate keys matching a pattern in SCAN-sized batches (sync client).
+
+    Args:
+        client: Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+        state: Scan state to resume from; updated in place as batches are read
+        max_batches: Stop after this many SCAN calls (resume later with state)
+        key_type: Only return keys of this Redis type
+
+    Yields:
+        Non-empty lists of keys
+    """
+    state = state if state is not None else ScanState()
+    calls = 0
+    while not state.finished:
+        cursor, keys = client.scan(
+            cursor=state.cursor, match=match, count=count, _type=key_type
+        )
+        state.cursor = int(cursor)
+        state.started = True
+        calls += 1
+        if keys:
+            state.keys_seen += len(keys)
+            yield list(keys)
+        if max_batches is not None and calls >= max_batches:
+            return
+
+
+def scan_with_followup(
+    client: redis.Redis,
+    match: str,
+    followup: FollowUp,
+    count: int = DEFAULT_SCAN_COUNT,
+    state: Optional[ScanState] = None,
+    max_batches: Optional[int] = None,
+) -> Iterator[List[Tuple[str, Any]]]:
+    """
+    Iterate matching keys and run a pipelined follow-up command per batch.
+
+    Args:
+        client: Redis client
+        match: Glob-style key pattern
+        followup: Callable queuing a command for a key on the pipeline
+        count: SCAN COUNT hint per round trip
+        state: Scan state to resume from
+        max_batches: Stop after this many SCAN calls
+
+    Yields:
+        Lists of (key, follow-up result) pairs
+    """
+    for keys in scan_batches(client, match, count, state, max_batches):
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            followup(pipe, key)
+        results = pipe.execute()
+        yield list(zip(keys, results))
+
+
+def count_matching(
+    client: redis.Redis, match: str, count: int = DEFAULT_SCAN_COUNT
+) -> int:
+    """
+    Count keys matching a pattern without blocking the server (sync client).
+
+    Args:
+        client: Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+
+    Returns:
+        Number of matching keys (approximate: SCAN can repeat a key while
+        the keyspace is being rehashed)
+    """
+    state = ScanState()
+    for _ in scan_batches(client, match, count, state):
+        pass
+    return state.keys_seen
+
+
+def delete_matching(
+    client: redis.Redis, match: str, count: int = DEFAULT_SCAN_COUNT
+) -> int:
+    """
+    Delete keys matching a pattern, one batch at a time (sync client).
+
+    Args:
+        client: Redis client
+        match: Glob-style key pattern
+        count: SCAN COUNT hint per round trip
+
+    Returns:
+        Number of keys deleted
+    """
+    deleted = 0
+    for keys in scan_batches(client, match, count):
+        deleted += int(client.delete(*keys) or 0)
+    return deleted
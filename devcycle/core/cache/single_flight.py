@@ -0,0 +1,91 @@
+"""
+Stampede protection helpers for get-or-compute caching.
+
+Values cached through ACPCache.get_or_compute are stored in an envelope that
+records how long the value took to compute and when it expires. Readers use
+these to refresh hot entries probabilistically before they expire (the XFetch
+algorithm from "Optimal Probabilistic Cache Stampede Prevention", Vattani et
+al., VLDB 2015): the closer an entry is to expiry and the more expensive it is
+to recompute, the more likely a reader is to refresh it early. Across
+processes, recomputation is guarded by a short Redis lock.
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Marks a cached value as a get-or-compute envelope
+ENVELOPE_MARKER = "__xfetch__"
+
+# Compare-and-delete so a worker never releases a lock another worker holds
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class ComputeStats:
+    """Counters for get-or-compute calls."""
+
+    hits: int = 0
+    loads: int = 0
+    coalesced: int = 0
+    lock_waits: int = 0
+    early_refreshes: int = 0
+    stale_served: int = 0
+    lock_timeouts: int = 0
+
+
+def make_envelope(value: Any, delta: float, ttl: int) -> Dict[str, Any]:
+    """
+    Wrap a computed value with its recompute cost and expiry.
+
+    Args:
+        value: Computed value
+        delta: Seconds the loader took to compute the value
+        ttl: Time to live in seconds
+
+    Returns:
+        Envelope dictionary to store in the cache
+    """
+    return {
+        ENVELOPE_MARKER: 1,
+        "value": value,
+        "delta": delta,
+        "expires_at": time.time() + ttl,
+    }
+
+
+def is_envelope(cached: Any) -> bool:
+    """Check whether a cached value is a get-or-compute envelope."""
+    return isinstance(cached, dict) and ENVELOPE_MARKER in cached
+
+
+def should_refresh_early(
+    delta: float,
+    expires_at: float,
+    beta: float = 1.0,
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Decide whether to recompute an entry ahead of its expiry (XFetch).
+
+    Args:
+        delta: Seconds the value took to compute
+        expires_at: Epoch seconds at which the entry expires
+        beta: Eagerness; values above 1.0 refresh earlier
+        now: Current epoch seconds (defaults to time.time())
+
+    Returns:
+        True if this reader should recompute the value
+    """
+    if beta <= 0 or delta <= 0:
+        return False
+    now = time.time() if now is None else now
+    # 1 - random() is in (0, 1], so the log is finite and non-positive
+    return now - delta * beta * math.log(1.0 - random.random()) >= expires_at
@@ -0,0 +1,231 @@
+"""
+Per key family TTL policies for DevCycle caches.
+
+A policy maps a glob-style pattern over full Redis keys (for example
+"acp:workflows:active:*") to a TTL. ACPCache consults the policy table on
+every write, so a policy change applies to new writes immediately; keys
+already in Redis are adjusted with pipelined EXPIRE/PEXPIRE without
+rewriting their values. Every change is recorded with the hit ratio and
+family memory measured before and after it.
+
+Policies are process-wide (see get_ttl_policy_table) and persisted in a
+Redis hash, so every worker writes with the same TTLs. A change is
+announced on the L1 invalidation channel and other workers reload the hash.
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import translate
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import redis.asyncio as redis
+
+# Redis hash of persisted policies: pattern -> JSON {"ttl", "reason", "updated_at"}
+TTL_POLICY_KEY = "devcycle:cache:ttl_policies"
+
+
+@dataclass
+class TTLPolicy:
+    """TTL applied to keys matching a pattern."""
+
+    pattern: str
+    ttl: float  # seconds
+    reason: str = ""
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass
+class TTLPolicyChange:
+    """A policy change and its measured impact."""
+
+    pattern: str
+    previous_ttl: Optional[float]
+    ttl: float
+    reason: str
+    applied_at: datetime
+    keys_adjusted: int = 0
+    hit_ratio_before: float = 0.0
+    memory_bytes_before: int = 0
+    # Keyspace counters at the change, to measure the hit ratio since it
+    keyspace_hits: int = 0
+    keyspace_misses: int = 0
+    hit_ratio_after: Optional[float] = None
+    memory_bytes_after: Optional[int] = None
+    measured_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-friendly summary of the change."""
+        return {
+            "pattern": self.pattern,
+            "previous_ttl": self.previous_ttl,
+            "ttl": self.ttl,
+            "reason": self.reason,
+            "applied_at": self.applied_at.isoformat(),
+            "keys_adjusted": self.keys_adjusted,
+            "hit_ratio_before": self.hit_ratio_before,
+            "hit_ratio_after": self.hit_ratio_after,
+            "memory_bytes_before": self.memory_bytes_before,
+            "memory_bytes_after": self.memory_bytes_after,
+            "measured_at": self.measured_at.isoformat() if self.measured_at else None,
+        }
+
+
+class TTLPolicyTable:
+    """Live-updatable table of TTL policies, most specific pattern first."""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, float]] = None,
+        redis_key: str = TTL_POLICY_KEY,
+    ):
+        """
+        Initialize policy table.
+
+        Args:
+            policies: Initial mapping of key pattern to TTL in seconds
+            redis_key: Redis hash the policies are persisted in
+        """
+        self.redis_key = redis_key
+        self._policies: Dict[str, TTLPolicy] = {}
+        self._matchers: List[Tuple[Pattern[str], TTLPolicy]] = []
+        # Changes applied through this process, with their measured impact
+        self.changes: List[TTLPolicyChange] = []
+        for pattern, ttl in (policies or {}).items():
+            self.set(pattern, ttl)
+
+    def _rebuild(self) -> None:
+        """Order matchers so longer (more specific) patterns win."""
+        self._matchers = [
+            (re.compile(translate(pattern)), self._policies[pattern])
+            for pattern in sorted(self._policies, key=len, reverse=True)
+        ]
+
+    def set(self, pattern: str, ttl: float, reason: str = "") -> Optional[float]:
+        """
+        Add or replace a policy.
+
+        Returns:
+            The pattern's previous TTL, or None if it had no policy
+        """
+        if ttl <= 0:
+            raise ValueError(f"TTL for {pattern} must be positive, got {ttl}")
+        previous = self._policies.get(pattern)
+        self._policies[pattern] = TTLPolicy(pattern, ttl, reason)
+        self._rebuild()
+        return previous.ttl if previous else None
+
+    def remove(self, pattern: str) -> Optional[float]:
+        """
+        Remove a policy.
+
+        Returns:
+            The removed TTL, or None if the pattern had no policy
+        """
+        previous = self._policies.pop(pattern, None)
+        self._rebuild()
+        return previous.ttl if previous else None
+
+    def get(self, pattern: str) -> Optional[TTLPolicy]:
+        """Get the policy for a pattern."""
+        return self._policies.get(pattern)
+
+    def policy_for(self, key: str) -> Optional[TTLPolicy]:
+        """Get the most specific policy matching a full Redis key."""
+        for matcher, policy in self._matchers:
+            if matcher.match(key):
+                return policy
+        return None
+
+    def ttl_for(self, key: str, default: int) -> int:
+        """
+        Get the TTL to write a key with.
+
+        Args:
+            key: Full Redis key
+            default: TTL to use when no policy matches
+
+        Returns:
+            TTL in whole seconds
+        """
+        policy = self.policy_for(key)
+        return default if policy is None else max(1, math.ceil(policy.ttl))
+
+    async def save(self, redis_client: redis.Redis, pattern: str) -> None:
+        """
+        Persist a pattern's policy, or its removal, for other workers.
+
+        Args:
+            redis_client: Async Redis client
+            pattern: Pattern whose policy changed
+        """
+        policy = self._policies.get(pattern)
+        if policy is None:
+            await redis_client.hdel(self.redis_key, pattern)
+            return
+        await redis_client.hset(
+            self.redis_key,
+            pattern,
+            json.dumps(
+                {
+                    "ttl": policy.ttl,
+                    "reason": policy.reason,
+                    "updated_at": policy.updated_at.isoformat(),
+                }
+            ),
+        )
+
+    async def load(self, redis_client: redis.Redis) -> int:
+        """
+        Replace the policies with the persisted ones.
+
+        Args:
+            redis_client: Async Redis client
+
+        Returns:
+            Number of policies loaded
+        """
+        stored = await redis_client.hgetall(self.redis_key)
+        policies: Dict[str, TTLPolicy] = {}
+        for pattern, data in stored.items():
+            if isinstance(pattern, bytes):
+                pattern = pattern.decode("utf-8")
+            fields = json.loads(data)
+            policies[pattern] = TTLPolicy(
+                pattern,
+                float(fields["ttl"]),
+                fields.get("reason", ""),
+                datetime.fromisoformat(fields["updated_at"]),
+            )
+        self._policies = policies
+        self._rebuild()
+        return len(policies)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Get the current pattern to TTL mapping."""
+        return {pattern: policy.ttl for pattern, policy in self._policies.items()}
+
+    def __len__(self) -> int:
+        """Get the number of policies."""
+        return len(self._policies)
+
+
+# Global policy table instance
+_ttl_policy_table_instance: Optional[TTLPolicyTable] = None
+
+
+def get_ttl_policy_table() -> TTLPolicyTable:
+    """
+    Get the global TTL policy table instance.
+
+    Returns:
+        TTLPolicyTable instance
+    """
+    global _ttl_policy_table_instance
+
+    if _ttl_policy_table_instance is None:
+        _ttl_policy_table_instance = TTLPolicyTable()
+
+    return _ttl_policy_table_instance
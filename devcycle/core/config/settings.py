@@ -198,6 +198,35 @@ class APIConfig(BaseSettings):
         default=600, description="CORS preflight cache time in seconds"
     )
     request_timeout: int = Field(default=30, description="Request timeout in seconds")
+    websocket_send_queue_size: int = Field(
+        default=256,
+        description="Frames queued per WebSocket client before the slow "
+        "consumer policy applies",
+    )
+    websocket_slow_consumer_policy: str = Field(
+        default="drop_oldest",
+        description="What to do when a WebSocket client falls behind: "
+        "drop_oldest, coalesce or disconnect",
+    )
+    websocket_per_message_deflate: bool = Field(
+        default=True,
+        description="Negotiate permessage-deflate compression on WebSockets",
+    )
+    websocket_history_size: int = Field(
+        default=1000,
+        description="Recent events kept per channel so reconnecting WebSocket "
+        "clients can resume (0 disables)",
+    )
+    websocket_history_linger_seconds: float = Field(
+        default=60.0,
+        description="Seconds a channel's event history is kept after its last "
+        "WebSocket subscriber leaves",
+    )
+    websocket_presence_interval_seconds: float = Field(
+        default=5.0,
+        description="Seconds between heartbeats publishing each worker's "
+        "WebSocket connections to Redis",
+    )
 
     model_config = SettingsConfigDict(env_prefix="API_")
 
@@ -291,6 +320,26 @@ class RedisConfig(BaseSettings):
     health_check_interval: int = Field(
         default=30, description="Health check interval in seconds"
     )
+    local_cache_enabled: bool = Field(
+        default=False,
+        description="Enable in-process L1 cache in front of Redis for ACP data",
+    )
+    cache_legacy_json_writes: bool = Field(
+        default=False,
+        description=(
+            "Write JSON cache values without a codec header, for rollouts where "
+            "older readers are still running"
+        ),
+    )
+    cache_compression_enabled: bool = Field(
+        default=True, description="Compress large cache values on write"
+    )
+    cache_compression_algorithm: str = Field(
+        default="zstd", description="Default compression algorithm (zstd, lz4, gzip)"
+    )
+    cache_compression_threshold: int = Field(
+        default=1024, description="Minimum encoded value size in bytes to compress"
+    )
 
     model_config = SettingsConfigDict(env_prefix="REDIS_")
 
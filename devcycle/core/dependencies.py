@@ -5,12 +5,14 @@ This module provides simplified dependency injection functions for FastAPI,
 using direct instantiation instead of complex factory patterns.
 """
 
+from typing import Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 
 from .acp.config import ACPConfig
 from .acp.events.redis_events import RedisACPEvents
+from .acp.events.stream_events import RedisStreamEvents
 from .acp.services.agent_registry import ACPAgentRegistry
 from .acp.services.message_router import ACPMessageRouter
 from .acp.services.workflow_engine import ACPWorkflowEngine
@@ -18,7 +20,8 @@ from .acp.services.workflow_engine import ACPWorkflowEngine
 # from .agents.lifecycle import AgentLifecycleService  # Removed - using ACP instead
 from .auth.tortoise_fastapi_users import current_active_user
 from .auth.tortoise_models import User
-from .cache import ACPCache, get_cache
+from .cache import ACPCache, get_async_cache, get_local_cache, get_ttl_policy_table
+from .config import get_config
 
 # Legacy messaging and agent services removed - using ACP instead
 
@@ -120,8 +123,9 @@ def get_acp_cache() -> ACPCache:
     Returns:
         ACPCache instance
     """
-    redis_cache = get_cache(key_prefix="devcycle:cache:")
-    return ACPCache(redis_cache)
+    redis_cache = get_async_cache(key_prefix="devcycle:cache:")
+    local_cache = get_local_cache() if get_config().redis.local_cache_enabled else None
+    return ACPCache(redis_cache, local_cache, get_ttl_policy_table())
 
 
 def get_agent_registry() -> ACPAgentRegistry:
@@ -149,15 +153,48 @@ def get_message_router() -> ACPMessageRouter:
     return ACPMessageRouter(config, agent_registry)
 
 
+# Events service shared by every dependency in this worker, so coalescing
+# windows and publishing statistics span all requests
+_redis_events_instance: Optional[RedisACPEvents] = None
+
+
 def get_redis_events() -> RedisACPEvents:
     """
-    Get Redis ACP events service.
+    Get the global Redis ACP events service.
 
     Returns:
         RedisACPEvents instance
     """
-    redis_cache = get_cache(key_prefix="devcycle:cache:")
-    return RedisACPEvents(redis_cache)
+    global _redis_events_instance
+
+    if _redis_events_instance is None:
+        redis_cache = get_async_cache(key_prefix="devcycle:cache:")
+        config = get_acp_config()
+        streams = (
+            RedisStreamEvents(
+                redis_cache.redis_client, maxlen=config.event_stream_maxlen
+            )
+            if config.event_streams_enabled
+            else None
+        )
+        coalesce_windows = {
+            event_type: window_ms / 1000
+            for event_type, window_ms in config.event_coalesce_windows_ms.items()
+        }
+        _redis_events_instance = RedisACPEvents(
+            redis_cache, streams=streams, coalesce_windows=coalesce_windows
+        )
+
+    return _redis_events_instance
+
+
+async def close_redis_events() -> None:
+    """Stop the global Redis ACP events service, publishing pending events."""
+    global _redis_events_instance
+
+    if _redis_events_instance is not None:
+        await _redis_events_instance.stop()
+        _redis_events_instance = None
 
 
 def get_workflow_engine() -> ACPWorkflowEngine:
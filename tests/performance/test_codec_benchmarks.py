@@ -0,0 +1,69 @@
+"""
+Encode/decode throughput benchmarks for Redis cache value codecs.
+
+These benchmarks are CPU-only and do not need a Redis container. They encode
+and decode a representative workflow step payload with each available codec
+and report operations per second and encoded size.
+"""
+
+import time
+from typing import Any, Dict
+
+import pytest
+
+from devcycle.core.cache.codecs import AVAILABLE_CODECS, CodecRegistry
+
+ITERATIONS = 5000
+
+
+def _workflow_step_payload() -> Dict[str, Any]:
+    """Build a workflow step state similar to what ACPCache stores."""
+    return {
+        "workflow_id": "wf-4f1c2d",
+        "step_id": "generate-code",
+        "status": "completed",
+        "progress": 1.0,
+        "started_at": "2024-01-01T12:00:00+00:00",
+        "completed_at": "2024-01-01T12:00:42+00:00",
+        "agent_id": "code-generator-1",
+        "input": {
+            "requirements": ["feature %d" % i for i in range(20)],
+            "language": "python",
+        },
+        "output": {
+            "files": [
+                {"path": f"src/module_{i}.py", "lines": 120 + i, "checksum": "a" * 32}
+                for i in range(25)
+            ],
+            "metrics": {"tokens": 18342, "duration_ms": 42012.5},
+        },
+        "error": None,
+    }
+
+
+class TestCodecBenchmarks:
+    """Throughput benchmarks for cache value codecs."""
+
+    @pytest.mark.performance
+    @pytest.mark.parametrize("codec_name", sorted(AVAILABLE_CODECS))
+    def test_codec_throughput(self, codec_name):
+        """Benchmark encode/decode throughput of a codec."""
+        registry = CodecRegistry(families={}, default=codec_name)
+        payload = _workflow_step_payload()
+
+        start_time = time.perf_counter()
+        for _ in range(ITERATIONS):
+            encoded = registry.encode("workflows:steps:wf:step", payload)
+        encode_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in range(ITERATIONS):
+            decoded = registry.decode(encoded)
+        decode_time = time.perf_counter() - start_time
+
+        assert decoded == payload
+
+        print(f"\nCodec {codec_name}:")
+        print(f"  Encoded size: {len(encoded)} bytes")
+        print(f"  Encode: {ITERATIONS / encode_time:.0f} ops/sec")
+        print(f"  Decode: {ITERATIONS / decode_time:.0f} ops/sec")
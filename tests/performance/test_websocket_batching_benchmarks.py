@@ -0,0 +1,123 @@
+"""
+Frame batching benchmarks for WebSocket event delivery.
+
+These benchmarks are CPU-only and do not need Redis or a network. They push
+a burst of workflow events through the fan-out hub to one client send queue
+and report frames and bytes per second with batching off and on, for JSON
+and msgpack frames. Bytes after permessage-deflate are estimated with a
+per-connection raw deflate stream, as RFC 7692 uses with context takeover.
+"""
+
+import asyncio
+import time
+import zlib
+from typing import Any, Dict
+
+import pytest
+
+from devcycle.api.routes.websocket import (
+    MSGPACK_AVAILABLE,
+    ClientSendQueue,
+    EventFanoutHub,
+)
+
+EVENTS = 5000
+
+
+class _CountingWebSocket:
+    """WebSocket stand-in that counts frames and bytes."""
+
+    def __init__(self) -> None:
+        """Initialize counters and the deflate stream."""
+        self.frames = 0
+        self.bytes = 0
+        self.deflated_bytes = 0
+        self._deflate = zlib.compressobj(wbits=-15)
+
+    async def send_text(self, data: str) -> None:
+        """Count a text frame."""
+        await self.send_bytes(data.encode())
+
+    async def send_bytes(self, data: bytes) -> None:
+        """Count a binary frame."""
+        self.frames += 1
+        self.bytes += len(data)
+        compressed = self._deflate.compress(data)
+        compressed += self._deflate.flush(zlib.Z_SYNC_FLUSH)
+        self.deflated_bytes += len(compressed) - 4  # Trailer is not sent
+
+
+def _workflow_event(n: int) -> Dict[str, Any]:
+    """Build a workflow event as delivered by RedisACPEvents."""
+    workflow_id = f"wf-{n % 20}"
+    return {
+        "event_type": "workflow_progress",
+        "event_id": f"workflow_progress_{workflow_id}_{n}",
+        "timestamp": "2024-01-01 12:00:00.000000+00:00",
+        "source": workflow_id,
+        "data": {
+            "workflow_id": workflow_id,
+            "step_id": f"step-{n % 7}",
+            "progress": n % 100,
+            "percentage": n % 100,
+        },
+        "metadata": {},
+    }
+
+
+async def _deliver(encoding: str, batch_max: int, batch_delay: float) -> Dict:
+    """Deliver a burst of events to one client and measure the writer."""
+    websocket = _CountingWebSocket()
+    queue = ClientSendQueue(
+        "bench",
+        websocket,  # type: ignore[arg-type]
+        max_size=EVENTS,
+        encoding=encoding,
+        batch_max=batch_max,
+        batch_delay=batch_delay,
+    )
+    hub = EventFanoutHub({"bench": queue})
+    hub.subscribe("bench", "workflow_events", "workflow_event")
+
+    start_time = time.perf_counter()
+    queue.start()
+    for n in range(EVENTS):
+        hub.dispatch("workflow_events", "workflow_event", _workflow_event(n))
+    while queue.sent < EVENTS:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start_time
+    queue.close()
+
+    return {
+        "frames": websocket.frames,
+        "bytes": websocket.bytes,
+        "deflated_bytes": websocket.deflated_bytes,
+        "elapsed": elapsed,
+    }
+
+
+class TestWebSocketBatchingBenchmarks:
+    """Throughput benchmarks for WebSocket frame batching."""
+
+    @pytest.mark.performance
+    @pytest.mark.parametrize("encoding", ["json", "msgpack"])
+    @pytest.mark.parametrize("batch_max", [1, 100])
+    async def test_batching_throughput(self, encoding, batch_max):
+        """Benchmark frames and bytes per second with batching off and on."""
+        if encoding == "msgpack" and not MSGPACK_AVAILABLE:
+            pytest.skip("msgpack is not installed")
+
+        result = await _deliver(encoding, batch_max, 0.02 if batch_max > 1 else 0)
+
+        assert result["frames"] == -(-EVENTS // batch_max)
+
+        elapsed = result["elapsed"]
+        print(f"\nEncoding {encoding}, batch_max {batch_max}:")
+        print(f"  Frames: {result['frames']}")
+        print(f"  Events: {EVENTS / elapsed:.0f} events/sec")
+        print(f"  Frames: {result['frames'] / elapsed:.0f} frames/sec")
+        print(f"  Payload: {result['bytes'] / elapsed / 1e6:.1f} MB/sec")
+        print(
+            f"  Bytes: {result['bytes']} raw, "
+            f"{result['deflated_bytes']} after deflate"
+        )
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, Mock
 
 import pytest
+from redis.exceptions import ResponseError
 
 from devcycle.core.acp.cache.batch_operations import (
     BatchOperation,
@@ -15,9 +16,14 @@ from devcycle.core.acp.cache.batch_operations import (
     batch_get,
     batch_set,
 )
-from devcycle.core.acp.cache.cache_optimizer import CacheAccessPattern, CacheOptimizer
+from devcycle.core.acp.cache.cache_optimizer import (
+    CacheAccessPattern,
+    CacheOptimizationRecommendation,
+    CacheOptimizer,
+)
 from devcycle.core.acp.cache.cache_warmer import (
     CacheWarmer,
+    PredictiveBudget,
     WarmingRule,
     WarmingStrategy,
 )
@@ -32,6 +38,8 @@ class TestCacheOptimizer:
         mock_cache = Mock()
         mock_cache.get = AsyncMock()
         mock_cache.set = AsyncMock()
+        mock_cache.redis.get = AsyncMock()
+        mock_cache.redis.set = AsyncMock()
         return mock_cache
 
     @pytest.fixture
@@ -67,28 +75,61 @@ class TestCacheOptimizer:
 
     @pytest.mark.asyncio
     async def test_analyze_access_patterns(self, cache_optimizer):
-        """Test analyzing access patterns."""
-        # Set up some access patterns
-        cache_optimizer.access_patterns["key1"] = CacheAccessPattern(
-            key="key1",
-            access_count=10,
-            last_access=datetime.now(timezone.utc),
-            first_access=datetime.now(timezone.utc) - timedelta(hours=1),
-            avg_ttl=300.0,
-            hit_ratio=0.8,
-            access_frequency=0.0,
-        )
+        """Test accesses are aggregated per key family."""
+        for agent_id in ("agent-1", "agent-2", "agent-1"):
+            await cache_optimizer.record_access(f"cache:agents:{agent_id}", 300.0)
 
-        # Add some access times
-        now = datetime.now(timezone.utc)
-        for i in range(10):
-            cache_optimizer.key_access_times["key1"].append(now - timedelta(minutes=i))
-
-        # Analyze patterns
         await cache_optimizer._analyze_access_patterns()
 
-        pattern = cache_optimizer.access_patterns["key1"]
+        pattern = cache_optimizer.access_patterns["cache:agents:*"]
+        assert pattern.access_count == 3
         assert pattern.access_frequency > 0
+        assert pattern.distinct_keys == 2
+        assert pattern.avg_ttl == 300.0
+
+    @pytest.mark.asyncio
+    async def test_family_overflow(self, mock_acp_cache):
+        """Test families beyond the limit share the overflow family."""
+        optimizer = CacheOptimizer(mock_acp_cache, max_families=2)
+        for family in ("agents", "workflows", "runs"):
+            await optimizer.record_access(f"{family}:1")
+
+        assert set(optimizer.access_patterns) == {"agents:*", "workflows:*", "*"}
+
+    @pytest.mark.asyncio
+    async def test_history_only_for_heavy_hitters(self, mock_acp_cache):
+        """Test access history is dropped when a key leaves the top-K."""
+        optimizer = CacheOptimizer(mock_acp_cache, top_k=2)
+        for _ in range(3):
+            await optimizer.record_access("hot:1")
+        await optimizer.record_access("cold:1")
+        for _ in range(2):
+            await optimizer.record_access("warm:1")
+
+        assert set(optimizer.key_access_times) == {"hot:1", "warm:1"}
+        assert optimizer.last_access_time("cold:1") is None
+        assert [h["key"] for h in optimizer.get_heavy_hitters()] == [
+            "hot:1",
+            "warm:1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_memory_ceiling(self, mock_acp_cache):
+        """Test tracking memory stays under the limit for many distinct keys."""
+        limit = 1024 * 1024
+        optimizer = CacheOptimizer(mock_acp_cache, memory_limit_bytes=limit)
+        for i in range(5000):
+            await optimizer.record_access(f"workflows:steps:wf-{i % 50}:step-{i}")
+
+        assert optimizer.memory_usage_bytes() <= limit
+        assert len(optimizer.access_patterns) == 1
+        stats = await optimizer.get_cache_statistics()
+        assert 4500 < stats["total_keys_tracked"] < 5500
+
+    def test_memory_limit_too_small(self, mock_acp_cache):
+        """Test a ceiling that leaves no room for the sketch is rejected."""
+        with pytest.raises(ValueError):
+            CacheOptimizer(mock_acp_cache, memory_limit_bytes=64 * 1024)
 
     @pytest.mark.asyncio
     async def test_generate_recommendations(self, cache_optimizer):
@@ -122,22 +163,78 @@ class TestCacheOptimizer:
         assert any(rec.key_pattern == "low_freq" for rec in recommendations)
 
     @pytest.mark.asyncio
-    async def test_adjust_key_ttl(self, cache_optimizer, mock_acp_cache):
-        """Test adjusting key TTL."""
-        key = "test_key"
-        new_ttl = 7200.0
+    async def test_ttl_recommendation_becomes_policy(
+        self, cache_optimizer, mock_acp_cache
+    ):
+        """Test TTL recommendations set a policy on the full Redis key family."""
+        mock_acp_cache.redis_key = Mock(side_effect=lambda key: f"devcycle:cache:{key}")
+        mock_acp_cache.apply_ttl_policy = AsyncMock()
+
+        await cache_optimizer._apply_recommendations(
+            [
+                CacheOptimizationRecommendation(
+                    "workflows:steps:*:*", "ttl_adjustment", 200.0, 400.0, 0.15, 4
+                ),
+                CacheOptimizationRecommendation(
+                    "*", "ttl_adjustment", 200.0, 400.0, 0.15, 4
+                ),
+            ]
+        )
 
-        # Mock cache get/set
-        mock_acp_cache.redis.get.return_value = "test_value"
-        mock_acp_cache.redis.set.return_value = True
+        mock_acp_cache.apply_ttl_policy.assert_awaited_once()
+        args = mock_acp_cache.apply_ttl_policy.call_args[0]
+        assert args == ("devcycle:cache:workflows:steps:*:*", 400.0)
+        mock_acp_cache.redis_key.assert_called_once_with("workflows:steps:*:*")
+        mock_acp_cache.redis.get.assert_not_called()
+        mock_acp_cache.redis.set.assert_not_called()
+
+    def test_predict_next_accesses(self, cache_optimizer):
+        """Test periodic keys are predicted and lapsed or irregular ones scored."""
+        now = datetime.now(timezone.utc)
+        minute = timedelta(minutes=1)
+        cache_optimizer.key_access_times["periodic"].extend(
+            now - minute * n for n in (3.5, 2.5, 1.5, 0.5)
+        )
+        cache_optimizer.key_access_times["irregular"].extend(
+            now - minute * n for n in (10, 9.8, 3, 0.5)
+        )
+        cache_optimizer.key_access_times["lapsed"].extend(
+            now - minute * n for n in (30, 29, 28, 27)
+        )
 
-        await cache_optimizer._adjust_key_ttl(key, new_ttl)
+        predictions = {
+            p.key: p
+            for p in cache_optimizer.predict_next_accesses(
+                timedelta(minutes=5), now=now
+            )
+        }
 
-        mock_acp_cache.redis.get.assert_called_once_with(key)
-        mock_acp_cache.redis.set.assert_called_once_with(
-            key, "test_value", ttl=int(new_ttl)
+        assert "lapsed" not in predictions
+        periodic = predictions["periodic"]
+        assert periodic.period_seconds == 60
+        assert periodic.next_access == now + minute / 2
+        assert periodic.confidence == 1.0
+        assert predictions["irregular"].confidence < 0.5
+
+    @pytest.mark.asyncio
+    async def test_preload_uses_attached_warmer(self, cache_optimizer):
+        """Test family preload recommendations warm the family's hot keys."""
+        warmer = Mock()
+        warmer.warm_on_demand = AsyncMock()
+        cache_optimizer.attach_warmer(warmer)
+        await cache_optimizer.record_access("cache:agents:a1")
+        await cache_optimizer.record_access("cache:workflows:w1")
+
+        await cache_optimizer._apply_recommendations(
+            [
+                CacheOptimizationRecommendation(
+                    "cache:agents:*", "preload", False, True, 0.2, 5
+                )
+            ]
         )
 
+        warmer.warm_on_demand.assert_awaited_once_with(["cache:agents:a1"])
+
     def test_enable_disable_optimization(self, cache_optimizer):
         """Test enabling/disabling optimization."""
         assert cache_optimizer.optimization_enabled is True
@@ -162,8 +259,9 @@ class TestCacheWarmer:
         """Create a mock ACP cache."""
         mock_cache = Mock()
         mock_cache.set = AsyncMock()
+        mock_cache.set_many = AsyncMock()
         mock_cache.redis = Mock()
-        mock_cache.redis.set = Mock()
+        mock_cache.redis.set = AsyncMock()
         return mock_cache
 
     @pytest.fixture
@@ -243,16 +341,140 @@ class TestCacheWarmer:
             ttl=3600.0,
         )
 
-        mock_acp_cache.redis.set.return_value = True
+        cache_warmer.add_warming_rule(rule)
+        mock_acp_cache.set_many.return_value = [True]
 
-        await cache_warmer._warm_rule(rule)
+        await cache_warmer.warm_on_demand(["test_key"])
 
-        mock_acp_cache.redis.set.assert_called_once_with(
-            "test_key", '"warmed_data_for_test_key"', ttl=3600
+        # The cache serializes values itself, so loaders' data is passed as-is
+        mock_acp_cache.set_many.assert_awaited_once_with(
+            [("test_key", "warmed_data_for_test_key", 3600)]
         )
         assert rule.last_warmed is not None
         assert rule.warm_count == 1
 
+    @pytest.mark.asyncio
+    async def test_warming_cycle_runs_loaders_by_priority(self, mock_acp_cache):
+        """Test loaders run concurrently, highest priority first."""
+        cache_warmer = CacheWarmer(mock_acp_cache, max_concurrent_loaders=2)
+        started = []
+        running = 0
+        peak = 0
+
+        def make_loader(name):
+            async def loader(key):
+                nonlocal running, peak
+                started.append(name)
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return {"rule": name}
+
+            return loader
+
+        for name, priority in [("low", 1), ("high", 10), ("mid", 5), ("top", 20)]:
+            cache_warmer.add_warming_rule(
+                WarmingRule(name, f"{name}_key", make_loader(name), priority)
+            )
+        mock_acp_cache.set_many.return_value = [True] * 4
+
+        await cache_warmer._execute_warming_cycle()
+
+        assert started[:2] == ["top", "high"]
+        assert peak == 2
+        mock_acp_cache.set_many.assert_awaited_once()
+        assert len(mock_acp_cache.set_many.call_args[0][0]) == 4
+        assert cache_warmer.warming_statistics.successful_warms == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_loader_hits_deadline(self, cache_warmer, mock_acp_cache):
+        """Test a loader past its deadline fails without blocking others."""
+
+        async def slow_loader(key):
+            await asyncio.sleep(10)
+
+        async def fast_loader(key):
+            return "fast"
+
+        cache_warmer.add_warming_rule(
+            WarmingRule("slow", "slow_key", slow_loader, 10, deadline=0.01)
+        )
+        cache_warmer.add_warming_rule(WarmingRule("fast", "fast_key", fast_loader, 1))
+        mock_acp_cache.set_many.return_value = [True]
+
+        await cache_warmer._execute_warming_cycle()
+
+        mock_acp_cache.set_many.assert_awaited_once_with([("fast_key", "fast", None)])
+        stats = cache_warmer.get_warming_statistics()
+        assert stats["successful_warms"] == 1
+        assert stats["failed_warms"] == 1
+        assert stats["timed_out_warms"] == 1
+
+    @pytest.fixture
+    def predictive_warmer(self, mock_acp_cache):
+        """Create a warmer fed by an optimizer with one periodic key."""
+        optimizer = CacheOptimizer(mock_acp_cache)
+        now = datetime.now(timezone.utc)
+        optimizer.key_access_times["cache:agents:a1"].extend(
+            now - timedelta(seconds=s) for s in (130, 90, 50)
+        )
+        warmer = CacheWarmer(mock_acp_cache, optimizer=optimizer)
+
+        async def loader(key):
+            return {"agent": key}
+
+        warmer.add_warming_rule(WarmingRule("agents", "cache:agents:*", loader, 1))
+        mock_acp_cache.redis.encode_value = Mock(return_value=b"x" * 100)
+        mock_acp_cache.set_many.return_value = [True]
+        return warmer
+
+    @pytest.mark.asyncio
+    async def test_predictive_cycle_preloads_due_keys(
+        self, predictive_warmer, mock_acp_cache
+    ):
+        """Test keys expiring before their predicted access are preloaded."""
+        optimizer = predictive_warmer.optimizer
+        mock_acp_cache.redis.get_ttls = AsyncMock(return_value=[-2])
+
+        assert await predictive_warmer._run_predictive_cycle() == 1
+        mock_acp_cache.set_many.assert_awaited_once_with(
+            [("cache:agents:a1", {"agent": "cache:agents:a1"}, None)]
+        )
+
+        # The key is read as predicted, so the preload avoided a miss
+        await optimizer.record_access("cache:agents:a1")
+        mock_acp_cache.redis.get_ttls.return_value = [300]
+        await predictive_warmer._run_predictive_cycle()
+
+        stats = predictive_warmer.get_warming_statistics()["predictive"]
+        assert stats["preloads"] == 1
+        assert stats["misses_avoided"] == 1
+        assert stats["precision"] == 1.0
+        assert stats["bytes_written"] == 100
+
+    @pytest.mark.asyncio
+    async def test_predictive_cycle_skips_cached_keys(
+        self, predictive_warmer, mock_acp_cache
+    ):
+        """Test keys that outlive their predicted access are left alone."""
+        mock_acp_cache.redis.get_ttls = AsyncMock(return_value=[600])
+
+        assert await predictive_warmer._run_predictive_cycle() == 0
+        mock_acp_cache.set_many.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_predictive_cycle_respects_budget(
+        self, predictive_warmer, mock_acp_cache
+    ):
+        """Test preloads stop once the cycle's byte budget is spent."""
+        mock_acp_cache.redis.get_ttls = AsyncMock(return_value=[-2])
+        predictive_warmer.predictive_budget = PredictiveBudget(max_bytes_per_cycle=50)
+
+        assert await predictive_warmer._run_predictive_cycle() == 0
+        stats = predictive_warmer.get_predictive_statistics()
+        assert stats["skipped_for_budget"] == 1
+
     def test_pattern_matching(self, cache_warmer):
         """Test pattern matching."""
         # Exact match
@@ -303,10 +525,8 @@ class TestBatchOperations:
         """Create a mock ACP cache."""
         mock_cache = Mock()
         mock_cache.redis = Mock()
-        mock_cache.redis.mget = AsyncMock()
-        mock_cache.redis.pipeline = Mock()
-        mock_cache.redis.delete = AsyncMock()
-        mock_cache.redis.exists = AsyncMock()
+        mock_cache.redis.redis_client = AsyncMock()
+        mock_cache.redis.redis_client.pipeline = Mock()
         return mock_cache
 
     @pytest.fixture
@@ -337,80 +557,148 @@ class TestBatchOperations:
         assert len(batches[1]) == 100
         assert len(batches[2]) == 50
 
-    def test_group_operations_by_type(self, batch_processor):
-        """Test grouping operations by type."""
+    @pytest.mark.asyncio
+    async def test_execute_batch(self, batch_processor, mock_acp_cache):
+        """Test executing a complete batch through one pipeline."""
         operations = [
             BatchOperation(BatchOperationType.GET, "key1"),
-            BatchOperation(BatchOperationType.SET, "key2", "value2"),
-            BatchOperation(BatchOperationType.GET, "key3"),
-            BatchOperation(BatchOperationType.DELETE, "key4"),
+            BatchOperation(BatchOperationType.SET, "key2", "value2", ttl=3600),
         ]
+        mock_pipeline = self._replying_pipeline(
+            mock_acp_cache, {"key1": "value1", "key2": True}
+        )
 
-        grouped = batch_processor._group_operations_by_type(operations)
+        result = await batch_processor.execute_batch(operations)
 
-        assert len(grouped[BatchOperationType.GET]) == 2
-        assert len(grouped[BatchOperationType.SET]) == 1
-        assert len(grouped[BatchOperationType.DELETE]) == 1
+        assert result.total_operations == 2
+        assert result.successful_operations == 2
+        assert result.failed_operations == 0
+        assert [op.result for op in result.operations] == ["value1", True]
+        mock_pipeline.set.assert_called_once_with("key2", "value2", ex=3600)
+        mock_pipeline.execute.assert_awaited_once()
+        assert result.execution_time_ms >= 0  # Can be 0 for very fast operations
+        assert (
+            result.throughput_ops_per_second >= 0
+        )  # Can be 0 for very fast operations
 
     @pytest.mark.asyncio
-    async def test_execute_get_operations(self, batch_processor, mock_acp_cache):
-        """Test executing GET operations."""
+    async def test_execute_batch_keeps_exact_replies(
+        self, batch_processor, mock_acp_cache
+    ):
+        """Test each operation gets its own reply, and errors stay per operation."""
+        error = ResponseError("WRONGTYPE")
         operations = [
-            BatchOperation(BatchOperationType.GET, "key1"),
-            BatchOperation(BatchOperationType.GET, "key2"),
+            BatchOperation(BatchOperationType.GET, "missing"),
+            BatchOperation(BatchOperationType.DELETE, "absent"),
+            BatchOperation(BatchOperationType.TTL, "persistent"),
+            BatchOperation(BatchOperationType.GET, "wrong_type"),
         ]
+        self._replying_pipeline(
+            mock_acp_cache,
+            {"missing": None, "absent": 0, "persistent": -1, "wrong_type": error},
+        )
 
-        mock_acp_cache.redis.redis_client.mget.return_value = ["value1", "value2"]
-
-        await batch_processor._execute_get_operations(operations)
+        result = await batch_processor.execute_batch(operations)
 
-        assert operations[0].result == "value1"
-        assert operations[1].result == "value2"
-        assert operations[0].error is None
-        assert operations[1].error is None
+        assert [op.result for op in operations[:3]] == [None, 0, -1]
+        assert [op.error for op in operations[:3]] == [None, None, None]
+        assert operations[3].error == "WRONGTYPE"
+        assert result.successful_operations == 3
+        assert result.failed_operations == 1
 
     @pytest.mark.asyncio
-    async def test_execute_set_operations(self, batch_processor, mock_acp_cache):
-        """Test executing SET operations."""
-        operations = [
-            BatchOperation(BatchOperationType.SET, "key1", "value1", ttl=3600),
-            BatchOperation(BatchOperationType.SET, "key2", "value2"),
-        ]
+    async def test_execute_batch_splits_into_pipelines(self, mock_acp_cache):
+        """Test batches larger than batch_size use one pipeline per batch."""
+        processor = RedisBatchProcessor(mock_acp_cache, batch_size=2)
+        mock_pipeline = self._replying_pipeline(
+            mock_acp_cache, {f"key{i}": i for i in range(5)}
+        )
+
+        result = await processor.execute_batch(
+            [BatchOperation(BatchOperationType.EXISTS, f"key{i}") for i in range(5)]
+        )
+
+        assert [op.result for op in result.operations] == [0, 1, 2, 3, 4]
+        assert mock_pipeline.execute.await_count == 3
+
+    @staticmethod
+    def _replying_pipeline(mock_acp_cache, replies):
+        """Mock a pipeline whose execute returns one reply per queued key."""
+        queued = []
+
+        def queue(key, *args, **kwargs):
+            queued.append(key)
+
+        async def execute(raise_on_error=True):
+            result = [replies[key] for key in queued]
+            queued.clear()
+            return result
 
         mock_pipeline = Mock()
-        mock_pipeline.execute = Mock(return_value=[True, True])
+        for command in ("get", "set", "delete", "exists", "expire", "ttl"):
+            setattr(mock_pipeline, command, Mock(side_effect=queue))
+        mock_pipeline.execute = AsyncMock(side_effect=execute)
         mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
+        return mock_pipeline
+
+    @pytest.mark.asyncio
+    async def test_submit_coalesces_concurrent_operations(
+        self, batch_processor, mock_acp_cache
+    ):
+        """Test concurrent submissions share one pipeline flush."""
+        mock_pipeline = self._replying_pipeline(
+            mock_acp_cache, {"key1": "value1", "key2": None, "key3": 1}
+        )
 
-        await batch_processor._execute_set_operations(operations)
+        results = await asyncio.gather(
+            batch_processor.submit(BatchOperation(BatchOperationType.GET, "key1")),
+            batch_processor.submit(BatchOperation(BatchOperationType.GET, "key2")),
+            batch_processor.submit(BatchOperation(BatchOperationType.DELETE, "key3")),
+        )
 
-        assert operations[0].result is True
-        assert operations[1].result is True
-        assert operations[0].error is None
-        assert operations[1].error is None
+        assert results == ["value1", None, 1]
+        mock_pipeline.execute.assert_awaited_once()
+        stats = batch_processor.get_coalescer_statistics()
+        assert stats["flushes"] == 1
+        assert stats["timer_triggered_flushes"] == 1
+        assert stats["max_queue_depth"] == 3
+        assert stats["flush_size_histogram"] == {4: 1}
+        assert stats["queue_depth"] == 0
 
     @pytest.mark.asyncio
-    async def test_execute_batch(self, batch_processor, mock_acp_cache):
-        """Test executing a complete batch."""
-        operations = [
-            BatchOperation(BatchOperationType.GET, "key1"),
-            BatchOperation(BatchOperationType.SET, "key2", "value2"),
-        ]
+    async def test_submit_flushes_at_batch_size(self, mock_acp_cache):
+        """Test a full queue is flushed without waiting for the timer."""
+        processor = RedisBatchProcessor(
+            mock_acp_cache, batch_size=2, flush_interval_us=10_000_000
+        )
+        self._replying_pipeline(mock_acp_cache, {f"key{i}": i for i in range(4)})
 
-        # Mock Redis operations
-        mock_acp_cache.redis.redis_client.mget.return_value = ["value1"]
-        mock_pipeline = Mock()
-        mock_pipeline.execute = Mock(return_value=[True])
-        mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
+        results = await asyncio.gather(
+            *(
+                processor.submit(BatchOperation(BatchOperationType.EXISTS, f"key{i}"))
+                for i in range(4)
+            )
+        )
 
-        result = await batch_processor.execute_batch(operations)
+        assert results == [0, 1, 2, 3]
+        stats = processor.get_coalescer_statistics()
+        assert stats["size_triggered_flushes"] == 2
+        assert stats["flush_size_histogram"] == {2: 2}
 
-        assert result.total_operations == 2
-        assert result.successful_operations == 2
-        assert result.failed_operations == 0
-        assert result.execution_time_ms >= 0  # Can be 0 for very fast operations
-        assert (
-            result.throughput_ops_per_second >= 0
-        )  # Can be 0 for very fast operations
+    @pytest.mark.asyncio
+    async def test_submit_raises_operation_error(self, batch_processor, mock_acp_cache):
+        """Test a failed command only fails its own caller."""
+        error = ResponseError("WRONGTYPE")
+        self._replying_pipeline(mock_acp_cache, {"good": "value", "bad": error})
+
+        good, bad = await asyncio.gather(
+            batch_processor.submit(BatchOperation(BatchOperationType.GET, "good")),
+            batch_processor.submit(BatchOperation(BatchOperationType.GET, "bad")),
+            return_exceptions=True,
+        )
+
+        assert good == "value"
+        assert bad is error
 
     def test_performance_statistics(self, batch_processor):
         """Test performance statistics tracking."""
@@ -442,7 +730,8 @@ class TestConvenienceFunctions:
         """Create a mock ACP cache."""
         mock_cache = Mock()
         mock_cache.redis = Mock()
-        mock_cache.redis.mget = AsyncMock()
+        mock_cache.redis.redis_client = AsyncMock()
+        mock_cache.redis.redis_client.pipeline = Mock()
         return mock_cache
 
     @pytest.fixture
@@ -454,11 +743,9 @@ class TestConvenienceFunctions:
     async def test_batch_get(self, batch_processor, mock_acp_cache):
         """Test batch_get convenience function."""
         keys = ["key1", "key2", "key3"]
-        mock_acp_cache.redis.redis_client.mget.return_value = [
-            "value1",
-            "value2",
-            "value3",
-        ]
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=["value1", "value2", "value3"])
+        mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
 
         result = await batch_get(batch_processor, keys)
 
@@ -471,7 +758,7 @@ class TestConvenienceFunctions:
         """Test batch_set convenience function."""
         key_value_pairs = [("key1", "value1"), ("key2", "value2")]
         mock_pipeline = Mock()
-        mock_pipeline.execute = Mock(return_value=[True, True])
+        mock_pipeline.execute = AsyncMock(return_value=[True, True])
         mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
 
         result = await batch_set(batch_processor, key_value_pairs, ttl=3600)
@@ -483,7 +770,9 @@ class TestConvenienceFunctions:
     async def test_batch_delete(self, batch_processor, mock_acp_cache):
         """Test batch_delete convenience function."""
         keys = ["key1", "key2"]
-        mock_acp_cache.redis.delete.return_value = 2
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1, 1])
+        mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
 
         result = await batch_delete(batch_processor, keys)
 
@@ -494,7 +783,9 @@ class TestConvenienceFunctions:
     async def test_batch_exists(self, batch_processor, mock_acp_cache):
         """Test batch_exists convenience function."""
         keys = ["key1", "key2"]
-        mock_acp_cache.redis.exists.return_value = 2
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1, 1])
+        mock_acp_cache.redis.redis_client.pipeline.return_value = mock_pipeline
 
         result = await batch_exists(batch_processor, keys)
 
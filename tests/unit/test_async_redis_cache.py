@@ -0,0 +1,128 @@
+"""
+Test cases for async Redis cache service.
+
+This module tests the redis.asyncio-based caching functionality.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from redis.exceptions import ResponseError
+
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+
+
+class TestAsyncRedisCache:
+    """Test AsyncRedisCache functionality."""
+
+    @pytest.fixture
+    def mock_redis(self):
+        """Mock async Redis client for testing."""
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        mock_redis.set.return_value = True
+        mock_redis.setex.return_value = True
+        mock_redis.delete.return_value = 1
+        mock_redis.exists.return_value = 0
+        mock_redis.ttl.return_value = -1
+        mock_redis.scan.return_value = (0, [])
+        mock_redis.info.return_value = {
+            "redis_version": "7.0.0",
+            "used_memory_human": "1.00M",
+            "connected_clients": 1,
+        }
+        mock_redis.ping.return_value = True
+        return mock_redis
+
+    @pytest.fixture
+    def redis_cache(self, mock_redis):
+        """Create AsyncRedisCache instance with mocked Redis."""
+        with patch(
+            "devcycle.core.cache.async_redis_cache.redis.Redis",
+            return_value=mock_redis,
+        ):
+            return AsyncRedisCache("test:")
+
+    def test_get_key(self, redis_cache):
+        """Test key prefixing."""
+        assert redis_cache._get_key("test_key") == "test:test_key"
+
+    async def test_get_json_value(self, redis_cache, mock_redis):
+        """Test getting JSON value."""
+        test_data = {"key": "value", "number": 42}
+        mock_redis.get.return_value = json.dumps(test_data)
+        result = await redis_cache.get("test_key")
+        assert result == test_data
+        mock_redis.get.assert_awaited_once_with("test:test_key")
+
+    async def test_get_string_value(self, redis_cache, mock_redis):
+        """Test getting a non-JSON string value."""
+        mock_redis.get.return_value = "test_value"
+        assert await redis_cache.get("test_key") == "test_value"
+
+    async def test_set_json_value(self, redis_cache, mock_redis):
+        """Test setting JSON value."""
+        test_data = {"key": "value"}
+        result = await redis_cache.set("test_key", test_data)
+        assert result is True
+        mock_redis.set.assert_awaited_once_with(
+            "test:test_key", b"\x01" + json.dumps(test_data).encode()
+        )
+
+    async def test_set_with_ttl(self, redis_cache, mock_redis):
+        """Test setting value with TTL."""
+        result = await redis_cache.set("test_key", "test_value", ttl=60)
+        assert result is True
+        mock_redis.setex.assert_awaited_once_with(
+            "test:test_key", 60, b'\x01"test_value"'
+        )
+
+    async def test_set_many(self, redis_cache, mock_redis):
+        """Test bulk set uses one pipeline and reports each result."""
+        pipe = Mock()
+        pipe.execute = AsyncMock(return_value=[True, ResponseError("OOM")])
+        mock_redis.pipeline = Mock(return_value=pipe)
+
+        result = await redis_cache.set_many([("a", {"x": 1}, 60), ("b", "v", None)])
+
+        assert result == [True, False]
+        pipe.set.assert_any_call("test:a", b'\x01{"x": 1}', ex=60)
+        pipe.set.assert_any_call("test:b", b'\x01"v"', ex=None)
+        pipe.execute.assert_awaited_once_with(raise_on_error=False)
+
+    async def test_delete_and_exists(self, redis_cache, mock_redis):
+        """Test deleting and checking keys."""
+        assert await redis_cache.delete("test_key") is True
+        mock_redis.exists.return_value = 1
+        assert await redis_cache.exists("test_key") is True
+
+    async def test_clear_pattern(self, redis_cache, mock_redis):
+        """Test clearing keys by pattern."""
+        mock_redis.scan.return_value = (0, ["test:a", "test:b"])
+        mock_redis.delete.return_value = 2
+        assert await redis_cache.clear_pattern("*") == 2
+        mock_redis.delete.assert_awaited_once_with("test:a", "test:b")
+
+    async def test_get_stats(self, redis_cache, mock_redis):
+        """Test getting cache statistics."""
+        mock_redis.scan.return_value = (0, ["test:a"])
+        stats = await redis_cache.get_stats()
+        assert stats["total_keys"] == 1
+        assert stats["redis_connected"] is True
+
+    async def test_health_check_failure(self, redis_cache, mock_redis):
+        """Test failed health check."""
+        mock_redis.ping.side_effect = ConnectionError("down")
+        assert await redis_cache.health_check() is False
+
+    async def test_error_handling_get(self, redis_cache, mock_redis):
+        """Test error handling in get operation."""
+        mock_redis.get.side_effect = ConnectionError("down")
+        assert await redis_cache.get("test_key") is None
+
+    async def test_close(self, redis_cache, mock_redis):
+        """Test closing the client."""
+        await redis_cache.close()
+        # Text and binary clients are both closed
+        assert mock_redis.aclose.await_count == 2
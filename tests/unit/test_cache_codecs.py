@@ -0,0 +1,109 @@
+"""Unit tests for Redis cache value codecs."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from devcycle.core.cache.codecs import (
+    MSGPACK_AVAILABLE,
+    ORJSON_AVAILABLE,
+    CodecRegistry,
+    JSONCodec,
+    get_codec,
+)
+from devcycle.core.cache.redis_cache import RedisCache
+
+STEP_PAYLOAD = {
+    "step_id": "step-1",
+    "status": "completed",
+    "progress": 1.0,
+    "output": {"files": ["a.py", "b.py"], "tokens": 1234},
+    "error": None,
+}
+
+
+class TestCodecs:
+    """Test individual codecs and header-based decoding."""
+
+    @pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+    def test_roundtrip(self, name):
+        """Every available codec round-trips through the registry."""
+        codec = get_codec(name)
+        registry = CodecRegistry(families={}, default=name)
+
+        encoded = registry.encode("any", STEP_PAYLOAD)
+
+        assert encoded[:1] == codec.header
+        assert registry.decode(encoded) == STEP_PAYLOAD
+
+    def test_headers_are_distinct(self):
+        """Each codec writes a different header byte."""
+        headers = {get_codec(name).header for name in ("json", "orjson", "msgpack")}
+        expected = 1 + int(ORJSON_AVAILABLE) + int(MSGPACK_AVAILABLE)
+        assert len(headers) == expected
+
+    def test_unavailable_codec_falls_back_to_json(self):
+        """Unknown codec names fall back to JSON."""
+        assert isinstance(get_codec("does-not-exist"), JSONCodec)
+
+    def test_family_selection(self):
+        """Writes pick the codec of the longest matching key prefix."""
+        registry = CodecRegistry(
+            families={"workflows:": "orjson", "workflows:steps:": "msgpack"}
+        )
+
+        assert registry.codec_for("workflows:steps:wf-1:s-1") is get_codec("msgpack")
+        assert registry.codec_for("workflows:active:wf-1") is get_codec("orjson")
+        assert registry.codec_for("cache:agents:a-1") is get_codec("json")
+
+    def test_decode_legacy_values(self):
+        """Values written before codecs existed are still readable."""
+        registry = CodecRegistry()
+
+        assert registry.decode(json.dumps(STEP_PAYLOAD)) == STEP_PAYLOAD
+        assert registry.decode(b"plain text") == "plain text"
+        assert registry.decode("42") == 42
+
+    def test_legacy_json_writes(self):
+        """Legacy mode writes JSON-family values without a header."""
+        registry = CodecRegistry(families={}, legacy_json_writes=True)
+
+        assert registry.encode("k", "text") == b"text"
+        assert registry.encode("k", {"a": 1}) == b'{"a": 1}'
+        assert registry.decode(registry.encode("k", {"a": 1})) == {"a": 1}
+
+    def test_strings_keep_their_type(self):
+        """Header-encoded strings are not re-parsed as JSON on read."""
+        registry = CodecRegistry()
+        assert registry.decode(registry.encode("k", "123")) == "123"
+
+
+class TestRedisCacheCodecs:
+    """Test codec selection through RedisCache."""
+
+    @pytest.fixture
+    def mock_redis(self):
+        """Mock Redis client for testing."""
+        mock_redis = MagicMock()
+        mock_redis.set.return_value = True
+        return mock_redis
+
+    @pytest.fixture
+    def redis_cache(self, mock_redis):
+        """Create RedisCache instance with mocked Redis."""
+        with patch(
+            "devcycle.core.cache.redis_cache.redis.Redis", return_value=mock_redis
+        ):
+            return RedisCache("test:")
+
+    def test_step_family_uses_binary_codec(self, redis_cache, mock_redis):
+        """Workflow steps are written with the codec configured for the family."""
+        redis_cache.set("workflows:steps:wf-1:s-1", STEP_PAYLOAD)
+
+        key, value = mock_redis.set.call_args[0]
+        assert key == "test:workflows:steps:wf-1:s-1"
+        assert value[:1] == get_codec("msgpack").header
+
+        mock_redis.get.return_value = value
+        assert redis_cache.get("workflows:steps:wf-1:s-1") == STEP_PAYLOAD
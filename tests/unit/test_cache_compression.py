@@ -0,0 +1,182 @@
+"""Unit tests for transparent cache value compression."""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from devcycle.core.cache.codecs import CodecRegistry
+from devcycle.core.cache.compression import (
+    AVAILABLE_ALGORITHMS,
+    ZSTD_AVAILABLE,
+    MissingDictionaryError,
+    ValueCompressor,
+    compress_bytes,
+    decompress_bytes,
+    is_compressed,
+)
+from devcycle.core.cache.redis_cache import RedisCache
+
+LARGE_VALUE = json.dumps(
+    {
+        "files": [
+            {"path": f"src/module_{i}.py", "code": "x = 1\n" * 20} for i in range(20)
+        ]
+    }
+).encode()
+
+
+def _step_samples(count: int = 400) -> list:
+    """Build small, similar JSON blobs like workflow step results."""
+    return [
+        json.dumps(
+            {
+                "step_id": f"step-{i}",
+                "status": "completed" if i % 3 else "failed",
+                "progress": i % 100 / 100,
+                "agent_id": f"agent-{i % 7}",
+            }
+        ).encode()
+        for i in range(count)
+    ]
+
+
+class TestCompression:
+    """Test compression helpers and ValueCompressor."""
+
+    @pytest.mark.parametrize("algorithm", sorted(AVAILABLE_ALGORITHMS))
+    def test_roundtrip_with_marker(self, algorithm):
+        """Compressed values carry a marker and round-trip."""
+        compressed = compress_bytes(LARGE_VALUE, algorithm)
+
+        assert is_compressed(compressed)
+        assert len(compressed) < len(LARGE_VALUE)
+        assert decompress_bytes(compressed) == LARGE_VALUE
+
+    def test_uncompressed_values_pass_through(self):
+        """Codec-encoded and legacy values are returned unchanged."""
+        for data in (b"\x01{}", b'{"a": 1}', b"plain"):
+            assert not is_compressed(data)
+            assert decompress_bytes(data) == data
+
+    def test_threshold(self):
+        """Values below the threshold are stored as-is."""
+        compressor = ValueCompressor(algorithm="gzip", threshold=1024)
+
+        assert compressor.compress("cache:agents:a", b"\x01{}") == b"\x01{}"
+        assert is_compressed(compressor.compress("cache:agents:a", LARGE_VALUE))
+
+    def test_incompressible_values_kept(self):
+        """Values that do not shrink are stored uncompressed."""
+        compressor = ValueCompressor(algorithm="gzip", threshold=16)
+        data = os.urandom(2048)
+
+        assert compressor.compress("k", data) == data
+        assert compressor.get_stats()["bytes_saved"] == 0
+
+    def test_disabled_compressor_still_decompresses(self):
+        """Reads detect compression even when writes are not compressed."""
+        compressor = ValueCompressor(enabled=False)
+        compressed = compress_bytes(LARGE_VALUE, "gzip")
+
+        assert compressor.compress("k", LARGE_VALUE) == LARGE_VALUE
+        assert compressor.decompress("k", compressed) == LARGE_VALUE
+
+    def test_stats_per_family(self):
+        """Bytes saved and CPU time are tracked per family."""
+        compressor = ValueCompressor(
+            algorithm="gzip", families={"workflows:steps:": "gzip"}
+        )
+
+        stored = compressor.compress("workflows:steps:wf:s", LARGE_VALUE)
+        compressor.decompress("workflows:steps:wf:s", stored)
+        compressor.compress("cache:agents:a", b"\x01{}")
+
+        stats = compressor.get_stats()
+        steps = stats["families"]["workflows:steps:"]
+        assert steps["compressed_writes"] == 1
+        assert steps["bytes_saved"] == len(LARGE_VALUE) - len(stored)
+        assert steps["decompressed_reads"] == 1
+        assert stats["families"]["other"]["compressed_writes"] == 0
+        assert stats["bytes_saved"] == steps["bytes_saved"]
+
+    @pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+    def test_dictionary_compresses_small_values(self):
+        """A trained dictionary lets small values shrink."""
+        writer = ValueCompressor(families={"workflows:steps:": "zstd"})
+        dict_bytes = writer.train_dictionary(
+            "workflows:steps:", _step_samples(), dict_size=4096
+        )
+        assert dict_bytes is not None
+
+        value = _step_samples(401)[-1]
+        stored = writer.compress("workflows:steps:wf:s", value)
+        assert len(stored) < len(value)
+
+        reader = ValueCompressor()
+        with pytest.raises(MissingDictionaryError):
+            reader.decompress("workflows:steps:wf:s", stored)
+
+        reader.load_dictionaries(
+            writer.dictionary_fields("workflows:steps:", dict_bytes)
+        )
+        assert reader.decompress("workflows:steps:wf:s", stored) == value
+        assert "workflows:steps:" in reader.family_dictionaries
+
+
+class TestRedisCacheCompression:
+    """Test compression in the RedisCache write and read paths."""
+
+    @pytest.fixture
+    def mock_redis(self):
+        """Mock Redis client for testing."""
+        mock_redis = MagicMock()
+        mock_redis.set.return_value = True
+        return mock_redis
+
+    @pytest.fixture
+    def redis_cache(self, mock_redis):
+        """Create RedisCache instance with mocked Redis."""
+        with patch(
+            "devcycle.core.cache.redis_cache.redis.Redis", return_value=mock_redis
+        ):
+            return RedisCache(
+                "test:",
+                codecs=CodecRegistry(families={}),
+                compressor=ValueCompressor(algorithm="gzip", threshold=256),
+            )
+
+    def test_large_values_compressed(self, redis_cache, mock_redis):
+        """Large values are compressed on write and decompressed on read."""
+        value = json.loads(LARGE_VALUE)
+        redis_cache.set("workflows:steps:wf:s", value)
+
+        stored = mock_redis.set.call_args[0][1]
+        assert is_compressed(stored)
+
+        mock_redis.get.return_value = stored
+        assert redis_cache.get("workflows:steps:wf:s") == value
+        assert redis_cache.compressor.get_stats()["bytes_saved"] > 0
+
+    @pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+    def test_missing_dictionary_loaded_from_redis(self, redis_cache, mock_redis):
+        """Dictionaries trained by another worker are loaded on demand."""
+        other = ValueCompressor(families={"workflows:steps:": "zstd"})
+        dict_bytes = other.train_dictionary(
+            "workflows:steps:", _step_samples(), dict_size=4096
+        )
+        value = json.loads(_step_samples(401)[-1])
+        stored = other.compress(
+            "workflows:steps:wf:s", CodecRegistry(families={}).encode("k", value)
+        )
+        assert is_compressed(stored)
+
+        mock_redis.get.return_value = stored
+        mock_redis.hgetall.return_value = {
+            k.encode(): v
+            for k, v in other.dictionary_fields("workflows:steps:", dict_bytes).items()
+        }
+
+        assert redis_cache.get("workflows:steps:wf:s") == value
+        mock_redis.hgetall.assert_called_once_with("test:compression:dictionaries")
@@ -0,0 +1,291 @@
+"""Unit tests for ACPCache.get_or_compute stampede protection."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from devcycle.core.cache.acp_cache import ACPCache
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+from devcycle.core.cache.single_flight import make_envelope, should_refresh_early
+
+
+class TestShouldRefreshEarly:
+    """Test the XFetch early refresh decision."""
+
+    def test_never_far_from_expiry(self):
+        """Cheap entries far from expiry are not refreshed."""
+        now = time.time()
+        assert not any(
+            should_refresh_early(0.01, now + 600, now=now) for _ in range(1000)
+        )
+
+    def test_always_after_expiry(self):
+        """Entries past their expiry are always refreshed."""
+        now = time.time()
+        assert should_refresh_early(0.01, now - 1, now=now)
+
+    def test_expensive_entries_refresh_earlier(self):
+        """Higher recompute cost raises the chance of early refresh."""
+        now = time.time()
+        cheap = sum(should_refresh_early(0.1, now + 1, now=now) for _ in range(2000))
+        costly = sum(should_refresh_early(2.0, now + 1, now=now) for _ in range(2000))
+        assert costly > cheap
+
+    def test_beta_zero_disables(self):
+        """beta=0 turns early refresh off."""
+        now = time.time()
+        assert not should_refresh_early(10.0, now + 1, beta=0, now=now)
+
+
+class TestGetOrCompute:
+    """Test ACPCache.get_or_compute."""
+
+    @pytest.fixture
+    def mock_redis_cache(self):
+        """Create a mock async Redis cache backed by a dict."""
+        store = {}
+        mock_cache = Mock(spec=AsyncRedisCache)
+        mock_cache.key_prefix = "devcycle:cache:"
+        mock_cache.get = AsyncMock(side_effect=lambda key: store.get(key))
+
+        async def set_value(key, value, ttl=None):
+            store[key] = value
+            return True
+
+        mock_cache.set = AsyncMock(side_effect=set_value)
+        mock_cache.redis_client = AsyncMock()
+        mock_cache.redis_client.set.return_value = True
+        mock_cache.store = store
+        return mock_cache
+
+    @pytest.fixture
+    def acp_cache(self, mock_redis_cache):
+        """Create ACP cache instance with fast lock polling."""
+        cache = ACPCache(mock_redis_cache)
+        cache.COMPUTE_LOCK_POLL_INTERVAL = 0.001
+        cache.COMPUTE_LOCK_WAIT = 0.05
+        return cache
+
+    async def test_hit_skips_loader(self, acp_cache, mock_redis_cache):
+        """Fresh entries are returned without calling the loader."""
+        mock_redis_cache.store["capabilities:x"] = make_envelope(["a"], 0.01, 600)
+        loader = AsyncMock()
+
+        assert await acp_cache.get_or_compute("capabilities:x", loader, 600) == ["a"]
+        loader.assert_not_awaited()
+        assert acp_cache.compute_stats.hits == 1
+
+    async def test_concurrent_misses_load_once(self, acp_cache, mock_redis_cache):
+        """Concurrent callers in one process share a single load."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return ["agent-1"]
+
+        results = await asyncio.gather(
+            *(
+                acp_cache.get_or_compute("capabilities:x", loader, 600)
+                for _ in range(20)
+            )
+        )
+
+        assert results == [["agent-1"]] * 20
+        assert calls == 1
+        assert mock_redis_cache.redis_client.set.await_count == 1
+        mock_redis_cache.redis_client.eval.assert_awaited_once()
+        assert acp_cache.compute_stats.coalesced == 19
+        assert acp_cache.get_compute_stats()["inflight"] == 0
+
+        stored = mock_redis_cache.store["capabilities:x"]
+        assert stored["value"] == ["agent-1"]
+        assert stored["delta"] > 0
+
+    async def test_waits_for_other_process(self, acp_cache, mock_redis_cache):
+        """When another process holds the lock, its result is used."""
+        mock_redis_cache.redis_client.set.return_value = None
+        loader = AsyncMock(return_value=["local"])
+
+        async def other_process():
+            await asyncio.sleep(0.005)
+            mock_redis_cache.store["capabilities:x"] = make_envelope(
+                ["remote"], 0.01, 600
+            )
+
+        result, _ = await asyncio.gather(
+            acp_cache.get_or_compute("capabilities:x", loader, 600), other_process()
+        )
+
+        assert result == ["remote"]
+        loader.assert_not_awaited()
+        assert acp_cache.compute_stats.lock_waits == 1
+
+    async def test_lock_timeout_loads_locally(self, acp_cache, mock_redis_cache):
+        """A caller stops waiting after COMPUTE_LOCK_WAIT and loads itself."""
+        mock_redis_cache.redis_client.set.return_value = None
+        loader = AsyncMock(return_value=["local"])
+
+        assert await acp_cache.get_or_compute("capabilities:x", loader, 600) == [
+            "local"
+        ]
+        assert acp_cache.compute_stats.lock_timeouts == 1
+
+    async def test_early_refresh(self, acp_cache, mock_redis_cache):
+        """Entries selected for early refresh are recomputed by one caller."""
+        mock_redis_cache.store["capabilities:x"] = make_envelope(["old"], 1.0, 600)
+        loader = AsyncMock(return_value=["new"])
+
+        with patch(
+            "devcycle.core.cache.acp_cache.should_refresh_early", return_value=True
+        ):
+            result = await acp_cache.get_or_compute("capabilities:x", loader, 600)
+
+        assert result == ["new"]
+        assert mock_redis_cache.store["capabilities:x"]["value"] == ["new"]
+        assert acp_cache.compute_stats.early_refreshes == 1
+
+    async def test_early_refresh_locked_serves_current(
+        self, acp_cache, mock_redis_cache
+    ):
+        """If another process is already refreshing, the current value is served."""
+        mock_redis_cache.store["capabilities:x"] = make_envelope(["old"], 1.0, 600)
+        mock_redis_cache.redis_client.set.return_value = None
+        loader = AsyncMock(return_value=["new"])
+
+        with patch(
+            "devcycle.core.cache.acp_cache.should_refresh_early", return_value=True
+        ):
+            result = await acp_cache.get_or_compute("capabilities:x", loader, 600)
+
+        assert result == ["old"]
+        loader.assert_not_awaited()
+        assert acp_cache.compute_stats.stale_served == 1
+
+    async def test_loader_error_propagates(self, acp_cache, mock_redis_cache):
+        """Loader errors reach every waiter and release the lock."""
+        loader = AsyncMock(side_effect=RuntimeError("backend down"))
+
+        with pytest.raises(RuntimeError):
+            await acp_cache.get_or_compute("capabilities:x", loader, 600)
+
+        mock_redis_cache.redis_client.eval.assert_awaited_once()
+        assert acp_cache.get_compute_stats()["inflight"] == 0
+
+    async def test_cancelled_caller_does_not_cancel_load(
+        self, acp_cache, mock_redis_cache
+    ):
+        """Cancelling one caller leaves the shared load running for others."""
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return ["agent-1"]
+
+        first = asyncio.create_task(
+            acp_cache.get_or_compute("capabilities:x", loader, 600)
+        )
+        await asyncio.sleep(0)
+        second = asyncio.create_task(
+            acp_cache.get_or_compute("capabilities:x", loader, 600)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == ["agent-1"]
+        assert first.cancelled()
+
+    async def test_instances_share_inflight_load(self, mock_redis_cache):
+        """Loads are shared across ACPCache instances, as created per request."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return ["agent-1"]
+
+        results = await asyncio.gather(
+            *(
+                ACPCache(mock_redis_cache).get_or_compute("capabilities:x", loader, 600)
+                for _ in range(5)
+            )
+        )
+
+        assert results == [["agent-1"]] * 5
+        assert calls == 1
+
+    async def test_envelope_expiry_follows_ttl_policy(
+        self, acp_cache, mock_redis_cache
+    ):
+        """The envelope expires when the key does, under a TTL policy."""
+        acp_cache.ttl_policies.set("devcycle:cache:capabilities:*", 60)
+        loader = AsyncMock(return_value=["agent-1"])
+
+        await acp_cache.get_or_compute("capabilities:x", loader, 600)
+
+        ttl = mock_redis_cache.set.await_args.kwargs["ttl"]
+        stored = mock_redis_cache.store["capabilities:x"]
+        assert ttl == 60
+        assert stored["expires_at"] == pytest.approx(time.time() + 60, abs=1)
+
+
+class TestCapabilityRebuild:
+    """Test rebuilding expired capability mappings through get_or_compute."""
+
+    @pytest.fixture
+    def acp_cache(self):
+        """Create an ACP cache whose capability sets are missing."""
+        store = {}
+        mock_cache = Mock(spec=AsyncRedisCache)
+        mock_cache.key_prefix = "devcycle:cache:"
+        mock_cache.get = AsyncMock(side_effect=lambda key: store.get(key))
+
+        async def set_value(key, value, ttl=None):
+            store[key] = value
+            return True
+
+        mock_cache.set = AsyncMock(side_effect=set_value)
+        mock_cache.redis_client = AsyncMock()
+        mock_cache.redis_client.set.return_value = True
+        mock_cache.redis_client.smembers.return_value = set()
+        pipe = Mock()
+        pipe.execute = AsyncMock(return_value=[1, 1, True])
+        mock_cache.redis_client.pipeline = Mock(return_value=pipe)
+        return ACPCache(mock_cache)
+
+    async def test_concurrent_misses_rebuild_once(self, acp_cache):
+        """Requests missing the same mapping share one rebuild."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return ["agent-1", "agent-2"]
+
+        results = await asyncio.gather(
+            *(
+                acp_cache.get_capability_agents("code_generation", loader)
+                for _ in range(10)
+            )
+        )
+
+        assert results == [["agent-1", "agent-2"]] * 10
+        assert calls == 1
+        pipe = acp_cache.redis.redis_client.pipeline.return_value
+        pipe.sadd.assert_called_once_with(
+            "capabilities:code_generation", "agent-1", "agent-2"
+        )
+
+    async def test_cached_mapping_skips_loader(self, acp_cache):
+        """An existing capability set is returned without rebuilding."""
+        acp_cache.redis.redis_client.smembers.return_value = {"agent-1"}
+        loader = AsyncMock()
+
+        assert await acp_cache.get_capability_agents("code_generation", loader) == [
+            "agent-1"
+        ]
+        loader.assert_not_awaited()
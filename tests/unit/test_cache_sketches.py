@@ -0,0 +1,88 @@
+"""Unit tests for the cache access tracking sketches."""
+
+from devcycle.core.acp.cache.sketches import (
+    CountMinSketch,
+    HeavyHitters,
+    HyperLogLog,
+    key_family,
+)
+
+
+class TestKeyFamily:
+    """Test key normalization."""
+
+    def test_variable_segments(self):
+        """Segments containing digits are replaced with a wildcard."""
+        assert key_family("workflows:steps:wf-12:step-3") == "workflows:steps:*:*"
+        assert key_family("acp:agents:status_index:online") == (
+            "acp:agents:status_index:online"
+        )
+
+
+class TestCountMinSketch:
+    """Test decayed frequency estimates."""
+
+    def test_never_underestimates(self):
+        """Estimates are at least the true count."""
+        sketch = CountMinSketch(width=64, depth=4, half_life_seconds=1e9)
+        for i in range(500):
+            sketch.add(f"key-{i % 100}", now=0.0)
+
+        assert all(sketch.estimate(f"key-{i}", now=0.0) >= 5 for i in range(100))
+        assert sketch.estimate("key-1", now=0.0) < 50
+
+    def test_decay(self):
+        """Counts halve every half-life."""
+        sketch = CountMinSketch(width=256, half_life_seconds=60)
+        for _ in range(8):
+            sketch.add("hot", now=0.0)
+
+        assert abs(sketch.estimate("hot", now=120.0) - 2.0) < 1e-9
+
+    def test_renormalize_preserves_estimates(self):
+        """Rescaling counters keeps decayed estimates unchanged."""
+        sketch = CountMinSketch(width=256, half_life_seconds=1)
+        sketch.add("key", now=0.0)
+        sketch.add("key", now=60.0)
+        before = sketch.estimate("key", now=60.0)
+
+        factor = sketch.maybe_renormalize(now=100.0)
+
+        assert factor < 1.0
+        assert abs(sketch.estimate("key", now=60.0) - before) < 1e-9
+        assert sketch.landmark == 100.0
+
+
+class TestHeavyHitters:
+    """Test top-K tracking."""
+
+    def test_evicts_smallest(self):
+        """A heavier key displaces the lightest tracked key."""
+        hitters = HeavyHitters(capacity=2)
+        hitters.update("a", 5.0)
+        hitters.update("b", 1.0)
+
+        assert hitters.update("c", 1.0) == (False, None)
+        assert hitters.update("c", 3.0) == (True, "b")
+        assert [key for key, _ in hitters.top()] == ["a", "c"]
+
+
+class TestHyperLogLog:
+    """Test distinct counting."""
+
+    def test_small_counts_exact(self):
+        """Small cardinalities are close to exact."""
+        hll = HyperLogLog(precision=12)
+        for i in range(100):
+            hll.add(f"key-{i}")
+            hll.add(f"key-{i}")
+
+        assert 97 <= hll.count() <= 103
+
+    def test_large_count_error(self):
+        """Large cardinalities stay within a few standard errors."""
+        hll = HyperLogLog(precision=12)
+        for i in range(50000):
+            hll.add(f"key-{i}")
+
+        assert abs(hll.count() - 50000) < 50000 * 0.05
@@ -151,9 +151,10 @@ class TestMemoryOptimizer:
                 "evicted_keys": 50,
             }
         )
-        mock_client.keys = AsyncMock(return_value=["key1", "key2", "key3"])
-        mock_client.memory_usage = AsyncMock(return_value=1024)
-        mock_client.type = AsyncMock(return_value="string")
+        mock_client.scan = AsyncMock(return_value=(0, ["key1", "key2", "key3"]))
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1024] * 3)
+        mock_client.pipeline = Mock(return_value=mock_pipeline)
         mock_client.config_set = AsyncMock()
         return mock_client
 
@@ -343,9 +344,10 @@ class TestIntegration:
                 "evicted_keys": 50,
             }
         )
-        mock_client.keys = AsyncMock(return_value=["key1", "key2"])
-        mock_client.memory_usage = AsyncMock(return_value=1024)
-        mock_client.type = AsyncMock(return_value="string")
+        mock_client.scan = AsyncMock(return_value=(0, ["key1", "key2"]))
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1024] * 2)
+        mock_client.pipeline = Mock(return_value=mock_pipeline)
         mock_client.config_set = AsyncMock()
         return mock_client
 
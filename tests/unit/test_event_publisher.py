@@ -0,0 +1,174 @@
+"""Unit tests for batched, coalesced ACP event publishing."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from devcycle.core.acp.events.event_types import WorkflowProgressEvent
+from devcycle.core.acp.events.publisher import EventPublisher
+from devcycle.core.acp.events.stream_events import RedisStreamEvents
+
+CHANNELS = ["acp:events:workflow_events:wf-1", "acp:events:workflow_events"]
+
+
+@pytest.fixture
+def mock_redis():
+    """Create a mock async Redis client."""
+    client = Mock()
+    client.publish = AsyncMock(return_value=1)
+    client.pipeline.return_value.execute = AsyncMock(return_value=[])
+    client.pipeline.return_value.command_stack = []
+    return client
+
+
+@pytest.fixture
+def publisher(mock_redis):
+    """Create a publisher coalescing workflow progress over 20 ms."""
+    return EventPublisher(mock_redis, coalesce_windows={"workflow_progress": 0.02})
+
+
+def progress_sent(mock_redis):
+    """Get the progress values published on the workflow channel."""
+    return [
+        json.loads(call.args[1])["data"]["progress"]
+        for call in mock_redis.pipeline.return_value.publish.call_args_list
+        if call.args[0] == CHANNELS[0]
+    ]
+
+
+class TestEventPublisher:
+    """Test cases for EventPublisher."""
+
+    async def test_multi_channel_publish_is_one_round_trip(self, publisher, mock_redis):
+        """An event is serialized once and pipelined to every channel."""
+        event = WorkflowProgressEvent("wf-1", "s1", 10)
+
+        await publisher.publish(CHANNELS, event)
+
+        pipe = mock_redis.pipeline.return_value
+        calls = pipe.publish.call_args_list
+        assert [call.args[0] for call in calls] == CHANNELS
+        assert calls[0].args[1] is calls[1].args[1]
+        pipe.execute.assert_awaited_once()
+        mock_redis.publish.assert_not_called()
+        stats = publisher.get_stats()
+        assert stats["events_published"] == 1
+        assert stats["messages_published"] == 2
+        assert stats["round_trips"] == 1
+
+    async def test_single_channel_publishes_directly(self, publisher, mock_redis):
+        """A single message needs no pipeline."""
+        await publisher.publish(CHANNELS[1:], WorkflowProgressEvent("wf-1", "s1", 10))
+
+        mock_redis.publish.assert_awaited_once()
+        mock_redis.pipeline.assert_not_called()
+
+    async def test_coalesces_to_latest_per_window(self, publisher, mock_redis):
+        """The first event goes out at once, then only the latest per window."""
+        for progress in range(0, 60, 10):
+            await publisher.publish(
+                CHANNELS, WorkflowProgressEvent("wf-1", "s1", progress), "wf-1"
+            )
+        assert progress_sent(mock_redis) == [0]
+
+        await asyncio.sleep(0.1)
+
+        assert progress_sent(mock_redis) == [0, 50]
+        stats = publisher.get_stats()
+        assert stats["events_published"] == 2
+        assert stats["events_coalesced"] == 4
+        assert stats["open_windows"] == 0
+
+    async def test_keys_are_coalesced_separately(self, publisher, mock_redis):
+        """Events of different workflows do not replace each other."""
+        await publisher.publish(
+            CHANNELS, WorkflowProgressEvent("wf-1", "s1", 10), "wf-1"
+        )
+        await publisher.publish(
+            CHANNELS, WorkflowProgressEvent("wf-2", "s1", 20), "wf-2"
+        )
+
+        assert publisher.get_stats()["events_published"] == 2
+        await publisher.close()
+
+    async def test_uncoalesced_types_are_sent_at_once(self, mock_redis):
+        """Event types without a window are never held back."""
+        publisher = EventPublisher(mock_redis, coalesce_windows={})
+
+        for progress in (10, 20):
+            await publisher.publish(
+                CHANNELS, WorkflowProgressEvent("wf-1", "s1", progress), "wf-1"
+            )
+
+        assert progress_sent(mock_redis) == [10, 20]
+
+    async def test_pending_limit_drops_new_keys(self, mock_redis):
+        """Beyond max_pending, events for new keys are dropped."""
+        publisher = EventPublisher(
+            mock_redis, coalesce_windows={"workflow_progress": 10}, max_pending=1
+        )
+        for workflow_id in ("wf-1", "wf-2"):
+            for progress in (10, 20):
+                await publisher.publish(
+                    CHANNELS,
+                    WorkflowProgressEvent(workflow_id, "s1", progress),
+                    workflow_id,
+                )
+
+        stats = publisher.get_stats()
+        assert stats["events_published"] == 2
+        assert stats["pending"] == 1
+        assert stats["events_dropped"] == 1
+        await publisher.close()
+
+    async def test_close_flushes_pending_in_one_round_trip(self, mock_redis):
+        """Pending events are published together on close."""
+        publisher = EventPublisher(
+            mock_redis, coalesce_windows={"workflow_progress": 10}
+        )
+        for workflow_id in ("wf-1", "wf-2"):
+            for progress in (10, 20):
+                await publisher.publish(
+                    CHANNELS,
+                    WorkflowProgressEvent(workflow_id, "s1", progress),
+                    workflow_id,
+                )
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.reset_mock()
+
+        await publisher.close()
+
+        pipe.execute.assert_awaited_once()
+        stats = publisher.get_stats()
+        assert stats["events_published"] == 4
+        assert stats["pending"] == 0
+        assert stats["open_windows"] == 0
+
+    async def test_failed_publish_counts_as_dropped(self, publisher, mock_redis):
+        """Events lost to a Redis error are counted."""
+        mock_redis.pipeline.return_value.execute.side_effect = ConnectionError()
+
+        await publisher.publish(CHANNELS, WorkflowProgressEvent("wf-1", "s1", 10))
+
+        stats = publisher.get_stats()
+        assert stats["events_published"] == 0
+        assert stats["events_dropped"] == 1
+
+    async def test_streams_are_written_in_the_same_pipeline(self, mock_redis):
+        """With a stream log, even single-channel events are pipelined."""
+        publisher = EventPublisher(mock_redis, streams=RedisStreamEvents(mock_redis))
+
+        await publisher.publish(CHANNELS[1:], WorkflowProgressEvent("wf-1", "s1", 10))
+
+        pipe = mock_redis.pipeline.return_value
+        # One script, called by SHA, logs the event and publishes it with its
+        # entry ID
+        pipe.eval.assert_not_called()
+        pipe.evalsha.assert_called_once()
+        sha, numkeys, key = pipe.evalsha.call_args.args[:3]
+        assert sha == publisher.streams.scripts.scripts["log_and_publish"].sha
+        assert key == "acp:stream:workflow_events"
+        pipe.publish.assert_not_called()
+        mock_redis.publish.assert_not_called()
@@ -0,0 +1,269 @@
+"""Unit tests for the instrumented connection pool."""
+
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from devcycle.core.acp.cache.connection_pool_optimizer import (
+    ConnectionPoolOptimizer,
+    PoolConfiguration,
+    PoolOptimizationStrategy,
+)
+from devcycle.core.acp.cache.instrumented_pool import (
+    InstrumentedConnectionPool,
+    RingStats,
+)
+
+
+class FakeConnection:
+    """Connection stand-in that never touches the network."""
+
+    def __init__(self, **kwargs):
+        """Initialize fake connection."""
+        self.disconnected = False
+
+    async def connect(self):
+        """Pretend to connect."""
+
+    async def disconnect(self, nowait: bool = False):
+        """Record the disconnect."""
+        self.disconnected = True
+
+    async def can_read_destructive(self):
+        """Report no pending data."""
+        return False
+
+    async def can_read(self):
+        """Report no pending data."""
+        return False
+
+    def should_reconnect(self):
+        """Report a healthy connection."""
+        return False
+
+    async def re_auth(self):
+        """Pretend to re-authenticate."""
+
+    @property
+    def is_connected(self):
+        """Report an open connection."""
+        return True
+
+
+class UnreachableConnection(FakeConnection):
+    """Connection stand-in whose server cannot be reached."""
+
+    async def connect(self):
+        """Fail to connect."""
+        raise ConnectionError("Connection refused")
+
+
+def make_pool(**kwargs):
+    """Create an instrumented pool of fake connections."""
+    kwargs.setdefault("max_connections", 2)
+    kwargs.setdefault("timeout", 0.05)
+    return InstrumentedConnectionPool(connection_class=FakeConnection, **kwargs)
+
+
+class TestRingStats:
+    """Test cases for ring buffer statistics."""
+
+    def test_running_and_recent_statistics(self):
+        """Running stats cover all samples, recent ones only the ring."""
+        stats = RingStats(capacity=4)
+        for value in range(1, 9):
+            stats.add(float(value))
+
+        assert stats.count == 8
+        assert stats.mean == pytest.approx(4.5)
+        assert stats.max == 8.0
+        assert stats.recent() == [5.0, 6.0, 7.0, 8.0]
+        assert stats.recent_mean() == pytest.approx(6.5)
+        assert stats.percentile(95) == 8.0
+
+    def test_empty_statistics(self):
+        """Empty stats report zeros."""
+        stats = RingStats(capacity=4)
+
+        assert stats.to_dict() == {
+            "count": 0,
+            "mean": 0.0,
+            "recent_mean": 0.0,
+            "p95": 0.0,
+            "max": 0.0,
+        }
+        assert stats.stddev == 0.0
+
+
+class TestInstrumentedConnectionPool:
+    """Test cases for the instrumented connection pool."""
+
+    async def test_checkout_and_release_are_counted(self):
+        """Checkouts record wait, hold and in-use samples."""
+        pool = make_pool()
+
+        first = await pool.get_connection()
+        second = await pool.get_connection()
+        await pool.release(first)
+        again = await pool.get_connection()
+
+        assert again is first
+        stats = pool.get_stats()
+        assert stats["created"] == 2
+        assert stats["checkouts"] == 3
+        assert stats["in_use"] == 2
+        assert stats["wait_ms"]["count"] == 3
+        assert stats["hold_ms"]["count"] == 1
+        assert pool.in_use_stats.max == 2
+        await pool.release(second)
+        await pool.release(again)
+
+    async def test_checkout_timeout_is_counted(self):
+        """Waiting past the timeout is recorded as a timeout."""
+        pool = make_pool(max_connections=1)
+        held = await pool.get_connection()
+
+        with pytest.raises(ConnectionError):
+            await pool.get_connection()
+
+        assert pool.checkout_timeouts == 1
+        assert pool.wait_stats.max >= 0.04
+        await pool.release(held)
+
+    async def test_connect_error_is_not_a_timeout(self):
+        """Failing to open a connection is not counted as a checkout timeout."""
+        pool = InstrumentedConnectionPool(
+            max_connections=1, timeout=0.05, connection_class=UnreachableConnection
+        )
+
+        with pytest.raises(ConnectionError):
+            await pool.get_connection()
+
+        assert pool.checkout_timeouts == 0
+
+    async def test_grow_wakes_waiting_caller(self):
+        """Growing the pool lets a blocked caller create a connection."""
+        pool = make_pool(max_connections=1, timeout=1)
+        held = await pool.get_connection()
+
+        waiter = asyncio.create_task(pool.get_connection())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await pool.resize(2)
+        connection = await asyncio.wait_for(waiter, 0.5)
+
+        assert connection is not held
+        assert pool.snapshot().in_use == 2
+        await pool.release(held)
+        await pool.release(connection)
+
+    async def test_shrink_drains_idle_then_busy_connections(self):
+        """Shrinking closes idle connections now and busy ones on release."""
+        pool = make_pool(max_connections=4)
+        connections = [await pool.get_connection() for _ in range(4)]
+        for connection in connections[:2]:
+            await pool.release(connection)
+
+        closed = await pool.resize(1)
+
+        assert closed == 2
+        assert all(c.disconnected for c in connections[:2])
+        assert pool.snapshot().total == 2
+
+        await pool.release(connections[2])
+        assert connections[2].disconnected
+        await pool.release(connections[3])
+        assert not connections[3].disconnected
+        assert pool.snapshot().idle == 1
+        assert pool.closed == 3
+        assert pool.lifetime_stats.count == 3
+
+    async def test_idle_limit_closes_extra_connections(self):
+        """Connections beyond max_idle_connections are closed on release."""
+        pool = make_pool(max_connections=3, max_idle_connections=1)
+        connections = [await pool.get_connection() for _ in range(3)]
+
+        for connection in connections:
+            await pool.release(connection)
+
+        assert pool.snapshot().idle == 1
+        assert [c.disconnected for c in connections] == [False, True, True]
+
+        await pool.set_max_idle_connections(0)
+        assert pool.snapshot().idle == 0
+
+    async def test_resize_rejects_empty_pool(self):
+        """A pool needs at least one connection."""
+        pool = make_pool()
+
+        with pytest.raises(ValueError):
+            await pool.resize(0)
+
+
+class TestPoolOptimizerResizing:
+    """Test cases for the optimizer acting on the live pool."""
+
+    @pytest.fixture
+    async def optimizer(self):
+        """Create an optimizer over a pool of fake connections."""
+        config = PoolConfiguration(
+            min_connections=1,
+            max_connections=2,
+            max_idle_connections=2,
+            connection_timeout=0.05,
+            socket_timeout=5.0,
+            socket_keepalive=True,
+            socket_keepalive_options={},
+            retry_on_timeout=True,
+            health_check_interval=30.0,
+        )
+        optimizer = ConnectionPoolOptimizer("redis://localhost:6379", config)
+        await optimizer._create_pool()
+        optimizer.pool.connection_class = FakeConnection
+        return optimizer
+
+    async def test_metrics_come_from_pool(self, optimizer):
+        """Metrics are computed from the pool's counters."""
+        await optimizer._collect_pool_metrics()
+        pool = optimizer.pool
+        connections = [await pool.get_connection() for _ in range(2)]
+        await pool.release(connections[0])
+        connection = await pool.get_connection()
+
+        await optimizer._collect_pool_metrics()
+
+        metrics = optimizer.get_pool_metrics()
+        assert metrics.active_connections == 2
+        assert metrics.connection_utilization == pytest.approx(5 / 6)
+        assert metrics.pool_hit_ratio == pytest.approx(1 / 3)
+        assert metrics.connection_creation_rate > 0
+        await pool.release(connection)
+        await pool.release(connections[1])
+
+    async def test_recommendations_resize_live_pool(self, optimizer):
+        """Applied recommendations change the running pool."""
+        pool = optimizer.pool
+
+        await optimizer._apply_optimization_recommendations(
+            [
+                {"type": "increase_pool_size", "recommended_value": 5, "reason": ""},
+                {"type": "decrease_timeout", "recommended_value": 0.5, "reason": ""},
+            ]
+        )
+
+        assert optimizer.pool is pool
+        assert pool.max_connections == 5
+        assert pool.timeout == 0.5
+        assert optimizer.config.max_connections == 5
+
+    async def test_static_strategy_does_not_apply(self, optimizer):
+        """The static strategy leaves the pool alone."""
+        optimizer.set_optimization_strategy(PoolOptimizationStrategy.STATIC)
+        optimizer.pool.in_use_stats.add(2)
+        await optimizer._collect_pool_metrics()
+
+        await optimizer._run_optimization_cycle()
+
+        assert optimizer.pool.max_connections == 2
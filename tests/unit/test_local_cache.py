@@ -0,0 +1,192 @@
+"""Unit tests for the in-process L1 cache."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from devcycle.core.cache.acp_cache import ACPCache
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+from devcycle.core.cache.local_cache import LocalCache, LocalCacheFamily
+from devcycle.core.cache.ttl_policy import TTLPolicyTable
+
+
+class TestLocalCache:
+    """Test LocalCache functionality."""
+
+    @pytest.fixture
+    def local_cache(self):
+        """Create a local cache with small families."""
+        return LocalCache(
+            families={
+                "agents:": LocalCacheFamily(max_entries=2, ttl=60),
+                "agents:status:": LocalCacheFamily(max_entries=10, ttl=5),
+            }
+        )
+
+    def test_uncached_family_bypasses_l1(self, local_cache):
+        """Keys outside every family are never stored."""
+        local_cache.set("workflows:active:wf-1", {"status": "running"})
+        assert local_cache.get("workflows:active:wf-1") == (False, None)
+        assert local_cache.l1_stats.misses == 0
+
+    def test_longest_prefix_family_wins(self, local_cache):
+        """Nested families are matched before broader ones."""
+        assert local_cache._family_for("agents:status:a") == "agents:status:"
+        assert local_cache._family_for("agents:meta:a") == "agents:"
+
+    def test_lru_eviction(self, local_cache):
+        """Least recently used entries are evicted past the family bound."""
+        local_cache.set("agents:a", 1)
+        local_cache.set("agents:b", 2)
+        local_cache.get("agents:a")
+        local_cache.set("agents:c", 3)
+
+        assert local_cache.get("agents:a") == (True, 1)
+        assert local_cache.get("agents:b") == (False, None)
+        assert local_cache.evictions == 1
+
+    def test_ttl_expiry(self, local_cache):
+        """Entries expire after the family TTL."""
+        with patch("devcycle.core.cache.local_cache.time.monotonic") as clock:
+            clock.return_value = 100.0
+            local_cache.set("agents:status:a", {"status": "online"})
+            clock.return_value = 104.0
+            assert local_cache.get("agents:status:a")[0] is True
+            clock.return_value = 106.0
+            assert local_cache.get("agents:status:a")[0] is False
+
+    def test_returned_values_are_copies(self, local_cache):
+        """Mutating a returned value does not change the cached entry."""
+        local_cache.set("agents:a", {"status": "online"})
+        _, value = local_cache.get("agents:a")
+        value["status"] = "offline"
+        assert local_cache.get("agents:a") == (True, {"status": "online"})
+
+    def test_remote_invalidation(self, local_cache):
+        """Invalidations from other workers drop entries; our own are ignored."""
+        local_cache.set("agents:a", 1)
+        local_cache.set("agents:status:b", 2)
+
+        local_cache._handle_invalidation(
+            json.dumps({"origin": local_cache.instance_id, "keys": ["agents:a"]})
+        )
+        assert local_cache.get("agents:a")[0] is True
+
+        local_cache._handle_invalidation(
+            json.dumps({"origin": "other", "keys": ["agents:a"], "prefixes": []})
+        )
+        assert local_cache.get("agents:a")[0] is False
+
+        local_cache._handle_invalidation(
+            json.dumps({"origin": "other", "keys": [], "prefixes": ["agents:"]})
+        )
+        assert local_cache.get("agents:status:b")[0] is False
+        assert local_cache.invalidations_received == 2
+
+    async def test_publish_invalidation(self, local_cache):
+        """Publishing invalidates locally and broadcasts to other workers."""
+        local_cache._redis = AsyncMock()
+        local_cache.set("agents:a", 1)
+
+        await local_cache.publish_invalidation(["agents:a", "workflows:x"])
+
+        assert local_cache.get("agents:a")[0] is False
+        channel, message = local_cache._redis.publish.call_args[0]
+        assert channel == local_cache.invalidation_channel
+        assert json.loads(message)["keys"] == ["agents:a"]
+
+    async def test_policy_change_reloads_ttl_policies(self):
+        """An announced policy change reloads the persisted policy table."""
+        table = TTLPolicyTable()
+        local_cache = LocalCache(ttl_policies=table)
+        local_cache._redis = AsyncMock()
+        local_cache._redis.hgetall.return_value = {
+            b"acp:workflows:active:*": json.dumps(
+                {"ttl": 900, "reason": "", "updated_at": "2026-01-01T00:00:00+00:00"}
+            )
+        }
+
+        local_cache._handle_invalidation(json.dumps({"ttl_policies": True}))
+        await asyncio.gather(*local_cache._reload_tasks)
+
+        assert table.to_dict() == {"acp:workflows:active:*": 900}
+        assert local_cache.invalidations_received == 0
+
+    def test_tier_stats(self, local_cache):
+        """Per-tier hit ratios are reported."""
+        local_cache.set("agents:a", 1)
+        local_cache.get("agents:a")
+        local_cache.get("agents:b")
+        local_cache.record_l2(True)
+
+        stats = local_cache.get_stats()
+
+        assert stats["l1"]["hit_ratio"] == 0.5
+        assert stats["l2"]["hit_ratio"] == 1.0
+        assert stats["overall_hit_ratio"] == 1.0
+        assert stats["redis_round_trips_saved"] == 1
+
+
+class TestACPCacheWithLocalCache:
+    """Test ACPCache read/write paths through the L1 cache."""
+
+    @pytest.fixture
+    def mock_redis_cache(self):
+        """Create a mock async Redis cache."""
+        mock_cache = Mock(spec=AsyncRedisCache)
+        mock_cache.key_prefix = "devcycle:cache:"
+        mock_cache.redis_client = AsyncMock()
+        mock_cache.redis_client.pipeline = Mock(return_value=Mock())
+        return mock_cache
+
+    @pytest.fixture
+    def acp_cache(self, mock_redis_cache):
+        """Create ACP cache with a local cache in front of Redis."""
+        return ACPCache(mock_redis_cache, LocalCache())
+
+    async def test_metadata_read_through(self, acp_cache, mock_redis_cache):
+        """Second read is served from L1 without a Redis round trip."""
+        mock_redis_cache.get.return_value = {"name": "agent-1"}
+
+        assert await acp_cache.get_agent_metadata("agent-1") == {"name": "agent-1"}
+        assert await acp_cache.get_agent_metadata("agent-1") == {"name": "agent-1"}
+
+        mock_redis_cache.get.assert_awaited_once_with("cache:agents:agent-1")
+        stats = acp_cache.get_tier_stats()
+        assert stats["l1"]["hits"] == 1
+        assert stats["l2"]["hits"] == 1
+
+    async def test_write_invalidates_l1(self, acp_cache, mock_redis_cache):
+        """Writes drop the L1 entry so the next read goes to Redis."""
+        client = mock_redis_cache.redis_client
+        client.pipeline.return_value.execute = AsyncMock(return_value=[])
+        client.hgetall.return_value = {"status": "online"}
+        await acp_cache.get_agent_status("agent-1")
+
+        await acp_cache.set_agent_status("agent-1", "busy")
+        client.hgetall.return_value = {"status": "busy"}
+
+        assert await acp_cache.get_agent_status("agent-1") == {"status": "busy"}
+        assert client.hgetall.await_count == 2
+
+    async def test_capability_discovery_cached(self, acp_cache, mock_redis_cache):
+        """Capability sets are cached in L1."""
+        mock_redis_cache.redis_client.smembers.return_value = {"agent-1"}
+
+        await acp_cache.discover_agents_by_capability("code_generation")
+        result = await acp_cache.discover_agents_by_capability("code_generation")
+
+        assert result == ["agent-1"]
+        mock_redis_cache.redis_client.smembers.assert_awaited_once()
+
+    async def test_workflow_state_bypasses_l1(self, acp_cache, mock_redis_cache):
+        """Workflow state is not an L1 family and always hits Redis."""
+        mock_redis_cache.redis_client.hgetall.return_value = {"status": '"running"'}
+
+        assert await acp_cache.get_workflow_state("wf-1") == {"status": "running"}
+        await acp_cache.get_workflow_state("wf-1")
+
+        assert mock_redis_cache.redis_client.hgetall.await_count == 2
+        assert acp_cache.get_tier_stats()["l2"]["hits"] == 0
@@ -0,0 +1,35 @@
+"""Unit tests for event loop lag measurement."""
+
+import asyncio
+import time
+
+from devcycle.core.acp.metrics.loop_lag import EventLoopLagMonitor
+
+
+class TestEventLoopLagMonitor:
+    """Test cases for the event loop lag monitor."""
+
+    async def test_blocking_call_shows_as_lag(self):
+        """Blocking the loop is recorded as lag."""
+        monitor = EventLoopLagMonitor(interval=0.005)
+        monitor.start()
+        await asyncio.sleep(0.02)
+
+        time.sleep(0.05)  # Block the loop
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        stats = monitor.get_stats()
+        assert stats["count"] > 1
+        assert stats["max"] >= 40
+        assert not monitor.running
+
+    async def test_start_is_idempotent(self):
+        """Starting twice keeps a single probe."""
+        monitor = EventLoopLagMonitor(interval=0.005)
+        monitor.start()
+        task = monitor._task
+        monitor.start()
+
+        assert monitor._task is task
+        await monitor.stop()
@@ -0,0 +1,196 @@
+"""Unit tests for the Lua script library and atomic ACP transitions."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from redis.exceptions import NoScriptError, ResponseError
+
+from devcycle.core.cache.acp_cache import ACPCache
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+from devcycle.core.cache.lua_scripts import ScriptLibrary
+
+
+class TestScriptLibrary:
+    """Test EVALSHA invocation and NOSCRIPT recovery."""
+
+    async def test_run_uses_evalsha(self):
+        """Scripts are invoked by SHA with keys and args."""
+        client = AsyncMock()
+        client.evalsha.return_value = ["status", '"running"']
+        library = ScriptLibrary(client, {"noop": "return 1"})
+
+        result = await library.run("noop", ["k1", "k2"], ["a"])
+
+        assert result == ["status", '"running"']
+        sha = library.scripts["noop"].sha
+        client.evalsha.assert_awaited_once_with(sha, 2, "k1", "k2", "a")
+        client.script_load.assert_not_awaited()
+
+    async def test_noscript_reloads_and_retries(self):
+        """A flushed script cache is repopulated transparently."""
+        client = AsyncMock()
+        client.evalsha.side_effect = [NoScriptError("NOSCRIPT"), 1]
+        library = ScriptLibrary(client, {"noop": "return 1"})
+
+        assert await library.run("noop", [], []) == 1
+        client.script_load.assert_awaited_once_with("return 1")
+        assert client.evalsha.await_count == 2
+        assert library.reloads == 1
+
+    async def test_pipeline_calls_use_evalsha(self):
+        """Queued script calls send the SHA, not the source."""
+        client = AsyncMock()
+        pipe = Mock()
+        pipe.command_stack = []
+        pipe.execute = AsyncMock(return_value=[1, True])
+        library = ScriptLibrary(client, {"noop": "return 1"})
+
+        library.queue(pipe, "noop", ["k1"], ["a"])
+        assert await library.execute(pipe) == [1, True]
+
+        pipe.evalsha.assert_called_once_with(library.scripts["noop"].sha, 1, "k1", "a")
+        pipe.execute.assert_awaited_once_with(raise_on_error=False)
+        client.script_load.assert_not_awaited()
+
+    async def test_pipeline_noscript_reloads_and_retries(self):
+        """Only the script calls Redis did not know are run again."""
+        client = AsyncMock()
+        client.execute_command.return_value = 1
+        library = ScriptLibrary(client, {"noop": "return 1"})
+        evalsha = ("EVALSHA", library.scripts["noop"].sha, 0)
+        pipe = Mock()
+        pipe.command_stack = [(("PUBLISH", "c", "m"), {}), (evalsha, {})]
+        pipe.execute = AsyncMock(return_value=[1, NoScriptError("NOSCRIPT")])
+
+        assert await library.execute(pipe) == [1, 1]
+        client.script_load.assert_awaited_once_with("return 1")
+        client.execute_command.assert_awaited_once_with(*evalsha)
+        assert library.reloads == 1
+
+    async def test_pipeline_errors_are_raised(self):
+        """Other command errors surface as with a plain pipeline."""
+        pipe = Mock()
+        pipe.command_stack = []
+        pipe.execute = AsyncMock(return_value=[ResponseError("WRONGTYPE")])
+
+        with pytest.raises(ResponseError):
+            await ScriptLibrary(AsyncMock()).execute(pipe)
+
+
+class TestACPTransitions:
+    """Test ACPCache transitions built on the script library."""
+
+    @pytest.fixture
+    def mock_redis_cache(self):
+        """Create a mock async Redis cache."""
+        mock_cache = Mock(spec=AsyncRedisCache)
+        mock_cache.key_prefix = "devcycle:cache:"
+        mock_cache.encode_value = Mock(return_value=b"\x01{}")
+        mock_cache.redis_client = AsyncMock()
+        return mock_cache
+
+    @pytest.fixture
+    def acp_cache(self, mock_redis_cache):
+        """Create ACP cache instance."""
+        return ACPCache(mock_redis_cache)
+
+    async def test_complete_workflow_step(self, acp_cache, mock_redis_cache):
+        """Step completion runs one script and returns the decoded state."""
+        client = mock_redis_cache.redis_client
+        client.evalsha.return_value = [
+            "status",
+            '"running"',
+            "progress",
+            "50",
+            "completed_steps",
+            "2",
+        ]
+
+        state = await acp_cache.complete_workflow_step(
+            "wf-1", "step-2", {"status": "completed"}, events=[("chan", "payload")]
+        )
+
+        assert state == {"status": "running", "progress": 50, "completed_steps": 2}
+        args = client.evalsha.call_args[0]
+        assert args[1] == 4
+        assert args[2:6] == (
+            "acp:workflows:active:wf-1",
+            "devcycle:cache:workflows:steps:wf-1:step-2",
+            "acp:workflows:completed:wf-1",
+            "acp:workflows:active_index",
+        )
+        assert args[6:9] == ("wf-1", "step-2", b"\x01{}")
+        assert args[-4:] == (0, "", "chan", "payload")
+        mock_redis_cache.encode_value.assert_called_once_with(
+            "workflows:steps:wf-1:step-2", {"status": "completed"}
+        )
+
+    async def test_complete_workflow_step_logs_event(self, acp_cache, mock_redis_cache):
+        """The completion event is logged by the same script that publishes it."""
+        client = mock_redis_cache.redis_client
+        client.evalsha.return_value = []
+
+        await acp_cache.complete_workflow_step(
+            "wf-1",
+            "step-2",
+            {},
+            events=[("acp:events:workflow_events", "{}")],
+            event_log=("acp:stream:workflow_events", "acp:events:workflow_events", 500),
+        )
+
+        args = client.evalsha.call_args[0]
+        assert args[1] == 5
+        assert args[6] == "acp:stream:workflow_events"
+        assert args[-4:] == (
+            500,
+            "acp:events:workflow_events",
+            "acp:events:workflow_events",
+            "{}",
+        )
+
+    async def test_advance_progress_missing_workflow(self, acp_cache, mock_redis_cache):
+        """Advancing an uncached workflow returns an empty state."""
+        mock_redis_cache.redis_client.evalsha.return_value = None
+
+        assert await acp_cache.advance_workflow_progress("wf-1", "step-2", 50) == {}
+
+    async def test_transition_error_returns_none(self, acp_cache, mock_redis_cache):
+        """Redis errors are logged and reported as None."""
+        mock_redis_cache.redis_client.evalsha.side_effect = ConnectionError("down")
+
+        assert await acp_cache.complete_workflow_step("wf-1", "s", {}) is None
+
+    async def test_register_agent(self, acp_cache, mock_redis_cache):
+        """Registration writes status, indexes, metadata and capabilities."""
+        client = mock_redis_cache.redis_client
+        client.smembers.return_value = {"code", "review"}
+        client.evalsha.return_value = ["status", "online", "current_runs", "0"]
+
+        status = await acp_cache.register_agent(
+            "agent-1",
+            {"status": "online", "current_runs": 0},
+            {"agent_id": "agent-1"},
+            ["code", "test"],
+        )
+
+        assert status == {"status": "online", "current_runs": 0}
+        client.smembers.assert_awaited_once_with("acp:agents:capabilities:agent-1")
+        args = client.evalsha.call_args[0]
+        key_count = args[1]
+        keys = args[2 : 2 + key_count]
+        script_args = args[2 + key_count :]
+        assert keys[:4] == (
+            "acp:agents:status:agent-1",
+            "devcycle:cache:cache:agents:agent-1",
+            "acp:agents:capabilities:agent-1",
+            "acp:agents:status_index:online",
+        )
+        # New capability sets, then the set the agent no longer belongs to
+        assert keys[-3:] == (
+            "capabilities:code",
+            "capabilities:test",
+            "capabilities:review",
+        )
+        # Five tracked statuses, "online" is the first, two capabilities
+        assert script_args[6:11] == (5, 1, 2, "code", "test")
+        assert script_args[11:] == ("status", "online", "current_runs", 0)
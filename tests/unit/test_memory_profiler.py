@@ -0,0 +1,130 @@
+"""Unit tests for the streaming Redis memory profiler and its CLI."""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from devcycle.cli.redis_memory import format_bytes, main
+from devcycle.core.acp.cache.memory_profiler import MemoryProfile, MemoryProfiler
+
+
+def make_pipeline(results):
+    """Create a mock pipeline returning the given replies."""
+    pipe = Mock()
+    pipe.execute = AsyncMock(return_value=results)
+    return pipe
+
+
+class TestMemoryProfiler:
+    """Test keyspace profiling."""
+
+    @pytest.fixture
+    def mock_redis_client(self):
+        """Create a mock Redis client with a two-batch keyspace."""
+        client = Mock()
+        client.scan = AsyncMock(
+            side_effect=[
+                (7, ["acp:agents:status:a1", "acp:agents:status:a2"]),
+                (0, ["devcycle:cache:workflows:steps:wf-1:s1", "gone"]),
+            ]
+        )
+        client.pipeline = Mock(
+            side_effect=[
+                make_pipeline(["hash", 200, "hash", 300]),
+                make_pipeline(["string", 5000, "none", None]),
+                # Exact re-measurement of the top candidates
+                make_pipeline([5200, 300, 200]),
+            ]
+        )
+        return client
+
+    @pytest.fixture
+    def profiler(self, mock_redis_client):
+        """Create a profiler that does not pause between batches."""
+        return MemoryProfiler(mock_redis_client, top_n=2, batch_pause=0)
+
+    async def test_profile_attributes_by_family(self, profiler, mock_redis_client):
+        """Memory is aggregated per key family and type."""
+        profile = await profiler.profile()
+
+        assert profile.complete
+        assert profile.keys_scanned == 3
+        assert profile.total_bytes == 5500
+        assert profile.by_type == {"hash": 500, "string": 5000}
+        family = profile.families["acp:agents:status:*"]
+        assert (family.keys, family.bytes) == (2, 500)
+        assert [f.family for f in profile.top_families(1)] == [
+            "devcycle:cache:workflows:steps:*:*"
+        ]
+
+    async def test_big_keys_measured_exactly(self, profiler, mock_redis_client):
+        """The largest keys are re-measured with SAMPLES 0."""
+        profile = await profiler.profile()
+
+        assert [(big.key, big.bytes) for big in profile.big_keys] == [
+            ("devcycle:cache:workflows:steps:wf-1:s1", 5200),
+            ("acp:agents:status:a2", 300),
+        ]
+
+    async def test_max_keys_marks_partial(self, profiler, mock_redis_client):
+        """Stopping early reports an incomplete profile."""
+        mock_redis_client.pipeline.side_effect = [
+            make_pipeline(["hash", 200, "hash", 300]),
+            make_pipeline([300, 200]),
+        ]
+
+        profile = await profiler.profile(max_keys=1)
+
+        assert not profile.complete
+        assert profile.keys_scanned == 2
+
+    async def test_family_history(self, profiler, mock_redis_client):
+        """Each profile adds a point to the per-family time series."""
+        await profiler.profile()
+        mock_redis_client.scan.side_effect = [(0, ["acp:agents:status:a1"])]
+        mock_redis_client.pipeline.side_effect = [
+            make_pipeline(["hash", 900]),
+            make_pipeline([900]),
+        ]
+        await profiler.profile()
+
+        history = profiler.get_family_history("acp:agents:status:*")
+        assert [size for _, size in history] == [500, 900]
+        trends = profiler.get_family_trends()
+        assert trends["acp:agents:status:*"] == 400
+        assert trends["devcycle:cache:workflows:steps:*:*"] == -5000
+
+
+class TestRedisMemoryCLI:
+    """Test the one-shot CLI report."""
+
+    def test_format_bytes(self):
+        """Sizes are printed with binary units."""
+        assert format_bytes(512) == "512 B"
+        assert format_bytes(1536) == "1.5 KiB"
+        assert format_bytes(3 * 1024**3) == "3.0 GiB"
+
+    def test_json_report(self, capsys):
+        """--json prints the profile as JSON."""
+        profile = MemoryProfile(started_at=Mock(isoformat=lambda: "t"))
+        with patch(
+            "devcycle.cli.redis_memory.run_profile", AsyncMock(return_value=profile)
+        ) as run_profile:
+            main(["--json", "--match", "acp:*"])
+
+        assert run_profile.call_args[0][0].match == "acp:*"
+        report = json.loads(capsys.readouterr().out)
+        assert report["keys_scanned"] == 0
+        assert report["complete"] is False
+
+    def test_error_exits(self, capsys):
+        """Connection errors exit with status 1."""
+        with patch(
+            "devcycle.cli.redis_memory.run_profile",
+            AsyncMock(side_effect=ConnectionError("refused")),
+        ):
+            with pytest.raises(SystemExit):
+                main([])
+
+        assert "refused" in capsys.readouterr().out
@@ -0,0 +1,164 @@
+"""Unit tests for the shared Redis connection pool registry."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from devcycle.api.app import create_app
+from devcycle.core.cache import pool_registry
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+from devcycle.core.cache.pool_registry import (
+    RedisPoolRegistry,
+    close_pool_registry,
+    get_pool_registry,
+)
+from devcycle.core.cache.redis_cache import RedisCache
+from devcycle.core.config.settings import RedisConfig
+
+
+@pytest.fixture
+def redis_config():
+    """Create Redis settings for the registry."""
+    return RedisConfig(host="redis.test", port=6380, db=2, max_connections=7)
+
+
+@pytest.fixture
+def registry(redis_config):
+    """Create a pool registry."""
+    return RedisPoolRegistry(redis_config)
+
+
+class TestRedisPoolRegistry:
+    """Test cases for the pool registry."""
+
+    def test_pools_are_shared_per_decode_mode(self, registry):
+        """The same pool is handed out for the same URL, db and decode mode."""
+        text = registry.get_pool(decode_responses=True)
+        binary = registry.get_pool(decode_responses=False)
+
+        assert registry.get_pool(decode_responses=True) is text
+        assert binary is not text
+        assert registry.get_pool(db=3) is not text
+
+    def test_pools_are_sized_from_config(self, registry):
+        """Pools use the configured connection settings."""
+        pool = registry.get_async_pool()
+
+        assert pool.max_connections == 7
+        assert pool.connection_kwargs["host"] == "redis.test"
+        assert pool.connection_kwargs["port"] == 6380
+        assert pool.connection_kwargs["db"] == 2
+        assert pool.connection_kwargs["decode_responses"] is True
+
+    def test_clients_share_pools(self, registry):
+        """Clients handed out by the registry reuse its pools."""
+        first = registry.get_client()
+        second = registry.get_client()
+        async_client = registry.get_async_client(decode_responses=False)
+
+        assert first is not second
+        assert first.connection_pool is second.connection_pool
+        assert async_client.connection_pool is registry.get_async_pool(False)
+
+    def test_stats_list_every_pool(self, registry):
+        """Stats report connection counts per pool."""
+        registry.get_pool()
+        registry.get_async_pool(decode_responses=False)
+
+        stats = registry.get_stats()
+
+        assert [(p["kind"], p["decode_responses"]) for p in stats["pools"]] == [
+            ("sync", True),
+            ("async", False),
+        ]
+        assert stats["pools"][0]["url"] == "redis://redis.test:6380"
+        assert stats["pools"][0]["max_connections"] == 7
+        assert stats["total_in_use"] == 0
+        assert stats["total_idle"] == 0
+
+    def test_stats_count_busy_and_idle_connections(self, registry):
+        """Checked-out and returned connections are counted per pool."""
+        pool = registry.get_pool()
+        for _ in range(2):  # Check out two slots, opening a connection each
+            pool.pool.get_nowait()
+            connection = pool.make_connection()
+        pool.pool.put_nowait(connection)
+        async_pool = registry.get_async_pool()
+        async_pool._in_use_connections.add(async_pool.make_connection())
+
+        stats = registry.get_stats()
+
+        assert [(p["in_use"], p["idle"]) for p in stats["pools"]] == [
+            (1, 1),
+            (1, 0),
+        ]
+        assert stats["total_in_use"] == 2
+
+    async def test_close_forgets_pools(self, registry):
+        """Closing disconnects every pool and starts afresh."""
+        pool = registry.get_async_pool()
+
+        await registry.aclose()
+
+        assert registry.get_stats()["pools"] == []
+        assert registry.get_async_pool() is not pool
+
+    async def test_global_registry_lifecycle(self, redis_config):
+        """The global registry is created once and reset on close."""
+        with patch.object(pool_registry, "_pool_registry_instance", None):
+            registry = get_pool_registry()
+            assert get_pool_registry() is registry
+
+            await close_pool_registry()
+            assert get_pool_registry() is not registry
+
+
+class TestSharedPoolConsumers:
+    """Test cases for services built on the shared pools."""
+
+    def test_caches_share_pools(self, registry):
+        """Cache instances reuse the registry's pools."""
+        with (
+            patch(
+                "devcycle.core.cache.redis_cache.get_pool_registry",
+                return_value=registry,
+            ),
+            patch(
+                "devcycle.core.cache.async_redis_cache.get_pool_registry",
+                return_value=registry,
+            ),
+        ):
+            first, second = RedisCache(), RedisCache()
+            async_cache = AsyncRedisCache()
+
+        assert first.redis_client.connection_pool is second.redis_client.connection_pool
+        assert first.binary_client.connection_pool is registry.get_pool(False)
+        assert async_cache.redis_client.connection_pool is registry.get_async_pool()
+        assert len(registry.get_stats()["pools"]) == 4
+
+
+class TestRedisPoolDebugEndpoint:
+    """Test cases for the pool stats endpoint."""
+
+    def test_hidden_outside_debug_mode(self):
+        """The endpoint is not served unless debug mode is on."""
+        client = TestClient(create_app())
+
+        response = client.get("/api/v1/debug/redis-pools")
+
+        assert response.status_code == 404
+
+    def test_reports_pool_stats_in_debug_mode(self, registry):
+        """In debug mode the endpoint returns the registry stats."""
+        app = create_app()
+        registry.get_pool()
+        with (
+            patch("devcycle.api.app.get_config") as mock_config,
+            patch("devcycle.api.app.get_pool_registry", return_value=registry),
+        ):
+            mock_config.return_value.debug = True
+            response = TestClient(app).get("/api/v1/debug/redis-pools")
+
+        assert response.status_code == 200
+        assert response.json()["pools"][0]["max_connections"] == 7
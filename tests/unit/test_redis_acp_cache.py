@@ -1,11 +1,11 @@
 """Unit tests for Redis ACP cache integration."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
 from devcycle.core.cache.acp_cache import ACPCache
-from devcycle.core.cache.redis_cache import RedisCache
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
 
 
 class TestACPCache:
@@ -14,18 +14,18 @@ class TestACPCache:
     @pytest.fixture
     def mock_redis_cache(self):
         """Create a mock Redis cache."""
-        mock_cache = Mock(spec=RedisCache)
+        mock_cache = Mock(spec=AsyncRedisCache)
         mock_cache.key_prefix = "devcycle:cache:"
-        mock_cache.redis_client = Mock()
-        mock_cache.redis_client.pipeline.return_value = Mock()
+        mock_cache.redis_client = AsyncMock()
+        mock_cache.redis_client.pipeline = Mock(return_value=Mock())
         mock_cache.redis_client.smembers.return_value = set()
-        mock_cache.redis_client.keys.return_value = []
+        mock_cache.redis_client.scan.return_value = (0, [])
         mock_cache.redis_client.info.return_value = {
             "keyspace_hits": 100,
             "keyspace_misses": 20,
             "redis_version": "7.0.0",
         }
-        mock_cache.clear_pattern = Mock(return_value=10)
+        mock_cache.clear_pattern = AsyncMock(return_value=10)
         return mock_cache
 
     @pytest.fixture
@@ -33,6 +33,13 @@ class TestACPCache:
         """Create ACP cache instance."""
         return ACPCache(mock_redis_cache)
 
+    @staticmethod
+    def _status_write(client):
+        """Split the last write_agent_status call into keys and arguments."""
+        args = client.evalsha.call_args[0]
+        key_count = args[1]
+        return args[2 : 2 + key_count], args[2 + key_count :]
+
     @pytest.mark.asyncio
     async def test_cache_agent_status(self, acp_cache, mock_redis_cache):
         """Test caching agent status."""
@@ -43,16 +50,78 @@ class TestACPCache:
             "current_runs": 2,
             "max_runs": 5,
         }
-
-        mock_redis_cache.set.return_value = True
+        client = mock_redis_cache.redis_client
+        client.evalsha.return_value = "2"
 
         result = await acp_cache.cache_agent_status(agent_id, status)
 
         assert result is True
-        mock_redis_cache.set.assert_called_once_with(
-            f"agents:status:{agent_id}", status, ttl=300
+        keys, args = self._status_write(client)
+        assert keys == (
+            f"acp:agents:status:{agent_id}",
+            "acp:agents:status_index:online",
+            "acp:agents:status_index:offline",
+            "acp:agents:status_index:busy",
+            "acp:agents:status_index:error",
+            "acp:agents:status_index:maintenance",
+        )
+        # TTL, no run count change, status set to the first tracked status
+        assert args[0] == agent_id
+        assert args[1] == 300
+        assert args[3:6] == (0, 1, 1)
+        assert args[6:] == (
+            "status",
+            "online",
+            "last_seen",
+            "2024-01-01T00:00:00Z",
+            "current_runs",
+            2,
+            "max_runs",
+            5,
         )
 
+    @pytest.mark.asyncio
+    async def test_set_agent_status_writes_single_fields(
+        self, acp_cache, mock_redis_cache
+    ):
+        """Test status flips update status, last_seen and the run count at once."""
+        client = mock_redis_cache.redis_client
+        client.evalsha.return_value = "1"
+
+        result = await acp_cache.set_agent_status(
+            "agent-1", "busy", "2024-01-01", delta_runs=1
+        )
+
+        assert result is True
+        client.evalsha.assert_awaited_once()
+        keys, args = self._status_write(client)
+        assert keys[0] == "acp:agents:status:agent-1"
+        # Run count +1, status set to "busy", the third tracked status
+        assert args[3:] == (1, 1, 3, "status", "busy", "last_seen", "2024-01-01")
+
+    @pytest.mark.asyncio
+    async def test_increment_agent_runs(self, acp_cache, mock_redis_cache):
+        """Test run counts use the status script without touching other fields."""
+        client = mock_redis_cache.redis_client
+        client.evalsha.return_value = "3"
+
+        result = await acp_cache.increment_agent_runs("agent-1", 1)
+
+        assert result == 3
+        keys, args = self._status_write(client)
+        assert keys[0] == "acp:agents:status:agent-1"
+        # Run count +1, status unchanged, no fields
+        assert args[3:] == (1, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_increment_agent_runs_missing_agent(
+        self, acp_cache, mock_redis_cache
+    ):
+        """Test run counts are not written for agents without a cached status."""
+        mock_redis_cache.redis_client.evalsha.return_value = None
+
+        assert await acp_cache.increment_agent_runs("agent-1", 1) is None
+
     @pytest.mark.asyncio
     async def test_get_agent_status(self, acp_cache, mock_redis_cache):
         """Test getting cached agent status."""
@@ -64,12 +133,27 @@ class TestACPCache:
             "max_runs": 5,
         }
 
-        mock_redis_cache.get.return_value = expected_status
+        mock_redis_cache.redis_client.hgetall.return_value = {
+            "status": "online",
+            "last_seen": "2024-01-01T00:00:00Z",
+            "current_runs": "2",
+            "max_runs": "5",
+        }
 
         result = await acp_cache.get_agent_status(agent_id)
 
         assert result == expected_status
-        mock_redis_cache.get.assert_called_once_with(f"agents:status:{agent_id}")
+        mock_redis_cache.redis_client.hgetall.assert_awaited_once_with(
+            f"acp:agents:status:{agent_id}"
+        )
+        mock_redis_cache.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_agent_status_missing(self, acp_cache, mock_redis_cache):
+        """Test a missing status hash reads as None."""
+        mock_redis_cache.redis_client.hgetall.return_value = {}
+
+        assert await acp_cache.get_agent_status("missing") is None
 
     @pytest.mark.asyncio
     async def test_cache_capability_mapping(self, acp_cache, mock_redis_cache):
@@ -82,7 +166,7 @@ class TestACPCache:
         mock_pipeline.delete.return_value = None
         mock_pipeline.sadd.return_value = None
         mock_pipeline.expire.return_value = True
-        mock_pipeline.execute.return_value = [None, None, True]
+        mock_pipeline.execute = AsyncMock(return_value=[None, None, True])
         mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
 
         result = await acp_cache.cache_capability_mapping(capability, agent_ids)
@@ -109,6 +193,43 @@ class TestACPCache:
             f"capabilities:{capability}"
         )
 
+    @pytest.mark.asyncio
+    async def test_remove_agent_capabilities(self, acp_cache, mock_redis_cache):
+        """Test unregistering removes the agent via its reverse index."""
+        mock_redis_cache.redis_client.smembers.return_value = {"code"}
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1, 1, 1])
+        mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
+
+        result = await acp_cache.remove_agent_capabilities("agent-1", ["test"])
+
+        assert result is True
+        removed = {call.args for call in mock_pipeline.srem.call_args_list}
+        assert removed == {
+            ("capabilities:code", "agent-1"),
+            ("capabilities:test", "agent-1"),
+        }
+        mock_pipeline.delete.assert_called_once_with("acp:agents:capabilities:agent-1")
+
+    @pytest.mark.asyncio
+    async def test_discover_agents_by_capabilities(self, acp_cache, mock_redis_cache):
+        """Test multi-capability discovery uses server-side set operations."""
+        client = mock_redis_cache.redis_client
+        client.sinter.return_value = {"agent-1"}
+        client.sunion.return_value = {"agent-1", "agent-2"}
+
+        assert await acp_cache.discover_agents_by_capabilities(["code", "test"]) == [
+            "agent-1"
+        ]
+        client.sinter.assert_awaited_once_with(
+            ["capabilities:code", "capabilities:test"]
+        )
+
+        result = await acp_cache.discover_agents_by_capabilities(
+            ["code", "test"], match_all=False
+        )
+        assert sorted(result) == ["agent-1", "agent-2"]
+
     @pytest.mark.asyncio
     async def test_cache_workflow_state(self, acp_cache, mock_redis_cache):
         """Test caching workflow state."""
@@ -120,13 +241,41 @@ class TestACPCache:
             "started_at": "2024-01-01T00:00:00Z",
         }
 
-        mock_redis_cache.set.return_value = True
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[0, 4, True, 1])
+        mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
 
         result = await acp_cache.cache_workflow_state(workflow_id, state)
 
         assert result is True
-        mock_redis_cache.set.assert_called_once_with(
-            f"workflows:active:{workflow_id}", state, ttl=1800
+        key = f"acp:workflows:active:{workflow_id}"
+        mock_pipeline.delete.assert_called_once_with(key)
+        mock_pipeline.hset.assert_called_once_with(
+            key,
+            mapping={
+                "status": '"running"',
+                "current_step": '"step-1"',
+                "progress": "25",
+                "started_at": '"2024-01-01T00:00:00Z"',
+            },
+        )
+        mock_pipeline.expire.assert_called_once_with(key, 1800)
+        mock_pipeline.zadd.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_workflow_state(self, acp_cache, mock_redis_cache):
+        """Test workflow state hash fields are decoded."""
+        mock_redis_cache.redis_client.hgetall.return_value = {
+            "status": '"running"',
+            "progress": "25",
+            "current_step": "null",
+        }
+
+        result = await acp_cache.get_workflow_state("workflow-123")
+
+        assert result == {"status": "running", "progress": 25, "current_step": None}
+        mock_redis_cache.redis_client.hgetall.assert_called_once_with(
+            "acp:workflows:active:workflow-123"
         )
 
     @pytest.mark.asyncio
@@ -143,17 +292,66 @@ class TestACPCache:
 
     @pytest.mark.asyncio
     async def test_get_agent_status_distribution(self, acp_cache, mock_redis_cache):
-        """Test getting agent status distribution."""
-        mock_redis_cache.redis_client.keys.return_value = [
-            "acp:agents:status:agent-1",
-            "acp:agents:status:agent-2",
-            "acp:agents:status:agent-3",
-        ]
-        mock_redis_cache.redis_client.hget.side_effect = ["online", "offline", "busy"]
+        """Test status distribution comes from the per-status indexes."""
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[0, 2, 1, 1, 0, 1, 0, 0, 0, 0])
+        mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
 
         result = await acp_cache.get_agent_status_distribution()
 
-        assert result == {"online": 1, "offline": 1, "busy": 1}
+        assert result == {
+            "online": 2,
+            "offline": 1,
+            "busy": 1,
+            "error": 0,
+            "maintenance": 0,
+        }
+        assert mock_pipeline.zcard.call_count == 5
+        mock_redis_cache.redis_client.scan.assert_not_called()
+        mock_redis_cache.redis_client.keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_workflow_metrics_uses_index(self, acp_cache, mock_redis_cache):
+        """Test active workflow count comes from the index, not a key scan."""
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[1, 4])
+        status_pipeline = Mock()
+        status_pipeline.execute = AsyncMock(return_value=[0, 1] * 5)
+        mock_redis_cache.redis_client.pipeline.side_effect = [
+            mock_pipeline,
+            status_pipeline,
+        ]
+
+        result = await acp_cache.get_workflow_metrics()
+
+        assert result["active_workflows"] == 4
+        assert result["agent_status_distribution"]["online"] == 1
+        mock_pipeline.zcard.assert_called_once_with("acp:workflows:active_index")
+        mock_redis_cache.redis_client.keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_clear_workflow_cache(self, acp_cache, mock_redis_cache):
+        """Test clearing workflow cache scans only the workflow's step keys."""
+        mock_redis_cache.redis_client.scan.return_value = (
+            0,
+            ["devcycle:cache:workflows:steps:wf-1:step-1"],
+        )
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[3, 1])
+        mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
+
+        result = await acp_cache.clear_workflow_cache("wf-1")
+
+        assert result is True
+        mock_pipeline.delete.assert_called_once_with(
+            "acp:workflows:active:wf-1",
+            "acp:workflows:completed:wf-1",
+            "devcycle:cache:workflows:steps:wf-1:step-1",
+        )
+        assert (
+            mock_redis_cache.redis_client.scan.call_args.kwargs["match"]
+            == "devcycle:cache:workflows:steps:wf-1:*"
+        )
 
     @pytest.mark.asyncio
     async def test_batch_update_agent_status(self, acp_cache, mock_redis_cache):
@@ -165,34 +363,63 @@ class TestACPCache:
 
         # Mock pipeline operations
         mock_pipeline = Mock()
-        mock_pipeline.hset.return_value = None
-        mock_pipeline.expire.return_value = True
-        # Each agent has 2 operations (hset + expire), so 4 total results
-        # hset returns 1 for success, expire returns True
-        mock_pipeline.execute.return_value = [1, True, 1, True]
+        mock_pipeline.command_stack = []
+        mock_pipeline.execute = AsyncMock(return_value=["2", "0"])
         mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
 
         result = await acp_cache.batch_update_agent_status(agent_updates)
 
         assert result is True
-        assert mock_pipeline.hset.call_count == 2
-        assert mock_pipeline.expire.call_count == 2
+        assert mock_pipeline.evalsha.call_count == 2
+        assert mock_pipeline.evalsha.call_args_list[0][0][2] == (
+            "acp:agents:status:agent-1"
+        )
+        mock_pipeline.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_set_many_applies_ttl_policies(self, acp_cache, mock_redis_cache):
+        """Test bulk writes use policy TTLs and invalidate L1 copies."""
+        acp_cache.ttl_policies.set("devcycle:cache:cache:agents:*", 120)
+        acp_cache._invalidate_local = AsyncMock()
+        mock_redis_cache.set_many = AsyncMock(return_value=[True, True, True])
+
+        result = await acp_cache.set_many(
+            [
+                ("cache:agents:a1", {"name": "a1"}, 3600),
+                ("cache:agents:a2", {"name": "a2"}, None),
+                ("cache:templates:t1", {"steps": []}, None),
+            ]
+        )
+
+        assert result == [True, True, True]
+        mock_redis_cache.set_many.assert_awaited_once_with(
+            [
+                ("cache:agents:a1", {"name": "a1"}, 120),
+                ("cache:agents:a2", {"name": "a2"}, 120),
+                ("cache:templates:t1", {"steps": []}, None),
+            ]
+        )
+        acp_cache._invalidate_local.assert_awaited_once_with(
+            keys=["cache:agents:a1", "cache:agents:a2", "cache:templates:t1"]
+        )
 
     @pytest.mark.asyncio
     async def test_clear_agent_cache(self, acp_cache, mock_redis_cache):
         """Test clearing agent cache."""
         agent_id = "test-agent-1"
-        mock_redis_cache.redis_client.keys.return_value = [
-            "acp:agents:status:test-agent-1",
-            "acp:agents:heartbeat:test-agent-1",
-            "acp:cache:agents:test-agent-1",
-        ]
-        mock_redis_cache.redis_client.delete.return_value = 3
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[3, 1, 0, 0, 0, 0])
+        mock_redis_cache.redis_client.pipeline.return_value = mock_pipeline
 
         result = await acp_cache.clear_agent_cache(agent_id)
 
         assert result is True
-        mock_redis_cache.redis_client.delete.assert_called_once()
+        mock_pipeline.delete.assert_called_once_with(
+            "acp:agents:status:test-agent-1",
+            "acp:agents:heartbeat:test-agent-1",
+            "acp:cache:agents:test-agent-1",
+        )
+        assert mock_pipeline.zrem.call_count == 5
 
     @pytest.mark.asyncio
     async def test_clear_all_acp_cache(self, acp_cache, mock_redis_cache):
@@ -1,12 +1,14 @@
 """Unit tests for Redis ACP Events service."""
 
+import asyncio
 import json
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from devcycle.core.acp.events.event_types import ACPEventType
 from devcycle.core.acp.events.redis_events import RedisACPEvents
+from devcycle.core.dependencies import close_redis_events, get_redis_events
 
 
 class TestRedisACPEvents:
@@ -17,17 +19,20 @@ class TestRedisACPEvents:
         """Create a mock Redis cache."""
         mock_cache = Mock()
         mock_redis = Mock()
-        mock_redis.publish = Mock()
+        mock_redis.publish = AsyncMock()
+        mock_redis.pipeline.return_value.execute = AsyncMock(return_value=[])
 
         # Create a proper mock pubsub object
         mock_pubsub = Mock()
-        mock_pubsub.subscribe = Mock()
-        mock_pubsub.close = Mock()
+        mock_pubsub.subscribe = AsyncMock()
+        mock_pubsub.psubscribe = AsyncMock()
+        mock_pubsub.aclose = AsyncMock()
+        mock_pubsub.subscribed = False
         mock_pubsub.get_message = AsyncMock(return_value=None)
         mock_redis.pubsub.return_value = mock_pubsub
 
-        mock_redis.pubsub_channels = Mock(return_value=[])
-        mock_redis.pubsub_numsub = Mock(return_value={})
+        mock_redis.pubsub_channels = AsyncMock(return_value=[])
+        mock_redis.pubsub_numsub = AsyncMock(return_value={})
         mock_cache.redis_client = mock_redis
         mock_cache.redis = mock_redis
         return mock_cache
@@ -96,16 +101,19 @@ class TestRedisACPEvents:
 
         await redis_events.publish_workflow_progress(workflow_id, step_id, progress)
 
-        # Verify Redis publish was called twice (general and specific channels)
-        assert mock_redis_cache.redis_client.publish.call_count == 2
+        # Both channels are published in one pipelined round trip
+        pipe = mock_redis_cache.redis_client.pipeline.return_value
+        assert pipe.publish.call_count == 2
+        pipe.execute.assert_awaited_once()
 
         # Check specific workflow channel (first call)
-        specific_call = mock_redis_cache.redis_client.publish.call_args_list[0]
+        specific_call = pipe.publish.call_args_list[0]
         assert specific_call[0][0] == f"acp:events:workflow_events:{workflow_id}"
 
         # Check general workflow events channel (second call)
-        general_call = mock_redis_cache.redis_client.publish.call_args_list[1]
+        general_call = pipe.publish.call_args_list[1]
         assert general_call[0][0] == "acp:events:workflow_events"
+        assert general_call[0][1] == specific_call[0][1]
 
         # Check event data
         event_data = json.loads(specific_call[0][1])
@@ -127,11 +135,12 @@ class TestRedisACPEvents:
 
         await redis_events.publish_workflow_step_completed(workflow_id, step_id, result)
 
-        # Verify Redis publish was called twice
-        assert mock_redis_cache.redis_client.publish.call_count == 2
+        # Verify both channels were published
+        pipe = mock_redis_cache.redis_client.pipeline.return_value
+        assert pipe.publish.call_count == 2
 
         # Check event data
-        call_args = mock_redis_cache.redis_client.publish.call_args_list[0]
+        call_args = pipe.publish.call_args_list[0]
         event_data = json.loads(call_args[0][1])
         assert event_data["event_type"] == ACPEventType.WORKFLOW_STEP_COMPLETED
         assert event_data["source"] == workflow_id
@@ -194,14 +203,14 @@ class TestRedisACPEvents:
 
         # Mock pubsub
         mock_pubsub = Mock()
-        mock_pubsub.subscribe = Mock()
+        mock_pubsub.subscribe = AsyncMock()
         mock_redis_cache.redis_client.pubsub.return_value = mock_pubsub
         redis_events.pubsub = mock_pubsub  # Set pubsub directly
 
         await redis_events.subscribe_to_agent_events(callback)
 
-        # Verify subscription
-        mock_pubsub.subscribe.assert_called_once_with("acp:events:agent_events")
+        # Handlers are registered locally; the pattern subscription covers Redis
+        mock_pubsub.subscribe.assert_not_called()
         assert "acp:events:agent_events" in redis_events.subscribers
         assert callback in redis_events.subscribers["acp:events:agent_events"]
 
@@ -213,7 +222,7 @@ class TestRedisACPEvents:
 
         # Mock pubsub
         mock_pubsub = Mock()
-        mock_pubsub.subscribe = Mock()
+        mock_pubsub.subscribe = AsyncMock()
         mock_redis_cache.redis_client.pubsub.return_value = mock_pubsub
         redis_events.pubsub = mock_pubsub  # Set pubsub directly
 
@@ -221,53 +230,256 @@ class TestRedisACPEvents:
 
         # Verify subscription
         expected_channel = f"acp:events:workflow_events:{workflow_id}"
-        mock_pubsub.subscribe.assert_called_once_with(expected_channel)
+        mock_pubsub.subscribe.assert_not_called()
         assert expected_channel in redis_events.subscribers
         assert callback in redis_events.subscribers[expected_channel]
 
     @pytest.mark.asyncio
     async def test_get_active_channels(self, redis_events, mock_redis_cache):
-        """Test getting active channels."""
-        mock_channels = [b"acp:events:agent_events", b"acp:events:workflow_events"]
-        mock_redis_cache.redis.pubsub_channels = Mock(return_value=mock_channels)
+        """Test active channels come from local handlers, not PUBSUB CHANNELS."""
+        mock_redis_cache.redis.pubsub_channels = AsyncMock(return_value=[])
+        redis_events.add_handler("workflow_events", Mock())
+        redis_events.add_handler("agent_events", Mock())
 
         channels = await redis_events.get_active_channels()
 
-        assert channels == [
-            "b'acp:events:agent_events'",
-            "b'acp:events:workflow_events'",
-        ]
+        assert channels == ["acp:events:agent_events", "acp:events:workflow_events"]
+        mock_redis_cache.redis.pubsub_channels.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_subscriber_count(self, redis_events, mock_redis_cache):
-        """Test getting subscriber count for a channel."""
-        channel = "agent_events"
-        expected_count = 5
-        mock_redis_cache.redis.pubsub_numsub = Mock(
-            return_value=[(f"acp:events:{channel}".encode("utf-8"), expected_count)]
-        )
-
-        count = await redis_events.get_subscriber_count(channel)
+        """Test subscriber counts include handlers behind the pattern subscription."""
+        mock_redis_cache.redis.pubsub_numsub = AsyncMock(return_value=[])
+        redis_events.add_handler("agent_events", Mock())
+        redis_events.add_handler("agent_events", Mock())
 
-        assert count == expected_count
+        assert await redis_events.get_subscriber_count("agent_events") == 2
+        assert await redis_events.get_subscriber_count("system_health") == 0
+        mock_redis_cache.redis.pubsub_numsub.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_start_and_stop(self, redis_events, mock_redis_cache):
         """Test starting and stopping the events service."""
         # Mock pubsub
         mock_pubsub = Mock()
-        mock_pubsub.close = Mock()
+        mock_pubsub.aclose = AsyncMock()
+        mock_pubsub.subscribe = AsyncMock()
+        mock_pubsub.psubscribe = AsyncMock()
+        mock_pubsub.subscribed = False
         mock_redis_cache.redis_client.pubsub.return_value = mock_pubsub
 
         # Test start
         await redis_events.start()
         assert redis_events._running is True
         assert redis_events.pubsub is not None
+        # Family channels only: per-workflow channels are not received
+        channels = mock_pubsub.subscribe.call_args.args
+        assert "acp:events:workflow_events" in channels
+        assert "acp:events:agent_events" in channels
+        mock_pubsub.psubscribe.assert_not_called()
 
         # Test stop
         await redis_events.stop()
         assert redis_events._running is False
-        mock_pubsub.close.assert_called_once()
+        mock_pubsub.aclose.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_publish_only_service(self, redis_events):
+        """A service that never subscribed still publishes coalesced events."""
+        redis_events.publisher.close = AsyncMock()
+
+        await redis_events.stop()
+
+        redis_events.publisher.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_shared_events_service(self, mock_redis_cache):
+        """Dependencies share one events service until it is closed."""
+        with patch(
+            "devcycle.core.dependencies.get_async_cache",
+            return_value=mock_redis_cache,
+        ):
+            events = get_redis_events()
+            assert get_redis_events() is events
+
+            events.publisher.close = AsyncMock()
+            await close_redis_events()
+            events.publisher.close.assert_awaited_once()
+            assert get_redis_events() is not events
+            await close_redis_events()
+
+    @staticmethod
+    def _message(channel, data):
+        """Build a subscription message."""
+        return {
+            "type": "message",
+            "pattern": None,
+            "channel": channel,
+            "data": json.dumps(data),
+        }
+
+    async def test_reader_dispatches_messages(self, redis_events, mock_redis_cache):
+        """The reader task delivers messages to sync and async handlers."""
+        received = []
+        delivered = asyncio.Event()
+
+        def sync_handler(data):
+            received.append(("sync", data))
+
+        async def async_handler(data):
+            received.append(("async", data))
+            delivered.set()
+
+        await redis_events.subscribe_to_agent_events(sync_handler)
+        await redis_events.subscribe_to_agent_events(async_handler)
+
+        messages = [
+            self._message("acp:events:system_health", {"ignored": True}),
+            self._message("acp:events:agent_events", {"agent_id": "a1"}),
+        ]
+
+        async def next_message(**kwargs):
+            if messages:
+                return messages.pop(0)
+            await asyncio.Event().wait()
+
+        mock_pubsub = mock_redis_cache.redis_client.pubsub.return_value
+        mock_pubsub.get_message = AsyncMock(side_effect=next_message)
+
+        await redis_events.start()
+        await asyncio.wait_for(delivered.wait(), 1)
+        await redis_events.stop()
+
+        assert sorted(kind for kind, _ in received) == ["async", "sync"]
+        assert all(data == {"agent_id": "a1"} for _, data in received)
+        stats = redis_events.get_stats()
+        assert stats["messages_received"] == 2
+        assert stats["messages_unhandled"] == 1
+
+    async def test_workflow_channels_subscribed_while_handled(
+        self, redis_events, mock_redis_cache
+    ):
+        """Per-workflow channels are subscribed on the first handler only."""
+        mock_pubsub = mock_redis_cache.redis_client.pubsub.return_value
+        mock_pubsub.unsubscribe = AsyncMock()
+
+        async def no_messages(**kwargs):
+            await asyncio.Event().wait()
+
+        mock_pubsub.get_message = AsyncMock(side_effect=no_messages)
+        early = Mock()
+        redis_events.add_handler("workflow_events:wf-0", early)
+
+        await redis_events.start()
+        mock_pubsub.subscribe.assert_awaited_with("acp:events:workflow_events:wf-0")
+
+        first, second = Mock(), Mock()
+        redis_events.add_handler("workflow_events:wf-1", first)
+        redis_events.add_handler("workflow_events:wf-1", second)
+        redis_events.add_handler("agent_events", Mock())
+        await asyncio.gather(*redis_events._subscription_tasks)
+        redis_events.remove_handler("workflow_events:wf-1", first)
+        await asyncio.gather(*redis_events._subscription_tasks)
+
+        subscribed = [call.args for call in mock_pubsub.subscribe.await_args_list]
+        assert subscribed[1:] == [
+            ("acp:events:workflow_events:wf-0",),
+            ("acp:events:workflow_events:wf-1",),
+        ]
+        mock_pubsub.unsubscribe.assert_not_awaited()
+
+        redis_events.remove_handler("workflow_events:wf-1", second)
+        await asyncio.gather(*redis_events._subscription_tasks)
+        mock_pubsub.unsubscribe.assert_awaited_once_with(
+            "acp:events:workflow_events:wf-1"
+        )
+        assert redis_events.get_stats()["subscribed_channels"] == 7
+        await redis_events.stop()
+
+    async def test_slow_handler_does_not_stall_delivery(self, redis_events):
+        """A slow handler keeps running while later messages are delivered."""
+        release = asyncio.Event()
+        fast = []
+
+        async def slow_handler(data):
+            await release.wait()
+
+        async def fast_handler(data):
+            fast.append(data["n"])
+
+        await redis_events.subscribe_to_agent_events(slow_handler)
+        await redis_events.subscribe_to_system_health(fast_handler)
+
+        await redis_events._handle_event(
+            self._message("acp:events:agent_events", {"n": 0})
+        )
+        for n in range(3):
+            await redis_events._handle_event(
+                self._message("acp:events:system_health", {"n": n})
+            )
+        await asyncio.sleep(0.01)
+
+        assert fast == [0, 1, 2]
+        assert redis_events.get_stats()["callbacks_in_flight"] == 1
+        release.set()
+        await asyncio.sleep(0.01)
+        assert redis_events.get_stats()["callbacks_in_flight"] == 0
+
+    async def test_handlers_are_bounded(self, mock_redis_cache):
+        """The reader waits for a slot once the handler limit is reached."""
+        redis_events = RedisACPEvents(mock_redis_cache, max_concurrent_callbacks=2)
+        release = asyncio.Event()
+        started = []
+
+        async def blocking_handler(data):
+            started.append(data["n"])
+            await release.wait()
+
+        await redis_events.subscribe_to_agent_events(blocking_handler)
+        for n in range(2):
+            await redis_events._handle_event(
+                self._message("acp:events:agent_events", {"n": n})
+            )
+
+        third = asyncio.create_task(
+            redis_events._handle_event(
+                self._message("acp:events:agent_events", {"n": 2})
+            )
+        )
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        release.set()
+        await asyncio.wait_for(third, 1)
+        await asyncio.sleep(0)
+        assert started == [0, 1, 2]
+
+    async def test_handler_errors_are_contained(self, redis_events):
+        """A failing handler is counted and does not affect the others."""
+        received = []
+
+        def failing_handler(data):
+            raise ValueError("boom")
+
+        await redis_events.subscribe_to_error_alerts(failing_handler)
+        await redis_events.subscribe_to_error_alerts(received.append)
+
+        await redis_events._handle_event(
+            self._message("acp:events:error_alerts", {"error": "x"})
+        )
+        await asyncio.sleep(0)
+
+        assert received == [{"error": "x"}]
+        assert redis_events.callback_errors == 1
+
+    async def test_remove_handler(self, redis_events):
+        """Removing the last handler drops the channel from the table."""
+        callback = AsyncMock()
+        await redis_events.subscribe_to_agent_events(callback)
+
+        redis_events.remove_handler("agent_events", callback)
+
+        assert "acp:events:agent_events" not in redis_events.subscribers
 
     def test_event_types_enum(self):
         """Test that all event types are properly defined."""
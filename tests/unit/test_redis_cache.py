@@ -26,7 +26,7 @@ class TestRedisCache:
         mock_redis.delete.return_value = 1
         mock_redis.exists.return_value = False
         mock_redis.ttl.return_value = -1
-        mock_redis.keys.return_value = []
+        mock_redis.scan.return_value = (0, [])
         mock_redis.info.return_value = {
             "redis_version": "7.0.0",
             "used_memory_human": "1.00M",
@@ -77,20 +77,24 @@ class TestRedisCache:
         """Test setting string value."""
         result = redis_cache.set("test_key", "test_value")
         assert result is True
-        mock_redis.set.assert_called_once_with("test:test_key", "test_value")
+        mock_redis.set.assert_called_once_with("test:test_key", b'\x01"test_value"')
 
     def test_set_json_value(self, redis_cache, mock_redis):
         """Test setting JSON value."""
         test_data = {"key": "value", "number": 42}
         result = redis_cache.set("test_key", test_data)
         assert result is True
-        mock_redis.set.assert_called_once_with("test:test_key", json.dumps(test_data))
+        mock_redis.set.assert_called_once_with(
+            "test:test_key", b"\x01" + json.dumps(test_data).encode()
+        )
 
     def test_set_with_ttl(self, redis_cache, mock_redis):
         """Test setting value with TTL."""
         result = redis_cache.set("test_key", "test_value", ttl=60)
         assert result is True
-        mock_redis.setex.assert_called_once_with("test:test_key", 60, "test_value")
+        mock_redis.setex.assert_called_once_with(
+            "test:test_key", 60, b'\x01"test_value"'
+        )
 
     def test_delete(self, redis_cache, mock_redis):
         """Test deleting key."""
@@ -114,24 +118,36 @@ class TestRedisCache:
 
     def test_clear_pattern(self, redis_cache, mock_redis):
         """Test clearing keys by pattern."""
-        mock_redis.keys.return_value = ["test:key1", "test:key2"]
+        mock_redis.scan.return_value = (0, ["test:key1", "test:key2"])
         mock_redis.delete.return_value = 2
         result = redis_cache.clear_pattern("key*")
         assert result == 2
-        mock_redis.keys.assert_called_once_with("test:key*")
+        mock_redis.scan.assert_called_once_with(
+            cursor=0, match="test:key*", count=500, _type=None
+        )
         mock_redis.delete.assert_called_once_with("test:key1", "test:key2")
+        mock_redis.keys.assert_not_called()
+
+    def test_clear_pattern_multiple_batches(self, redis_cache, mock_redis):
+        """Test clearing keys across several SCAN batches."""
+        mock_redis.scan.side_effect = [(7, ["test:key1"]), (0, ["test:key2"])]
+        mock_redis.delete.return_value = 1
+        result = redis_cache.clear_pattern("key*")
+        assert result == 2
+        assert mock_redis.scan.call_args_list[1].kwargs["cursor"] == 7
+        assert mock_redis.delete.call_count == 2
 
     def test_clear_all(self, redis_cache, mock_redis):
         """Test clearing all keys."""
-        mock_redis.keys.return_value = ["test:key1", "test:key2"]
+        mock_redis.scan.return_value = (0, ["test:key1", "test:key2"])
         mock_redis.delete.return_value = 2
         result = redis_cache.clear_all()
         assert result == 2
-        mock_redis.keys.assert_called_once_with("test:*")
+        assert mock_redis.scan.call_args.kwargs["match"] == "test:*"
 
     def test_get_stats(self, redis_cache, mock_redis):
         """Test getting cache statistics."""
-        mock_redis.keys.return_value = ["test:key1", "test:key2"]
+        mock_redis.scan.return_value = (0, ["test:key1", "test:key2"])
         stats = redis_cache.get_stats()
 
         assert stats["total_keys"] == 2
@@ -0,0 +1,103 @@
+"""Unit tests for SCAN-based key iteration helpers."""
+
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from devcycle.core.cache.scan import (
+    ScanState,
+    acount_matching,
+    adelete_matching,
+    ascan_batches,
+    ascan_with_followup,
+    scan_batches,
+    scan_with_followup,
+)
+
+
+class TestAsyncScan:
+    """Test async SCAN helpers."""
+
+    @pytest.fixture
+    def mock_client(self):
+        """Create a mock async Redis client returning two SCAN pages."""
+        client = AsyncMock()
+        client.scan.side_effect = [(12, ["a:1", "a:2"]), (0, ["a:3"])]
+        return client
+
+    async def test_scan_batches_follows_cursor(self, mock_client):
+        """Batches follow the cursor until it wraps to zero."""
+        batches = [batch async for batch in ascan_batches(mock_client, "a:*", 10)]
+
+        assert batches == [["a:1", "a:2"], ["a:3"]]
+        cursors = [call.kwargs["cursor"] for call in mock_client.scan.call_args_list]
+        assert cursors == [0, 12]
+        mock_client.keys.assert_not_called()
+
+    async def test_scan_resumes_from_state(self, mock_client):
+        """A partial scan can be resumed from its saved state."""
+        state = ScanState()
+
+        first = [
+            b
+            async for b in ascan_batches(mock_client, "a:*", state=state, max_batches=1)
+        ]
+        assert first == [["a:1", "a:2"]]
+        assert state.cursor == 12 and not state.finished
+
+        rest = [b async for b in ascan_batches(mock_client, "a:*", state=state)]
+        assert rest == [["a:3"]]
+        assert state.finished
+        assert state.keys_seen == 3
+
+    async def test_scan_skips_empty_pages(self):
+        """Empty SCAN pages are not yielded."""
+        client = AsyncMock()
+        client.scan.side_effect = [(5, []), (0, ["a:1"])]
+
+        batches = [b async for b in ascan_batches(client, "a:*")]
+
+        assert batches == [["a:1"]]
+
+    async def test_followup_pipelined_per_batch(self, mock_client):
+        """Follow-up commands for a batch share one pipeline."""
+        pipelines = [Mock(), Mock()]
+        pipelines[0].execute = AsyncMock(return_value=["x", "y"])
+        pipelines[1].execute = AsyncMock(return_value=["z"])
+        mock_client.pipeline = Mock(side_effect=pipelines)
+
+        results = [
+            batch
+            async for batch in ascan_with_followup(
+                mock_client, "a:*", lambda pipe, key: pipe.get(key)
+            )
+        ]
+
+        assert results == [[("a:1", "x"), ("a:2", "y")], [("a:3", "z")]]
+        assert pipelines[0].get.call_count == 2
+        assert pipelines[1].get.call_count == 1
+
+    async def test_count_and_delete(self, mock_client):
+        """Counting and deleting walk every batch."""
+        assert await acount_matching(mock_client, "a:*") == 3
+
+        mock_client.scan.side_effect = [(12, ["a:1", "a:2"]), (0, ["a:3"])]
+        mock_client.delete.side_effect = [2, 1]
+        assert await adelete_matching(mock_client, "a:*") == 3
+
+
+class TestSyncScan:
+    """Test sync SCAN helpers."""
+
+    def test_scan_with_followup(self):
+        """Sync variant mirrors the async behaviour."""
+        client = MagicMock()
+        client.scan.side_effect = [(3, ["s:1"]), (0, ["s:2"])]
+        client.pipeline.return_value.execute.side_effect = [[1], [2]]
+
+        results = list(
+            scan_with_followup(client, "s:*", lambda pipe, key: pipe.scard(key))
+        )
+
+        assert results == [[("s:1", 1)], [("s:2", 2)]]
+        assert list(scan_batches(client, "s:*", state=ScanState(0, True))) == []
@@ -108,25 +108,80 @@ class TestTokenBlacklist:
         assert len(hash1) == 64  # SHA256 hex length
         assert hash1 != token  # Should be hashed
 
+    def test_blacklist_token_indexed(self, token_blacklist, mock_redis):
+        """Test blacklisted tokens are added to the expiry index."""
+        token = "test.jwt.token"
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+
+        token_blacklist.blacklist_token(token, expires_at)
+
+        mock_redis.zadd.assert_called_once_with(
+            "jwt_blacklist_index",
+            {token_blacklist._hash_token(token): expires_at.timestamp()},
+        )
+
     def test_cleanup_expired(self, token_blacklist, mock_redis):
         """Test cleanup of expired entries."""
-        mock_redis.keys.return_value = ["jwt_blacklist:hash1", "jwt_blacklist:hash2"]
-        mock_redis.exists.side_effect = [False, True]  # First expired, second exists
+        mock_redis.zremrangebyscore.return_value = 1  # One expired entry
 
         result = token_blacklist.cleanup_expired()
 
-        assert result == 1  # One expired entry
-        assert mock_redis.keys.called
-        assert mock_redis.exists.call_count == 2
+        assert result == 1
+        assert mock_redis.zremrangebyscore.call_args[0][0] == "jwt_blacklist_index"
+        mock_redis.keys.assert_not_called()
 
     def test_get_blacklist_stats(self, token_blacklist, mock_redis):
         """Test getting blacklist statistics."""
-        mock_redis.keys.return_value = ["jwt_blacklist:hash1", "jwt_blacklist:hash2"]
+        mock_redis.zremrangebyscore.return_value = 0
+        mock_redis.hget.return_value = "1"  # Index backfill finished
+        mock_redis.zcard.return_value = 2
 
         stats = token_blacklist.get_blacklist_stats()
 
         assert stats["total_blacklisted_tokens"] == 2
         assert stats["redis_connected"] is True
+        mock_redis.keys.assert_not_called()
+
+    def test_get_blacklist_stats_before_backfill(self, token_blacklist, mock_redis):
+        """Test tokens are counted with SCAN until the index is backfilled."""
+        mock_redis.zremrangebyscore.return_value = 0
+        mock_redis.hget.return_value = None
+        mock_redis.scan.return_value = (0, ["jwt_blacklist:a", "jwt_blacklist:b"])
+
+        stats = token_blacklist.get_blacklist_stats()
+
+        assert stats["total_blacklisted_tokens"] == 2
+        mock_redis.zcard.assert_not_called()
+
+    def test_backfill_index(self, token_blacklist, mock_redis):
+        """Test existing blacklist keys are indexed by their stored expiry."""
+        mock_redis.hgetall.return_value = {}
+        mock_redis.scan.return_value = (0, ["jwt_blacklist:a", "jwt_blacklist:b"])
+        mock_pipeline = MagicMock()
+        # Token "b" expired between SCAN and GET
+        mock_pipeline.execute.return_value = ["1700000000.5", None]
+        mock_redis.pipeline.return_value = mock_pipeline
+
+        assert token_blacklist.backfill_index() is True
+
+        mock_pipeline.zadd.assert_called_once_with(
+            "jwt_blacklist_index", {"a": 1700000000.5}
+        )
+        mock_redis.hset.assert_called_with(
+            "jwt_blacklist_index_backfill", mapping={"cursor": 0, "done": 1}
+        )
+
+    def test_backfill_index_resumes(self, token_blacklist, mock_redis):
+        """Test an interrupted backfill continues from its saved cursor."""
+        mock_redis.hgetall.return_value = {"cursor": "42"}
+        mock_redis.scan.return_value = (7, [])
+
+        assert token_blacklist.backfill_index(max_batches=1) is False
+
+        assert mock_redis.scan.call_args.kwargs["cursor"] == 42
+        mock_redis.hset.assert_called_once_with(
+            "jwt_blacklist_index_backfill", "cursor", 7
+        )
 
     def test_health_check_success(self, token_blacklist, mock_redis):
         """Test successful health check."""
@@ -158,7 +213,7 @@ class TestSessionMonitor:
         mock_redis.hgetall.return_value = {}
         mock_redis.srem.return_value = 1
         mock_redis.delete.return_value = 1
-        mock_redis.keys.return_value = []
+        mock_redis.scan.return_value = (0, [])
         mock_redis.scard.return_value = 0
         mock_redis.ping.return_value = True
         return mock_redis
@@ -250,27 +305,83 @@ class TestSessionMonitor:
     def test_cleanup_expired_sessions(self, session_monitor, mock_redis):
         """Test cleanup of expired sessions."""
         session_info_key = "session_info:test-session"
-        mock_redis.keys.return_value = [session_info_key]
-        mock_redis.hgetall.return_value = {
-            "user_id": str(uuid.uuid4()),
-            "expires_at": (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat(),
-        }
+        mock_redis.scan.return_value = (0, [session_info_key])
+        mock_pipeline = MagicMock()
+        mock_pipeline.execute.return_value = [
+            {
+                "user_id": str(uuid.uuid4()),
+                "expires_at": (
+                    datetime.now(timezone.utc) - timedelta(hours=1)
+                ).isoformat(),
+            }
+        ]
+        mock_redis.pipeline.return_value = mock_pipeline
 
         result = session_monitor.cleanup_expired_sessions()
 
         assert result == 1  # One expired session
-        mock_redis.delete.assert_called()
+        mock_pipeline.delete.assert_called_once_with(session_info_key)
+        mock_pipeline.zrem.assert_called_once_with("session_index", "test-session")
+        mock_redis.keys.assert_not_called()
 
     def test_get_session_stats(self, session_monitor, mock_redis):
         """Test getting session statistics."""
-        mock_redis.keys.return_value = ["user_sessions:user1", "user_sessions:user2"]
-        mock_redis.scard.side_effect = [2, 1]  # Two sessions for user1, one for user2
+        mock_pipeline = MagicMock()
+        # Trim results for both indexes, three sessions across two users, and
+        # the finished index backfill
+        mock_pipeline.execute.return_value = [0, 0, 3, 2, "1"]
+        mock_redis.pipeline.return_value = mock_pipeline
 
         stats = session_monitor.get_session_stats()
 
         assert stats["total_active_sessions"] == 3
         assert stats["total_users_with_sessions"] == 2
         assert stats["redis_connected"] is True
+        mock_redis.scan.assert_not_called()
+
+    def test_get_session_stats_before_backfill(self, session_monitor, mock_redis):
+        """Test sessions and users are counted with SCAN until backfilled."""
+        mock_pipeline = MagicMock()
+        mock_pipeline.execute.return_value = [0, 0, 1, 1, None]
+        mock_redis.pipeline.return_value = mock_pipeline
+        mock_redis.scan.side_effect = [
+            (0, ["session_info:s1", "session_info:s2", "session_info:s3"]),
+            (0, ["user_sessions:u1", "user_sessions:u2"]),
+        ]
+
+        stats = session_monitor.get_session_stats()
+
+        assert stats["total_active_sessions"] == 3
+        assert stats["total_users_with_sessions"] == 2
+
+    def test_backfill_indexes(self, session_monitor, mock_redis):
+        """Test live sessions tracked before the indexes existed are indexed."""
+        now = datetime.now(timezone.utc)
+        live = now + timedelta(hours=1)
+        mock_redis.scan.return_value = (0, ["session_info:s1", "session_info:s2"])
+        mock_pipeline = MagicMock()
+        mock_pipeline.execute.return_value = [
+            ["u1", live.isoformat()],
+            ["u2", (now - timedelta(hours=1)).isoformat()],
+        ]
+        mock_redis.pipeline.return_value = mock_pipeline
+
+        assert session_monitor.backfill_indexes() is True
+
+        assert [c.args for c in mock_pipeline.zadd.call_args_list] == [
+            ("session_index", {"s1": live.timestamp()}),
+            ("session_users_index", {"u1": live.timestamp()}),
+        ]
+        mock_redis.hset.assert_called_with(
+            "session_index_backfill", mapping={"cursor": 0, "done": 1}
+        )
+
+    def test_backfill_indexes_done(self, session_monitor, mock_redis):
+        """Test a finished backfill does not scan again."""
+        mock_redis.hgetall.return_value = {"cursor": "0", "done": "1"}
+
+        assert session_monitor.backfill_indexes() is True
+        mock_redis.scan.assert_not_called()
 
     def test_health_check_success(self, session_monitor, mock_redis):
         """Test successful health check."""
@@ -0,0 +1,230 @@
+"""Unit tests for the Redis Streams ACP event transport."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from redis.exceptions import ResponseError
+
+from devcycle.core.acp.events.redis_events import RedisACPEvents
+from devcycle.core.acp.events.stream_events import RedisStreamEvents, StreamEvent
+
+
+def entry(entry_id, channel, data):
+    """Build a raw stream entry."""
+    return (entry_id, {"channel": channel, "event": json.dumps(data)})
+
+
+@pytest.fixture
+def mock_redis():
+    """Create a mock async Redis client."""
+    client = Mock()
+    client.pipeline.return_value.execute = AsyncMock(return_value=[])
+    client.pipeline.return_value.command_stack = []
+    client.xrange = AsyncMock(return_value=[])
+    client.xgroup_create = AsyncMock(return_value=True)
+    client.xreadgroup = AsyncMock(return_value=[])
+    client.xack = AsyncMock(return_value=0)
+    client.xautoclaim = AsyncMock(return_value=["0-0", [], []])
+    return client
+
+
+@pytest.fixture
+def streams(mock_redis):
+    """Create a stream transport."""
+    return RedisStreamEvents(mock_redis, maxlen=500)
+
+
+class TestRedisStreamEvents:
+    """Test cases for the stream transport."""
+
+    def test_streams_per_event_family(self, streams):
+        """Family channels are logged; per-entity mirrors are not."""
+        assert streams.stream_for_channel("acp:events:agent_events") == "agent_events"
+        assert streams.stream_for_channel("workflow_events") == "workflow_events"
+        assert streams.stream_for_channel("acp:events:workflow_events:wf-1") is None
+
+    async def test_append_many_uses_one_pipeline(self, streams, mock_redis):
+        """Events are appended with approximate trimming in one round trip."""
+        added = await streams.append_many(
+            [
+                ("acp:events:workflow_events:wf-1", "{}"),
+                ("acp:events:workflow_events", '{"n": 1}'),
+            ]
+        )
+
+        assert added == 1
+        pipe = mock_redis.pipeline.return_value
+        pipe.xadd.assert_called_once_with(
+            "acp:stream:workflow_events",
+            {"channel": "acp:events:workflow_events", "event": '{"n": 1}'},
+            maxlen=500,
+            approximate=True,
+        )
+        pipe.execute.assert_awaited_once()
+
+    async def test_read_since_is_exclusive(self, streams, mock_redis):
+        """Replay starts after the last seen entry."""
+        mock_redis.xrange.return_value = [
+            entry("5-0", "acp:events:agent_events", {"agent_id": "a1"}),
+            ("6-0", {}),  # Deleted entry
+        ]
+
+        events = await streams.read_since("agent_events", "4-0", count=10)
+
+        mock_redis.xrange.assert_awaited_once_with(
+            "acp:stream:agent_events", min="(4-0", count=10
+        )
+        assert events == [
+            StreamEvent("5-0", "acp:events:agent_events", {"agent_id": "a1"})
+        ]
+
+    async def test_read_since_inclusive(self, streams, mock_redis):
+        """An inclusive read starts at the entry itself."""
+        await streams.read_since("agent_events", "4-0", inclusive=True)
+
+        assert mock_redis.xrange.call_args.kwargs["min"] == "4-0"
+
+    async def test_read_since_start(self, streams, mock_redis):
+        """Without a last seen ID the whole log is replayed."""
+        await streams.read_since("agent_events")
+
+        assert mock_redis.xrange.call_args.kwargs["min"] == "-"
+
+    async def test_ensure_group_tolerates_existing_group(self, streams, mock_redis):
+        """An existing group is not an error."""
+        mock_redis.xgroup_create.side_effect = ResponseError(
+            "BUSYGROUP Consumer Group name already exists"
+        )
+
+        assert await streams.ensure_group("agent_events", "api") is True
+
+        mock_redis.xgroup_create.side_effect = ResponseError("WRONGTYPE")
+        assert await streams.ensure_group("agent_events", "api") is False
+
+    async def test_read_group_and_ack(self, streams, mock_redis):
+        """New entries are read for a consumer and acknowledged by ID."""
+        mock_redis.xreadgroup.return_value = [
+            [
+                "acp:stream:agent_events",
+                [entry("7-0", "acp:events:agent_events", {"n": 7})],
+            ]
+        ]
+        mock_redis.xack.return_value = 1
+
+        events = await streams.read_group("agent_events", "api", "node-1", block_ms=10)
+        acked = await streams.ack("agent_events", "api", [e.entry_id for e in events])
+
+        mock_redis.xreadgroup.assert_awaited_once_with(
+            "api", "node-1", {"acp:stream:agent_events": ">"}, count=100, block=10
+        )
+        assert [e.data for e in events] == [{"n": 7}]
+        assert acked == 1
+        mock_redis.xack.assert_awaited_once_with(
+            "acp:stream:agent_events", "api", "7-0"
+        )
+
+    async def test_claim_stale(self, streams, mock_redis):
+        """Entries pending too long are claimed with XAUTOCLAIM."""
+        mock_redis.xautoclaim.return_value = [
+            "0-0",
+            [entry("3-0", "acp:events:agent_events", {"n": 3})],
+            [],
+        ]
+
+        events = await streams.claim_stale(
+            "agent_events", "api", "node-2", min_idle_ms=1000
+        )
+
+        assert [e.entry_id for e in events] == ["3-0"]
+        assert mock_redis.xautoclaim.call_args.kwargs["min_idle_time"] == 1000
+
+    async def test_consume_acks_only_handled_events(self, streams, mock_redis):
+        """Events whose handler fails stay pending."""
+        mock_redis.xautoclaim.return_value = [
+            "0-0",
+            [entry("1-0", "acp:events:agent_events", {"ok": False})],
+            [],
+        ]
+        batches = [
+            [
+                [
+                    "acp:stream:agent_events",
+                    [entry("2-0", "acp:events:agent_events", {"ok": True})],
+                ]
+            ]
+        ]
+
+        async def xreadgroup(*args, **kwargs):
+            if batches:
+                return batches.pop()
+            await asyncio.sleep(0.01)  # Blocking read with nothing new
+            return []
+
+        mock_redis.xreadgroup.side_effect = xreadgroup
+        acked = asyncio.Event()
+        mock_redis.xack.side_effect = lambda *args: acked.set() or 1
+
+        async def handler(event):
+            if not event.data["ok"]:
+                raise ValueError("not yet")
+
+        task = asyncio.create_task(
+            streams.consume("agent_events", "api", "node-1", handler, block_ms=10)
+        )
+        await asyncio.wait_for(acked.wait(), 1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        mock_redis.xgroup_create.assert_awaited_once()
+        assert mock_redis.xack.call_args_list[0].args == (
+            "acp:stream:agent_events",
+            "api",
+            "2-0",
+        )
+
+
+class TestRedisACPEventsWithStreams:
+    """Test cases for publishing with the stream log enabled."""
+
+    @pytest.fixture
+    def events(self, mock_redis, streams):
+        """Create an events service logging to streams."""
+        cache = Mock()
+        cache.redis_client = mock_redis
+        return RedisACPEvents(cache, streams=streams)
+
+    async def test_publish_logs_to_stream_in_same_round_trip(self, events, mock_redis):
+        """Publishing and logging share one pipeline."""
+        await events.publish_workflow_completed("wf-1", {"ok": True})
+
+        pipe = mock_redis.pipeline.return_value
+        pipe.publish.assert_not_called()
+        pipe.evalsha.assert_called_once()
+        sha, numkeys, key, maxlen, logged, payload, *published = (
+            pipe.evalsha.call_args.args
+        )
+        assert sha == events.streams.scripts.scripts["log_and_publish"].sha
+        # Only the family channel is logged; both are published from the script
+        assert (numkeys, key, maxlen) == (1, "acp:stream:workflow_events", 500)
+        assert logged == "acp:events:workflow_events"
+        assert json.loads(payload)["event_type"] == "workflow_completed"
+        assert published == [
+            "acp:events:workflow_events:wf-1",
+            "acp:events:workflow_events",
+        ]
+
+    def test_event_log_for_script_published_events(self, events):
+        """Events published by a script are logged by the same script."""
+        messages = events.workflow_step_completed_messages("wf-1", "s1", {})
+
+        assert events.event_log_for(messages) == (
+            "acp:stream:workflow_events",
+            "acp:events:workflow_events",
+            500,
+        )
+        assert events.event_log_for([("acp:events:workflow_events:wf-1", "{}")]) is None
+        # The script stamps logged payloads, so only JSON objects are logged
+        assert events.event_log_for([("acp:events:workflow_events", "[]")]) is None
@@ -0,0 +1,173 @@
+"""Unit tests for per key family TTL policies."""
+
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from devcycle.core.cache.acp_cache import ACPCache
+from devcycle.core.cache.async_redis_cache import AsyncRedisCache
+from devcycle.core.cache.local_cache import INVALIDATION_CHANNEL
+from devcycle.core.cache.ttl_policy import (
+    TTL_POLICY_KEY,
+    TTLPolicyTable,
+    get_ttl_policy_table,
+)
+
+
+class TestTTLPolicyTable:
+    """Test policy matching."""
+
+    def test_most_specific_pattern_wins(self):
+        """Longer patterns take precedence over broader ones."""
+        table = TTLPolicyTable({"acp:*": 60, "acp:workflows:active:*": 900})
+
+        assert table.ttl_for("acp:workflows:active:wf-1", 1800) == 900
+        assert table.ttl_for("acp:agents:status:a1", 300) == 60
+        assert table.ttl_for("devcycle:cache:cache:agents:a1", 3600) == 3600
+
+    def test_set_returns_previous(self):
+        """Replacing a policy reports the TTL it replaced."""
+        table = TTLPolicyTable()
+
+        assert table.set("acp:*", 60) is None
+        assert table.set("acp:*", 120.5) == 60
+        assert table.ttl_for("acp:x", 1) == 121
+        assert table.remove("acp:*") == 120.5
+        assert len(table) == 0
+
+    def test_rejects_non_positive_ttl(self):
+        """A TTL of zero would expire keys immediately."""
+        with pytest.raises(ValueError):
+            TTLPolicyTable().set("acp:*", 0)
+
+    async def test_save_and_load_round_trip(self):
+        """Policies persisted by one table are loaded by another."""
+        stored = {}
+        client = AsyncMock()
+        client.hset.side_effect = lambda key, field, value: stored.update(
+            {field: value}
+        )
+        client.hdel.side_effect = lambda key, field: stored.pop(field, None)
+        client.hgetall.side_effect = lambda key: dict(stored)
+        table = TTLPolicyTable()
+        table.set("acp:*", 60, reason="broad")
+        table.set("capabilities:*", 30)
+        await table.save(client, "acp:*")
+        await table.save(client, "capabilities:*")
+        table.remove("capabilities:*")
+        await table.save(client, "capabilities:*")
+
+        other = TTLPolicyTable({"devcycle:cache:*": 10})
+        assert await other.load(client) == 1
+
+        assert other.to_dict() == {"acp:*": 60}
+        assert other.get("acp:*").reason == "broad"
+        assert other.ttl_for("devcycle:cache:x", 5) == 5
+
+    def test_global_table_is_shared(self):
+        """Every caller gets the same process-wide table."""
+        assert get_ttl_policy_table() is get_ttl_policy_table()
+
+
+class TestACPCacheTTLPolicies:
+    """Test write-time policies and adjustment of existing keys."""
+
+    @pytest.fixture
+    def mock_redis_cache(self):
+        """Create a mock Redis cache."""
+        mock_cache = Mock(spec=AsyncRedisCache)
+        mock_cache.key_prefix = "devcycle:cache:"
+        mock_cache.set = AsyncMock(return_value=True)
+        mock_cache.redis_client = AsyncMock()
+        mock_cache.redis_client.pipeline = Mock(return_value=Mock())
+        mock_cache.redis_client.info.return_value = {
+            "keyspace_hits": 80,
+            "keyspace_misses": 20,
+        }
+        return mock_cache
+
+    @pytest.fixture
+    def acp_cache(self, mock_redis_cache):
+        """Create ACP cache instance."""
+        return ACPCache(mock_redis_cache)
+
+    async def test_policy_applies_on_write(self, acp_cache, mock_redis_cache):
+        """Writes use the TTL of the matching family policy."""
+        acp_cache.ttl_policies.set("devcycle:cache:cache:agents:*", 7200)
+
+        await acp_cache.cache_agent_metadata("agent-1", {"name": "a"})
+
+        mock_redis_cache.set.assert_awaited_once_with(
+            "cache:agents:agent-1", {"name": "a"}, ttl=7200
+        )
+
+    async def test_apply_policy_expires_existing_keys(
+        self, acp_cache, mock_redis_cache
+    ):
+        """Existing keys get the new TTL through a pipeline, without rewrites."""
+        client = mock_redis_cache.redis_client
+        client.scan.return_value = (0, ["acp:workflows:active:1", "acp:gone"])
+        pipe = Mock()
+        pipe.execute = AsyncMock(return_value=[100, True, None, False])
+        client.pipeline.return_value = pipe
+
+        change = await acp_cache.apply_ttl_policy(
+            "acp:workflows:active:*", 0.5, reason="test"
+        )
+
+        pipe.pexpire.assert_any_call("acp:workflows:active:1", 500)
+        pipe.expire.assert_not_called()
+        mock_redis_cache.set.assert_not_called()
+        assert change.keys_adjusted == 1
+        assert change.memory_bytes_before == 100
+        assert change.hit_ratio_before == 0.8
+        assert acp_cache.ttl_policies.get("acp:workflows:active:*").ttl == 0.5
+
+    async def test_apply_policy_persists_and_announces(
+        self, acp_cache, mock_redis_cache
+    ):
+        """Other workers learn about a change through Redis."""
+        client = mock_redis_cache.redis_client
+        client.scan.return_value = (0, [])
+
+        await acp_cache.apply_ttl_policy("acp:agents:status:*", 120, reason="test")
+
+        key, pattern, value = client.hset.call_args[0]
+        assert (key, pattern) == (TTL_POLICY_KEY, "acp:agents:status:*")
+        assert json.loads(value)["ttl"] == 120
+        channel, message = client.publish.call_args[0]
+        assert channel == INVALIDATION_CHANNEL
+        assert json.loads(message) == {"ttl_policies": True}
+
+    def test_redis_key_follows_key_owner(self, acp_cache):
+        """Family patterns get the prefix of the code that writes them."""
+        assert acp_cache.redis_key("agents:status:*") == "acp:agents:status:*"
+        assert acp_cache.redis_key("workflows:active:*") == "acp:workflows:active:*"
+        assert acp_cache.redis_key("capabilities:*") == "capabilities:*"
+        assert (
+            acp_cache.redis_key("workflows:steps:*:*")
+            == "devcycle:cache:workflows:steps:*:*"
+        )
+
+    async def test_measure_impact(self, acp_cache, mock_redis_cache):
+        """Hit ratio after a change covers only traffic since the change."""
+        client = mock_redis_cache.redis_client
+        client.scan.return_value = (0, [])
+        await acp_cache.apply_ttl_policy("acp:*", 60)
+
+        client.info.return_value = {"keyspace_hits": 98, "keyspace_misses": 22}
+        client.scan.return_value = (0, ["acp:x"])
+        pipe = Mock()
+        pipe.execute = AsyncMock(return_value=[64])
+        client.pipeline.return_value = pipe
+
+        measured = await acp_cache.measure_ttl_policy_impact()
+
+        assert len(measured) == 1
+        assert measured[0].hit_ratio_after == 0.9
+        assert measured[0].memory_bytes_after == 64
+        assert await acp_cache.measure_ttl_policy_impact() == []
+        history = acp_cache.get_ttl_policy_history()
+        assert history[0]["pattern"] == "acp:*"
+        assert history[0]["previous_ttl"] is None
@@ -231,6 +231,95 @@ class TestWebSocketEndpoints:
                 assert response["type"] == "workflow_subscription_confirmed"
                 assert response["workflow_id"] == workflow_id
 
+            # Only the workflow's own channel is subscribed upstream
+            from devcycle.api.routes.websocket import manager
+
+            channel = manager.redis_events.add_handler.call_args[0][0]
+            assert channel == f"workflow_events:{workflow_id}"
+
+    @pytest.mark.asyncio
+    async def test_websocket_workflow_filter(self, client):
+        """Test WebSocket workflow endpoint with a filter expression."""
+        with patch(
+            "devcycle.api.routes.websocket.get_redis_events"
+        ) as mock_get_redis_events:
+            mock_redis_events = Mock()
+            mock_redis_events.start = AsyncMock()
+            mock_get_redis_events.return_value = mock_redis_events
+
+            with client.websocket_connect(
+                "/ws/workflow/wf-1?client_id=test-client"
+                "&filter=event_type=workflow_completed"
+            ) as websocket:
+                response = json.loads(websocket.receive_text())
+                assert response["filter"] == "event_type=workflow_completed"
+
+                websocket.send_text(
+                    json.dumps({"type": "filter", "filter": "step_id=build"})
+                )
+                response = json.loads(websocket.receive_text())
+                assert response == {"type": "filter_updated", "filter": "step_id=build"}
+
+                websocket.send_text(json.dumps({"type": "filter", "filter": "bad"}))
+                response = json.loads(websocket.receive_text())
+                assert response["type"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_websocket_workflow_invalid_filter(self, client):
+        """Test WebSocket workflow endpoint rejects a malformed filter."""
+        with client.websocket_connect("/ws/workflow/wf-1?filter=bad") as websocket:
+            response = json.loads(websocket.receive_text())
+            assert response["type"] == "error"
+            assert "Invalid filter clause" in response["message"]
+
+    @pytest.mark.asyncio
+    async def test_websocket_workflow_resume(self, client):
+        """Test WebSocket workflow endpoint resuming from an unknown ID."""
+        from devcycle.api.routes.websocket import manager
+
+        with (
+            patch(
+                "devcycle.api.routes.websocket.get_redis_events"
+            ) as mock_get_redis_events,
+            patch.object(manager, "redis_events", None),
+        ):
+            mock_redis_events = Mock()
+            mock_redis_events.start = AsyncMock()
+            mock_redis_events.streams = None  # No log to replay from
+            mock_get_redis_events.return_value = mock_redis_events
+
+            with client.websocket_connect(
+                "/ws/workflow/wf-resume?client_id=resume-client&since=1-0"
+            ) as websocket:
+                response = json.loads(websocket.receive_text())
+                assert response == {
+                    "type": "resync_required",
+                    "channel": "workflow_events:wf-resume",
+                    "since": "1-0",
+                }
+                response = json.loads(websocket.receive_text())
+                assert response["type"] == "workflow_subscription_confirmed"
+
+    @pytest.mark.asyncio
+    async def test_websocket_events_msgpack_batching(self, client):
+        """Test WebSocket events endpoint with batching and msgpack."""
+        pytest.importorskip("msgpack")
+        with client.websocket_connect(
+            "/ws/events?client_id=batch-client&batch_ms=20&batch_max=50",
+            subprotocols=["devcycle.msgpack"],
+        ) as websocket:
+            assert websocket.accepted_subprotocol == "devcycle.msgpack"
+
+            from devcycle.api.routes.websocket import manager
+
+            stats = manager.get_client_stats()["batch-client"]
+            assert stats["encoding"] == "msgpack"
+            assert stats["batch_max"] == 50
+
+            # Replies stay JSON text frames
+            websocket.send_text(json.dumps({"type": "ping"}))
+            assert json.loads(websocket.receive_text()) == {"type": "pong"}
+
     @pytest.mark.asyncio
     async def test_websocket_invalid_json(self, client):
         """Test WebSocket with invalid JSON."""
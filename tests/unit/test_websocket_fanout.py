@@ -0,0 +1,571 @@
+"""Unit tests for WebSocket event fan-out and per-client send queues."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from devcycle.api.routes.websocket import (
+    ClientSendQueue,
+    ConnectionManager,
+    EventFanoutHub,
+    EventFilter,
+    SlowConsumerPolicy,
+    negotiate_subprotocol,
+)
+from devcycle.core.acp.events.stream_events import RedisStreamEvents
+
+
+def progress(workflow_id, value):
+    """Build a workflow progress event."""
+    return {
+        "event_type": "workflow_progress",
+        "source": workflow_id,
+        "data": {"progress": value},
+    }
+
+
+@pytest.fixture
+def websocket():
+    """Create a mock WebSocket."""
+    ws = Mock()
+    ws.accept = AsyncMock()
+    ws.send_text = AsyncMock()
+    ws.close = AsyncMock()
+    return ws
+
+
+def queued(queue):
+    """Get the decoded frames waiting in a queue."""
+    return [json.loads(entry[0]) for entry in queue.frames]
+
+
+class TestClientSendQueue:
+    """Test cases for ClientSendQueue."""
+
+    async def test_writer_sends_in_order_and_records_lag(self, websocket):
+        """Frames are sent by the writer task in queue order."""
+        queue = ClientSendQueue("c1", websocket)
+        queue.start()
+
+        for frame in ("a", "b", "c"):
+            queue.put(frame)
+        await asyncio.sleep(0.01)
+
+        assert [c.args[0] for c in websocket.send_text.call_args_list] == [
+            "a",
+            "b",
+            "c",
+        ]
+        stats = queue.get_stats()
+        assert stats["sent"] == 3
+        assert stats["queued"] == 0
+        assert stats["lag_ms"]["count"] == 3
+        queue.close()
+
+    def test_drop_oldest(self, websocket):
+        """A full queue discards its oldest frame."""
+        queue = ClientSendQueue("c1", websocket, max_size=2)
+
+        for frame in ("a", "b", "c"):
+            assert queue.put(frame) is True
+
+        assert [entry[0] for entry in queue.frames] == ["b", "c"]
+        assert queue.dropped == 1
+
+    def test_coalesce_replaces_queued_frame_for_same_source(self, websocket):
+        """Only the latest progress per workflow stays queued."""
+        queue = ClientSendQueue(
+            "c1", websocket, max_size=10, policy=SlowConsumerPolicy.COALESCE
+        )
+
+        queue.put(json.dumps(progress("wf-1", 10)), "workflow_progress:wf-1")
+        queue.put(json.dumps(progress("wf-2", 10)), "workflow_progress:wf-2")
+        queue.put(json.dumps(progress("wf-1", 20)), "workflow_progress:wf-1")
+
+        assert [(f["source"], f["data"]["progress"]) for f in queued(queue)] == [
+            ("wf-1", 20),
+            ("wf-2", 10),
+        ]
+        assert queue.coalesced == 1
+
+    def test_coalesce_falls_back_to_dropping_oldest(self, websocket):
+        """Frames without a coalescing key still respect the bound."""
+        queue = ClientSendQueue(
+            "c1", websocket, max_size=1, policy=SlowConsumerPolicy.COALESCE
+        )
+
+        queue.put("a", "workflow_progress:wf-1")
+        queue.put("b")
+
+        assert [entry[0] for entry in queue.frames] == ["b"]
+        assert queue.dropped == 1
+        # The dropped frame can no longer be coalesced into
+        queue.put("c", "workflow_progress:wf-1")
+        assert queue.coalesced == 0
+        assert [entry[0] for entry in queue.frames] == ["c"]
+
+    async def test_disconnect_policy_closes_slow_client(self, websocket):
+        """Overflowing a queue with the disconnect policy closes the socket."""
+        websocket.send_text.side_effect = lambda frame: asyncio.sleep(1)
+        queue = ClientSendQueue(
+            "c1", websocket, max_size=1, policy=SlowConsumerPolicy.DISCONNECT
+        )
+
+        assert queue.put("a") is True
+        assert queue.put("b") is False
+        queue.start()
+        await asyncio.sleep(0.01)
+
+        websocket.close.assert_awaited_once_with(code=1013)
+        websocket.send_text.assert_not_called()
+        assert queue.put("c") is False
+
+    def test_control_frames_are_never_dropped(self, websocket):
+        """Replies to the client bypass the bound."""
+        queue = ClientSendQueue(
+            "c1", websocket, max_size=1, policy=SlowConsumerPolicy.DISCONNECT
+        )
+
+        queue.put("event")
+        assert queue.put("pong", control=True) is True
+
+        assert [entry[0] for entry in queue.frames] == ["event", "pong"]
+
+
+class TestEventFanoutHub:
+    """Test cases for EventFanoutHub."""
+
+    @pytest.fixture
+    def hub(self, websocket):
+        """Create a hub with three clients."""
+        queues = {
+            client_id: ClientSendQueue(client_id, websocket)
+            for client_id in ("c1", "c2", "c3")
+        }
+        hub = EventFanoutHub(queues)
+        hub.redis_events = Mock()
+        return hub
+
+    def test_one_upstream_handler_per_channel(self, hub):
+        """The upstream handler lives from the first to the last client."""
+        for client_id in ("c1", "c2", "c3"):
+            hub.subscribe(client_id, "workflow_events", "workflow_event")
+
+        hub.redis_events.add_handler.assert_called_once()
+        handler = hub.redis_events.add_handler.call_args.args[1]
+
+        hub.unsubscribe("c1", "workflow_events")
+        hub.unsubscribe_all("c2")
+        hub.redis_events.remove_handler.assert_not_called()
+
+        hub.unsubscribe("c3", "workflow_events")
+        hub.redis_events.remove_handler.assert_called_once_with(
+            "workflow_events", handler
+        )
+        assert hub.get_stats()["channels"] == {}
+
+    def test_event_is_encoded_once(self, hub):
+        """Every subscribed client gets the same encoded frame."""
+        for client_id in ("c1", "c2"):
+            hub.subscribe(client_id, "workflow_events", "workflow_event")
+        handler = hub.redis_events.add_handler.call_args.args[1]
+
+        handler(progress("wf-1", 50))
+
+        frame = hub.queues["c1"].frames[0][0]
+        assert hub.queues["c2"].frames[0][0] is frame
+        message = json.loads(frame)
+        assert message.pop("id")
+        assert message == {"type": "workflow_event", "data": progress("wf-1", 50)}
+        assert not hub.queues["c3"].frames
+        stats = hub.get_stats()
+        assert stats["events_received"] == 1
+        assert stats["frames_queued"] == 2
+
+
+class TestConnectionManagerFanout:
+    """Test cases for the connection manager's use of the hub."""
+
+    async def test_disconnect_releases_queue_and_subscriptions(self, websocket):
+        """A disconnected client stops its writer and leaves the hub."""
+        manager = ConnectionManager(
+            send_queue_size=8,
+            slow_consumer_policy=SlowConsumerPolicy.COALESCE,
+            history_linger=0,
+        )
+        manager.redis_events = Mock()
+        manager.hub.redis_events = manager.redis_events
+
+        await manager.connect(websocket, "c1")
+        await manager.subscribe_to_events("c1", {"agent_events", "unknown"})
+        await manager.send_personal_message("hello", "c1")
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once_with("hello")
+        stats = manager.get_client_stats()["c1"]
+        assert stats["policy"] == "coalesce"
+        assert manager.hub.get_stats()["channels"] == {"agent_events": 1}
+
+        queue = manager.send_queues["c1"]
+        manager.disconnect("c1")
+
+        assert queue.closed
+        assert manager.send_queues == {}
+        assert manager.hub.get_stats()["channels"] == {}
+        manager.redis_events.remove_handler.assert_called_once()
+
+
+class TestEventFilter:
+    """Test cases for subscription expressions."""
+
+    def test_matches_event_type_and_step(self):
+        """Clauses match on the event and on its data."""
+        event_filter = EventFilter(
+            "event_type=workflow_progress, workflow_step_completed; step_id=build"
+        )
+
+        assert event_filter.matches(
+            {"event_type": "workflow_progress", "data": {"step_id": "build"}}
+        )
+        assert not event_filter.matches(
+            {"event_type": "workflow_progress", "data": {"step_id": "test"}}
+        )
+        assert not event_filter.matches(
+            {"event_type": "workflow_failed", "data": {"step_id": "build"}}
+        )
+
+    def test_exclusion(self):
+        """A != clause excludes the listed values."""
+        event_filter = EventFilter("event_type!=workflow_progress")
+
+        assert not event_filter.matches({"event_type": "workflow_progress"})
+        assert event_filter.matches({"event_type": "workflow_completed"})
+
+    @pytest.mark.parametrize("expression", ["", ";", "step_id", "step_id=", "a b=c"])
+    def test_invalid_expressions(self, expression):
+        """Malformed expressions are rejected."""
+        with pytest.raises(ValueError):
+            EventFilter(expression)
+
+
+class TestWorkflowSubscriptions:
+    """Test cases for per-workflow subscriptions."""
+
+    @pytest.fixture
+    async def manager(self):
+        """Create a manager with two watchers on each of three workflows."""
+        manager = ConnectionManager(send_queue_size=8, history_linger=0)
+        manager.redis_events = Mock()
+        manager.hub.redis_events = manager.redis_events
+        for workflow_id in ("wf-1", "wf-2", "wf-3"):
+            for n in (1, 2):
+                client_id = f"{workflow_id}-c{n}"
+                ws = Mock()
+                ws.accept = AsyncMock()
+                ws.send_text = AsyncMock()
+                await manager.connect(ws, client_id)
+                await manager.subscribe_to_workflow(client_id, workflow_id)
+        yield manager
+        for client_id in list(manager.send_queues):
+            manager.disconnect(client_id)
+
+    def handler_for(self, manager, channel):
+        """Get the upstream handler registered for a channel."""
+        for call in manager.redis_events.add_handler.call_args_list:
+            if call.args[0] == channel:
+                return call.args[1]
+        raise AssertionError(f"No handler for {channel}")
+
+    async def test_events_reach_only_the_workflows_watchers(self, manager):
+        """Watchers of other workflows receive nothing."""
+        assert manager.redis_events.add_handler.call_count == 3
+
+        self.handler_for(manager, "workflow_events:wf-1")(progress("wf-1", 10))
+
+        delivered = {
+            client_id: len(queue.frames)
+            for client_id, queue in manager.send_queues.items()
+        }
+        assert delivered == {
+            "wf-1-c1": 1,
+            "wf-1-c2": 1,
+            "wf-2-c1": 0,
+            "wf-2-c2": 0,
+            "wf-3-c1": 0,
+            "wf-3-c2": 0,
+        }
+
+    async def test_upstream_closes_with_last_watcher(self, manager):
+        """The workflow channel handler is removed when its last watcher leaves."""
+        manager.disconnect("wf-2-c1")
+        manager.redis_events.remove_handler.assert_not_called()
+
+        manager.disconnect("wf-2-c2")
+        manager.redis_events.remove_handler.assert_called_once()
+        assert manager.redis_events.remove_handler.call_args.args[0] == (
+            "workflow_events:wf-2"
+        )
+
+    async def test_filters_apply_per_client(self, manager):
+        """A client's filter drops events before they are encoded or queued."""
+        await manager.subscribe_to_workflow(
+            "wf-1-c1", "wf-1", EventFilter("event_type=workflow_completed")
+        )
+
+        self.handler_for(manager, "workflow_events:wf-1")(progress("wf-1", 10))
+
+        assert not manager.send_queues["wf-1-c1"].frames
+        assert len(manager.send_queues["wf-1-c2"].frames) == 1
+        assert manager.hub.get_stats()["frames_filtered"] == 1
+        # Replacing the filter keeps a single upstream handler
+        assert manager.redis_events.add_handler.call_count == 3
+
+
+class TestBatchingAndEncoding:
+    """Test cases for frame batching and the msgpack subprotocol."""
+
+    async def test_events_are_batched_into_one_array_frame(self, websocket):
+        """Events queued together go out as one frame; replies go alone."""
+        queue = ClientSendQueue("c1", websocket, batch_max=3, batch_delay=1)
+        for n in range(4):
+            queue.put(json.dumps({"n": n}), event=True)
+        queue.put(json.dumps({"type": "pong"}), control=True)
+        queue.start()
+        await asyncio.sleep(0.01)
+
+        sent = [json.loads(c.args[0]) for c in websocket.send_text.call_args_list]
+        assert sent == [[{"n": 0}, {"n": 1}, {"n": 2}], [{"n": 3}], {"type": "pong"}]
+        stats = queue.get_stats()
+        assert stats["sent"] == 5
+        assert stats["frames_sent"] == 3
+        queue.close()
+
+    async def test_partial_batch_waits_for_delay(self, websocket):
+        """A batch that does not fill is sent once its oldest event is due."""
+        queue = ClientSendQueue("c1", websocket, batch_max=10, batch_delay=0.03)
+        queue.start()
+        queue.put('{"n": 0}', event=True)
+
+        await asyncio.sleep(0.01)
+        websocket.send_text.assert_not_called()
+        queue.put('{"n": 1}', event=True)
+        await asyncio.sleep(0.05)
+
+        websocket.send_text.assert_awaited_once_with('[{"n": 0},{"n": 1}]')
+        queue.close()
+
+    async def test_msgpack_clients_get_binary_frames(self, websocket):
+        """Each encoding in use is encoded once; msgpack batches are arrays."""
+        msgpack = pytest.importorskip("msgpack")
+        websocket.send_bytes = AsyncMock()
+        queues = {
+            "json": ClientSendQueue("json", websocket),
+            "mp1": ClientSendQueue("mp1", websocket, encoding="msgpack"),
+            "mp2": ClientSendQueue(
+                "mp2", websocket, encoding="msgpack", batch_max=2, batch_delay=1
+            ),
+        }
+        hub = EventFanoutHub(queues)
+        for client_id in queues:
+            hub.subscribe(client_id, "agent_events", "agent_event")
+
+        hub.dispatch("agent_events", "agent_event", {"n": 1})
+        hub.dispatch("agent_events", "agent_event", {"n": 2})
+
+        assert queues["mp1"].frames[0][0] is queues["mp2"].frames[0][0]
+        assert json.loads(queues["json"].frames[0][0])["data"] == {"n": 1}
+
+        queues["mp2"].start()
+        await asyncio.sleep(0.01)
+        payload = websocket.send_bytes.call_args.args[0]
+        assert [(m["type"], m["data"]) for m in msgpack.unpackb(payload)] == [
+            ("agent_event", {"n": 1}),
+            ("agent_event", {"n": 2}),
+        ]
+        queues["mp2"].close()
+
+    def test_negotiate_subprotocol(self):
+        """The first supported subprotocol offered by the client wins."""
+        pytest.importorskip("msgpack")
+        ws = Mock()
+        ws.scope = {"subprotocols": ["graphql-ws", "devcycle.msgpack"]}
+        assert negotiate_subprotocol(ws) == ("devcycle.msgpack", "msgpack")
+
+        ws.scope = {"subprotocols": ["devcycle.json", "devcycle.msgpack"]}
+        assert negotiate_subprotocol(ws) == ("devcycle.json", "json")
+
+        ws.scope = {}
+        assert negotiate_subprotocol(ws) == (None, "json")
+
+
+class TestResumableSubscriptions:
+    """Test cases for event IDs and replay on resubscribe."""
+
+    @pytest.fixture
+    def hub(self, websocket):
+        """Create a hub whose channels linger after their last client."""
+        queues = {}
+        hub = EventFanoutHub(queues, history_size=3, history_linger=10)
+        hub.redis_events = Mock()
+        return hub
+
+    def connect(self, hub, websocket, client_id):
+        """Give a client a send queue."""
+        hub.queues[client_id] = ClientSendQueue(client_id, websocket)
+        return hub.queues[client_id]
+
+    async def test_ids_increase_and_stream_ids_are_kept(self, hub, websocket):
+        """Events get local IDs unless the publisher stamped a stream ID."""
+        queue = self.connect(hub, websocket, "c1")
+        hub.subscribe("c1", "agent_events", "agent_event")
+
+        hub.dispatch("agent_events", "agent_event", {"n": 1})
+        hub.dispatch("agent_events", "agent_event", {"n": 2})
+        hub.dispatch("agent_events", "agent_event", {"stream_id": "9-0", "n": 3})
+
+        ids = [message["id"] for message in queued(queue)]
+        epoch, first = ids[0].split("-")
+        assert ids == [f"{epoch}-{first}", f"{epoch}-{int(first) + 1}", "9-0"]
+
+    async def test_reconnect_replays_from_lingering_history(self, hub, websocket):
+        """A client that returns within the linger time gets what it missed."""
+        queue = self.connect(hub, websocket, "c1")
+        hub.subscribe("c1", "agent_events", "agent_event")
+        hub.dispatch("agent_events", "agent_event", {"n": 1})
+        last_id = queued(queue)[-1]["id"]
+        hub.unsubscribe_all("c1")
+        del hub.queues["c1"]
+
+        # The upstream handler outlives the client and keeps recording
+        hub.redis_events.remove_handler.assert_not_called()
+        assert hub.get_stats()["lingering_channels"] == 1
+        hub.dispatch("agent_events", "agent_event", {"n": 2})
+        hub.dispatch("agent_events", "agent_event", {"n": 3})
+
+        queue = self.connect(hub, websocket, "c1")
+        assert hub.subscribe("c1", "agent_events", "agent_event", since=last_id)
+        hub.dispatch("agent_events", "agent_event", {"n": 4})
+
+        messages = queued(queue)
+        assert [m["data"]["n"] for m in messages if "data" in m] == [2, 3, 4]
+        assert messages[2]["type"] == "replay_complete"
+        assert messages[2]["replayed"] == 2
+        assert messages[2]["last_id"] == messages[1]["id"]
+        assert hub.get_stats()["lingering_channels"] == 0
+        hub.redis_events.add_handler.assert_called_once()
+
+    async def test_lingering_channel_is_released(self, websocket):
+        """The upstream handler is removed once the linger time passes."""
+        hub = EventFanoutHub({}, history_linger=0.01)
+        hub.redis_events = Mock()
+        hub.subscribe("c1", "agent_events", "agent_event")
+        hub.unsubscribe("c1", "agent_events")
+
+        await asyncio.sleep(0.03)
+
+        hub.redis_events.remove_handler.assert_called_once()
+        assert hub.history == {}
+
+    async def test_gap_older_than_history_holds_live_events(self, hub, websocket):
+        """Live events wait for the stream replay and are not duplicated."""
+        queue = self.connect(hub, websocket, "c1")
+        assert not hub.subscribe("c1", "agent_events", "agent_event", since="1-0")
+        hub.dispatch("agent_events", "agent_event", {"event_id": "e3", "n": 3})
+        hub.dispatch("agent_events", "agent_event", {"event_id": "e4", "n": 4})
+        assert not queue.frames
+
+        hub.finish_replay(
+            "c1",
+            "agent_events",
+            "1-0",
+            [("2-0", {"event_id": "e2", "n": 2}), ("3-0", {"event_id": "e3", "n": 3})],
+        )
+
+        messages = queued(queue)
+        assert [m.get("id") for m in messages] == [
+            "2-0",
+            "3-0",
+            None,
+            messages[3]["id"],
+        ]
+        assert messages[2]["type"] == "replay_complete"
+        assert messages[3]["data"]["n"] == 4
+
+    async def test_resync_required_when_nothing_is_retained(self, hub, websocket):
+        """The client is told to refetch, then gets live events."""
+        queue = self.connect(hub, websocket, "c1")
+        hub.subscribe("c1", "agent_events", "agent_event", since="1-0")
+        hub.dispatch("agent_events", "agent_event", {"n": 1})
+
+        hub.finish_replay("c1", "agent_events", "1-0", None)
+
+        messages = queued(queue)
+        assert messages[0] == {
+            "type": "resync_required",
+            "channel": "agent_events",
+            "since": "1-0",
+        }
+        assert messages[1]["data"] == {"n": 1}
+        assert hub.get_stats()["resyncs"] == 1
+
+
+class TestStreamReplay:
+    """Test cases for replaying from the Redis Streams log."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a manager whose events service has a stream log."""
+        manager = ConnectionManager(send_queue_size=8, history_linger=0)
+        manager.redis_events = Mock()
+        manager.redis_events.streams = RedisStreamEvents(Mock())
+        manager.hub.redis_events = manager.redis_events
+        return manager
+
+    def log(self, manager, *entries):
+        """Make the stream log return entries from an inclusive read."""
+        manager.redis_events.streams.redis.xrange = AsyncMock(
+            return_value=[
+                (entry_id, {"channel": "c", "event": json.dumps(data)})
+                for entry_id, data in entries
+            ]
+        )
+
+    async def test_workflow_channel_replays_from_family_stream(
+        self, manager, websocket
+    ):
+        """Only the workflow's own events are replayed from its family's log."""
+        self.log(
+            manager,
+            ("5-0", {"source": "wf-1"}),
+            ("6-0", {"source": "wf-2", "n": 6}),
+            ("7-0", {"source": "wf-1", "n": 7}),
+        )
+        await manager.connect(websocket, "c1")
+
+        await manager.subscribe_to_workflow("c1", "wf-1", since="5-0")
+
+        xrange = manager.redis_events.streams.redis.xrange
+        assert xrange.call_args.args[0] == "acp:stream:workflow_events"
+        assert xrange.call_args.kwargs["min"] == "5-0"
+        messages = queued(manager.send_queues["c1"])
+        assert messages[0] == {
+            "type": "workflow_event",
+            "id": "7-0",
+            "data": {"source": "wf-1", "n": 7},
+        }
+        assert messages[1]["type"] == "replay_complete"
+        manager.disconnect("c1")
+
+    async def test_trimmed_log_requires_resync(self, manager, websocket):
+        """A since ID no longer in the log means the client must refetch."""
+        self.log(manager, ("8-0", {"source": "wf-1"}))
+        await manager.connect(websocket, "c1")
+
+        await manager.subscribe_to_events(
+            "c1", {"agent_events"}, {"agent_events": "5-0"}
+        )
+
+        assert queued(manager.send_queues["c1"])[0]["type"] == "resync_required"
+        manager.disconnect("c1")
@@ -0,0 +1,197 @@
+"""Unit tests for the cluster-wide WebSocket registry."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from devcycle.api.routes.websocket import ConnectionManager
+from devcycle.api.websocket_registry import RELEASE_CLIENTS, WebSocketRegistry
+from devcycle.core.cache.lua_scripts import LuaScript
+
+RELEASE_SHA = LuaScript("release", RELEASE_CLIENTS).sha
+
+
+async def no_message(**kwargs):
+    """Wait briefly for a Pub/Sub message that never comes."""
+    await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def mock_redis():
+    """Create a mock async Redis client."""
+    client = Mock()
+    # The last reply of a heartbeat lists expired workers
+    client.pipeline.return_value.execute = AsyncMock(return_value=[[]])
+    client.pipeline.return_value.command_stack = []
+    client.evalsha = AsyncMock(return_value=1)
+    client.publish = AsyncMock(return_value=1)
+    client.mget = AsyncMock(return_value=[])
+    client.pubsub.return_value.subscribe = AsyncMock()
+    client.pubsub.return_value.get_message = AsyncMock(side_effect=no_message)
+    client.pubsub.return_value.aclose = AsyncMock()
+    return client
+
+
+@pytest.fixture
+async def registry(mock_redis):
+    """Create a started registry for worker w1."""
+    registry = WebSocketRegistry(interval=60, worker_id="w1")
+    registry.client_connected("c1")
+    on_message = AsyncMock()
+    await registry.start(mock_redis, on_message, lambda: {"connections": 1})
+    registry.on_message = on_message
+    yield registry
+    await registry.stop()
+
+
+class TestWebSocketRegistry:
+    """Test cases for WebSocketRegistry."""
+
+    async def test_start_writes_clients_and_presence_in_one_pipeline(
+        self, registry, mock_redis
+    ):
+        """Existing clients, presence and the worker set share a round trip."""
+        mock_redis.pubsub.return_value.subscribe.assert_awaited_once_with(
+            "devcycle:ws:worker:w1:messages", "devcycle:ws:broadcast"
+        )
+        pipe = mock_redis.pipeline.return_value
+        pipe.hset.assert_called_once_with("devcycle:ws:clients", mapping={"c1": "w1"})
+        pipe.sadd.assert_called_once_with("devcycle:ws:worker:w1:clients", "c1")
+        key, presence = pipe.set.call_args.args
+        assert key == "devcycle:ws:worker:w1"
+        assert json.loads(presence)["connections"] == 1
+        assert pipe.set.call_args.kwargs["ex"] == 180
+        pipe.zadd.assert_called_once()
+        pipe.zrangebyscore.assert_called_once()
+        pipe.execute.assert_awaited_once()
+
+    async def test_disconnect_releases_only_own_mapping(self, registry, mock_redis):
+        """A client is removed from the hash only if this worker still holds it."""
+        pipe = mock_redis.pipeline.return_value
+        registry.client_disconnected("c1")
+
+        await registry._sync()
+
+        pipe.evalsha.assert_called_once_with(
+            RELEASE_SHA, 1, "devcycle:ws:clients", "w1", "c1"
+        )
+        pipe.srem.assert_called_once_with("devcycle:ws:worker:w1:clients", "c1")
+
+    async def test_heartbeat_releases_expired_workers(self, registry, mock_redis):
+        """Clients of workers that stopped heartbeating are released."""
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.side_effect = [[True, 1, ["w3"]], [{"c3"}], [1, 1, 1]]
+        pipe.evalsha.reset_mock()
+
+        await registry._sync()
+
+        pipe.smembers.assert_called_once_with("devcycle:ws:worker:w3:clients")
+        pipe.evalsha.assert_called_once_with(
+            RELEASE_SHA, 1, "devcycle:ws:clients", "w3", "c3"
+        )
+        pipe.delete.assert_called_once_with("devcycle:ws:worker:w3:clients")
+        pipe.zrem.assert_called_once_with("devcycle:ws:workers", "w3")
+
+    async def test_failed_heartbeat_keeps_changes(self, registry, mock_redis):
+        """Client changes are retried after a failed write."""
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.side_effect = ConnectionError()
+        registry.client_connected("c2")
+
+        await registry._sync()
+
+        assert registry._added == {"c2"}
+        assert registry.get_stats()["heartbeat_errors"] == 1
+
+    async def test_send_routes_through_script(self, registry, mock_redis):
+        """A message is published on the holding worker's channel."""
+        assert await registry.send("c9", "hello") is True
+
+        args = mock_redis.evalsha.call_args.args
+        assert args[2:6] == (
+            "devcycle:ws:clients",
+            "c9",
+            "devcycle:ws:worker:",
+            ":messages",
+        )
+        assert json.loads(args[6]) == {"client_id": "c9", "message": "hello"}
+
+        mock_redis.evalsha.return_value = -1  # Unknown client
+        assert await registry.send("c9", "hello") is False
+        stats = registry.get_stats()
+        assert stats["messages_routed"] == 1
+        assert stats["messages_unroutable"] == 1
+
+    async def test_routed_and_broadcast_messages_are_delivered(self, registry):
+        """Messages for this worker are delivered; its own broadcasts are not."""
+        await registry._handle_message(
+            "devcycle:ws:worker:w1:messages",
+            json.dumps({"client_id": "c1", "message": "hi"}),
+        )
+        await registry._handle_message(
+            b"devcycle:ws:broadcast",
+            json.dumps({"origin": "w2", "message": "all"}).encode(),
+        )
+        await registry._handle_message(
+            "devcycle:ws:broadcast", json.dumps({"origin": "w1", "message": "own"})
+        )
+
+        assert [c.args for c in registry.on_message.await_args_list] == [
+            ("c1", "hi"),
+            (None, "all"),
+        ]
+
+    async def test_cluster_status_aggregates_live_workers(self, registry, mock_redis):
+        """Totals are summed from live workers' presence, not the client hash."""
+        mock_redis.zrangebyscore = AsyncMock(return_value=["w1", "w2", "w3"])
+        mock_redis.mget.return_value = [
+            json.dumps({"connections": 1, "channels": {"agent_events": 1}}),
+            json.dumps({"connections": 2, "channels": {"agent_events": 2}}),
+            None,  # Presence expired since the heartbeat
+        ]
+
+        status = await registry.get_cluster_status()
+
+        assert status["active_connections"] == 3
+        assert status["channels"] == {"agent_events": 3}
+        assert set(status["workers"]) == {"w1", "w2"}
+        mock_redis.hgetall.assert_not_called()
+
+
+class TestConnectionManagerRouting:
+    """Test cases for the connection manager's use of the registry."""
+
+    async def test_messages_for_remote_clients_use_the_registry(self):
+        """Unknown clients are looked up on other workers."""
+        manager = ConnectionManager()
+        manager.registry = Mock()
+        manager.registry.send = AsyncMock(return_value=True)
+        manager.registry.broadcast = AsyncMock()
+
+        assert await manager.send_personal_message("hi", "remote") is True
+        manager.registry.send.assert_awaited_once_with("remote", "hi")
+
+        await manager.broadcast("all")
+        manager.registry.broadcast.assert_awaited_once_with("all")
+
+    async def test_routed_message_reaches_local_queue(self):
+        """A routed message is queued for the local client, not routed again."""
+        manager = ConnectionManager(send_queue_size=8, history_linger=0)
+        manager.registry = Mock()
+        manager.registry.send = AsyncMock()
+        websocket = Mock()
+        websocket.accept = AsyncMock()
+        websocket.send_text = AsyncMock()
+        await manager.connect(websocket, "c1")
+        manager.registry.client_connected.assert_called_once_with("c1")
+
+        await manager._deliver_routed("c1", "hi")
+        await manager._deliver_routed("gone", "hi")
+
+        assert [entry[0] for entry in manager.send_queues["c1"].frames] == ["hi"]
+        manager.registry.send.assert_not_called()
+        assert manager.get_presence()["connections"] == 1
+        manager.disconnect("c1")
+        manager.registry.client_disconnected.assert_called_once_with("c1")
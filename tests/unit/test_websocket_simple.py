@@ -1,5 +1,6 @@
 """Simplified WebSocket tests that avoid hanging issues."""
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -141,16 +142,32 @@ class TestConnectionManagerSimple:
         assert websocket_router.prefix == "/ws"
         assert "websocket" in websocket_router.tags
 
-    @pytest.mark.asyncio
-    async def test_handle_agent_event(self, manager):
-        """Test handling agent events."""
-        client_id = "test-client-1"
+    async def _deliver(self, manager, channel, event_data):
+        """Deliver an upstream event to a subscribed client."""
         mock_websocket = Mock()
+        mock_websocket.accept = AsyncMock()
         mock_websocket.send_text = AsyncMock()
+        mock_redis_events = Mock()
+        mock_redis_events.start = AsyncMock()
 
-        # Set up connection and subscription
-        manager.active_connections[client_id] = mock_websocket
-        manager.connection_subscriptions[client_id] = {"agent_events"}
+        await manager.connect(mock_websocket, "test-client-1")
+        with patch(
+            "devcycle.api.routes.websocket.get_redis_events",
+            return_value=mock_redis_events,
+        ):
+            await manager.subscribe_to_events("test-client-1", {channel})
+
+        # Call the handler the hub registered upstream
+        upstream_channel, handler = mock_redis_events.add_handler.call_args[0]
+        assert upstream_channel == channel
+        handler(event_data)
+        await asyncio.sleep(0.01)  # Let the writer task send
+        manager.disconnect("test-client-1")
+        return mock_websocket
+
+    @pytest.mark.asyncio
+    async def test_handle_agent_event(self, manager):
+        """Test handling agent events."""
 
         # Test agent event
         event_data = {
@@ -160,7 +177,7 @@ class TestConnectionManagerSimple:
             "new_status": "online",
         }
 
-        await manager._handle_agent_event(event_data, client_id)
+        mock_websocket = await self._deliver(manager, "agent_events", event_data)
         mock_websocket.send_text.assert_called_once()
 
         # Verify message content
@@ -172,13 +189,6 @@ class TestConnectionManagerSimple:
     @pytest.mark.asyncio
     async def test_handle_workflow_event(self, manager):
         """Test handling workflow events."""
-        client_id = "test-client-1"
-        mock_websocket = Mock()
-        mock_websocket.send_text = AsyncMock()
-
-        # Set up connection and subscription
-        manager.active_connections[client_id] = mock_websocket
-        manager.connection_subscriptions[client_id] = {"workflow_events"}
 
         # Test workflow event
         event_data = {
@@ -188,7 +198,7 @@ class TestConnectionManagerSimple:
             "progress": 50,
         }
 
-        await manager._handle_workflow_event(event_data, client_id)
+        mock_websocket = await self._deliver(manager, "workflow_events", event_data)
         mock_websocket.send_text.assert_called_once()
 
         # Verify message content
@@ -200,13 +210,6 @@ class TestConnectionManagerSimple:
     @pytest.mark.asyncio
     async def test_handle_system_health_event(self, manager):
         """Test handling system health events."""
-        client_id = "test-client-1"
-        mock_websocket = Mock()
-        mock_websocket.send_text = AsyncMock()
-
-        # Set up connection and subscription
-        manager.active_connections[client_id] = mock_websocket
-        manager.connection_subscriptions[client_id] = {"system_health"}
 
         # Test system health event
         event_data = {
@@ -216,7 +219,7 @@ class TestConnectionManagerSimple:
             "metrics": {"cpu_usage": 45.2},
         }
 
-        await manager._handle_system_health_event(event_data, client_id)
+        mock_websocket = await self._deliver(manager, "system_health", event_data)
         mock_websocket.send_text.assert_called_once()
 
         # Verify message content
@@ -228,13 +231,6 @@ class TestConnectionManagerSimple:
     @pytest.mark.asyncio
     async def test_handle_performance_metrics_event(self, manager):
         """Test handling performance metrics events."""
-        client_id = "test-client-1"
-        mock_websocket = Mock()
-        mock_websocket.send_text = AsyncMock()
-
-        # Set up connection and subscription
-        manager.active_connections[client_id] = mock_websocket
-        manager.connection_subscriptions[client_id] = {"performance_metrics"}
 
         # Test performance metrics event
         event_data = {
@@ -244,7 +240,7 @@ class TestConnectionManagerSimple:
             "timestamp": "2024-01-01T00:00:00Z",
         }
 
-        await manager._handle_performance_metrics_event(event_data, client_id)
+        mock_websocket = await self._deliver(manager, "performance_metrics", event_data)
         mock_websocket.send_text.assert_called_once()
 
         # Verify message content
@@ -256,13 +252,6 @@ class TestConnectionManagerSimple:
     @pytest.mark.asyncio
     async def test_handle_error_alert_event(self, manager):
         """Test handling error alert events."""
-        client_id = "test-client-1"
-        mock_websocket = Mock()
-        mock_websocket.send_text = AsyncMock()
-
-        # Set up connection and subscription
-        manager.active_connections[client_id] = mock_websocket
-        manager.connection_subscriptions[client_id] = {"error_alerts"}
 
         # Test error alert event
         event_data = {
@@ -272,7 +261,7 @@ class TestConnectionManagerSimple:
             "severity": "error",
         }
 
-        await manager._handle_error_alert_event(event_data, client_id)
+        mock_websocket = await self._deliver(manager, "error_alerts", event_data)
         mock_websocket.send_text.assert_called_once()
 
         # Verify message content
@@ -20,6 +20,8 @@ class TestWorkflowRedisIntegration:
         mock_cache = Mock(spec=ACPCache)
         mock_cache.cache_workflow_state = AsyncMock(return_value=True)
         mock_cache.update_workflow_step = AsyncMock(return_value=True)
+        mock_cache.complete_workflow_step = AsyncMock(return_value={})
+        mock_cache.advance_workflow_progress = AsyncMock(return_value={})
         mock_cache.get_workflow_state = AsyncMock(return_value=None)
         mock_cache.get_workflow_step = AsyncMock(return_value=None)
         return mock_cache
@@ -119,9 +121,10 @@ class TestWorkflowRedisIntegration:
         step = sample_workflow.steps[0]
         await workflow_engine._execute_step(sample_workflow, step)
 
-        # Verify step result was cached
-        mock_acp_cache.update_workflow_step.assert_called_once()
-        call_args = mock_acp_cache.update_workflow_step.call_args
+        # Verify step result was cached atomically with the progress update
+        mock_acp_cache.update_workflow_step.assert_not_called()
+        mock_acp_cache.complete_workflow_step.assert_called_once()
+        call_args = mock_acp_cache.complete_workflow_step.call_args
 
         assert call_args[0][0] == "test-workflow-1"  # workflow_id
         assert call_args[0][1] == "step1"  # step_id
@@ -207,26 +210,14 @@ class TestWorkflowRedisIntegration:
     @pytest.mark.asyncio
     async def test_update_workflow_progress(self, workflow_engine, mock_acp_cache):
         """Test updating workflow progress in Redis cache."""
-        current_state = {
-            "status": "running",
-            "current_step": "step1",
-            "progress": 25,
-            "total_steps": 4,
-        }
-        mock_acp_cache.get_workflow_state.return_value = current_state
-
         await workflow_engine.update_workflow_progress("test-workflow-1", "step2", 50)
 
-        # Verify state was updated and cached
-        mock_acp_cache.get_workflow_state.assert_called_once_with("test-workflow-1")
-        mock_acp_cache.cache_workflow_state.assert_called_once()
-
-        call_args = mock_acp_cache.cache_workflow_state.call_args
-        updated_state = call_args[0][1]
-
-        assert updated_state["current_step"] == "step2"
-        assert updated_state["progress"] == 50
-        assert updated_state["status"] == "running"  # Other fields preserved
+        # Progress is updated server-side without a read-modify-write
+        mock_acp_cache.advance_workflow_progress.assert_called_once_with(
+            "test-workflow-1", "step2", 50
+        )
+        mock_acp_cache.get_workflow_state.assert_not_called()
+        mock_acp_cache.cache_workflow_state.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_workflow_completion_caches_final_state(